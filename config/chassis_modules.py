@@ -24,6 +24,10 @@ def modules():
     pass
 
 
+# 'upgrade-all' command ('config chassis upgrade-all ...'), parallel upgrade of the OTN linecards
+chassis.add_lazy_command('upgrade-all', 'otn.chassis.chassis_upgrade:chassis_upgrade_all')
+
+
 def get_config_module_state(db, chassis_module_name):
     config_db = db.cfgdb
     fvs = config_db.get_entry('CHASSIS_MODULE', chassis_module_name)
@@ -18,6 +18,7 @@ from jsondiff import diff
 from sonic_py_common import port_util
 from swsscommon.swsscommon import SonicV2Connector, ConfigDBConnector
 from utilities_common.general import load_module_from_source
+from utilities_common.yang_cache import load_sonic_yang
 
 
 # Load sonic-cfggen from source since /usr/local/bin/sonic-cfggen does not have .py extension.
@@ -71,9 +72,8 @@ class ConfigMgmt():
         return
 
     def __init_sonic_yang(self):
-        self.sy = sonic_yang.SonicYang(YANG_DIR, debug=self.DEBUG, sonic_yang_options=self.sonicYangOptions)
-        # load yang models
-        self.sy.loadYangModel()
+        # load yang models, from the cache when they are unchanged
+        self.sy = load_sonic_yang(YANG_DIR, debug=self.DEBUG, sonic_yang_options=self.sonicYangOptions)
         # load jIn from config DB or from config DB json file.
         if self.source.lower() == 'configdb':
             self.readConfigDB()
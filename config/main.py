@@ -17,14 +17,15 @@ import time
 import itertools
 import copy
 import tempfile
+import lazy_object_proxy
 import sonic_yang
 
 from jsonpatch import JsonPatchConflict
 from jsonpointer import JsonPointerException
 from collections import OrderedDict
+from importlib import import_module
 from generic_config_updater.generic_updater import GenericUpdater, ConfigFormat, extract_scope
-from generic_config_updater.gu_common import HOST_NAMESPACE, GenericConfigUpdaterError
-from minigraph import parse_device_desc_xml, minigraph_encoder
+from generic_config_updater.gu_common import HOST_NAMESPACE, GenericConfigUpdaterError, YANG_DIR
 from natsort import natsorted
 from portconfig import get_child_ports
 from socket import AF_INET, AF_INET6
@@ -45,30 +46,20 @@ from utilities_common.general import load_db_config, load_module_from_source
 from .validated_config_db_connector import ValidatedConfigDBConnector
 import utilities_common.multi_asic as multi_asic_util
 from utilities_common.flock import try_lock
+from utilities_common.yang_cache import load_sonic_yang
 from otn.config_main import *
 
 from .utils import log
 
-from . import aaa
-from . import chassis_modules
-from . import console
-from . import feature
-from . import fabric
-from . import flow_counters
-from . import kdump
-from . import kube
-from . import muxcable
-from . import nat
-from . import vlan
-from . import vxlan
 from . import plugins
-from .config_mgmt import ConfigMgmtDPB, ConfigMgmt, YANG_DIR
-from . import mclag
-from . import syslog
-from . import switchport
-from . import dns
-from . import bgp_cli
-from . import stp
+
+# Modules only needed by a few commands, imported on first use
+parse_device_desc_xml = lazy_object_proxy.Proxy(lambda: import_module('minigraph').parse_device_desc_xml)
+minigraph_encoder = lazy_object_proxy.Proxy(lambda: import_module('minigraph').minigraph_encoder)
+ConfigMgmtDPB = lazy_object_proxy.Proxy(lambda: import_module('config.config_mgmt').ConfigMgmtDPB)
+ConfigMgmt = lazy_object_proxy.Proxy(lambda: import_module('config.config_mgmt').ConfigMgmt)
+# Still reachable as config.main.vlan, as when the subcommand modules were imported eagerly
+vlan = lazy_object_proxy.Proxy(lambda: import_module('config.vlan'))
 
 # mock masic APIs for unit test
 try:
@@ -1235,7 +1226,8 @@ def apply_patch_wrapper(args):
 
 
 # Function to apply patch for a single ASIC.
-def apply_patch_for_scope(scope_changes, results, config_format, verbose, dry_run, ignore_non_yang_tables, ignore_path):
+def apply_patch_for_scope(scope_changes, results, config_format, verbose, dry_run, ignore_non_yang_tables, ignore_path,
+                          sort_workers=1):
     scope, changes = scope_changes
     # Replace localhost to DEFAULT_NAMESPACE which is db definition of Host
     if scope.lower() == HOST_NAMESPACE or scope == "":
@@ -1247,12 +1239,12 @@ def apply_patch_for_scope(scope_changes, results, config_format, verbose, dry_ru
 
     try:
         # Call apply_patch with the ASIC-specific changes and predefined parameters
-        GenericUpdater(scope=scope).apply_patch(jsonpatch.JsonPatch(changes),
-                                                config_format,
-                                                verbose,
-                                                dry_run,
-                                                ignore_non_yang_tables,
-                                                ignore_path)
+        GenericUpdater(scope=scope, sort_workers=sort_workers).apply_patch(jsonpatch.JsonPatch(changes),
+                                                                           config_format,
+                                                                           verbose,
+                                                                           dry_run,
+                                                                           ignore_non_yang_tables,
+                                                                           ignore_path)
         results[scope_for_log] = {"success": True, "message": "Success"}
         log.log_notice(f"'apply-patch' executed successfully for {scope_for_log} by {changes} in thread:{thread_id}")
     except Exception as e:
@@ -1398,8 +1390,7 @@ def config_file_yang_validation(filename):
     if not isinstance(config, dict):
         return False
 
-    sy = sonic_yang.SonicYang(YANG_DIR)
-    sy.loadYangModel()
+    sy = load_sonic_yang(YANG_DIR)
     asic_list = [HOST_NAMESPACE]
     if multi_asic.is_multi_asic():
         asic_list.extend(multi_asic.get_namespace_list())
@@ -1459,38 +1450,38 @@ def config(ctx):
 
 add_otn_config_commands(config)
 
-# Add groups from other modules
-config.add_command(aaa.aaa)
-config.add_command(aaa.tacacs)
-config.add_command(aaa.radius)
-config.add_command(chassis_modules.chassis)
-config.add_command(console.console)
-config.add_command(fabric.fabric)
-config.add_command(feature.feature)
-config.add_command(flow_counters.flowcnt_route)
-config.add_command(kdump.kdump)
-config.add_command(kube.kubernetes)
-config.add_command(muxcable.muxcable)
-config.add_command(nat.nat)
-config.add_command(vlan.vlan)
-config.add_command(vxlan.vxlan)
+# Add groups from other modules, they are imported when resolved
+config.add_lazy_command('aaa', 'config.aaa:aaa')
+config.add_lazy_command('tacacs', 'config.aaa:tacacs')
+config.add_lazy_command('radius', 'config.aaa:radius')
+config.add_lazy_command('chassis', 'config.chassis_modules:chassis')
+config.add_lazy_command('console', 'config.console:console')
+config.add_lazy_command('fabric', 'config.fabric:fabric')
+config.add_lazy_command('feature', 'config.feature:feature')
+config.add_lazy_command('flowcnt-route', 'config.flow_counters:flowcnt_route')
+config.add_lazy_command('kdump', 'config.kdump:kdump')
+config.add_lazy_command('kubernetes', 'config.kube:kubernetes')
+config.add_lazy_command('muxcable', 'config.muxcable:muxcable')
+config.add_lazy_command('nat', 'config.nat:nat')
+config.add_lazy_command('vlan', 'config.vlan:vlan')
+config.add_lazy_command('vxlan', 'config.vxlan:vxlan')
 
 # add stp commands
-config.add_command(stp.spanning_tree)
+config.add_lazy_command('spanning-tree', 'config.stp:spanning_tree')
 
 # add mclag commands
-config.add_command(mclag.mclag)
-config.add_command(mclag.mclag_member)
-config.add_command(mclag.mclag_unique_ip)
+config.add_lazy_command('mclag', 'config.mclag:mclag')
+config.add_lazy_command('member', 'config.mclag:mclag_member')
+config.add_lazy_command('unique-ip', 'config.mclag:mclag_unique_ip')
 
 # syslog module
-config.add_command(syslog.syslog)
+config.add_lazy_command('syslog', 'config.syslog:syslog')
 
 # DNS module
-config.add_command(dns.dns)
+config.add_lazy_command('dns', 'config.dns:dns')
 
 # Switchport module
-config.add_command(switchport.switchport)
+config.add_lazy_command('switchport', 'config.switchport:switchport')
 
 @config.command()
 @click.option('-y', '--yes', is_flag=True, callback=_abort_if_false,
@@ -1628,14 +1619,21 @@ def print_dry_run_message(dry_run):
 @click.option('-n', '--ignore-non-yang-tables', is_flag=True, default=False, help='ignore validation for tables without YANG models', hidden=True)
 @click.option('-i', '--ignore-path', multiple=True, help='ignore validation for config specified by given path which is a JsonPointer', hidden=True)
 @click.option('-v', '--verbose', is_flag=True, default=False, help='print additional details of what the operation is doing')
+@click.option('-w', '--sort-workers', type=click.IntRange(min=1), default=1, show_default=True,
+              help='number of processes validating the candidate changes while sorting the patch')
 @click.pass_context
-def apply_patch(ctx, patch_file_path, format, dry_run, parallel, ignore_non_yang_tables, ignore_path, verbose):
+def apply_patch(ctx, patch_file_path, format, dry_run, parallel, ignore_non_yang_tables, ignore_path, verbose,
+                sort_workers):
     """Apply given patch of updates to Config. A patch is a JsonPatch which follows rfc6902.
        This command can be used do partial updates to the config with minimum disruption to running processes.
        It allows addition as well as deletion of configs. The patch file represents a diff of ConfigDb(ABNF)
        format or SonicYang format.
 
        <patch-file-path>: Path to the patch file on the file-system."""
+    # The sort workers are forked, which is not safe from the threads applying the scopes in parallel
+    if parallel and sort_workers > 1:
+        ctx.fail("--parallel cannot be used with --sort-workers greater than 1")
+
     try:
         print_dry_run_message(dry_run)
 
@@ -1679,7 +1677,7 @@ def apply_patch(ctx, patch_file_path, format, dry_run, parallel, ignore_non_yang
             with concurrent.futures.ThreadPoolExecutor() as executor:
                 # Prepare the argument tuples
                 arguments = [(scope_changes, results, config_format,
-                              verbose, dry_run, ignore_non_yang_tables, ignore_path)
+                              verbose, dry_run, ignore_non_yang_tables, ignore_path, sort_workers)
                              for scope_changes in changes_by_scope.items()]
 
                 # Submit all tasks and wait for them to complete
@@ -1694,7 +1692,8 @@ def apply_patch(ctx, patch_file_path, format, dry_run, parallel, ignore_non_yang
                                       config_format,
                                       verbose, dry_run,
                                       ignore_non_yang_tables,
-                                      ignore_path)
+                                      ignore_path,
+                                      sort_workers)
 
         # Check if any updates failed
         failures = [scope for scope, result in results.items() if not result['success']]
@@ -1719,8 +1718,10 @@ def apply_patch(ctx, patch_file_path, format, dry_run, parallel, ignore_non_yang
 @click.option('-n', '--ignore-non-yang-tables', is_flag=True, default=False, help='ignore validation for tables without YANG models', hidden=True)
 @click.option('-i', '--ignore-path', multiple=True, help='ignore validation for config specified by given path which is a JsonPointer', hidden=True)
 @click.option('-v', '--verbose', is_flag=True, default=False, help='print additional details of what the operation is doing')
+@click.option('-w', '--sort-workers', type=click.IntRange(min=1), default=1, show_default=True,
+              help='number of processes validating the candidate changes while sorting the patch')
 @click.pass_context
-def replace(ctx, target_file_path, format, dry_run, ignore_non_yang_tables, ignore_path, verbose):
+def replace(ctx, target_file_path, format, dry_run, ignore_non_yang_tables, ignore_path, verbose, sort_workers):
     """Replace the whole config with the specified config. The config is replaced with minimum disruption e.g.
        if ACL config is different between current and target config only ACL config is updated, and other config/services
        such as DHCP will not be affected.
@@ -1737,7 +1738,8 @@ def replace(ctx, target_file_path, format, dry_run, ignore_non_yang_tables, igno
 
         config_format = ConfigFormat[format.upper()]
 
-        GenericUpdater().replace(target_config, config_format, verbose, dry_run, ignore_non_yang_tables, ignore_path)
+        GenericUpdater(sort_workers=sort_workers).replace(target_config, config_format, verbose, dry_run,
+                                                          ignore_non_yang_tables, ignore_path)
 
         click.secho("Config replaced successfully.", fg="cyan", underline=True)
     except Exception as ex:
@@ -1750,8 +1752,10 @@ def replace(ctx, target_file_path, format, dry_run, ignore_non_yang_tables, igno
 @click.option('-n', '--ignore-non-yang-tables', is_flag=True, default=False, help='ignore validation for tables without YANG models', hidden=True)
 @click.option('-i', '--ignore-path', multiple=True, help='ignore validation for config specified by given path which is a JsonPointer', hidden=True)
 @click.option('-v', '--verbose', is_flag=True, default=False, help='print additional details of what the operation is doing')
+@click.option('-w', '--sort-workers', type=click.IntRange(min=1), default=1, show_default=True,
+              help='number of processes validating the candidate changes while sorting the patch')
 @click.pass_context
-def rollback(ctx, checkpoint_name, dry_run, ignore_non_yang_tables, ignore_path, verbose):
+def rollback(ctx, checkpoint_name, dry_run, ignore_non_yang_tables, ignore_path, verbose, sort_workers):
     """Rollback the whole config to the specified checkpoint. The config is rolled back with minimum disruption e.g.
        if ACL config is different between current and checkpoint config only ACL config is updated, and other config/services
        such as DHCP will not be affected.
@@ -1760,7 +1764,8 @@ def rollback(ctx, checkpoint_name, dry_run, ignore_non_yang_tables, ignore_path,
     try:
         print_dry_run_message(dry_run)
 
-        GenericUpdater().rollback(checkpoint_name, verbose, dry_run, ignore_non_yang_tables, ignore_path)
+        GenericUpdater(sort_workers=sort_workers).rollback(checkpoint_name, verbose, dry_run,
+                                                           ignore_non_yang_tables, ignore_path)
 
         click.secho("Config rolled back successfully.", fg="cyan", underline=True)
     except Exception as ex:
@@ -4423,7 +4428,7 @@ def bgp():
 
 
 # BGP module extensions
-config.commands['bgp'].add_command(bgp_cli.DEVICE_GLOBAL)
+config.commands['bgp'].add_lazy_command('device-global', 'config.bgp_cli:DEVICE_GLOBAL')
 
 #
 # 'shutdown' subgroup ('config bgp shutdown ...')
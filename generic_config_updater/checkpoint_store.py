@@ -0,0 +1,255 @@
+import contextlib
+import copy
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+from datetime import datetime, timezone
+from utilities_common.flock import acquire_flock, release_flock
+from .gu_common import GenericConfigUpdaterError
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+CHECKPOINT_INDEX_FILE = "index.json"
+CHECKPOINT_CHUNKS_DIR = "chunks"
+CHECKPOINT_LOCK_FILE = "index.lock"
+CHECKPOINT_STORE_VERSION = 1
+# Maximum number of deltas to apply on a full chunk to rebuild a table
+CHECKPOINT_MAX_DELTA_CHAIN = 8
+ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+
+
+def dump_canonical_json(content):
+    return json.dumps(content, sort_keys=True, separators=(',', ':')).encode()
+
+
+def get_chunk_id(content):
+    return hashlib.sha256(dump_canonical_json(content)).hexdigest()
+
+
+def compress(data):
+    if zstandard is not None:
+        return zstandard.ZstdCompressor().compress(data)
+    return gzip.compress(data, mtime=0)
+
+
+def decompress(data):
+    if data.startswith(ZSTD_MAGIC):
+        if zstandard is None:
+            raise GenericConfigUpdaterError("Reading zstd compressed checkpoints requires the zstandard module")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+class CheckpointStore:
+    """
+    Stores the checkpoints as tables. The content of every table is saved once in a compressed chunk named after the
+    hash of the content, so the tables which did not change between checkpoints are shared by them. A table which
+    changed is saved as a delta of its keys against the same table of the last checkpoint, up to
+    CHECKPOINT_MAX_DELTA_CHAIN deltas in a row.
+
+    The index file holds the tables of every checkpoint, the time it was taken and the base chunk of the deltas.
+    Listing the checkpoints only reads the index, and loading a checkpoint only reads the chunks of its tables.
+
+    A multi-ASIC checkpoint holds the tables of every scope, the tables of a scope are compared with the same scope
+    of the last checkpoint.
+
+    Saving and deleting a checkpoint hold an exclusive lock of the store from reading the index until the chunks it
+    no longer uses are deleted, so that concurrent updates neither lose checkpoints nor delete chunks still in use.
+    """
+    def __init__(self, checkpoints_dir):
+        self.checkpoints_dir = checkpoints_dir
+        self.index_path = os.path.join(checkpoints_dir, CHECKPOINT_INDEX_FILE)
+        self.chunks_dir = os.path.join(checkpoints_dir, CHECKPOINT_CHUNKS_DIR)
+        self.lock_path = os.path.join(checkpoints_dir, CHECKPOINT_LOCK_FILE)
+
+    @contextlib.contextmanager
+    def lock(self):
+        os.makedirs(self.checkpoints_dir, exist_ok=True)
+        fd = os.open(self.lock_path, os.O_CREAT | os.O_RDWR, 0o600)
+        try:
+            if not acquire_flock(fd):
+                raise GenericConfigUpdaterError(f"Cannot lock the checkpoints in {self.checkpoints_dir}")
+            try:
+                yield
+            finally:
+                release_flock(fd)
+        finally:
+            os.close(fd)
+
+    def has_checkpoint(self, name):
+        return name in self.load_index()["checkpoints"]
+
+    def get_checkpoint_names(self):
+        return list(self.load_index()["checkpoints"])
+
+    def get_checkpoint_times(self):
+        return {name: checkpoint["time"] for name, checkpoint in self.load_index()["checkpoints"].items()}
+
+    def save_checkpoint(self, name, config, scoped=False):
+        """
+        Args:
+            config: config db as json, or the config db of every scope if scoped
+        """
+        with self.lock():
+            index = self.load_index()
+            last_checkpoint = list(index["checkpoints"].values())[-1] if index["checkpoints"] else {}
+
+            if scoped:
+                last_scopes = last_checkpoint.get("scopes", {})
+                checkpoint = {"scopes": {scope: self.save_tables(index, scope_config, last_scopes.get(scope, {}))
+                                         for scope, scope_config in config.items()}}
+            else:
+                checkpoint = {"tables": self.save_tables(index, config, last_checkpoint.get("tables", {}))}
+            checkpoint["time"] = datetime.now(timezone.utc).isoformat()
+
+            # Re-inserted so that it is the last checkpoint
+            index["checkpoints"].pop(name, None)
+            index["checkpoints"][name] = checkpoint
+            unused_chunks = self.remove_unused_chunks(index)
+            self.save_index(index)
+            self.delete_chunks(unused_chunks)
+
+    def get_checkpoint(self, name):
+        index = self.load_index()
+        if name not in index["checkpoints"]:
+            raise ValueError(f"Checkpoint '{name}' does not exist")
+
+        checkpoint = index["checkpoints"][name]
+        chunks = {}
+        if "scopes" in checkpoint:
+            return {scope: self.load_tables(tables, chunks) for scope, tables in checkpoint["scopes"].items()}
+        return self.load_tables(checkpoint["tables"], chunks)
+
+    def delete_checkpoint(self, name):
+        with self.lock():
+            index = self.load_index()
+            if index["checkpoints"].pop(name, None) is None:
+                raise ValueError(f"Checkpoint '{name}' does not exist")
+            unused_chunks = self.remove_unused_chunks(index)
+            self.save_index(index)
+            self.delete_chunks(unused_chunks)
+
+    def load_index(self):
+        try:
+            with open(self.index_path) as fh:
+                index = json.load(fh)
+        except FileNotFoundError:
+            return {"version": CHECKPOINT_STORE_VERSION, "checkpoints": {}, "chunks": {}}
+
+        if index.get("version") != CHECKPOINT_STORE_VERSION:
+            raise GenericConfigUpdaterError(f"Checkpoint index version {index.get('version')} is not supported")
+        return index
+
+    def save_index(self, index):
+        self.write_file(self.index_path, json.dumps(index).encode())
+
+    def save_tables(self, index, config, last_tables):
+        """
+        Returns:
+            dict of table name -> chunk id
+        """
+        return {table: self.save_chunk(index, content, last_tables.get(table)) for table, content in config.items()}
+
+    def save_chunk(self, index, content, base_id):
+        data = dump_canonical_json(content)
+        chunk_id = hashlib.sha256(data).hexdigest()
+        if chunk_id in index["chunks"]:
+            return chunk_id
+
+        chunk = {"content": content}
+        chunk_info = {"base": None, "depth": 0}
+        base_info = index["chunks"].get(base_id)
+        if isinstance(content, dict) and base_info is not None and base_info["depth"] < CHECKPOINT_MAX_DELTA_CHAIN:
+            base = self.load_chunk(base_id, {})
+            if isinstance(base, dict):
+                delta = {"base": base_id,
+                         "set": {key: value for key, value in content.items() if key not in base or base[key] != value},
+                         "delete": [key for key in base if key not in content]}
+                delta_data = dump_canonical_json(delta)
+                if len(delta_data) < len(data):
+                    chunk = delta
+                    chunk_info = {"base": base_id, "depth": base_info["depth"] + 1}
+
+        self.write_file(self.get_chunk_path(chunk_id), compress(dump_canonical_json(chunk)))
+        index["chunks"][chunk_id] = chunk_info
+        return chunk_id
+
+    def load_tables(self, tables, chunks):
+        # The chunks are shared by the tables with the same content, each table gets its own copy
+        return {table: copy.deepcopy(self.load_chunk(chunk_id, chunks)) for table, chunk_id in tables.items()}
+
+    def load_chunk(self, chunk_id, chunks):
+        """
+        Args:
+            chunks: dict of chunk id -> content of the chunks already loaded
+        """
+        if chunk_id in chunks:
+            return chunks[chunk_id]
+
+        try:
+            with open(self.get_chunk_path(chunk_id), "rb") as fh:
+                chunk = json.loads(decompress(fh.read()))
+        except (OSError, EOFError, ValueError) as ex:
+            raise GenericConfigUpdaterError(f"Cannot read checkpoint chunk '{chunk_id}': {ex}")
+
+        if "base" in chunk:
+            content = dict(self.load_chunk(chunk["base"], chunks))
+            for key in chunk["delete"]:
+                content.pop(key, None)
+            content.update(chunk["set"])
+        else:
+            content = chunk["content"]
+
+        if get_chunk_id(content) != chunk_id:
+            raise GenericConfigUpdaterError(f"Checkpoint chunk '{chunk_id}' is corrupted")
+        chunks[chunk_id] = content
+        return content
+
+    def remove_unused_chunks(self, index):
+        """
+        Remove the chunks no checkpoint needs from the index. Their files are deleted once the index is saved, so
+        that the saved index never refers to a missing chunk.
+
+        Returns:
+            list of the removed chunk ids
+        """
+        used = set()
+        for checkpoint in index["checkpoints"].values():
+            for tables in checkpoint.get("scopes", {"": checkpoint.get("tables", {})}).values():
+                for chunk_id in tables.values():
+                    # The bases of a delta are needed to rebuild it
+                    while chunk_id is not None and chunk_id not in used:
+                        used.add(chunk_id)
+                        chunk_id = index["chunks"][chunk_id]["base"]
+
+        unused_chunks = [chunk_id for chunk_id in index["chunks"] if chunk_id not in used]
+        for chunk_id in unused_chunks:
+            del index["chunks"][chunk_id]
+        return unused_chunks
+
+    def delete_chunks(self, chunk_ids):
+        for chunk_id in chunk_ids:
+            try:
+                os.remove(self.get_chunk_path(chunk_id))
+            except FileNotFoundError:
+                pass
+
+    def get_chunk_path(self, chunk_id):
+        return os.path.join(self.chunks_dir, chunk_id[:2], chunk_id[2:])
+
+    def write_file(self, path, data):
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                fh.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
@@ -7,9 +7,10 @@ from datetime import datetime, timezone
 from enum import Enum
 from .gu_common import HOST_NAMESPACE, GenericConfigUpdaterError, EmptyTableError, ConfigWrapper, \
                     DryRunConfigWrapper, PatchWrapper, genericUpdaterLogging
-from .patch_sorter import StrictPatchSorter, NonStrictPatchSorter, ConfigSplitter, \
+from .patch_sorter import StrictPatchSorter, NonStrictPatchSorter, PatchSorter, ConfigSplitter, \
                         TablesWithoutYangConfigSplitter, IgnorePathsFromYangConfigSplitter
 from .change_applier import ChangeApplier, DryRunChangeApplier
+from .checkpoint_store import CheckpointStore
 from sonic_py_common import multi_asic
 
 CHECKPOINTS_DIR = "/etc/sonic/checkpoints"
@@ -223,14 +224,11 @@ class FileSystemConfigRollbacker:
         self.logger.log_notice("Getting current config db.")
         json_content = get_config_json()
 
-        self.logger.log_notice("Getting checkpoint full-path.")
-        path = self.util.get_checkpoint_full_path(checkpoint_name)
-
         self.logger.log_notice("Ensuring checkpoint directory exist.")
         self.util.ensure_checkpoints_dir_exists()
 
-        self.logger.log_notice(f"Saving config db content to {path}.")
-        self.util.save_json_file(path, json_content)
+        self.logger.log_notice(f"Saving config db content to checkpoint store {self.checkpoints_dir}.")
+        self.util.save_checkpoint(checkpoint_name, json_content)
 
         self.logger.log_notice("Config checkpoint completed.")
 
@@ -247,10 +245,9 @@ class FileSystemConfigRollbacker:
 
         checkpoints = []
         if includes_time:
+            checkpoint_times = self.util.get_checkpoint_times()
             for checkpoint_name in checkpoint_names:
-                checkpoint_path = os.path.join(self.checkpoints_dir, checkpoint_name + CHECKPOINT_EXT)
-                last_modified = datetime.fromtimestamp(os.path.getmtime(checkpoint_path), tz=timezone.utc).isoformat()
-                checkpoints.append({"name": checkpoint_name, "time": last_modified})
+                checkpoints.append({"name": checkpoint_name, "time": checkpoint_times[checkpoint_name]})
 
             checkpoints.sort(key=lambda x: x["time"], reverse=True)
         else:
@@ -350,21 +347,23 @@ class MultiASICConfigRollbacker(FileSystemConfigRollbacker):
         self.logger.log_notice("Config checkpoint starting.")
         self.logger.log_notice(f"Checkpoint name: {checkpoint_name}.")
 
-        self.logger.log_notice("Getting checkpoint full-path.")
-        path = self.util.get_checkpoint_full_path(checkpoint_name)
-
         self.logger.log_notice("Ensuring checkpoint directory exist.")
         self.util.ensure_checkpoints_dir_exists()
 
-        self.logger.log_notice(f"Saving config db content to {path}.")
-        self.util.save_json_file(path, all_configs)
+        self.logger.log_notice(f"Saving config db content of every scope to checkpoint store {self.checkpoints_dir}.")
+        self.util.save_checkpoint(checkpoint_name, all_configs, scoped=True)
 
         self.logger.log_notice("Config checkpoint completed.")
 
 
 class Util:
+    """
+    Checkpoints are saved in the checkpoint store. The checkpoints saved before it, one '<name>.cp.json' file of the
+    whole config each, can still be listed, rolled back to and deleted.
+    """
     def __init__(self, checkpoints_dir=CHECKPOINTS_DIR):
         self.checkpoints_dir = checkpoints_dir
+        self.checkpoint_store = CheckpointStore(checkpoints_dir)
 
     def ensure_checkpoints_dir_exists(self):
         os.makedirs(self.checkpoints_dir, exist_ok=True)
@@ -373,7 +372,18 @@ class Util:
         with open(path, "w") as fh:
             fh.write(json.dumps(json_content))
 
+    def save_checkpoint(self, name, json_content, scoped=False):
+        self.checkpoint_store.save_checkpoint(name, json_content, scoped)
+
+        # The checkpoint replaces the one with the same name saved as a file
+        path = self.get_checkpoint_full_path(name)
+        if os.path.isfile(path):
+            os.remove(path)
+
     def get_checkpoint_content(self, checkpoint_name):
+        if self.checkpoint_store.has_checkpoint(checkpoint_name):
+            return self.checkpoint_store.get_checkpoint(checkpoint_name)
+
         path = self.get_checkpoint_full_path(checkpoint_name)
         with open(path) as fh:
             text = fh.read()
@@ -389,18 +399,36 @@ class Util:
                 # Remove extension from file name.
                 # Example assuming ext is '.cp.json', then 'checkpoint1.cp.json' becomes 'checkpoint1'
                 file_names.append(file_name[:-len(CHECKPOINT_EXT)])
-        return file_names
+        return self.checkpoint_store.get_checkpoint_names() + file_names
+
+    def get_checkpoint_times(self):
+        """
+        Returns:
+            dict of checkpoint name -> time it was saved, in ISO format
+        """
+        checkpoint_times = {}
+        for file_name in os.listdir(self.checkpoints_dir):
+            if file_name.endswith(CHECKPOINT_EXT):
+                path = os.path.join(self.checkpoints_dir, file_name)
+                checkpoint_times[file_name[:-len(CHECKPOINT_EXT)]] = \
+                    datetime.fromtimestamp(os.path.getmtime(path), tz=timezone.utc).isoformat()
+        checkpoint_times.update(self.checkpoint_store.get_checkpoint_times())
+        return checkpoint_times
 
     def checkpoints_dir_exist(self):
         return os.path.isdir(self.checkpoints_dir)
 
     def check_checkpoint_exists(self, name):
         path = self.get_checkpoint_full_path(name)
-        return os.path.isfile(path)
+        return self.checkpoint_store.has_checkpoint(name) or os.path.isfile(path)
 
     def delete_checkpoint(self, name):
+        if self.checkpoint_store.has_checkpoint(name):
+            self.checkpoint_store.delete_checkpoint(name)
+
         path = self.get_checkpoint_full_path(name)
-        return os.remove(path)
+        if os.path.isfile(path):
+            os.remove(path)
 
 
 class Decorator(PatchApplier, ConfigReplacer, FileSystemConfigRollbacker):
@@ -490,8 +518,9 @@ class ConfigLockDecorator(Decorator):
 
 
 class GenericUpdateFactory:
-    def __init__(self, scope=multi_asic.DEFAULT_NAMESPACE):
+    def __init__(self, scope=multi_asic.DEFAULT_NAMESPACE, sort_workers=1):
         self.scope = scope
+        self.sort_workers = sort_workers
 
     def create_patch_applier(self, config_format, verbose, dry_run, ignore_non_yang_tables, ignore_paths):
         self.init_verbose_logging(verbose)
@@ -599,8 +628,9 @@ class GenericUpdateFactory:
             return ChangeApplier(scope=self.scope)
 
     def get_patch_sorter(self, ignore_non_yang_tables, ignore_paths, config_wrapper, patch_wrapper):
+        inner_patch_sorter = PatchSorter(config_wrapper, patch_wrapper, sort_workers=self.sort_workers)
         if not ignore_non_yang_tables and not ignore_paths:
-            return StrictPatchSorter(config_wrapper, patch_wrapper)
+            return StrictPatchSorter(config_wrapper, patch_wrapper, inner_patch_sorter)
 
         inner_config_splitters = []
         if ignore_non_yang_tables:
@@ -611,13 +641,13 @@ class GenericUpdateFactory:
 
         config_splitter = ConfigSplitter(config_wrapper, inner_config_splitters)
 
-        return NonStrictPatchSorter(config_wrapper, patch_wrapper, config_splitter)
+        return NonStrictPatchSorter(config_wrapper, patch_wrapper, config_splitter, patch_sorter=inner_patch_sorter)
 
 
 class GenericUpdater:
-    def __init__(self, generic_update_factory=None, scope=multi_asic.DEFAULT_NAMESPACE):
-        self.generic_update_factory = \
-            generic_update_factory if generic_update_factory is not None else GenericUpdateFactory(scope=scope)
+    def __init__(self, generic_update_factory=None, scope=multi_asic.DEFAULT_NAMESPACE, sort_workers=1):
+        self.generic_update_factory = generic_update_factory if generic_update_factory is not None else \
+            GenericUpdateFactory(scope=scope, sort_workers=sort_workers)
 
     def apply_patch(self, patch, config_format, verbose, dry_run, ignore_non_yang_tables, ignore_paths, sort=True):
         patch_applier = self.generic_update_factory.create_patch_applier(config_format, verbose, dry_run, ignore_non_yang_tables, ignore_paths)
@@ -11,6 +11,7 @@ import re
 import os
 from sonic_py_common import logger, multi_asic
 from enum import Enum
+from utilities_common.yang_cache import load_sonic_yang
 
 YANG_DIR = "/usr/local/yang-models"
 SYSLOG_IDENTIFIER = "GenericConfigUpdater"
@@ -28,6 +29,75 @@ class IllegalPatchOperationError(ValueError):
 class EmptyTableError(ValueError):
     pass
 
+class FrozenConfigDict(dict):
+    """
+    An immutable dict node of a config. Configs derived from each other share their unchanged subtrees, a change
+    only copies the nodes on its path. The structural hash of a node is computed once, from the hashes of its children.
+    Copies and deep-copies are regular mutable dicts and lists.
+    """
+    __slots__ = ('_hash',)
+
+    def _immutable(self, *args, **kwargs):
+        raise TypeError(f"'{type(self).__name__}' object is immutable")
+
+    __setitem__ = __delitem__ = __ior__ = clear = pop = popitem = setdefault = update = _immutable
+
+    def __hash__(self):
+        try:
+            return self._hash
+        except AttributeError:
+            self._hash = hash(frozenset((key, hash(value)) for key, value in self.items()))
+            return self._hash
+
+    def __copy__(self):
+        return dict(self)
+
+    def __deepcopy__(self, memo):
+        return {key: copy.deepcopy(value, memo) for key, value in self.items()}
+
+    def __reduce__(self):
+        return (FrozenConfigDict, (dict(self),))
+
+class FrozenConfigList(list):
+    """
+    An immutable list node of a config, check FrozenConfigDict.
+    """
+    __slots__ = ('_hash',)
+
+    def _immutable(self, *args, **kwargs):
+        raise TypeError(f"'{type(self).__name__}' object is immutable")
+
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = append = clear = extend = insert = pop = remove = \
+        reverse = sort = _immutable
+
+    def __hash__(self):
+        try:
+            return self._hash
+        except AttributeError:
+            self._hash = hash(tuple(hash(value) for value in self))
+            return self._hash
+
+    def __copy__(self):
+        return list(self)
+
+    def __deepcopy__(self, memo):
+        return [copy.deepcopy(value, memo) for value in self]
+
+    def __reduce__(self):
+        return (FrozenConfigList, (list(self),))
+
+def freeze_config(config):
+    """
+    Returns the given config as a tree of FrozenConfigDict and FrozenConfigList, frozen subtrees are reused as is.
+    """
+    if isinstance(config, (FrozenConfigDict, FrozenConfigList)):
+        return config
+    if isinstance(config, dict):
+        return FrozenConfigDict((key, freeze_config(value)) for key, value in config.items())
+    if isinstance(config, list):
+        return FrozenConfigList(freeze_config(value) for value in config)
+    return config
+
 class JsonChange:
     """
     A class that describes a partial change to a JSON object.
@@ -80,6 +150,8 @@ class ConfigWrapper:
         self.scope = scope
         self.yang_dir = YANG_DIR
         self.sonic_yang_with_loaded_models = None
+        self.tables_references = None
+        self.tables_dependents = None
 
     def get_config_db_as_json(self):
         return get_config_db_as_json(self.scope)
@@ -138,11 +210,14 @@ class ConfigWrapper:
             return False, ex
 
     def validate_config_db_config(self, config_db_as_json):
-        sy = self.create_sonic_yang_with_loaded_models()
+        success, error = self.validate_config_db_config_yang(config_db_as_json)
+        if not success:
+            return success, error
 
-        # TODO: Move these validators to YANG models
-        supplemental_yang_validators = [self.validate_bgp_peer_group,
-                                        self.validate_lanes]
+        return self.validate_config_db_config_supplemental(config_db_as_json)
+
+    def validate_config_db_config_yang(self, config_db_as_json):
+        sy = self.create_sonic_yang_with_loaded_models()
 
         try:
             tmp_config_db_as_json = copy.deepcopy(config_db_as_json)
@@ -150,16 +225,88 @@ class ConfigWrapper:
             sy.loadData(tmp_config_db_as_json)
 
             sy.validate_data_tree()
-
-            for supplemental_yang_validator in supplemental_yang_validators:
-                success, error = supplemental_yang_validator(config_db_as_json)
-                if not success:
-                    return success, error
         except sonic_yang.SonicYangException as ex:
             return False, ex
 
         return True, None
 
+    def validate_config_db_config_supplemental(self, config_db_as_json):
+        # TODO: Move these validators to YANG models
+        supplemental_yang_validators = [self.validate_bgp_peer_group,
+                                        self.validate_lanes]
+
+        for supplemental_yang_validator in supplemental_yang_validators:
+            success, error = supplemental_yang_validator(config_db_as_json)
+            if not success:
+                return success, error
+
+        return True, None
+
+    def get_tables_references(self):
+        """
+        Returns a dict from each table with a YANG model to the other tables its model refers to, i.e. the tables
+        named in its leafref paths and must/when conditions. A model which cannot be scanned refers to all tables.
+        Example:
+          VLAN_MEMBER refers to VLAN and PORT, ACL_TABLE refers to PORT, PORTCHANNEL...
+        """
+        if self.tables_references is None:
+            sy = self.create_sonic_yang_with_loaded_models()
+            tables = set(sy.confDbYangMap.keys())
+            tables_references = {}
+            for table, cmap in sy.confDbYangMap.items():
+                try:
+                    names = set()
+                    self._collect_model_names(cmap['container'], cmap['yangModule'], sy, names)
+                    tables_references[table] = (names & tables) - {table}
+                except Exception:
+                    tables_references[table] = tables - {table}
+            self.tables_references = tables_references
+
+        return self.tables_references
+
+    def get_tables_dependents(self):
+        """
+        Returns a dict from each table to the tables whose YANG model refers to it.
+        """
+        if self.tables_dependents is None:
+            tables_dependents = {}
+            for table, references in self.get_tables_references().items():
+                for reference in references:
+                    tables_dependents.setdefault(reference, set()).add(table)
+            self.tables_dependents = tables_dependents
+
+        return self.tables_dependents
+
+    def _collect_model_names(self, model, yang_module, sy, names):
+        if isinstance(model, list):
+            for submodel in model:
+                self._collect_model_names(submodel, yang_module, sy, names)
+        elif isinstance(model, dict):
+            for key, value in model.items():
+                if key == 'description':
+                    continue
+                if key == 'uses':
+                    # a model can be a single dict or a list of dictionaries, unify to a list of dictionaries
+                    uses_s = value if isinstance(value, list) else [value]
+                    for uses in uses_s:
+                        self._collect_model_names(self._get_uses_grouping(uses['@name'], yang_module, sy),
+                                                  yang_module, sy, names)
+                self._collect_model_names(value, yang_module, sy, names)
+        elif isinstance(model, str):
+            names.update(re.findall(r'[\w-]+', model))
+
+    def _get_uses_grouping(self, uses_name, yang_module, sy):
+        # uses Example: "@name": "bgpcmn:sonic-bgp-cmn"
+        if ':' in uses_name:
+            name_parts = uses_name.split(':')
+            uses_module_name = sy._findYangModuleFromPrefix(name_parts[0].strip(), yang_module)
+            grouping = name_parts[-1].strip()
+        else:
+            uses_module_name = yang_module['@name']
+            grouping = uses_name
+
+        return sy.preProcessedYang['grouping'][uses_module_name][grouping]
+
     def validate_field_operation(self, old_config, target_config):
         """
         Some fields in ConfigDB are restricted and may not allow third-party addition, replacement, or removal.
@@ -347,8 +494,8 @@ class ConfigWrapper:
         # sonic_yang_with_loaded_models will only be initialized once the first time this method is called
         if self.sonic_yang_with_loaded_models is None:
             sonic_yang_print_log_enabled = genericUpdaterLogging.get_verbose()
-            loaded_models_sy = sonic_yang.SonicYang(self.yang_dir, print_log_enabled=sonic_yang_print_log_enabled)
-            loaded_models_sy.loadYangModel() # This call takes a long time (100s of ms) because it reads files from disk
+            # Loading the models takes seconds, they are taken from the preloaded models or the cache if possible
+            loaded_models_sy = load_sonic_yang(self.yang_dir, print_log_enabled=sonic_yang_print_log_enabled)
             self.sonic_yang_with_loaded_models = loaded_models_sy
 
         return copy.copy(self.sonic_yang_with_loaded_models)
@@ -375,6 +522,77 @@ class DryRunConfigWrapper(ConfigWrapper):
             self.imitated_config_db = super().get_config_db_as_json()
 
 
+class IncrementalConfigValidator:
+    """
+    Validates configs derived from an already validated config, such as the configs simulated by the patch sorter
+    for every candidate move. YANG validation is only run on the tables which differ from the base config, the tables
+    whose models refer to them, and the tables these refer to so that their leafrefs can be resolved. The other tables
+    are unchanged and were already valid in the base config.
+
+    The base config is validated in full the first time it is seen, the validity of the configs is then remembered
+    so that the next moves, starting from an accepted config, only need the incremental validation. When the base
+    config is not valid the config is validated in full as well.
+    """
+    def __init__(self, config_wrapper):
+        self.config_wrapper = config_wrapper
+        self.validity = {}
+        self.last_config = None
+        self.last_config_valid = False
+
+    def validate_config_db_config(self, base_config, config_db_as_json):
+        if not self._is_valid(base_config):
+            return self.config_wrapper.validate_config_db_config(config_db_as_json)
+
+        tables = self.get_affected_tables(base_config, config_db_as_json)
+        affected_config = {table: config_db_as_json[table] for table in tables if table in config_db_as_json}
+
+        success, error = True, None
+        if affected_config:
+            success, error = self.config_wrapper.validate_config_db_config_yang(affected_config)
+        if success:
+            success, error = self.config_wrapper.validate_config_db_config_supplemental(config_db_as_json)
+
+        if success:
+            self.validity[self._get_config_hash(config_db_as_json)] = True
+        return success, error
+
+    def get_affected_tables(self, base_config, config):
+        changed_tables = [table for table in set(base_config.keys()) | set(config.keys())
+                          if base_config.get(table) != config.get(table)]
+
+        tables_references = self.config_wrapper.get_tables_references()
+        tables_dependents = self.config_wrapper.get_tables_dependents()
+
+        tables = set()
+        pending = list(changed_tables)
+        for table in changed_tables:
+            pending.extend(tables_dependents.get(table, []))
+        while pending:
+            table = pending.pop()
+            if table in tables:
+                continue
+            tables.add(table)
+            pending.extend(tables_references.get(table, []))
+
+        return tables
+
+    def set_config_valid(self, config):
+        self.validity[self._get_config_hash(config)] = True
+
+    def _is_valid(self, config):
+        # The sorters validate all the candidate moves of a config one after the other
+        if config is not self.last_config:
+            config_hash = self._get_config_hash(config)
+            if config_hash not in self.validity:
+                success, _ = self.config_wrapper.validate_config_db_config(config)
+                self.validity[config_hash] = success
+            self.last_config = config
+            self.last_config_valid = self.validity[config_hash]
+        return self.last_config_valid
+
+    def _get_config_hash(self, config):
+        return hash(json.dumps(config, sort_keys=True))
+
 class PatchWrapper:
     def __init__(self, config_wrapper=None, scope=multi_asic.DEFAULT_NAMESPACE):
         self.scope = scope
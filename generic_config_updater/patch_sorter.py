@@ -1,23 +1,25 @@
 import copy
 import json
 import jsonpatch
+import multiprocessing
 from collections import deque, OrderedDict
 from enum import Enum
+from itertools import islice
 from .gu_common import OperationWrapper, OperationType, GenericConfigUpdaterError, \
-                       JsonChange, PathAddressing, genericUpdaterLogging
+                       JsonChange, PathAddressing, IncrementalConfigValidator, FrozenConfigDict, FrozenConfigList, \
+                       freeze_config, genericUpdaterLogging
 
 class Diff:
     """
     A class that contains the diff info between current and target configs.
+    The configs are frozen, so the diffs derived from each other by applying moves share their unchanged subtrees.
     """
     def __init__(self, current_config, target_config):
-        self.current_config = current_config
-        self.target_config = target_config
+        self.current_config = freeze_config(current_config)
+        self.target_config = freeze_config(target_config)
 
     def __hash__(self):
-        cc = json.dumps(self.current_config, sort_keys=True)
-        tc = json.dumps(self.target_config, sort_keys=True)
-        return hash((cc,tc))
+        return hash((hash(self.current_config), hash(self.target_config)))
 
     def __eq__(self, other):
         """Overrides the default implementation"""
@@ -26,9 +28,6 @@ class Diff:
 
         return False
 
-    # TODO: Can be optimized to apply the move in place. JsonPatch supports that using the option 'in_place=True'
-    # Check: https://python-json-patch.readthedocs.io/en/latest/tutorial.html#applying-a-patch
-    # NOTE: in case move is applied in place, we will need to support `undo_move` as well.
     def apply_move(self, move):
         new_current_config = move.apply(self.current_config)
         return Diff(new_current_config, self.target_config)
@@ -92,7 +91,7 @@ class JsonMove:
         for token in tokens:
             config = config[token]
 
-        return copy.deepcopy(config)
+        return freeze_config(config)
 
     @staticmethod
     def _to_jsonpatch_add_operation(diff, current_config_tokens, target_config_tokens):
@@ -220,7 +219,7 @@ class JsonMove:
 
         op_type = OperationType.ADD
         new_path = path_addressing.create_path(new_tokens)
-        new_value = copy.deepcopy(filtered_config)
+        new_value = freeze_config(filtered_config)
 
         return operation_wrapper.create(op_type, new_path, new_value)
 
@@ -272,7 +271,58 @@ class JsonMove:
         return JsonMove(diff, op_type, current_config_tokens, target_config_tokens)
 
     def apply(self, config):
-        return self.patch.apply(config)
+        """
+        Applies the move without modifying the given config. Only the dicts and lists on the path of the move are
+        copied, the rest of the returned config is shared with the given config.
+        """
+        tokens = PathAddressing().get_path_tokens(self.path)
+        value = freeze_config(self.value)
+        return self._apply(freeze_config(config), tokens, value)
+
+    def _apply(self, node, tokens, value):
+        if not tokens:
+            if self.op_type == OperationType.REMOVE:
+                raise jsonpatch.JsonPatchConflict("Cannot remove the whole config")
+            return value
+
+        token = tokens[0]
+        is_last = len(tokens) == 1
+        if isinstance(node, list):
+            index = self._get_list_index(node, token, allow_end=is_last and self.op_type == OperationType.ADD)
+            new_node = FrozenConfigList(node)
+            if not is_last:
+                list.__setitem__(new_node, index, self._apply(node[index], tokens[1:], value))
+            elif self.op_type == OperationType.ADD:
+                list.insert(new_node, index, value)
+            elif self.op_type == OperationType.REPLACE:
+                list.__setitem__(new_node, index, value)
+            else:
+                list.__delitem__(new_node, index)
+            return new_node
+
+        if not isinstance(node, dict):
+            raise jsonpatch.JsonPatchConflict(f"Cannot apply {self.patch}, path does not refer to a dict or list")
+        if token not in node and not (is_last and self.op_type == OperationType.ADD):
+            raise jsonpatch.JsonPatchConflict(f"Cannot apply {self.patch}, '{token}' does not exist")
+        new_node = FrozenConfigDict(node)
+        if not is_last:
+            dict.__setitem__(new_node, token, self._apply(node[token], tokens[1:], value))
+        elif self.op_type == OperationType.REMOVE:
+            dict.__delitem__(new_node, token)
+        else:
+            dict.__setitem__(new_node, token, value)
+        return new_node
+
+    def _get_list_index(self, node, token, allow_end):
+        if token == '-' and allow_end:
+            return len(node)
+        try:
+            index = int(token)
+        except ValueError:
+            raise jsonpatch.JsonPatchConflict(f"Cannot apply {self.patch}, '{token}' is not a list index")
+        if index < 0 or index > len(node) or (index == len(node) and not allow_end):
+            raise jsonpatch.JsonPatchConflict(f"Cannot apply {self.patch}, index {index} is out of range")
+        return index
 
     def __str__(self):
         return str(self.patch)
@@ -290,11 +340,13 @@ class JsonMove:
         return hash((self.op_type, self.path, json.dumps(self.value)))
 
 class MoveWrapper:
-    def __init__(self, move_generators, move_non_extendable_generators, move_extenders, move_validators):
+    def __init__(self, move_generators, move_non_extendable_generators, move_extenders, move_validators,
+                 validation_pool=None):
         self.move_generators = move_generators
         self.move_non_extendable_generators = move_non_extendable_generators
         self.move_extenders = move_extenders
         self.move_validators = move_validators
+        self.validation_pool = validation_pool
 
     def generate(self, diff):
         """
@@ -343,6 +395,32 @@ class MoveWrapper:
                 return False
         return True
 
+    def validate_moves(self, moves, diff):
+        """
+        Validates the given moves, yielding a tuple (move, is_valid) for each of them in their order.
+
+        The moves are validated one at a time as they are consumed, unless there is a validation pool in which case
+        they are validated in batches by its worker processes. The order of the results is the same either way.
+        """
+        if self.validation_pool is not None:
+            yield from self.validation_pool.validate_moves(moves, diff)
+            return
+
+        for move in moves:
+            yield move, self.validate(move, diff)
+
+    def set_config_valid(self, config):
+        """
+        Tells the validators which remember the valid configs that the given config is valid.
+        """
+        for validator in self.move_validators:
+            if isinstance(validator, FullConfigMoveValidator):
+                validator.set_config_valid(config)
+
+    def close(self):
+        if self.validation_pool is not None:
+            self.validation_pool.close()
+
     def simulate(self, move, diff):
         return diff.apply_move(move)
 
@@ -361,6 +439,117 @@ class MoveWrapper:
             for newmove in extender.extend(move, diff):
                 yield newmove
 
+def _run_move_validation_worker(move_wrapper, conn, parent_connections):
+    """
+    Validation worker process. It receives the diff once, then the batches of moves to validate against it, so that
+    the current config of the diff is the same object for all the batches and its validity is only looked up once.
+    """
+    # The parent ends of the pipes of the workers forked before this one
+    for parent_conn in parent_connections:
+        parent_conn.close()
+    diff = None
+    while True:
+        message = conn.recv()
+        if message is None:
+            return
+        kind, payload = message
+        if kind == 'diff':
+            diff, is_current_config_valid = payload
+            if is_current_config_valid:
+                move_wrapper.set_config_valid(diff.current_config)
+            continue
+        try:
+            conn.send((True, [move_wrapper.validate(move, diff) for move in payload]))
+        except Exception as ex:
+            conn.send((False, str(ex)))
+
+class MoveValidationPool:
+    """
+    Validates the candidate moves of the sorters in a pool of worker processes.
+
+    The workers are forked once the sonic_yang models and the tables dependency graph are loaded, so they all start
+    with the move wrapper and its preloaded models without loading them again. Each worker is sent the diff once, then
+    the moves are taken from the generator in batches, one batch per worker at a time, and the results are yielded in
+    the order of the moves so that the sorters choose the same moves as with the sequential validation.
+
+    A valid move always leads to a valid config. The pool remembers these configs so that the workers, which do not
+    see each other validations, are told that the current config of a diff is valid and only validate the moves
+    incrementally.
+
+    The workers are forked from the calling process, it must not run other threads.
+    """
+    def __init__(self, move_wrapper, config_wrapper, workers, batch_size=8):
+        self.move_wrapper = move_wrapper
+        self.config_wrapper = config_wrapper
+        self.workers = workers
+        self.batch_size = batch_size
+        self.valid_configs = set()
+        self.processes = []
+        self.connections = []
+        # Diff the workers hold, and whether they were told its current config is valid
+        self.diff = None
+        self.diff_valid = False
+
+    def validate_moves(self, moves, diff):
+        self._start()
+        is_current_config_valid = hash(diff.current_config) in self.valid_configs
+        moves = iter(moves)
+        while True:
+            batches = [list(islice(moves, self.batch_size)) for _ in range(self.workers)]
+            batches = [batch for batch in batches if batch]
+            if not batches:
+                return
+
+            # The sorters validate the moves of the next diffs while consuming these results, send the diff again
+            # when it was replaced meanwhile
+            if diff is not self.diff or (is_current_config_valid and not self.diff_valid):
+                for conn in self.connections:
+                    conn.send(('diff', (diff, is_current_config_valid)))
+                self.diff = diff
+                self.diff_valid = is_current_config_valid
+            for conn, batch in zip(self.connections, batches):
+                conn.send(('moves', batch))
+            # All the results are received before yielding any, the workers are free for the next diffs
+            results = [conn.recv() for conn in self.connections[:len(batches)]]
+
+            for batch, (success, batch_results) in zip(batches, results):
+                if not success:
+                    raise GenericConfigUpdaterError(f"Move validation worker failed: {batch_results}")
+                for move, is_valid in zip(batch, batch_results):
+                    if is_valid:
+                        self.valid_configs.add(hash(diff.apply_move(move).current_config))
+                    yield move, is_valid
+
+    def close(self):
+        for conn in self.connections:
+            try:
+                conn.send(None)
+            except OSError:
+                pass
+            conn.close()
+        for process in self.processes:
+            process.join()
+        self.processes = []
+        self.connections = []
+        self.diff = None
+        self.diff_valid = False
+
+    def _start(self):
+        if self.processes:
+            return
+        # Loaded before forking, so that each worker inherits them
+        self.config_wrapper.create_sonic_yang_with_loaded_models()
+        self.config_wrapper.get_tables_dependents()
+        context = multiprocessing.get_context('fork')
+        for _ in range(self.workers):
+            conn, worker_conn = context.Pipe()
+            process = context.Process(target=_run_move_validation_worker,
+                                      args=(self.move_wrapper, worker_conn, list(self.connections)), daemon=True)
+            process.start()
+            worker_conn.close()
+            self.processes.append(process)
+            self.connections.append(conn)
+
 class JsonPointerFilter:
     """
     A filtering class to get the paths matching the filter from the given config.
@@ -676,13 +865,23 @@ class DeleteWholeConfigMoveValidator:
 class FullConfigMoveValidator:
     """
     A class to validate that full config is valid according to YANG models after applying the move.
+    If an incremental validator is given, only the tables affected by the move are validated against YANG models.
     """
-    def __init__(self, config_wrapper):
+    def __init__(self, config_wrapper, incremental_validator=None):
         self.config_wrapper = config_wrapper
+        self.incremental_validator = incremental_validator
+
+    def set_config_valid(self, config):
+        if self.incremental_validator is not None:
+            self.incremental_validator.set_config_valid(config)
 
     def validate(self, move, diff):
         simulated_config = move.apply(diff.current_config)
-        is_valid, error = self.config_wrapper.validate_config_db_config(simulated_config)
+        if self.incremental_validator is not None:
+            is_valid, error = self.incremental_validator.validate_config_db_config(diff.current_config,
+                                                                                   simulated_config)
+        else:
+            is_valid, error = self.config_wrapper.validate_config_db_config(simulated_config)
         return is_valid
 
 class CreateOnlyMoveValidator:
@@ -1550,8 +1749,8 @@ class DfsSorter:
 
         moves = self.move_wrapper.generate(diff)
 
-        for move in moves:
-            if self.move_wrapper.validate(move, diff):
+        for move, is_valid in self.move_wrapper.validate_moves(moves, diff):
+            if is_valid:
                 new_diff = self.move_wrapper.simulate(move, diff)
                 new_moves = self.sort(new_diff)
                 if new_moves is not None:
@@ -1584,8 +1783,8 @@ class BfsSorter:
                 return prv_moves
 
             moves = self.move_wrapper.generate(diff)
-            for move in moves:
-                if self.move_wrapper.validate(move, diff):
+            for move, is_valid in self.move_wrapper.validate_moves(moves, diff):
+                if is_valid:
                     new_diff = self.move_wrapper.simulate(move, diff)
                     new_prv_moves = prv_moves + [move]
 
@@ -1614,8 +1813,8 @@ class MemoizationSorter:
         moves = self.move_wrapper.generate(diff)
 
         bst_moves = None
-        for move in moves:
-            if self.move_wrapper.validate(move, diff):
+        for move, is_valid in self.move_wrapper.validate_moves(moves, diff):
+            if is_valid:
                 new_diff = self.move_wrapper.simulate(move, diff)
                 new_moves = self.sort(new_diff)
                 if new_moves != None and (bst_moves is None or len(bst_moves) > len(new_moves)+1):
@@ -1630,10 +1829,11 @@ class Algorithm(Enum):
     MEMOIZATION = 3
 
 class SortAlgorithmFactory:
-    def __init__(self, operation_wrapper, config_wrapper, path_addressing):
+    def __init__(self, operation_wrapper, config_wrapper, path_addressing, sort_workers=1):
         self.operation_wrapper = operation_wrapper
         self.config_wrapper = config_wrapper
         self.path_addressing = path_addressing
+        self.sort_workers = sort_workers
 
     def create(self, algorithm=Algorithm.DFS):
         move_generators = [RemoveCreateOnlyDependencyMoveGenerator(self.path_addressing),
@@ -1645,7 +1845,8 @@ class SortAlgorithmFactory:
                           DeleteInsteadOfReplaceMoveExtender(),
                           DeleteRefsMoveExtender(self.path_addressing)]
         move_validators = [DeleteWholeConfigMoveValidator(),
-                           FullConfigMoveValidator(self.config_wrapper),
+                           FullConfigMoveValidator(self.config_wrapper,
+                                                   IncrementalConfigValidator(self.config_wrapper)),
                            NoDependencyMoveValidator(self.path_addressing, self.config_wrapper),
                            CreateOnlyMoveValidator(self.path_addressing),
                            RequiredValueMoveValidator(self.path_addressing),
@@ -1653,6 +1854,8 @@ class SortAlgorithmFactory:
                            NoEmptyTableMoveValidator(self.path_addressing)]
 
         move_wrapper = MoveWrapper(move_generators, move_non_extendable_generators, move_extenders, move_validators)
+        if self.sort_workers > 1:
+            move_wrapper.validation_pool = MoveValidationPool(move_wrapper, self.config_wrapper, self.sort_workers)
 
         if algorithm == Algorithm.DFS:
             sorter = DfsSorter(move_wrapper)
@@ -1915,13 +2118,13 @@ class NonStrictPatchSorter:
         return changes
 
 class PatchSorter:
-    def __init__(self, config_wrapper, patch_wrapper, sort_algorithm_factory=None):
+    def __init__(self, config_wrapper, patch_wrapper, sort_algorithm_factory=None, sort_workers=1):
         self.config_wrapper = config_wrapper
         self.patch_wrapper = patch_wrapper
         self.operation_wrapper = OperationWrapper()
         self.path_addressing = PathAddressing(self.config_wrapper)
         self.sort_algorithm_factory = sort_algorithm_factory if sort_algorithm_factory else \
-            SortAlgorithmFactory(self.operation_wrapper, config_wrapper, self.path_addressing)
+            SortAlgorithmFactory(self.operation_wrapper, config_wrapper, self.path_addressing, sort_workers)
 
     def sort(self, patch, algorithm=Algorithm.DFS, preloaded_current_config=None):
         current_config = preloaded_current_config if preloaded_current_config else self.config_wrapper.get_config_db_as_json()
@@ -1930,7 +2133,10 @@ class PatchSorter:
         diff = Diff(current_config, target_config)
 
         sort_algorithm = self.sort_algorithm_factory.create(algorithm)
-        moves = sort_algorithm.sort(diff)
+        try:
+            moves = sort_algorithm.sort(diff)
+        finally:
+            sort_algorithm.move_wrapper.close()
 
         if moves is None:
             raise GenericConfigUpdaterError("There is no possible sorting")
@@ -1,4 +1,6 @@
 import os
+import itertools
+import json
 import click
 
 from tabulate import tabulate
@@ -10,17 +12,58 @@ from otn.utils.utils import *
 def alarm(ctx):
     pass
 
+def alarm_filter_options(func):
+    func = click.option('--since', type=click.DateTime(formats=["%Y-%m-%d %H:%M:%S", "%Y-%m-%d"]),
+                        help='Only show alarms created at or after this time')(func)
+    func = click.option('--severity', multiple=True,
+                        help='Only show alarms of this severity, can be given several times')(func)
+    func = click.option('--json', 'json_output', is_flag=True, help="JSON output")(func)
+    return func
+
+def alarm_time_to_ns(value):
+    return int(value.timestamp() * 1000000000) if value else None
+
+def get_alarm_filters(severity, since):
+    severities = {s.upper() for s in severity}
+    return severities, alarm_time_to_ns(since)
+
+def get_alarm_json(alarms, with_cleared=False):
+    fields = ['entity', 'time-created-str', 'resource', 'severity', 'type-id', 'text', 'sa', 'type']
+    if with_cleared:
+        fields.insert(2, 'time-cleared-str')
+    return [{field.replace('-str', ''): alarm[field] for field in fields} for alarm in alarms]
+
 @alarm.command()
-def current():
-    for slot_id in get_linecard_slot_range():
-        show_slot_alarm_current(slot_id)
-    show_chassis_alarm_current()
+@alarm_filter_options
+def current(json_output, severity, since):
+    severities, since_ns = get_alarm_filters(severity, since)
+    alarms = collect_chassis_alarms(DB_STATE_IDX, CURALARM, severities, since_ns)
+    if json_output:
+        click.echo(json.dumps(get_alarm_json(alarms), indent=4))
+    else:
+        show_alarm_table('Chassis Current Alarm', alarms, with_entity=True)
 
 @alarm.command()
-def history():
-    for slot_id in get_linecard_slot_range():
-        show_slot_alarm_history(slot_id)
-    show_chassis_alarm_history()
+@alarm_filter_options
+@click.option('--until', type=click.DateTime(formats=["%Y-%m-%d %H:%M:%S", "%Y-%m-%d"]),
+              help='Only show alarms created at or before this time')
+@click.option('--offset', type=click.IntRange(0), default=0, help='Skip the newest N history alarms')
+@click.option('--limit', type=click.IntRange(1), help='Show at most N history alarms')
+def history(json_output, severity, since, until, offset, limit):
+    severities, since_ns = get_alarm_filters(severity, since)
+    until_ns = alarm_time_to_ns(until)
+    slot_ids = get_linecard_slot_range() + [0]
+    alarms = iter_chassis_alarm_history(slot_ids, severities, since_ns, until_ns)
+    if json_output:
+        stop = offset + limit if limit is not None else None
+        alarms = list(itertools.islice(alarms, offset, stop))
+        events = collect_chassis_alarms(DB_HISTORY_IDX, HISEVENT, severities, since_ns, until_ns)
+        click.echo(json.dumps({'history-alarm': get_alarm_json(alarms, with_cleared=True),
+                               'history-event': get_alarm_json(events)}, indent=4))
+    else:
+        show_alarm_history_stream('Chassis History Alarm', alarms, offset, limit, with_entity=True)
+        events = collect_chassis_alarms(DB_HISTORY_IDX, HISEVENT, severities, since_ns, until_ns)
+        show_alarm_table('Chassis History Event', events, with_entity=True)
 
 @alarm.command()
 def profile():
@@ -1,4 +1,5 @@
 import click
+import functools
 
 from tabulate import tabulate
 from otn.utils.db import *
@@ -63,10 +64,15 @@ def current(ctx):
     
 @pm.command()
 @click.pass_context
-@click.argument('bin_idx',type=click.IntRange(1, 96),required=True)
-def history(ctx, bin_idx):
+@click.argument('bin_idx',type=click.IntRange(1, 96),required=False)
+@pm_history_range_options
+def history(ctx, bin_idx, bin_from, bin_to, output_format, summary):
     chassis_id = ctx.obj['module_idx']
-    show_chassis_pm_history_impl(chassis_id, ctx.obj['pm_type'], bin_idx)
+    bins = get_pm_history_bins(bin_idx, bin_from, bin_to)
+    if bins:
+        show_chassis_pm_history_range_impl(chassis_id, ctx.obj['pm_type'], bins, output_format, summary)
+    else:
+        show_chassis_pm_history_impl(chassis_id, ctx.obj['pm_type'], bin_idx)
 #################################### config ############################################################
 @click.group("chassis")
 @click.pass_context
@@ -120,6 +126,7 @@ def hi_warning(ctx,hw_value):
     config_chassis(chassis_id, "temp-high-warn-threshold", hw_value) 
     click.echo('Succeeded')
     
+
 #################################### clear pm ############################################################
 @cfg_chassis.group("clear-pm")
 @click.argument('pm_type',type=click.Choice(['15','24', 'all']),required=True)
@@ -172,8 +179,14 @@ def show_chassis_pm_current_impl(chassis_id, pm_type):
     show_chassis_pm_current(chassis_id, PM_LIST, "CHASSIS", pm_type)
 
 def show_chassis_pm_history_impl(chassis_id, pm_type, bin_idx):
-    show_entity_pm_history_head("CHASSIS-1", pm_type, bin_idx)
-    show_chassis_pm_history(chassis_id, PM_LIST, "CHASSIS", pm_type, bin_idx)
+    snapshot = PmSnapshot(pm_type)
+    show_entity_pm_history_head("CHASSIS-1", pm_type, bin_idx, snapshot)
+    show_chassis_pm_history(chassis_id, PM_LIST, "CHASSIS", pm_type, bin_idx, snapshot)
+
+def show_chassis_pm_history_range_impl(chassis_id, pm_type, bins, output_format, summary):
+    entity_name = f"CHASSIS-{chassis_id}"
+    entities = [(entity_name, functools.partial(get_entity_pm_requests, entity_name, PM_LIST, "CHASSIS", pm_type))]
+    show_pm_history_range(0, entities, pm_type, bins, output_format, summary)
 
 def config_chassis(chassis_id, field, value):
     table_name = 'CHASSIS'
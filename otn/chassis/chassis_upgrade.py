@@ -0,0 +1,201 @@
+import click
+import socket
+import struct
+import sys
+import threading
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+from tabulate import tabulate
+from otn.utils.db import *
+from otn.utils.utils import *
+from otn.utils.watch import is_keyspace_notification_enabled
+from otn.slot.slot_upgrade import get_slot_upgrade_file_fields, set_slot_upgrade_fields
+
+UPGRADE_WAITING = "WAITING"
+UPGRADE_SUCCEEDED = "SUCCEEDED"
+UPGRADE_FAILED = "FAILED"
+UPGRADE_ROLLED_BACK = "ROLLED_BACK"
+UPGRADE_TIMEOUT = "TIMEOUT"
+
+#####################################upgrade########################################################
+@click.command('upgrade-all')
+@click.argument('file',type=str,required=True)
+@click.argument('uname',type=str,required=True)
+@click.password_option(confirmation_prompt=False)
+@click.option('--slots', default='all', help='Comma separated slot ids to upgrade, default all present linecards')
+@click.option('--parallel', type=click.IntRange(1, 16), default=UPGRADE_PARALLEL,
+              help='Slots upgraded at the same time')
+@click.option('--no-reboot', is_flag=True, help='Stop after commit, do not reboot the linecards')
+@click.pass_context
+def chassis_upgrade_all(ctx, file, uname, password, slots, parallel, no_reboot):
+    try:
+        slot_ids = get_upgrade_slot_ids(slots)
+    except ValueError as e:
+        click.echo(e)
+        return
+    if not slot_ids:
+        click.echo('No linecard to upgrade')
+        return
+
+    ip = struct.unpack('I', socket.inet_aton(CU_IP_INTERNAL))[0]
+    file_fields = get_slot_upgrade_file_fields(ip, file, uname, password)
+    progress = ChassisUpgradeProgress(slot_ids)
+    with ThreadPoolExecutor(max_workers=parallel) as executor:
+        futures = [executor.submit(upgrade_slot, slot_id, file_fields, progress, no_reboot) for slot_id in slot_ids]
+        version = 0
+        while not all(future.done() for future in futures):
+            version = progress.wait_change(version, 1)
+            show_chassis_upgrade_progress(progress)
+    show_chassis_upgrade_progress(progress)
+
+################################################################################################
+class ChassisUpgradeProgress(object):
+    """
+    Upgrade progress of every slot, updated by the slot workers and rendered
+    by the main thread whenever one of them changes.
+    """
+    def __init__(self, slot_ids):
+        self.condition = threading.Condition()
+        self.version = 0
+        self.slots = {}
+        for slot_id in slot_ids:
+            self.slots[slot_id] = {'stage': UPGRADE_WAITING, 'state': NA_VALUE, 'result': '', 'start': None}
+
+    def update(self, slot_id, **kwargs):
+        with self.condition:
+            self.slots[slot_id].update(kwargs)
+            self.version += 1
+            self.condition.notify_all()
+
+    def wait_change(self, version, timeout):
+        with self.condition:
+            self.condition.wait_for(lambda: self.version != version, timeout)
+            return self.version
+
+    def get_table(self):
+        now = time.monotonic()
+        with self.condition:
+            table = []
+            for slot_id, slot in sorted(self.slots.items()):
+                elapsed = int(now - slot['start']) if slot['start'] is not None else 0
+                table.append([f'Slot {slot_id}', slot['stage'], slot['state'], f'{elapsed}s', slot['result']])
+            return table
+
+def show_chassis_upgrade_progress(progress):
+    header = ['Slot', 'Stage', 'Upgrade State', 'Elapsed', 'Result']
+    if sys.stdout.isatty():
+        click.clear()
+    click.echo(tabulate(progress.get_table(), header, numalign="left") + "\n")
+
+def get_upgrade_slot_ids(slots):
+    linecard_slots = get_linecard_slot_range()
+    if slots == 'all':
+        return [slot_id for slot_id in linecard_slots if is_slot_present(slot_id)]
+
+    slot_ids = []
+    for slot in slots.split(','):
+        slot_id = int(slot)
+        if slot_id not in linecard_slots:
+            raise ValueError(f'Slot {slot_id} is not a linecard slot')
+        if not is_slot_present(slot_id):
+            raise ValueError(f'Slot {slot_id} is not present')
+        if slot_id not in slot_ids:
+            slot_ids.append(slot_id)
+    return slot_ids
+
+def get_slot_upgrade_state_key(slot_id):
+    separator = get_db_table_separator(slot_id, DB_STATE_IDX, 'LINECARD')
+    return f'LINECARD{separator}LINECARD-1-{slot_id}'
+
+def read_slot_upgrade_state(slot_id):
+    client = get_redis_client_by_slot(slot_id, DB_STATE_IDX)
+    return client.hget(get_slot_upgrade_state_key(slot_id), 'upgrade-state') or NA_VALUE
+
+def watch_slot_upgrade_state(slot_id):
+    """
+    Returns:
+        pubsub of the keyspace events of the LINECARD key, None if the redis
+        of the slot does not publish them
+    """
+    client = get_redis_client_by_slot(slot_id, DB_STATE_IDX)
+    if not is_keyspace_notification_enabled(client):
+        return None
+    pubsub = client.pubsub(ignore_subscribe_messages=True)
+    pubsub.psubscribe(f'__keyspace@{DB_STATE_IDX}__:{get_slot_upgrade_state_key(slot_id)}')
+    return pubsub
+
+def wait_slot_upgrade_state(slot_id, pubsub, progress, initial_state, is_done, timeout=UPGRADE_STAGE_TIMEOUT):
+    """
+    Wait until the upgrade state of the slot moved away from initial_state and
+    satisfies is_done. The state is read on every iteration: after each batch
+    of keyspace events of the LINECARD key, at least every
+    UPGRADE_STATE_REFRESH_INTERVAL, or every UPGRADE_STATE_POLL_INTERVAL
+    without keyspace events so that a short lived state is not missed.
+
+    Returns:
+        the final upgrade state, None on timeout
+    """
+    deadline = time.monotonic() + timeout
+    changed = False
+    while True:
+        state = read_slot_upgrade_state(slot_id)
+        progress.update(slot_id, state=state)
+        changed = changed or state != initial_state
+        if changed and is_done(state):
+            return state
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return None
+        if pubsub is None:
+            time.sleep(min(remaining, UPGRADE_STATE_POLL_INTERVAL))
+            continue
+        message = pubsub.get_message(timeout=min(remaining, UPGRADE_STATE_REFRESH_INTERVAL))
+        while message:
+            message = pubsub.get_message()
+
+def run_slot_upgrade_stage(slot_id, pubsub, progress, stage, field_value_touple_list, is_done):
+    progress.update(slot_id, stage=stage)
+    initial_state = read_slot_upgrade_state(slot_id)
+    set_slot_upgrade_fields(slot_id, field_value_touple_list)
+    return wait_slot_upgrade_state(slot_id, pubsub, progress, initial_state, is_done)
+
+def upgrade_slot(slot_id, file_fields, progress, no_reboot):
+    progress.update(slot_id, start=time.monotonic())
+    pubsub = None
+    try:
+        pubsub = watch_slot_upgrade_state(slot_id)
+        state = run_slot_upgrade_stage(slot_id, pubsub, progress, 'download',
+                                       file_fields + [('upgrade-download', 'true')],
+                                       lambda state: state in [DOWNLOAD_FINISH, IDLE, COMMIT_STOP])
+        if state != DOWNLOAD_FINISH:
+            progress.update(slot_id, result=UPGRADE_FAILED if state else UPGRADE_TIMEOUT)
+            return
+
+        state = run_slot_upgrade_stage(slot_id, pubsub, progress, 'commit', [('upgrade-commit', 'true')],
+                                       lambda state: state in [COMMIT_FINISH, COMMIT_ERROR, COMMIT_STOP])
+        if state == COMMIT_ERROR:
+            state = run_slot_upgrade_stage(slot_id, pubsub, progress, 'rollback', [('upgrade-rollback', 'true')],
+                                           lambda state: state != ROLLBACKING)
+            if state is None:
+                progress.update(slot_id, result=UPGRADE_TIMEOUT)
+            else:
+                progress.update(slot_id, result=UPGRADE_ROLLED_BACK if state == IDLE else UPGRADE_FAILED)
+            return
+        if state != COMMIT_FINISH:
+            progress.update(slot_id, result=UPGRADE_FAILED if state else UPGRADE_TIMEOUT)
+            return
+
+        if not no_reboot:
+            state = run_slot_upgrade_stage(slot_id, pubsub, progress, 'reboot', [('upgrade-reboot', 'true')],
+                                           lambda state: state in [IDLE, REBOOT_ERROR])
+            if state != IDLE:
+                progress.update(slot_id, result=UPGRADE_FAILED if state else UPGRADE_TIMEOUT)
+                return
+        progress.update(slot_id, result=UPGRADE_SUCCEEDED)
+    except Exception as e:
+        log.log_info(f"Upgrade slot {slot_id} failed: {e}")
+        progress.update(slot_id, result=f'{UPGRADE_FAILED}: {e}')
+    finally:
+        if pubsub is not None:
+            pubsub.close()
@@ -1,8 +1,9 @@
 import click
 from otn.utils.utils import *
-from otn.utils.config_utils import set_slot_synchronized_save
+from otn.utils.config_utils import set_slot_synchronized_save, set_slot_synchronized_save_modules
 from otn.utils.db import *
 from otn.utils.pm import *
+from otn.utils.watch import *
 
 ################################### show #########################################################
 @click.group()
@@ -14,10 +15,14 @@ def edfa(ctx, module_idx):
        
 @edfa.command()
 @click.pass_context
-def info(ctx):
+@watch_options
+def info(ctx, watch, interval):
     slot_id = ctx.obj['slot_idx']
     edfa_ids = get_module_ids(ctx)
-    show_modules_info(slot_id, edfa_ids, "AMPLIFIER")
+    if watch:
+        KeyspaceWatch(slot_id, get_modules_info_watch_rows(slot_id, edfa_ids, "AMPLIFIER"), interval).run()
+    else:
+        show_modules_info(slot_id, edfa_ids, "AMPLIFIER")
 
 @edfa.command()
 @click.pass_context
@@ -41,11 +46,16 @@ def current(ctx):
     
 @pm.command()
 @click.pass_context
-@click.argument('bin_idx',type=click.IntRange(1, 96),required=True)
-def history(ctx, bin_idx):
+@click.argument('bin_idx',type=click.IntRange(1, 96),required=False)
+@pm_history_range_options
+def history(ctx, bin_idx, bin_from, bin_to, output_format, summary):
     slot_id = ctx.obj['slot_idx']
     edfa_ids = get_module_ids(ctx)
-    show_modules_pm_history(slot_id, edfa_ids, "AMPLIFIER", ctx.obj['pm_type'], bin_idx)
+    bins = get_pm_history_bins(bin_idx, bin_from, bin_to)
+    if bins:
+        show_modules_pm_history_range(slot_id, edfa_ids, "AMPLIFIER", ctx.obj['pm_type'], bins, output_format, summary)
+    else:
+        show_modules_pm_history(slot_id, edfa_ids, "AMPLIFIER", ctx.obj['pm_type'], bin_idx)
 #################################### config ############################################################
 @click.group("edfa")
 @click.pass_context
@@ -147,8 +157,8 @@ def config_edfa(slot_id, edfa_id, field, value):
     click.echo('Succeeded')
 
 def config_edfas(slot_id, edfa_ids, field, value):
-    for edfa_id in edfa_ids:
-        config_edfa(slot_id, edfa_id, field,value)         
+    table_keys = [f'AMPLIFIER-1-{slot_id}-{edfa_id}' for edfa_id in edfa_ids]
+    set_slot_synchronized_save_modules(slot_id, 'AMPLIFIER', table_keys, field, value)
 
 def transform_auto_shutdown(status):
     if status == 'enable':
@@ -160,20 +170,28 @@ def show_modules_info(slot_id, module_ids, table_name):
     for module_id in module_ids:
         show_module_info_data(slot_id, module_id, STATE_LIST, table_name)
         show_module_pm_instant(slot_id, module_id, PM_LIST, table_name)
+
+def get_modules_info_watch_rows(slot_id, module_ids, table_name):
+    rows = []
+    for module_id in module_ids:
+        table_key = f'{table_name}-1-{slot_id}-{module_id}'
+        rows += get_state_watch_rows(table_name, table_key, STATE_LIST)
+        rows += get_pm_instant_watch_rows(table_name, table_key, PM_LIST)
+        rows.append(WatchRow(""))
+    return rows
     
 def show_modules_config(slot_id, module_ids, table_name):
     for module_id in module_ids:
         show_module_config_data(slot_id, module_id, CONFIG_LIST, table_name)
 
 def show_modules_pm_current(slot_id, module_ids, table_name, pm_type):
-    for module_id in module_ids:
-        show_module_pm_current_head(slot_id, module_id, table_name, pm_type)
-        show_module_pm_current(slot_id, module_id, PM_LIST, table_name, pm_type)
+    show_slot_modules_pm_current(slot_id, module_ids, PM_LIST, table_name, pm_type)
 
 def show_modules_pm_history(slot_id, module_ids, table_name, pm_type, bin_idx):
-    for module_id in module_ids:
-        show_module_pm_history_head(slot_id, module_id, table_name, pm_type, bin_idx)
-        show_module_pm_history(slot_id, module_id, PM_LIST, table_name, pm_type, bin_idx)
+    show_slot_modules_pm_history(slot_id, module_ids, PM_LIST, table_name, pm_type, bin_idx)
+
+def show_modules_pm_history_range(slot_id, module_ids, table_name, pm_type, bins, output_format, summary):
+    show_slot_modules_pm_history_range(slot_id, module_ids, PM_LIST, table_name, pm_type, bins, output_format, summary)
     
 STATE_LIST = [
         {'Field': 'name',                       'show_name': 'Module Name'},
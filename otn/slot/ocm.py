@@ -1,8 +1,10 @@
 import click
 from tabulate import tabulate
 from otn.utils.utils import *
+from otn.utils.config_utils import set_slot_synchronized_save, set_slot_synchronized_save_modules
 from otn.utils.db import *
 from otn.utils.pm import *
+from otn.utils.spectrum import OcmSpectrum
 
 ################################### show #########################################################
 @click.group()
@@ -27,11 +29,20 @@ def config(ctx):
     show_modules_config(slot_id, ocm_ids, "OCM")
 #################################### show spectrum  #####################################################
 @ocm.command()
+@click.option('--threshold', type=float, default=OCM_CHANNEL_THRESHOLD,
+              help='Power(dBm) from which a slice carries a channel')
+@click.option('--summary', is_flag=True, help='Show channel count, tilt, ripple and peak to floor deltas')
+@click.option('--baseline', type=click.Path(dir_okay=False),
+              help='Compare with a spectrum saved by --export. With several OCMs, '
+                   'the baseline of each OCM is read from the file name followed by .<OCM id>')
+@click.option('--export', type=click.Path(dir_okay=False),
+              help='Save the spectrum in binary form. With several OCMs, '
+                   'the spectrum of each OCM is saved to the file name followed by .<OCM id>')
 @click.pass_context
-def spectrum(ctx):
+def spectrum(ctx, threshold, summary, baseline, export):
     slot_id = ctx.obj['slot_idx']
     ocm_ids = get_module_ids(ctx)
-    show_ocms_spectrum(slot_id, ocm_ids)
+    show_ocms_spectrum(slot_id, ocm_ids, threshold, summary, baseline, export)
 
 #################################### config ############################################################
 @click.group("ocm")
@@ -65,8 +76,8 @@ def config_ocm(slot_id, ocm_id, field, value):
     click.echo('Succeeded')
 
 def config_ocms(slot_id, ocm_ids, field, value):
-    for ocm_id in ocm_ids:
-        config_ocm(slot_id, ocm_id, field,value)         
+    table_keys = [f'OCM-1-{slot_id}-{ocm_id}' for ocm_id in ocm_ids]
+    set_slot_synchronized_save_modules(slot_id, 'OCM', table_keys, field, value)
 
 def show_modules_info(slot_id, module_ids, table_name):
     for module_id in module_ids:
@@ -76,33 +87,79 @@ def show_modules_config(slot_id, module_ids, table_name):
     for module_id in module_ids:
         show_module_config_data(slot_id, module_id, CONFIG_LIST, table_name)
         
-def show_ocms_spectrum(slot_id, ocm_ids):
-    for ocm_id in ocm_ids:
-        show_ocm_spectrum(slot_id, ocm_id)
-        
-def show_ocm_spectrum(slot_id, ocm_id):
-    db = get_state_db_by_slot(slot_id)
-    monitor_port = get_db_table_field(db, 'OCM', f'OCM-1-{slot_id}-{ocm_id}', 'monitor-port')
-    name = get_db_table_field(db, 'OCM', f'OCM-1-{slot_id}-{ocm_id}', 'name')
-
-    keys = get_db_table_keys(db, f'OCM|OCM-1-{slot_id}-{ocm_id}|*')
-    keys = [] if keys is None else keys
-    click.echo(f'{name} monitor {monitor_port} Total spectrum num: {len(keys)}')
-    spectrums = []
-    for key in keys:
-        spectrum = get_db_table_fields(db, 'OCM', key)
-        spectrums.append(spectrum)
-    sorted_spectrums = sorted(spectrums, key=operator.itemgetter('lower-frequency'),reverse=True)
-    
+def get_ocms_spectrum(slot_id, ocm_ids):
+    """
+    Read the spectrum of several OCMs: one KEYS call and one pipelined
+    HGETALL batch for all their slices.
+
+    Returns:
+        dict of ocm_id -> (OCM rdict, OcmSpectrum)
+    """
+    ocm_keys = {f'OCM-1-{slot_id}-{ocm_id}': ocm_id for ocm_id in ocm_ids}
+    channels = {ocm_id: [] for ocm_id in ocm_ids}
+    all_fields = get_db_table_all_fields_batch(slot_id, DB_STATE_IDX, 'OCM', f'OCM-1-{slot_id}-*|*')
+    for table_key, fields in all_fields.items():
+        ocm_key = table_key.split('|')[0]
+        if ocm_key in ocm_keys:
+            channels[ocm_keys[ocm_key]].append(fields)
+    ocm_fields = get_db_tables_fields_batch(slot_id, DB_STATE_IDX, [('OCM', ocm_key) for ocm_key in ocm_keys])
+    return {ocm_id: (fields, OcmSpectrum.from_channels(channels[ocm_id]))
+            for ocm_id, fields in zip(ocm_ids, ocm_fields)}
+
+def get_ocm_spectrum_path(path, ocm_ids, ocm_id):
+    """
+    File of the spectrum of one OCM for --baseline/--export: the path itself
+    for a single OCM, the path followed by .<OCM id> for several.
+    """
+    return path if len(ocm_ids) == 1 else f'{path}.{ocm_id}'
+
+def show_ocms_spectrum(slot_id, ocm_ids, threshold=OCM_CHANNEL_THRESHOLD, summary=False, baseline=None, export=None):
+    baseline_spectrums = {}
+    if baseline:
+        for ocm_id in ocm_ids:
+            path = get_ocm_spectrum_path(baseline, ocm_ids, ocm_id)
+            if not os.path.isfile(path):
+                click.echo(f'Baseline spectrum {path} does not exist')
+                return
+            baseline_spectrums[ocm_id] = OcmSpectrum.load(path)
+    for ocm_id, (fields, spectrum) in get_ocms_spectrum(slot_id, ocm_ids).items():
+        click.echo(f"{fields['name']} monitor {fields['monitor-port']} Total spectrum num: {len(spectrum)}")
+        show_ocm_spectrum(spectrum)
+        if summary:
+            show_ocm_spectrum_summary(spectrum, threshold)
+        if ocm_id in baseline_spectrums:
+            show_ocm_spectrum_diff(spectrum, baseline_spectrums[ocm_id])
+        if export:
+            path = get_ocm_spectrum_path(export, ocm_ids, ocm_id)
+            spectrum.save(path)
+            click.echo(f'Spectrum saved to {path}')
+
+def show_ocm_spectrum(spectrum):
     spectrum_header = ['id','lower-frequency(MHz)','upper-frequency(MHz)','power(dBm)']
     spectrums_info = []
-    index = 1
-    for spectrum in sorted_spectrums:
-        spectrums_info.append([index, spectrum['lower-frequency'], spectrum['upper-frequency'], spectrum['power']])
-        index = index + 1     
+    for index, i in enumerate(reversed(range(len(spectrum))), 1):
+        spectrums_info.append([index, spectrum.lower[i], spectrum.upper[i], spectrum.power[i]])
     click.echo(tabulate(spectrums_info, spectrum_header, tablefmt="simple"))
     click.echo("")
- 
+
+def show_ocm_spectrum_summary(spectrum, threshold):
+    section_str = ""
+    section_str += "Channel Num".ljust(FIELD_WITH) + f": {spectrum.channel_count(threshold)}\n"
+    section_str += "Tilt(dB/THz)".ljust(FIELD_WITH) + f": {spectrum.tilt():.2f}\n"
+    section_str += "Ripple(dB)".ljust(FIELD_WITH) + f": {spectrum.ripple(threshold):.2f}\n"
+    click.echo(section_str)
+    delta_header = ['lower-frequency(MHz)','upper-frequency(MHz)','peak-to-floor(dB)']
+    deltas = [[lower, upper, f'{delta:.2f}'] for lower, upper, delta in spectrum.peak_to_floor(threshold)]
+    click.echo(tabulate(deltas, delta_header, tablefmt="simple"))
+    click.echo("")
+
+def show_ocm_spectrum_diff(spectrum, baseline_spectrum):
+    diff_header = ['lower-frequency(MHz)','upper-frequency(MHz)','power(dBm)','baseline(dBm)','delta(dB)']
+    deltas = [[lower, upper, power, base, f'{delta:.2f}']
+              for lower, upper, power, base, delta in spectrum.diff(baseline_spectrum)]
+    click.echo(tabulate(deltas, diff_header, tablefmt="simple"))
+    click.echo("")
+
 STATE_LIST = [
         {'Field': 'name',                       'show_name': 'Module Name'},
         {'Field': 'part-no',                    'show_name': 'Module PN'},
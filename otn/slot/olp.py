@@ -1,8 +1,10 @@
+import functools
 from tabulate import tabulate
 from otn.utils.utils import *
-from otn.utils.config_utils import set_slot_synchronized_save
+from otn.utils.config_utils import set_slot_synchronized_save, set_slot_synchronized_save_modules, set_slot_table_fields
 from otn.utils.db import *
 from otn.utils.pm import *
+from otn.utils.watch import *
 
 ################################### show #########################################################
 @click.group()
@@ -14,10 +16,14 @@ def olp(ctx, module_idx):
        
 @olp.command()
 @click.pass_context
-def info(ctx):
+@watch_options
+def info(ctx, watch, interval):
     slot_id = ctx.obj['slot_idx']
     olp_ids = get_module_ids(ctx)
-    show_modules_info(slot_id, olp_ids, "APS")
+    if watch:
+        KeyspaceWatch(slot_id, get_modules_info_watch_rows(slot_id, olp_ids, "APS"), interval).run()
+    else:
+        show_modules_info(slot_id, olp_ids, "APS")
 
 @olp.command()
 @click.pass_context
@@ -33,9 +39,7 @@ def switch_info(ctx):
     olp_ids = get_module_ids(ctx)
     
     for olp_id in olp_ids:
-        outputs = run_OLSS_utils_set(slot_id, 'APS', f'APS-1-{slot_id}-{olp_id}', 'collect-switch-info', f'true')
-        if 'failed' in outputs:
-            click.echo(outputs)
+        set_slot_table_fields(slot_id, 'APS', f'APS-1-{slot_id}-{olp_id}', [('collect-switch-info', 'true')])
         time.sleep(2)
         state_db = get_state_db_by_slot(slot_id)
         get_keys = sorted(list(state_db.keys(f'OLP_SWITCH_INFO|APS-1-{slot_id}-{olp_ids}*')),reverse=True)[:10]
@@ -64,11 +68,16 @@ def current(ctx):
     
 @pm.command()
 @click.pass_context
-@click.argument('bin_idx',type=click.IntRange(1, 96),required=True)
-def history(ctx, bin_idx):
+@click.argument('bin_idx',type=click.IntRange(1, 96),required=False)
+@pm_history_range_options
+def history(ctx, bin_idx, bin_from, bin_to, output_format, summary):
     slot_id = ctx.obj['slot_idx']
     olp_ids = get_module_ids(ctx)
-    show_olps_pm_history(slot_id, olp_ids, "APS", ctx.obj['pm_type'], bin_idx)
+    bins = get_pm_history_bins(bin_idx, bin_from, bin_to)
+    if bins:
+        show_olps_pm_history_range(slot_id, olp_ids, "APS", ctx.obj['pm_type'], bins, output_format, summary)
+    else:
+        show_olps_pm_history(slot_id, olp_ids, "APS", ctx.obj['pm_type'], bin_idx)
 #################################### config ############################################################
 @click.group("olp")
 @click.pass_context
@@ -257,11 +266,11 @@ def workline(ctx, work_line):
     olp_ids = get_module_ids(ctx)
     
     for olp_id in olp_ids:
-        outputs = run_OLSS_utils_set(slot_id, 'APS', f'APS-1-{slot_id}-{olp_id}', 'active-path', f'work_line.upper()')
-        if 'failed' in outputs:
-            click.echo(outputs)
+        err, msg = set_slot_table_fields(slot_id, 'APS', f'APS-1-{slot_id}-{olp_id}',
+                                         [('active-path', work_line.upper())], wait=True)
+        if err != 0:
+            click.echo(f'Failed, error msg: {msg}')
         else:
-            time.sleep(2)
             click.echo(f'Succeeded Config Olp workline {work_line}.')
 
 @cfg_olp.command('hold-off-time')
@@ -284,15 +293,13 @@ def config_olp_port(slot_id, olp_id, port, field, value):
     set_slot_synchronized_save(slot_id,table_name,table_key,field, value)
 
 def config_olps(slot_id, olp_ids, field, value):
-    for olp_id in olp_ids:
-        config_olp(slot_id, olp_id, field,value)         
-        click.echo('Succeeded')
+    table_keys = [f'APS-1-{slot_id}-{olp_id}' for olp_id in olp_ids]
+    set_slot_synchronized_save_modules(slot_id, 'APS', table_keys, field, value)
 
 def config_olps_port(slot_id, olp_ids, port, field, value):
-    for olp_id in olp_ids:
-        config_olp_port(slot_id, olp_id, port, field,value)         
-        click.echo('Succeeded')
-            
+    table_keys = [f'APS-1-{slot_id}-{olp_id}_{port}' for olp_id in olp_ids]
+    set_slot_synchronized_save_modules(slot_id, 'APS_PORT', table_keys, field, value)
+
 def show_modules_info(slot_id, module_ids, table_name):
     for module_id in module_ids:
         show_module_info_data(slot_id, module_id, STATE_LIST, table_name)
@@ -315,6 +322,19 @@ def show_olp_port_info(slot_id, module_id, table_name):
             value = get_pm_instant(db, table_name, table_key)
             section_str += (port+ " " + field['show_name']).ljust(FIELD_WITH)+ ": " + value + "\n"    
     click.echo(section_str)
+
+def get_modules_info_watch_rows(slot_id, module_ids, table_name):
+    rows = []
+    for module_id in module_ids:
+        table_key = f'{table_name}-1-{slot_id}-{module_id}'
+        rows += get_state_watch_rows(table_name, table_key, STATE_LIST)
+        rows.append(WatchRow(""))
+        for port in OLP_PORTS:
+            port_key = f"{table_key}_{port}"
+            rows += get_state_watch_rows("APS_PORT", port_key, PORT_STATE_LIST, port + " ", optional=True)
+            rows += get_pm_instant_watch_rows("APS_PORT", port_key, PM_LIST, port + " ")
+        rows.append(WatchRow(""))
+    return rows
     
 def show_modules_config(slot_id, module_ids, table_name):
     for module_id in module_ids:
@@ -334,40 +354,41 @@ def show_olp_port_config(slot_id, module_id, table_name):
                 section_str += (port+ " " + field['show_name']).ljust(FIELD_WITH)+ ": " + value + "\n"
     click.echo(section_str)
     
-def show_module_olp_pm_current(slot_id, module_id, pm_list, table_name, pm_type): 
-    pm_header = ['Name','Instant','Avg','Min','Max','Min-time','Max-time','Valid']
-    pm_table = []
-    db = get_counter_db_by_slot(slot_id)
+def get_olp_pm_requests(slot_id, module_id, pm_list, table_name, pm_type, history_stamp=None):
+    pm_requests = []
     for port in OLP_PORTS:
         for field in pm_list:
-            table_key = f"APS-1-{slot_id}-{module_id}_{port}_{field['Field']}:{pm_type}_pm_current"
-            pm = get_db_table_fields(db, table_name, table_key)
-            key = port+" "+field['show_name']
-            pm_table.append([key, pm['instant'],pm['avg'],pm['min'],pm['max'], format_timestamp(pm['min-time']), format_timestamp(pm['max-time']),pm['validity']])
-    print(tabulate(pm_table, pm_header, numalign="left")+"\n")
+            entity_name = f"APS-1-{slot_id}-{module_id}_{port}"
+            if history_stamp is None:
+                table_key = get_pm_current_table_key(entity_name, field['Field'], pm_type)
+            else:
+                table_key = get_pm_history_table_key(entity_name, field['Field'], pm_type, history_stamp)
+            pm_requests.append((port+" "+field['show_name'], table_name, table_key))
+    return pm_requests
 
 def show_olp_pm_current(slot_id, olp_ids, table_name, pm_type):
-    for module_id in olp_ids:
-        show_module_pm_current_head(slot_id, module_id, table_name, pm_type)
-        show_module_olp_pm_current(slot_id, module_id, PM_LIST, "APS_PORT", pm_type)
-
-def show_module_olp_pm_history(slot_id, module_id, pm_list, table_name, pm_type, bin_idx): 
-    pm_header = ['Name','Instant','Avg','Min','Max','Min-time','Max-time','Valid']
-    pm_table = []
-    db = get_history_db_by_slot(slot_id)
-    history_stamp = get_pm_history_bin_start_time(pm_type, bin_idx)
-    for port in OLP_PORTS:
-        for field in pm_list:
-            table_key = f"APS-1-{slot_id}-{module_id}_{port}_{field['Field']}:{pm_type}_pm_history_{history_stamp}"
-            pm = get_db_table_fields(db, table_name, table_key)
-            key = port+" "+field['show_name']
-            pm_table.append([key, pm['instant'],pm['avg'],pm['min'],pm['max'], format_timestamp(pm['min-time']), format_timestamp(pm['max-time']),pm['validity']])
-    print(tabulate(pm_table, pm_header, numalign="left")+"\n")
+    snapshot = PmSnapshot(pm_type)
+    pm_requests_list = [get_olp_pm_requests(slot_id, module_id, PM_LIST, "APS_PORT", pm_type) for module_id in olp_ids]
+    pm_tables = get_pm_tables(slot_id, DB_COUNTER_IDX, pm_requests_list)
+    for module_id, pm_table in zip(olp_ids, pm_tables):
+        show_module_pm_current_head(slot_id, module_id, table_name, pm_type, snapshot)
+        show_pm_table(pm_table)
 
 def show_olps_pm_history(slot_id, module_ids, table_name, pm_type, bin_idx):
-    for module_id in module_ids:
-        show_module_pm_history_head(slot_id, module_id, table_name, pm_type, bin_idx)
-        show_module_olp_pm_history(slot_id, module_id, PM_LIST, "APS_PORT", pm_type, bin_idx)
+    snapshot = PmSnapshot(pm_type)
+    history_stamp = snapshot.history_stamp(bin_idx)
+    pm_requests_list = [get_olp_pm_requests(slot_id, module_id, PM_LIST, "APS_PORT", pm_type, history_stamp)
+                        for module_id in module_ids]
+    pm_tables = get_pm_tables(slot_id, DB_HISTORY_IDX, pm_requests_list)
+    for module_id, pm_table in zip(module_ids, pm_tables):
+        show_module_pm_history_head(slot_id, module_id, table_name, pm_type, bin_idx, snapshot)
+        show_pm_table(pm_table)
+
+def show_olps_pm_history_range(slot_id, module_ids, table_name, pm_type, bins, output_format, summary):
+    entities = [(f"{table_name}-1-{slot_id}-{module_id}",
+                 functools.partial(get_olp_pm_requests, slot_id, module_id, PM_LIST, "APS_PORT", pm_type))
+                for module_id in module_ids]
+    show_pm_history_range(slot_id, entities, pm_type, bins, output_format, summary)
 
 OLP_PORTS = ["LinePrimaryIn", "LinePrimaryOut","LineSecondaryIn", "LineSecondaryOut", "CommonIn", "CommonOutput"]
     
@@ -1,6 +1,6 @@
 import click
 from otn.utils.utils import *
-from otn.utils.config_utils import set_slot_synchronized_save
+from otn.utils.config_utils import set_slot_synchronized_save, set_slot_synchronized_save_modules
 from otn.utils.db import *
 from otn.utils.pm import *
 
@@ -48,11 +48,16 @@ def current(ctx):
     
 @pm.command()
 @click.pass_context
-@click.argument('bin_idx',type=click.IntRange(1, 96),required=True)
-def history(ctx, bin_idx):
+@click.argument('bin_idx',type=click.IntRange(1, 96),required=False)
+@pm_history_range_options
+def history(ctx, bin_idx, bin_from, bin_to, output_format, summary):
     slot_id = ctx.obj['slot_idx']
     osc_ids = get_module_ids(ctx)
-    show_modules_pm_history(slot_id, osc_ids, "OSC", ctx.obj['pm_type'], bin_idx)
+    bins = get_pm_history_bins(bin_idx, bin_from, bin_to)
+    if bins:
+        show_modules_pm_history_range(slot_id, osc_ids, "OSC", ctx.obj['pm_type'], bins, output_format, summary)
+    else:
+        show_modules_pm_history(slot_id, osc_ids, "OSC", ctx.obj['pm_type'], bin_idx)
 #################################### config ############################################################
 @click.group("osc")
 @click.pass_context
@@ -138,14 +143,13 @@ def show_oscs_lldp(slot_id, module_ids):
         show_osc_lldp(slot_id, module_id)
 
 def show_modules_pm_current(slot_id, module_ids, table_name, pm_type):
-    for module_id in module_ids:
-        show_module_pm_current_head(slot_id, module_id, table_name, pm_type)
-        show_module_pm_current(slot_id, module_id, PM_LIST, table_name, pm_type)
+    show_slot_modules_pm_current(slot_id, module_ids, PM_LIST, table_name, pm_type)
 
 def show_modules_pm_history(slot_id, module_ids, table_name, pm_type, bin_idx):
-    for module_id in module_ids:
-        show_module_pm_history_head(slot_id, module_id, table_name, pm_type, bin_idx)
-        show_module_pm_history(slot_id, module_id, PM_LIST, table_name, pm_type, bin_idx)
+    show_slot_modules_pm_history(slot_id, module_ids, PM_LIST, table_name, pm_type, bin_idx)
+
+def show_modules_pm_history_range(slot_id, module_ids, table_name, pm_type, bins, output_format, summary):
+    show_slot_modules_pm_history_range(slot_id, module_ids, PM_LIST, table_name, pm_type, bins, output_format, summary)
         
 def config_osc(slot_id,osc_id, field, value):
     table_name = 'OSC'
@@ -154,9 +158,9 @@ def config_osc(slot_id,osc_id, field, value):
     click.echo('Succeeded')
 
 def config_oscs(slot_id, osc_ids, field, value):
-    for osc_id in osc_ids:
-        config_osc(slot_id, osc_id, field,value)         
-  
+    table_keys = [f'OSC-1-{slot_id}-{osc_id}' for osc_id in osc_ids]
+    set_slot_synchronized_save_modules(slot_id, 'OSC', table_keys, field, value)
+
 STATE_LIST = [
     {'Field': 'name',               'show_name': 'Module Name'},
     {'Field': 'part-no',            'show_name': 'Module PN'},
@@ -1,5 +1,10 @@
 import click
+import json
+import os
+import tempfile
+from tabulate import tabulate
 from otn.utils.utils import *
+from otn.utils.config_utils import set_slot_synchronized_save, set_slot_synchronized_save_modules
 from otn.utils.db import *
 from otn.utils.pm import *
 
@@ -45,6 +50,16 @@ def history_info(ctx):
     slot_id = ctx.obj['slot_idx']
     otdr_ids = get_module_ids(ctx)
     show_otdrs_history_scan(slot_id, otdr_ids)
+
+@otdr.command("diff")
+@click.option('--scan', 'scan_time', help='History scan to compare with the baseline, default the current scan')
+@click.option('--bin-size', type=click.FloatRange(0.001, None), default=OTDR_DIFF_BIN_SIZE,
+              help='Distance bin(km) events are matched in')
+@click.pass_context
+def diff(ctx, scan_time, bin_size):
+    slot_id = ctx.obj['slot_idx']
+    otdr_ids = get_module_ids(ctx)
+    show_otdrs_diff(slot_id, otdr_ids, scan_time, bin_size)
     
 #################################### config ############################################################
 @click.group("otdr")
@@ -166,8 +181,8 @@ def config_otdr(slot_id, otdr_id, field, value):
     click.echo('Succeeded')
 
 def config_otdrs(slot_id, otdr_ids, field, value):
-    for otdr_id in otdr_ids:
-        config_otdr(slot_id, otdr_id, field,value)         
+    table_keys = [f'OTDR-1-{slot_id}-{otdr_id}' for otdr_id in otdr_ids]
+    set_slot_synchronized_save_modules(slot_id, 'OTDR', table_keys, field, value)
 
 def show_modules_info(slot_id, module_ids, table_name):
     for module_id in module_ids:
@@ -189,35 +204,175 @@ def show_otdrs_history_scan(slot_id, otdr_ids):
     for otdr_id in otdr_ids:
         show_otdr_history_scan(slot_id, otdr_id)
 
+def show_otdrs_diff(slot_id, otdr_ids, scan_time, bin_size):
+    for otdr_id in otdr_ids:
+        show_otdr_diff(slot_id, otdr_id, scan_time, bin_size)
+
+def get_otdr_scan(slot_id, otdr_id, scan_type):
+    """
+    A scan and its events sorted by index, with one HGETALL batch for the events.
+    """
+    scan_key = f'OTDR-1-{slot_id}-{otdr_id}|{scan_type}'
+    scan, = get_db_tables_fields_batch(slot_id, DB_STATE_IDX, [('OTDR', scan_key)])
+    events = get_db_table_all_fields_batch(slot_id, DB_STATE_IDX, 'OTDR_EVENT', f'{scan_key}|*').values()
+    return scan, sorted(events, key=get_otdr_event_index)
+
+def get_otdr_event_index(event):
+    try:
+        return int(event.get('index'))
+    except (TypeError, ValueError):
+        return 0
+
+def get_otdr_scan_cache_file(slot_id, otdr_id):
+    return os.path.join(OTDR_SCAN_CACHE_DIR, f'OTDR-1-{slot_id}-{otdr_id}.json')
+
+def load_otdr_scan_cache(slot_id, otdr_id):
+    try:
+        with open(get_otdr_scan_cache_file(slot_id, otdr_id)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_otdr_scan_cache(slot_id, otdr_id, scans):
+    cache_file = get_otdr_scan_cache_file(slot_id, otdr_id)
+    tmp_file = None
+    try:
+        os.makedirs(OTDR_SCAN_CACHE_DIR, exist_ok=True)
+        # a file of its own, so that concurrent shows do not write the same temporary file
+        fd, tmp_file = tempfile.mkstemp(dir=OTDR_SCAN_CACHE_DIR, prefix=f'{os.path.basename(cache_file)}.',
+                                        suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(scans, f)
+        os.replace(tmp_file, cache_file)
+    except OSError as e:
+        log.log_info(f"Save OTDR scan cache {cache_file} failed: {e}")
+        if tmp_file is not None and os.path.exists(tmp_file):
+            os.unlink(tmp_file)
+
+def get_otdr_history_scans(slot_id, otdr_id):
+    """
+    History scans keyed by scan time, with their events. Scans already seen
+    are served from a local cache, only the new ones are read from the
+    linecard, each batch with a single pipeline. A cached scan is read again
+    when its event count differs from the linecard, e.g. it was cached while
+    the linecard was still writing it.
+
+    Returns:
+        dict of scan time -> {'scan': fields, 'events': [fields]}
+    """
+    otdr_key = f'OTDR-1-{slot_id}-{otdr_id}'
+    client = get_redis_client_by_slot(slot_id, DB_STATE_IDX)
+    prefix = f"OTDR{get_db_table_separator(slot_id, DB_STATE_IDX, 'OTDR')}{otdr_key}|"
+    scan_times = [key[len(prefix):] for key in client.keys(f'{prefix}20*')]
+    event_prefix = f"OTDR_EVENT{get_db_table_separator(slot_id, DB_STATE_IDX, 'OTDR_EVENT')}"
+    scan_event_keys = {scan_time: [] for scan_time in scan_times}
+    for key in client.keys(f'{event_prefix}{otdr_key}|20*'):
+        key = key[len(event_prefix):]
+        scan_time = key.split('|')[1]
+        if scan_time in scan_event_keys:
+            scan_event_keys[scan_time].append(key)
+
+    cached = load_otdr_scan_cache(slot_id, otdr_id)
+    scans = {scan_time: cached[scan_time] for scan_time in scan_times
+             if scan_time in cached and cached[scan_time]['scan']
+             and len(cached[scan_time]['events']) == len(scan_event_keys[scan_time])}
+    new_scan_times = [scan_time for scan_time in scan_times if scan_time not in scans]
+    if new_scan_times:
+        event_keys = [key for scan_time in new_scan_times for key in scan_event_keys[scan_time]]
+        fields_list = get_db_tables_fields_batch(slot_id, DB_STATE_IDX,
+                                                 [('OTDR', f'{otdr_key}|{scan_time}') for scan_time in new_scan_times] +
+                                                 [('OTDR_EVENT', key) for key in event_keys])
+        new_scans, events = fields_list[:len(new_scan_times)], fields_list[len(new_scan_times):]
+        for scan_time, scan in zip(new_scan_times, new_scans):
+            scans[scan_time] = {'scan': dict(scan), 'events': []}
+        for key, event in zip(event_keys, events):
+            if event:
+                scans[key.split('|')[1]]['events'].append(dict(event))
+        for scan_time in new_scan_times:
+            scans[scan_time]['events'].sort(key=get_otdr_event_index)
+    if new_scan_times or len(scans) != len(cached):
+        save_otdr_scan_cache(slot_id, otdr_id, scans)
+    return scans
+
 def show_otdr_history_scan(slot_id, otdr_id):
-    db = get_state_db_by_slot(slot_id)
-    keys = get_db_table_keys(db, f'OTDR|OTDR-1-{slot_id}-{otdr_id}|20*')
-    keys = [] if keys is None else keys
-    click.echo(f'Total history scan num: {len(keys)}')
-    scans = []
-    for key in keys:
-        scan = get_db_table_fields(db, 'OTDR', key)
-        scans.append(scan)
-    sorted_scans = sorted(scans, key=operator.itemgetter('scan-time'),reverse=True)
-    for scan in sorted_scans:
-        show_key_value_list(SCAN_LIST, scan)
+    scans = get_otdr_history_scans(slot_id, otdr_id)
+    click.echo(f'Total history scan num: {len(scans)}')
+    for scan_time in sorted(scans, reverse=True):
+        show_key_value_list(SCAN_LIST, rdict(scans[scan_time]['scan']))
         
 def show_otdr_scan(slot_id, otdr_id, scan_type):
-    db = get_state_db_by_slot(slot_id)
-    baseline = get_db_table_fields(db, 'OTDR', f'OTDR-1-{slot_id}-{otdr_id}|{scan_type}')
-    show_key_value_list(SCAN_LIST, baseline)
+    scan, events = get_otdr_scan(slot_id, otdr_id, scan_type)
+    show_key_value_list(SCAN_LIST, scan)
     click.echo("")
     
-    keys = get_db_table_keys(db, f'OTDR_EVENT|OTDR-1-{slot_id}-{otdr_id}|{scan_type}|*')
-    keys = [] if keys is None else keys
-    click.echo(f'Total event num: {len(keys)}')
-    events = []
-    for key in keys:
-        event = get_db_table_fields(db, 'OTDR_EVENT', key)
-        events.append(event)
-    sorted_events = sorted(events, key=operator.itemgetter('index'),reverse=True)
-    for event in sorted_events:
-        show_key_value_list(EVENT_LIST, baseline)
+    click.echo(f'Total event num: {len(events)}')
+    for event in reversed(events):
+        show_key_value_list(EVENT_LIST, event)
+
+def to_otdr_value(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+def diff_otdr_events(baseline_events, events, bin_size):
+    """
+    Match the events of two scans per distance bin.
+
+    Returns:
+        list of [distance, baseline loss, loss, loss delta, note] for the bins that changed
+    """
+    def get_bins(scan_events):
+        bins = {}
+        for event in scan_events:
+            length = to_otdr_value(event.get('length'))
+            if length is None:
+                continue
+            b = bins.setdefault(int(round(length / bin_size)), {'loss': 0.0, 'reflection': False})
+            b['loss'] += to_otdr_value(event.get('loss')) or 0.0
+            b['reflection'] = b['reflection'] or bool(to_otdr_value(event.get('reflection')))
+        return bins
+
+    baseline_bins = get_bins(baseline_events)
+    bins = get_bins(events)
+    diffs = []
+    for idx in sorted(set(baseline_bins) | set(bins)):
+        baseline_bin = baseline_bins.get(idx)
+        current_bin = bins.get(idx)
+        if baseline_bin is None:
+            note = 'new reflection' if current_bin['reflection'] else 'new event'
+        elif current_bin is None:
+            note = 'event missing'
+        elif current_bin['reflection'] and not baseline_bin['reflection']:
+            note = 'new reflection'
+        else:
+            note = ''
+        baseline_loss = baseline_bin['loss'] if baseline_bin else 0.0
+        loss = current_bin['loss'] if current_bin else 0.0
+        if note or abs(loss - baseline_loss) >= OTDR_DIFF_LOSS_THRESHOLD:
+            diffs.append([f'{idx * bin_size:.3f}', f'{baseline_loss:.2f}', f'{loss:.2f}',
+                          f'{loss - baseline_loss:+.2f}', note])
+    return diffs
+
+def show_otdr_diff(slot_id, otdr_id, scan_time, bin_size):
+    baseline, baseline_events = get_otdr_scan(slot_id, otdr_id, 'BASELINE')
+    if scan_time is None:
+        scan, events = get_otdr_scan(slot_id, otdr_id, 'CURRENT')
+    else:
+        history_scan = get_otdr_history_scans(slot_id, otdr_id).get(scan_time)
+        if history_scan is None:
+            click.echo(f'OTDR-1-{slot_id}-{otdr_id} has no scan {scan_time}')
+            return
+        scan, events = rdict(history_scan['scan']), history_scan['events']
+
+    click.echo(f"OTDR-1-{slot_id}-{otdr_id} baseline {baseline['scan-time']} vs scan {scan['scan-time']}")
+    baseline_loss = to_otdr_value(baseline['span-loss'])
+    span_loss = to_otdr_value(scan['span-loss'])
+    if baseline_loss is not None and span_loss is not None:
+        click.echo("Span Loss Delta(dB)".ljust(FIELD_WITH) + f": {span_loss - baseline_loss:+.2f}")
+    diff_header = ['Distance(km)', 'Baseline Loss(dB)', 'Loss(dB)', 'Delta(dB)', 'Note']
+    click.echo(tabulate(diff_otdr_events(baseline_events, events, bin_size), diff_header, tablefmt="simple"))
+    click.echo("")
 
 STATE_LIST = [
         {'Field': 'name',                       'show_name': 'Module Name'},
@@ -278,7 +433,7 @@ SCAN_LIST = [
     ]
 
 EVENT_LIST = [
-        {'Field': 'scan-time',                        'show_name': 'Event Idex'},
+        {'Field': 'index',                            'show_name': 'Event Index'},
         {'Field': 'type',                             'show_name': 'Event Type'},
         {'Field': 'length',                           'show_name': 'Event Length(km)'},
         {'Field': 'loss',                             'show_name': 'Event Loss(dB)'},
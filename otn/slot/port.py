@@ -1,8 +1,9 @@
 import click
+import functools
 
 from tabulate import tabulate
 from otn.utils.utils import *
-from otn.utils.config_utils import set_slot_synchronized_save
+from otn.utils.config_utils import set_slot_synchronized_save, set_slot_synchronized_save_modules
 from otn.utils.pm import *
 
 IN = "IN"
@@ -44,11 +45,16 @@ def current(ctx):
     
 @pm.command()
 @click.pass_context
-@click.argument('bin_idx',type=click.IntRange(1, 96),required=True)
-def history(ctx, bin_idx):
+@click.argument('bin_idx',type=click.IntRange(1, 96),required=False)
+@pm_history_range_options
+def history(ctx, bin_idx, bin_from, bin_to, output_format, summary):
     slot_id = ctx.obj['slot_idx']
     ports = get_module_ids(ctx)
-    show_ports_pm_history(slot_id, ports, ctx.obj['pm_type'], bin_idx)
+    bins = get_pm_history_bins(bin_idx, bin_from, bin_to)
+    if bins:
+        show_ports_pm_history_range(slot_id, ports, ctx.obj['pm_type'], bins, output_format, summary)
+    else:
+        show_ports_pm_history(slot_id, ports, ctx.obj['pm_type'], bin_idx)
 #################################### config ############################################################
 @click.group("port")
 @click.pass_context
@@ -117,29 +123,39 @@ def get_port_data(db, slot_id, port, direction):
     table_key = f'{table_name}-1-{slot_id}-{port}{direction}'
     return get_db_table_fields(db, table_name, table_key)
 
-def show_ports_pm_current(slot_id, ports, pm_type):
-    for port in ports:
-        show_module_pm_current_head_with_entity(f"PORT-1-{slot_id}-{port}", pm_type)
-        show_port_pm_current(slot_id, port, PM_LIST, pm_type)
-
-def show_port_pm_current(slot_id, port, pm_list, pm_type):
-    pm_header = ['Name','Instant','Avg','Min','Max','Min-time','Max-time','Valid']
-    pm_table = []
-    db = get_counter_db_by_slot(slot_id)
+def get_port_pm_requests(slot_id, port, pm_list, pm_type, history_stamp=None):
+    pm_requests = []
     for field in pm_list:
         direction = field['Direction']
         full_name = (port + direction).upper()
-        table_key = get_port_current_pm_table_key(slot_id, full_name, field["Field"], pm_type)
-        pm = get_db_table_fields(db, "PORT", table_key)
-        key = field['show_name']
-        pm_table.append([key, pm['instant'],pm['avg'],pm['min'],pm['max'], format_timestamp(pm['min-time']), format_timestamp(pm['max-time']),pm['validity']])
-    
-    print(tabulate(pm_table, pm_header, numalign="left")+"\n")    
+        if history_stamp is None:
+            table_key = get_port_current_pm_table_key(slot_id, full_name, field["Field"], pm_type)
+        else:
+            table_key = get_port_history_pm_table_key(slot_id, full_name, field["Field"], pm_type, history_stamp)
+        pm_requests.append((field['show_name'], "PORT", table_key))
+    return pm_requests
+
+def show_ports_pm_current(slot_id, ports, pm_type):
+    snapshot = PmSnapshot(pm_type)
+    pm_requests_list = [get_port_pm_requests(slot_id, port, PM_LIST, pm_type) for port in ports]
+    pm_tables = get_pm_tables(slot_id, DB_COUNTER_IDX, pm_requests_list)
+    for port, pm_table in zip(ports, pm_tables):
+        show_module_pm_current_head_with_entity(f"PORT-1-{slot_id}-{port}", pm_type, snapshot)
+        show_pm_table(pm_table)
 
 def show_ports_pm_history(slot_id, ports, pm_type, bin_idx):
-    for port in ports:
-        show_module_pm_history_head_with_entity(f"PORT-1-{slot_id}-{port}", pm_type, bin_idx)
-        show_port_pm_history(slot_id, port, PM_LIST, pm_type, bin_idx)
+    snapshot = PmSnapshot(pm_type)
+    history_stamp = snapshot.history_stamp(bin_idx)
+    pm_requests_list = [get_port_pm_requests(slot_id, port, PM_LIST, pm_type, history_stamp) for port in ports]
+    pm_tables = get_pm_tables(slot_id, DB_HISTORY_IDX, pm_requests_list)
+    for port, pm_table in zip(ports, pm_tables):
+        show_module_pm_history_head_with_entity(f"PORT-1-{slot_id}-{port}", pm_type, bin_idx, snapshot)
+        show_pm_table(pm_table)
+
+def show_ports_pm_history_range(slot_id, ports, pm_type, bins, output_format, summary):
+    entities = [(f"PORT-1-{slot_id}-{port}",
+                 functools.partial(get_port_pm_requests, slot_id, port, PM_LIST, pm_type)) for port in ports]
+    show_pm_history_range(slot_id, entities, pm_type, bins, output_format, summary)
 
 def get_port_current_pm_table_key(slot_id, port, pm_field, pm_type):
     return f"PORT-1-{slot_id}-{port}_{pm_field}:{pm_type}_pm_current"
@@ -147,20 +163,6 @@ def get_port_current_pm_table_key(slot_id, port, pm_field, pm_type):
 def get_port_history_pm_table_key(slot_id, port, pm_field, pm_type, history_stamp):
     return f"PORT-1-{slot_id}-{port}_{pm_field}:{pm_type}_pm_history_{history_stamp}"
 
-def show_port_pm_history(slot_id, module_id, pm_list,pm_type, bin_idx): 
-    pm_header = ['Name','Instant','Avg','Min','Max','Min-time','Max-time','Valid']
-    pm_table = []
-    db = get_history_db_by_slot(slot_id)
-    history_stamp = get_pm_history_bin_start_time(pm_type, bin_idx)
-    for field in pm_list:
-        direction = field['Direction']
-        full_name = (module_id + direction).upper()
-        table_key = get_port_history_pm_table_key(slot_id, full_name, field["Field"], pm_type, history_stamp)
-        pm = get_db_table_fields(db, "PORT", table_key)
-        key = field['show_name']
-        pm_table.append([key, pm['instant'],pm['avg'],pm['min'],pm['max'], format_timestamp(pm['min-time']), format_timestamp(pm['max-time']),pm['validity']])
-    print(tabulate(pm_table, pm_header, numalign="left")+"\n")
-
 def show_port_pm_instant(slot_id, port, pm_list):
     section_str = ""
     db = get_counter_db_by_slot(slot_id)
@@ -191,8 +193,8 @@ def config_port_RX(slot_id, port_id, field, value):
     click.echo('Succeeded')
 
 def config_ports(slot_id, port_ids, field, value):
-    for port_id in port_ids:
-        config_port_RX(slot_id, port_id, field,value)      
+    table_keys = [f'PORT-1-{slot_id}-{port_id}IN' for port_id in port_ids]
+    set_slot_synchronized_save_modules(slot_id, 'PORT', table_keys, field, value)
 
 STATE_LIST = [
     {'Direction': IN,         'Field': 'oper-status',                      'show_name': 'Oper Status'},
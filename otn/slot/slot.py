@@ -1,16 +1,17 @@
 import click
+import functools
 import time
-from . import edfa, terminal_line_show, voa, ocm, otdr, osc, olp, wss, port, slot_upgrade, terminal_client_show, terminal_client_config, terminal_line_config
 from otn.utils.utils import *
 from otn.utils.config_utils import set_slot_configuration_save, set_slot_synchronized_save
 from otn.utils.db import *
 from otn.utils.pm import *
+from utilities_common.cli import LazyGroup
 
 
 OBX_TERMINAL_LINECARD = ['P230C']
 
 #################################### info ############################################################
-@click.group()
+@click.group(cls=LazyGroup)
 @click.pass_context
 @click.argument('slot_idx',type=DynamicModuleIdxChoice('slot'), required=True)
 def slot(ctx, slot_idx):
@@ -44,17 +45,17 @@ def current(ctx):
 def history(ctx):
     show_slot_alarm_history(ctx.obj['slot_idx'])
         
-slot.add_command(slot_upgrade.show_slot_upgrade)
-slot.add_command(edfa.edfa)
-slot.add_command(voa.voa)
-slot.add_command(ocm.ocm)
-slot.add_command(otdr.otdr)
-slot.add_command(osc.osc)
-slot.add_command(olp.olp)
-slot.add_command(wss.wss)
-slot.add_command(port.port)
-slot.add_command(terminal_client_show.client)
-slot.add_command(terminal_line_show.line)
+slot.add_lazy_command('upgrade', 'otn.slot.slot_upgrade:show_slot_upgrade')
+slot.add_lazy_command('edfa', 'otn.slot.edfa:edfa')
+slot.add_lazy_command('voa', 'otn.slot.voa:voa')
+slot.add_lazy_command('ocm', 'otn.slot.ocm:ocm')
+slot.add_lazy_command('otdr', 'otn.slot.otdr:otdr')
+slot.add_lazy_command('osc', 'otn.slot.osc:osc')
+slot.add_lazy_command('olp', 'otn.slot.olp:olp')
+slot.add_lazy_command('wss', 'otn.slot.wss:wss')
+slot.add_lazy_command('port', 'otn.slot.port:port')
+slot.add_lazy_command('client', 'otn.slot.terminal_client_show:client')
+slot.add_lazy_command('line', 'otn.slot.terminal_line_show:line')
 #################################### pm ############################################################
 @slot.group()
 @click.pass_context
@@ -70,13 +71,18 @@ def current(ctx):
     
 @pm.command()
 @click.pass_context
-@click.argument('bin_idx',type=click.IntRange(1, 96),required=True)
-def history(ctx, bin_idx):
+@click.argument('bin_idx',type=click.IntRange(1, 96),required=False)
+@pm_history_range_options
+def history(ctx, bin_idx, bin_from, bin_to, output_format, summary):
     slot_id = ctx.obj['slot_idx']
-    show_slot_pm_history_impl(slot_id, "LINECARD", ctx.obj['pm_type'], bin_idx)
+    bins = get_pm_history_bins(bin_idx, bin_from, bin_to)
+    if bins:
+        show_slot_pm_history_range_impl(slot_id, "LINECARD", ctx.obj['pm_type'], bins, output_format, summary)
+    else:
+        show_slot_pm_history_impl(slot_id, "LINECARD", ctx.obj['pm_type'], bin_idx)
 
 #####################################config########################################################
-@click.group("slot")
+@click.group("slot", cls=LazyGroup)
 @click.pass_context
 @click.argument('slot_idx',type=DynamicModuleIdxChoice('slot'), required=True)
 def cfg_slot(ctx, slot_idx):
@@ -182,17 +188,17 @@ def current(ctx):
     set_table_field(state_db, "CLEANPM",table_key,'period', pm_type)
     click.echo('Successed')
                 
-cfg_slot.add_command(slot_upgrade.slot_upgrade)
-cfg_slot.add_command(edfa.cfg_edfa)
-cfg_slot.add_command(voa.cfg_voa)
-# cfg_slot.add_command(ocm.cfg_ocm)
-# cfg_slot.add_command(otdr.cfg_otdr)
-cfg_slot.add_command(osc.cfg_osc)
-cfg_slot.add_command(olp.cfg_olp)
-# cfg_slot.add_command(wss.cfg_wss)
-cfg_slot.add_command(port.cfg_port)
-cfg_slot.add_command(terminal_client_config.cfg_client)
-cfg_slot.add_command(terminal_line_config.cfg_line)
+cfg_slot.add_lazy_command('upgrade', 'otn.slot.slot_upgrade:slot_upgrade')
+cfg_slot.add_lazy_command('edfa', 'otn.slot.edfa:cfg_edfa')
+cfg_slot.add_lazy_command('voa', 'otn.slot.voa:cfg_voa')
+# cfg_slot.add_lazy_command('ocm', 'otn.slot.ocm:cfg_ocm')
+# cfg_slot.add_lazy_command('otdr', 'otn.slot.otdr:cfg_otdr')
+cfg_slot.add_lazy_command('osc', 'otn.slot.osc:cfg_osc')
+cfg_slot.add_lazy_command('olp', 'otn.slot.olp:cfg_olp')
+# cfg_slot.add_lazy_command('wss', 'otn.slot.wss:cfg_wss')
+cfg_slot.add_lazy_command('port', 'otn.slot.port:cfg_port')
+cfg_slot.add_lazy_command('client', 'otn.slot.terminal_client_config:cfg_client')
+cfg_slot.add_lazy_command('line', 'otn.slot.terminal_line_config:cfg_line')
 
 #################################################################################################
 def show_slot_info_impl(slot_id):
@@ -231,8 +237,14 @@ def show_slot_pm_current_impl(slot_id, table_name, pm_type):
     show_slot_pm_current(slot_id, PM_LIST, table_name, pm_type)
 
 def show_slot_pm_history_impl(slot_id, table_name, pm_type, bin_idx):
-    show_slot_pm_history_head(slot_id, table_name, pm_type, bin_idx)
-    show_slot_pm_history(slot_id, PM_LIST, table_name, pm_type, bin_idx)
+    snapshot = PmSnapshot(pm_type)
+    show_slot_pm_history_head(slot_id, table_name, pm_type, bin_idx, snapshot)
+    show_slot_pm_history(slot_id, PM_LIST, table_name, pm_type, bin_idx, snapshot)
+
+def show_slot_pm_history_range_impl(slot_id, table_name, pm_type, bins, output_format, summary):
+    entity_name = f"{table_name}-1-{slot_id}"
+    entities = [(entity_name, functools.partial(get_entity_pm_requests, entity_name, PM_LIST, table_name, pm_type))]
+    show_pm_history_range(slot_id, entities, pm_type, bins, output_format, summary)
 
 def config_slot(slot_id, field, value):
     table_name = 'LINECARD'
@@ -241,7 +253,7 @@ def config_slot(slot_id, field, value):
 
 def flush_linecard_data(slot_id):
     for db_id in FLUSH_DB_IDX_LIST:
-        connect_muti_db_common(slot_id, db_id).flushdb()
+        get_db_by_slot(slot_id, db_id).flushdb()
     db = get_config_db_by_slot(slot_id)
     db.set("CONFIG_DB_INITIALIZED", 1)
 
@@ -255,12 +267,12 @@ def flush_linecard_data_except_state(slot_id):
     flush_linecard_data(slot_id)
 
 def flush_linecard_all_data(slot_id):
-    connect_muti_db_common(slot_id, DB_STATE_IDX).flushdb()
+    get_db_by_slot(slot_id, DB_STATE_IDX).flushdb()
     flush_linecard_data(slot_id)
 
 def create_linecard_config_file(slot_id, cfg_type, board_mode=None):
     asic_id = slot_id - 1
-    platform = get_chassis_config_db().hget('DEVICE_METADATA|localhost', 'platform')
+    platform = get_platform()
 
     # make sure the linecards factory configuration is there
     cmd = f'sudo cp -r /usr/share/sonic/device/{platform}/linecards /etc/sonic'
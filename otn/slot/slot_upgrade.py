@@ -3,6 +3,7 @@ import socket
 import struct
 
 from otn.utils.utils import *
+from otn.utils.config_utils import set_slot_table_fields
 #####################################upgrade########################################################
 @click.group("upgrade")
 @click.pass_context
@@ -20,14 +21,9 @@ def slot_upgrade_auto(ctx, file, uname, password):
     ip = struct.unpack('I', socket.inet_aton(ip_addr))[0]
     
     try:
-        file_path = os.path.dirname(file)
-        file_name = os.path.basename(file)
-        run_OLSS_utils_set(slot_id, 'LINECARD', f'LINECARD-1-{slot_id}', 'host-ip', ip)
-        run_OLSS_utils_set(slot_id, 'LINECARD', f'LINECARD-1-{slot_id}', 'user-name', uname)
-        run_OLSS_utils_set(slot_id, 'LINECARD', f'LINECARD-1-{slot_id}', 'user-password', password)
-        run_OLSS_utils_set(slot_id, 'LINECARD', f'LINECARD-1-{slot_id}', 'upgrade-file-name', file_name)
-        run_OLSS_utils_set(slot_id, 'LINECARD', f'LINECARD-1-{slot_id}', 'upgrade-file-path', file_path)
-        run_OLSS_utils_set(slot_id, 'LINECARD', f'LINECARD-1-{slot_id}', 'upgrade-auto', 'true')
+        field_value_touple_list = get_slot_upgrade_file_fields(ip, file, uname, password)
+        field_value_touple_list.append(('upgrade-auto', 'true'))
+        set_slot_upgrade_fields(slot_id, field_value_touple_list)
     except Exception as e:
         click.echo(e)
 
@@ -41,14 +37,9 @@ def slot_upgrade_download(ctx, file, uname, password):
     ip_addr = CU_IP_INTERNAL
     ip = struct.unpack('I', socket.inet_aton(ip_addr))[0]
     try:
-        file_path = os.path.dirname(file)
-        file_name = os.path.basename(file)
-        run_OLSS_utils_set(slot_id, 'LINECARD', f'LINECARD-1-{slot_id}', 'host-ip', ip)
-        run_OLSS_utils_set(slot_id, 'LINECARD', f'LINECARD-1-{slot_id}', 'user-name', uname)
-        run_OLSS_utils_set(slot_id, 'LINECARD', f'LINECARD-1-{slot_id}', 'user-password', password)
-        run_OLSS_utils_set(slot_id, 'LINECARD', f'LINECARD-1-{slot_id}', 'upgrade-file-name', file_name)
-        run_OLSS_utils_set(slot_id, 'LINECARD', f'LINECARD-1-{slot_id}', 'upgrade-file-path', file_path)
-        run_OLSS_utils_set(slot_id, 'LINECARD', f'LINECARD-1-{slot_id}', 'upgrade-download', 'true')
+        field_value_touple_list = get_slot_upgrade_file_fields(ip, file, uname, password)
+        field_value_touple_list.append(('upgrade-download', 'true'))
+        set_slot_upgrade_fields(slot_id, field_value_touple_list)
         click.echo(f'slot {slot_id} Download Successed')
     except Exception as e:
         click.echo(e)
@@ -59,7 +50,7 @@ def slot_upgrade_download(ctx, file, uname, password):
 def slot_upgrade_commit(ctx):
     slot_id = ctx.obj['slot_idx']
     try:
-        run_OLSS_utils_set(slot_id, 'LINECARD', f'LINECARD-1-{slot_id}', 'upgrade-commit', 'true')
+        set_slot_upgrade_fields(slot_id, [('upgrade-commit', 'true')])
         click.echo(f'Trigger slot {slot_id} Committing Successed')
     except Exception as e:
         click.echo(e)
@@ -69,7 +60,7 @@ def slot_upgrade_commit(ctx):
 def slot_upgrade_reboot(ctx):
     slot_id = ctx.obj['slot_idx']
     try:
-        run_OLSS_utils_set(slot_id, 'LINECARD', f'LINECARD-1-{slot_id}', 'upgrade-reboot', 'true')
+        set_slot_upgrade_fields(slot_id, [('upgrade-reboot', 'true')])
         click.echo(f'Reboot slot {slot_id}...wait for a moment')
     except Exception as e:
         click.echo(e)
@@ -79,7 +70,7 @@ def slot_upgrade_reboot(ctx):
 def slot_upgrade_commit_pause(ctx):
     slot_id = ctx.obj['slot_idx']
     try:
-        run_OLSS_utils_set(slot_id, 'LINECARD', f'LINECARD-1-{slot_id}', 'upgrade-commit-pause', 'true')
+        set_slot_upgrade_fields(slot_id, [('upgrade-commit-pause', 'true')])
         click.echo(f'Trigger slot {slot_id} Commit-pause Successed')
     except Exception as e:
         click.echo(e)
@@ -89,7 +80,7 @@ def slot_upgrade_commit_pause(ctx):
 def slot_upgrade_commit_resume(ctx):
     slot_id = ctx.obj['slot_idx']
     try:
-        run_OLSS_utils_set(slot_id, 'LINECARD', f'LINECARD-1-{slot_id}', 'upgrade-commit-resume', 'true')
+        set_slot_upgrade_fields(slot_id, [('upgrade-commit-resume', 'true')])
         click.echo(f'Trigger slot {slot_id} Commit-resume Successed')
     except Exception as e:
         click.echo(e)
@@ -99,7 +90,7 @@ def slot_upgrade_commit_resume(ctx):
 def slot_upgrade_rollback(ctx):
     slot_id = ctx.obj['slot_idx']
     try:
-        run_OLSS_utils_set(slot_id, 'LINECARD', f'LINECARD-1-{slot_id}', 'upgrade-rollback', 'true')
+        set_slot_upgrade_fields(slot_id, [('upgrade-rollback', 'true')])
         click.echo(f'Trigger slot {slot_id} Rollback Successed')
     except Exception as e:
         click.echo(e)
@@ -119,6 +110,16 @@ def slot_upgrade_state(ctx):
     except Exception as e:
         click.echo(f'{e}  Query Failed, Wait for a moment and then try again.')
 
+def get_slot_upgrade_file_fields(ip, file, uname, password):
+    return [('host-ip', ip),
+            ('user-name', uname),
+            ('user-password', password),
+            ('upgrade-file-name', os.path.basename(file)),
+            ('upgrade-file-path', os.path.dirname(file))]
+
+def set_slot_upgrade_fields(slot_id, field_value_touple_list):
+    set_slot_table_fields(slot_id, 'LINECARD', f'LINECARD-1-{slot_id}', field_value_touple_list)
+
 def get_slot_upgrade_state(slot_id):
     state = run_OLSS_utils_get(slot_id, 'LINECARD', f'LINECARD-1-{slot_id}', 'upgrade-state')
     return state.strip()
\ No newline at end of file
@@ -1,7 +1,7 @@
 import click
 import time
 from otn.utils.utils import *
-from otn.utils.config_utils import set_slot_synchronized_save
+from otn.utils.config_utils import set_slot_synchronized_save, set_slot_synchronized_save_modules, set_slot_table_fields
 from otn.utils.db import *
 from otn.slot.terminal_client_command_info import *
 from otn.slot.terminal_client_utils import *
@@ -276,38 +276,28 @@ def clear_rmon(ctx, rmon_type):
 ################################################################################################
 def config_clients_logical_channel(slot_id, client_ids, field, value):
     table_name = LOGICAL_CHANNEL
-    for client_id in client_ids:
-        table_key = get_client_GE_logical_channel_id(slot_id, client_id)
-        set_slot_synchronized_save(slot_id,table_name,table_key,field, value)  
-        click.echo('Succeeded')       
+    table_keys = [get_client_GE_logical_channel_id(slot_id, client_id) for client_id in client_ids]
+    set_slot_synchronized_save_modules(slot_id, table_name, table_keys, field, value)
 
 def config_clients_ethernet(slot_id, client_ids, field, value):
     table_name = ETHERNET
-    for client_id in client_ids:
-        table_key = get_client_GE_logical_channel_id(slot_id, client_id)
-        set_slot_synchronized_save(slot_id,table_name,table_key,field, value)         
-        click.echo('Succeeded')
+    table_keys = [get_client_GE_logical_channel_id(slot_id, client_id) for client_id in client_ids]
+    set_slot_synchronized_save_modules(slot_id, table_name, table_keys, field, value)
 
 def config_clients_OTN(slot_id, client_ids, field, value):
     table_name = OTN
-    for client_id in client_ids:
-        table_key = get_client_ODU_logical_channel_id(slot_id, client_id)
-        set_slot_synchronized_save(slot_id,table_name,table_key,field, value)         
-        click.echo('Succeeded')
-    
+    table_keys = [get_client_ODU_logical_channel_id(slot_id, client_id) for client_id in client_ids]
+    set_slot_synchronized_save_modules(slot_id, table_name, table_keys, field, value)
+
 def config_clients_transceiver(slot_id, client_ids, field, value):
     table_name = TRANSCEIVER
-    for client_id in client_ids:
-        table_key = f'{table_name}-1-{slot_id}-C{client_id}'
-        set_slot_synchronized_save(slot_id,table_name,table_key,field, value)         
-        click.echo('Succeeded')
+    table_keys = [f'{table_name}-1-{slot_id}-C{client_id}' for client_id in client_ids]
+    set_slot_synchronized_save_modules(slot_id, table_name, table_keys, field, value)
 
 def config_clients_LLDP(slot_id, client_ids, field, value):
     table_name = LLDP
-    for client_id in client_ids:
-        table_key = get_client_GE_logical_channel_id(slot_id, client_id)
-        set_slot_synchronized_save(slot_id,table_name,table_key,field, value)         
-        click.echo('Succeeded')
+    table_keys = [get_client_GE_logical_channel_id(slot_id, client_id) for client_id in client_ids]
+    set_slot_synchronized_save_modules(slot_id, table_name, table_keys, field, value)
 
 def clear_clients_pm(slot_id, client_ids, pm_type):
     state_db = get_state_db_by_slot(slot_id)
@@ -330,7 +320,7 @@ def clear_clients_rmon_remote(slot_id, client_ids):
     state_db = get_state_db_by_slot(slot_id)
     for client_id in client_ids:
         GE_ch = get_client_GE_logical_channel_id(slot_id, client_id)
-        run_OLSS_utils_set(slot_id, 'ETHERNET', f'{GE_ch}', 'clear-rmon', 'true')
+        set_slot_table_fields(slot_id, 'ETHERNET', GE_ch, [('clear-rmon', 'true')])
         set_table_field(state_db,'ETHERNET',f'{GE_ch}:current','last-clean-up', f"{time.time()}")
         click.echo('Succeeded')
 
@@ -44,27 +44,34 @@ def get_client_GE_channel_ETHERNET_rmon(db, slot_id, module_id):
     table_key = f'{channel_id}:current'
     return get_db_table_fields(db, table_name, table_key)
 
-def get_client_GE_channel_ETHERNET_current_counter_pm(db, slot_id, module_id, pm_type):
-    table_name = "ETHERNET"
+def get_client_counter_pm_table_keys(slot_id, module_id, pm_type, history_stamp=None):
+    """
+    Returns:
+        dict of table name -> key of the PM counter table of a client, current
+        or of the history bin starting at history_stamp
+    """
+    if history_stamp is None:
+        suffix = f'{pm_type}_pm_current'
+    else:
+        suffix = f'{pm_type}_pm_history_{history_stamp}'
     channel_id = get_client_GE_logical_channel_id(slot_id, module_id)
-    table_key = f'{channel_id}:{pm_type}_pm_current'
-    return get_db_table_fields(db, table_name, table_key)
+    return {"TRANSCEIVER": f'TRANSCEIVER-1-{slot_id}-C{module_id}:{suffix}', "ETHERNET": f'{channel_id}:{suffix}'}
+
+def get_client_GE_channel_ETHERNET_current_counter_pm(db, slot_id, module_id, pm_type):
+    table_key = get_client_counter_pm_table_keys(slot_id, module_id, pm_type)["ETHERNET"]
+    return get_db_table_fields(db, "ETHERNET", table_key)
 
 def get_client_transceiver_current_counter_pm(db, slot_id, module_id, pm_type):
-    table_name = "TRANSCEIVER"
-    table_key = f'{table_name}-1-{slot_id}-C{module_id}:{pm_type}_pm_current'
-    return get_db_table_fields(db, table_name, table_key)
+    table_key = get_client_counter_pm_table_keys(slot_id, module_id, pm_type)["TRANSCEIVER"]
+    return get_db_table_fields(db, "TRANSCEIVER", table_key)
 
 def get_client_GE_channel_ETHERNET_history_counter_pm(db, slot_id, module_id, pm_type, history_stamp):
-    table_name = "ETHERNET"
-    channel_id = get_client_GE_logical_channel_id(slot_id, module_id)
-    table_key = f'{channel_id}:{pm_type}_pm_history_{history_stamp}'
-    return get_db_table_fields(db, table_name, table_key)
+    table_key = get_client_counter_pm_table_keys(slot_id, module_id, pm_type, history_stamp)["ETHERNET"]
+    return get_db_table_fields(db, "ETHERNET", table_key)
 
 def get_client_transceiver_history_counter_pm(db, slot_id, module_id, pm_type, history_stamp):
-    table_name = "TRANSCEIVER"
-    table_key = f'{table_name}-1-{slot_id}-C{module_id}:{pm_type}_pm_history_{history_stamp}'
-    return get_db_table_fields(db, table_name, table_key)
+    table_key = get_client_counter_pm_table_keys(slot_id, module_id, pm_type, history_stamp)["TRANSCEIVER"]
+    return get_db_table_fields(db, "TRANSCEIVER", table_key)
 
 def get_client_GE_channel_LLDP_data(db, slot_id, module_id):
     table_name = "LLDP"
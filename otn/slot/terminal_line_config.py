@@ -3,7 +3,7 @@ import sys
 from click import IntRange
 from otn.utils.utils import *
 from otn.utils.db import *
-from otn.utils.config_utils import set_slot_synchronized_save
+from otn.utils.config_utils import set_slot_synchronized_save, set_slot_synchronized_save_modules
 from otn.slot.terminal_line_command_info import *
 from . import terminal_line_upgrade
 
@@ -174,38 +174,28 @@ cfg_line.add_command(terminal_line_upgrade.upgrade)
 ################################################################################################
 def config_lines_logical_channel(slot_id, line_ids, field, value):
     table_name = LOGICAL_CHANNEL
-    for line_id in line_ids:
-        table_key = get_line_OTU_logical_channel_id(slot_id, line_id)
-        set_slot_synchronized_save(slot_id,table_name,table_key,field, value)         
-        click.echo('Succeeded')
+    table_keys = [get_line_OTU_logical_channel_id(slot_id, line_id) for line_id in line_ids]
+    set_slot_synchronized_save_modules(slot_id, table_name, table_keys, field, value)
 
 def config_lines_OTN(slot_id, line_ids, field, value):
     table_name = OTN
-    for line_id in line_ids:
-        table_key = get_line_OTU_logical_channel_id(slot_id, line_id)
-        set_slot_synchronized_save(slot_id,table_name,table_key,field, value)         
-        click.echo('Succeeded')
+    table_keys = [get_line_OTU_logical_channel_id(slot_id, line_id) for line_id in line_ids]
+    set_slot_synchronized_save_modules(slot_id, table_name, table_keys, field, value)
 
 def config_lines_OCH(slot_id, line_ids, field, value):
     table_name = OCH
-    for line_id in line_ids:
-        table_key = f'OCH-1-{slot_id}-L{line_id}'
-        set_slot_synchronized_save(slot_id,table_name,table_key,field, value)         
-        click.echo('Succeeded')
-    
+    table_keys = [f'OCH-1-{slot_id}-L{line_id}' for line_id in line_ids]
+    set_slot_synchronized_save_modules(slot_id, table_name, table_keys, field, value)
+
 def config_lines_transceiver(slot_id, line_ids, field, value):
     table_name = TRANSCEIVER
-    for line_id in line_ids:
-        table_key = f'{table_name}-1-{slot_id}-L{line_id}'
-        set_slot_synchronized_save(slot_id,table_name,table_key,field, value)         
-        click.echo('Succeeded')
+    table_keys = [f'{table_name}-1-{slot_id}-L{line_id}' for line_id in line_ids]
+    set_slot_synchronized_save_modules(slot_id, table_name, table_keys, field, value)
 
 def config_lines_port(slot_id, line_ids, field, value):
     table_name = PORT
-    for line_id in line_ids:
-        table_key = f'{table_name}-1-{slot_id}-L{line_id}'
-        set_slot_synchronized_save(slot_id,table_name,table_key,field, value)         
-        click.echo('Succeeded')
+    table_keys = [f'{table_name}-1-{slot_id}-L{line_id}' for line_id in line_ids]
+    set_slot_synchronized_save_modules(slot_id, table_name, table_keys, field, value)
 
 def get_slot_line_transceiver_vendor(slot_id, line_id):
     db = get_state_db_by_slot(slot_id)
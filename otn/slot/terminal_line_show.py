@@ -1,4 +1,5 @@
 import click
+import functools
 
 from tabulate import tabulate
 from otn.utils.utils import *
@@ -54,11 +55,16 @@ def current(ctx):
     
 @pm.command()
 @click.pass_context
-@click.argument('bin_idx',type=click.IntRange(1, 96),required=True)
-def history(ctx, bin_idx):
+@click.argument('bin_idx',type=click.IntRange(1, 96),required=False)
+@pm_history_range_options
+def history(ctx, bin_idx, bin_from, bin_to, output_format, summary):
     slot_id = ctx.obj['slot_idx']
     line_ids = get_module_ids(ctx)
-    show_modules_pm_history(slot_id, line_ids, ctx.obj['pm_type'], bin_idx)
+    bins = get_pm_history_bins(bin_idx, bin_from, bin_to)
+    if bins:
+        show_modules_pm_history_range(slot_id, line_ids, ctx.obj['pm_type'], bins, output_format, summary)
+    else:
+        show_modules_pm_history(slot_id, line_ids, ctx.obj['pm_type'], bin_idx)
 ################################################################################################
 def get_line_current_pm_table_key(slot_id, module_id, table_name, pm_field, pm_type):
     if table_name == OTN:
@@ -119,17 +125,21 @@ def show_modules_config(slot_id, module_ids):
         all_dict = {TRANSCEIVER:trans_dict, LOGICAL_CHANNEL:OTU_dict, PORT: port_dict, OCH: OCH_dict, OTN: OTN_dict}
         show_key_value_list_with_module(CONFIG_LIST, all_dict)
 
-def show_line_pm_current(slot_id, module_id, pm_list, pm_type): 
-    pm_header = ['Name','Instant','Avg','Min','Max','Min-time','Max-time','Valid']
-    pm_table = []
-    db = get_counter_db_by_slot(slot_id)
+def get_line_pm_requests(slot_id, module_id, pm_list, pm_type, history_stamp=None):
+    pm_requests = []
     for field in pm_list:
         table_name = field['Module']
-        table_key = get_line_current_pm_table_key(slot_id, module_id, table_name, field["Field"], pm_type)
-        pm = get_db_table_fields(db, table_name, table_key)
-        key = field['show_name']
-        pm_table.append([key, pm['instant'],pm['avg'],pm['min'],pm['max'], format_timestamp(pm['min-time']), format_timestamp(pm['max-time']),pm['validity']])
-    print(tabulate(pm_table, pm_header, numalign="left")+"\n")
+        if history_stamp is None:
+            table_key = get_line_current_pm_table_key(slot_id, module_id, table_name, field["Field"], pm_type)
+        else:
+            table_key = get_line_history_pm_table_key(slot_id, module_id, table_name, field["Field"], pm_type,
+                                                      history_stamp)
+        pm_requests.append((field['show_name'], table_name, table_key))
+    return pm_requests
+
+def get_line_OTU_pm_requests(slot_id, module_id, pm_list, pm_type, history_stamp=None):
+    table_keys = get_line_counter_pm_table_keys(slot_id, module_id, pm_type, history_stamp)
+    return get_counter_pm_requests(pm_list, table_keys)
 
 def show_line_OTU_pm_current(slot_id, module_id, pm_list, pm_type): 
     counter_db = get_counter_db_by_slot(slot_id)
@@ -141,9 +151,9 @@ def show_line_OTU_pm_current(slot_id, module_id, pm_list, pm_type):
     print(f"<OTUCN-1-{slot_id}-L{module_id}>")
     show_key_value_list_with_module(pm_list, all_dict)
 
-def show_line_OTU_pm_history(slot_id, module_id, pm_list, pm_type, bin_idx): 
+def show_line_OTU_pm_history(slot_id, module_id, pm_list, pm_type, bin_idx, snapshot=None): 
     counter_db = get_history_db_by_slot(slot_id)
-    history_stamp = get_pm_history_bin_start_time(pm_type, bin_idx)
+    history_stamp = (snapshot or PmSnapshot(pm_type)).history_stamp(bin_idx)
     trans_dict = get_line_transceiver_history_counter_pm(counter_db, slot_id, module_id, pm_type, history_stamp)
     OTN_dict = get_line_OTN_history_counter_pm(counter_db, slot_id, module_id, pm_type, history_stamp)
     all_dict = {TRANSCEIVER:trans_dict, OTN: OTN_dict}
@@ -151,26 +161,30 @@ def show_line_OTU_pm_history(slot_id, module_id, pm_list, pm_type, bin_idx):
     show_key_value_list_with_module(pm_list, all_dict)
            
 def show_modules_pm_current(slot_id, module_ids, pm_type):
-    for module_id in module_ids:
-        show_module_pm_current_head_with_entity(f"PORT-1-{slot_id}-L{module_id}", pm_type)
-        show_line_pm_current(slot_id, module_id, PM_LIST, pm_type)
+    snapshot = PmSnapshot(pm_type)
+    pm_requests_list = [get_line_pm_requests(slot_id, module_id, PM_LIST, pm_type) for module_id in module_ids]
+    pm_tables = get_pm_tables(slot_id, DB_COUNTER_IDX, pm_requests_list)
+    for module_id, pm_table in zip(module_ids, pm_tables):
+        show_module_pm_current_head_with_entity(f"PORT-1-{slot_id}-L{module_id}", pm_type, snapshot)
+        show_pm_table(pm_table)
         show_line_OTU_pm_current(slot_id, module_id, OTU_PM_LIST, pm_type) 
 
-def show_line_pm_history(slot_id, module_id, pm_list,pm_type, bin_idx): 
-    pm_header = ['Name','Instant','Avg','Min','Max','Min-time','Max-time','Valid']
-    pm_table = []
-    db = get_history_db_by_slot(slot_id)
-    history_stamp = get_pm_history_bin_start_time(pm_type, bin_idx)
-    for field in pm_list:
-        table_name = field['Module']
-        table_key = get_line_history_pm_table_key(slot_id, module_id, table_name, field["Field"], pm_type, history_stamp)
-        pm = get_db_table_fields(db, table_name, table_key)
-        key = field['show_name']
-        pm_table.append([key, pm['instant'],pm['avg'],pm['min'],pm['max'], format_timestamp(pm['min-time']), format_timestamp(pm['max-time']),pm['validity']])
-    print(tabulate(pm_table, pm_header, numalign="left")+"\n")
-
 def show_modules_pm_history(slot_id, module_ids, pm_type, bin_idx):
+    snapshot = PmSnapshot(pm_type)
+    history_stamp = snapshot.history_stamp(bin_idx)
+    pm_requests_list = [get_line_pm_requests(slot_id, module_id, PM_LIST, pm_type, history_stamp)
+                        for module_id in module_ids]
+    pm_tables = get_pm_tables(slot_id, DB_HISTORY_IDX, pm_requests_list)
+    for module_id, pm_table in zip(module_ids, pm_tables):
+        show_module_pm_history_head_with_entity(f"PORT-1-{slot_id}-L{module_id}", pm_type, bin_idx, snapshot)
+        show_pm_table(pm_table)
+        show_line_OTU_pm_history(slot_id, module_id, OTU_PM_LIST, pm_type, bin_idx, snapshot)
+
+def show_modules_pm_history_range(slot_id, module_ids, pm_type, bins, output_format, summary):
+    entities = []
     for module_id in module_ids:
-        show_module_pm_history_head_with_entity(f"PORT-1-{slot_id}-L{module_id}", pm_type, bin_idx)
-        show_line_pm_history(slot_id, module_id, PM_LIST, pm_type, bin_idx)
-        show_line_OTU_pm_history(slot_id, module_id, OTU_PM_LIST, pm_type, bin_idx)
+        entities.append((f"PORT-1-{slot_id}-L{module_id}",
+                         functools.partial(get_line_pm_requests, slot_id, module_id, PM_LIST, pm_type)))
+        entities.append((f"OTUCN-1-{slot_id}-L{module_id}",
+                         functools.partial(get_line_OTU_pm_requests, slot_id, module_id, OTU_PM_LIST, pm_type)))
+    show_pm_history_range(slot_id, entities, pm_type, bins, output_format, summary)
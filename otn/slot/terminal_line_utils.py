@@ -43,37 +43,43 @@ def get_line_OTU_channel_OTN_data(db, slot_id, module_id):
     table_key = f'{channel_id}'
     return get_db_table_fields(db, table_name, table_key)
 
+def get_line_counter_pm_table_keys(slot_id, module_id, pm_type, history_stamp=None):
+    """
+    Returns:
+        dict of table name -> key of the PM counter table of a line, current
+        or of the history bin starting at history_stamp
+    """
+    channel_id = get_line_OTU_logical_channel_id(slot_id, module_id)
+    if history_stamp is None:
+        suffix = f'{pm_type}_pm_current'
+        return {"TRANSCEIVER": f'TRANSCEIVER-1-{slot_id}-L{module_id}:{suffix}',
+                "LOGICAL_CHANNEL": f'{channel_id}:{suffix}',
+                "OCH": f'OCH-1-{slot_id}-L{module_id}:{suffix}',
+                "OTN": f'{channel_id}:{suffix}'}
+    # Only the TRANSCEIVER and OTN counters have history bins
+    suffix = f'{pm_type}_pm_history_{history_stamp}'
+    return {"TRANSCEIVER": f'TRANSCEIVER-1-{slot_id}-C{module_id}:{suffix}', "OTN": f'{channel_id}:{suffix}'}
+
 def get_line_transceiver_current_counter_pm(db, slot_id, module_id, pm_type):
-    table_name = "TRANSCEIVER"
-    table_key = f'{table_name}-1-{slot_id}-L{module_id}:{pm_type}_pm_current'
-    return get_db_table_fields(db, table_name, table_key)
+    table_key = get_line_counter_pm_table_keys(slot_id, module_id, pm_type)["TRANSCEIVER"]
+    return get_db_table_fields(db, "TRANSCEIVER", table_key)
 
 def get_line_OTU_current_counter_pm(db, slot_id, module_id, pm_type):
-    table_name = "LOGICAL_CHANNEL"
-    channel_id = get_line_OTU_logical_channel_id(slot_id, module_id)
-    table_key = f'{channel_id}:{pm_type}_pm_current'
-    return get_db_table_fields(db, table_name, table_key)
+    table_key = get_line_counter_pm_table_keys(slot_id, module_id, pm_type)["LOGICAL_CHANNEL"]
+    return get_db_table_fields(db, "LOGICAL_CHANNEL", table_key)
 
 def get_line_OCH_current_counter_pm(db, slot_id, module_id, pm_type):
-    table_name = "OCH"
-    table_key = f'{table_name}-1-{slot_id}-L{module_id}:{pm_type}_pm_current'
-    return get_db_table_fields(db, table_name, table_key)
+    table_key = get_line_counter_pm_table_keys(slot_id, module_id, pm_type)["OCH"]
+    return get_db_table_fields(db, "OCH", table_key)
 
 def get_line_OTN_current_counter_pm(db, slot_id, module_id, pm_type):
-    table_name = "OTN"
-    channel_id = get_line_OTU_logical_channel_id(slot_id, module_id)
-    table_key = f'{channel_id}'
-    table_key = f'{table_key}:{pm_type}_pm_current'
-    return get_db_table_fields(db, table_name, table_key)
+    table_key = get_line_counter_pm_table_keys(slot_id, module_id, pm_type)["OTN"]
+    return get_db_table_fields(db, "OTN", table_key)
 
 def get_line_transceiver_history_counter_pm(db, slot_id, module_id, pm_type, history_stamp):
-    table_name = "TRANSCEIVER"
-    table_key = f'{table_name}-1-{slot_id}-C{module_id}:{pm_type}_pm_history_{history_stamp}'
-    return get_db_table_fields(db, table_name, table_key)
+    table_key = get_line_counter_pm_table_keys(slot_id, module_id, pm_type, history_stamp)["TRANSCEIVER"]
+    return get_db_table_fields(db, "TRANSCEIVER", table_key)
 
 def get_line_OTN_history_counter_pm(db, slot_id, module_id, pm_type, history_stamp):
-    table_name = "OTN"
-    channel_id = get_line_OTU_logical_channel_id(slot_id, module_id)
-    table_key = f'{channel_id}'
-    table_key = f'{table_key}:{pm_type}_pm_history_{history_stamp}'
-    return get_db_table_fields(db, table_name, table_key)
\ No newline at end of file
+    table_key = get_line_counter_pm_table_keys(slot_id, module_id, pm_type, history_stamp)["OTN"]
+    return get_db_table_fields(db, "OTN", table_key)
\ No newline at end of file
@@ -1,6 +1,6 @@
 import click
 from otn.utils.utils import *
-from otn.utils.config_utils import set_slot_synchronized_save
+from otn.utils.config_utils import set_slot_synchronized_save, set_slot_synchronized_save_modules
 from otn.utils.db import *
 from otn.utils.pm import *
 
@@ -41,11 +41,16 @@ def current(ctx):
     
 @pm.command()
 @click.pass_context
-@click.argument('bin_idx',type=click.IntRange(1, 96),required=True)
-def history(ctx, bin_idx):
+@click.argument('bin_idx',type=click.IntRange(1, 96),required=False)
+@pm_history_range_options
+def history(ctx, bin_idx, bin_from, bin_to, output_format, summary):
     slot_id = ctx.obj['slot_idx']
     voa_ids = get_module_ids(ctx)
-    show_modules_pm_history(slot_id, voa_ids, "ATTENUATOR", ctx.obj['pm_type'], bin_idx)
+    bins = get_pm_history_bins(bin_idx, bin_from, bin_to)
+    if bins:
+        show_modules_pm_history_range(slot_id, voa_ids, "ATTENUATOR", ctx.obj['pm_type'], bins, output_format, summary)
+    else:
+        show_modules_pm_history(slot_id, voa_ids, "ATTENUATOR", ctx.obj['pm_type'], bin_idx)
 #################################### config ############################################################
 @click.group("voa")
 @click.pass_context
@@ -71,14 +76,13 @@ def show_modules_config(slot_id, module_ids, table_name):
         show_module_config_data(slot_id, module_id, CONFIG_LIST, table_name)
 
 def show_modules_pm_current(slot_id, module_ids, table_name, pm_type):
-    for module_id in module_ids:
-        show_module_pm_current_head(slot_id, module_id, table_name, pm_type)
-        show_module_pm_current(slot_id, module_id, PM_LIST, table_name, pm_type)
+    show_slot_modules_pm_current(slot_id, module_ids, PM_LIST, table_name, pm_type)
 
 def show_modules_pm_history(slot_id, module_ids, table_name, pm_type, bin_idx):
-    for module_id in module_ids:
-        show_module_pm_history_head(slot_id, module_id, table_name, pm_type, bin_idx)
-        show_module_pm_history(slot_id, module_id, PM_LIST, table_name, pm_type, bin_idx)
+    show_slot_modules_pm_history(slot_id, module_ids, PM_LIST, table_name, pm_type, bin_idx)
+
+def show_modules_pm_history_range(slot_id, module_ids, table_name, pm_type, bins, output_format, summary):
+    show_slot_modules_pm_history_range(slot_id, module_ids, PM_LIST, table_name, pm_type, bins, output_format, summary)
         
 def config_voa(slot_id,voa_id, field, value):
     table_name = 'ATTENUATOR'
@@ -86,10 +90,9 @@ def config_voa(slot_id,voa_id, field, value):
     set_slot_synchronized_save(slot_id,table_name,table_key,field, value)
 
 def config_voas(slot_id, voa_ids, field, value):
-    for voa_id in voa_ids:
-        config_voa(slot_id, voa_id, field,value)         
-        click.echo('Succeeded')
-  
+    table_keys = [f'ATTENUATOR-1-{slot_id}-{voa_id}' for voa_id in voa_ids]
+    set_slot_synchronized_save_modules(slot_id, 'ATTENUATOR', table_keys, field, value)
+
 STATE_LIST = [
     {'Field': 'name',               'show_name': 'Module Name'},
     {'Field': 'attenuation',        'show_name': 'VOA Attenuation(dB)'},
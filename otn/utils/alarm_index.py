@@ -0,0 +1,145 @@
+"""
+Maintain the HISALARM time index of the slot history databases.
+
+The index is a sorted set next to the HISALARM table, member is the HISALARM
+redis key and score its time-created in ms (ns timestamps do not fit a redis
+double exactly). 'show ... alarm history' only reads it, so that the first
+page of the history costs the same whatever the history size.
+
+The indexer follows the keyspace notifications of the HISALARM keys: a
+written alarm is indexed, a deleted or aged out one is removed. The table is
+also reconciled in the background with SCAN and ZSCAN, ALARM_INDEX_SCAN_COUNT
+keys per step from the cursor where the previous step stopped, which catches
+up with the alarms written while the indexer was not running.
+
+Once a full pass over the HISALARM keys is done, and as long as the keyspace
+events are followed, the indexer refreshes the HISALARM_TIME_INDEX_HEARTBEAT
+key after every reconciliation step, with an expiry of
+HISALARM_TIME_INDEX_HEARTBEAT_TIMEOUT. The readers fall back to the whole
+table when the heartbeat is missing, i.e. the indexer is not running, has not
+caught up yet or cannot follow the writes.
+"""
+import argparse
+import threading
+import time
+
+from otn.utils.db import *
+from otn.utils.constants import *
+from otn.utils.utils import get_alarm_index_score, get_linecard_slot_range, log
+from otn.utils.watch import is_keyspace_notification_enabled
+
+ALARM_INDEX_SCAN_COUNT = 500  #keys scanned by one reconciliation step
+ALARM_INDEX_SCAN_INTERVAL = 1  #seconds between two reconciliation steps
+ALARM_INDEX_REMOVED_EVENTS = ('del', 'expired', 'evicted')
+
+class AlarmHistoryIndexer(object):
+    def __init__(self, slot_id):
+        self.slot_id = slot_id
+        self.client = get_redis_client_by_slot(slot_id, DB_HISTORY_IDX)
+        self.prefix = f'{HISALARM}{get_db_table_separator(slot_id, DB_HISTORY_IDX, HISALARM)}'
+        self.keys_cursor = 0
+        self.index_cursor = 0
+        self.synced = False
+
+    def index_keys(self, keys):
+        """
+        Add keys to the index, the keys without time-created yet are indexed
+        by the keyspace event of the write setting it, or by the next scan.
+        """
+        if not keys:
+            return
+        pipe = self.client.pipeline(transaction=False)
+        for key in keys:
+            pipe.hget(key, 'time-created')
+        mapping = {key: get_alarm_index_score(time_created) for key, time_created in zip(keys, pipe.execute())
+                   if time_created is not None and time_created.isdigit()}
+        if mapping:
+            self.client.zadd(HISALARM_TIME_INDEX, mapping)
+
+    def scan_keys(self):
+        """
+        One reconciliation step of the HISALARM keys: index the scanned keys
+        missing from the index, the index is in sync after a full pass.
+        """
+        self.keys_cursor, keys = self.client.scan(self.keys_cursor, match=f'{self.prefix}*',
+                                                  count=ALARM_INDEX_SCAN_COUNT)
+        if keys:
+            pipe = self.client.pipeline(transaction=False)
+            for key in keys:
+                pipe.zscore(HISALARM_TIME_INDEX, key)
+            self.index_keys([key for key, score in zip(keys, pipe.execute()) if score is None])
+        # the cursor is back to 0 once every key existing at the start of the pass was returned
+        if self.keys_cursor == 0:
+            self.synced = True
+
+    def scan_index(self):
+        """
+        One reconciliation step of the index: remove the scanned members whose
+        alarm does not exist anymore.
+        """
+        self.index_cursor, members = self.client.zscan(HISALARM_TIME_INDEX, self.index_cursor,
+                                                       count=ALARM_INDEX_SCAN_COUNT)
+        if not members:
+            return
+        pipe = self.client.pipeline(transaction=False)
+        for key, _ in members:
+            pipe.exists(key)
+        stale = [key for (key, _), exists in zip(members, pipe.execute()) if not exists]
+        if stale:
+            self.client.zrem(HISALARM_TIME_INDEX, *stale)
+
+    def handle_event(self, key, event):
+        if event in ALARM_INDEX_REMOVED_EVENTS:
+            self.client.zrem(HISALARM_TIME_INDEX, key)
+        elif event.startswith('h'):
+            self.index_keys([key])
+
+    def run(self):
+        channel_prefix = f'__keyspace@{DB_HISTORY_IDX}__:'
+        pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        try:
+            # Subscribe before the first scan so that no write is missed
+            if is_keyspace_notification_enabled(self.client):
+                pubsub.psubscribe(f'{channel_prefix}{self.prefix}*')
+            next_scan = time.monotonic()
+            while True:
+                if pubsub.subscribed:
+                    message = pubsub.get_message(timeout=max(0, next_scan - time.monotonic()))
+                    if message and message['type'] == 'pmessage':
+                        self.handle_event(message['channel'][len(channel_prefix):], message['data'])
+                else:
+                    time.sleep(max(0, next_scan - time.monotonic()))
+                if time.monotonic() >= next_scan:
+                    self.scan_keys()
+                    self.scan_index()
+                    # without keyspace events the index lags the writes by up to a full pass
+                    if self.synced and pubsub.subscribed:
+                        self.client.set(HISALARM_TIME_INDEX_HEARTBEAT, int(time.time()),
+                                        ex=HISALARM_TIME_INDEX_HEARTBEAT_TIMEOUT)
+                    next_scan = time.monotonic() + ALARM_INDEX_SCAN_INTERVAL
+        finally:
+            pubsub.close()
+
+def run_slot_indexer(slot_id):
+    while True:
+        try:
+            AlarmHistoryIndexer(slot_id).run()
+        except Exception as e:
+            log.log_error(f"Failed to index {HISALARM} of slot {slot_id}: {e}")
+            time.sleep(ALARM_INDEX_SCAN_INTERVAL)
+
+def main():
+    parser = argparse.ArgumentParser(description=f'Maintain the {HISALARM} time index of the slot history databases')
+    parser.add_argument('-s', '--slot', type=int, action='append',
+                        help='Slot to index, can be given several times, default: the linecards and the chassis')
+    args = parser.parse_args()
+
+    slot_ids = args.slot if args.slot else get_linecard_slot_range() + [0]
+    threads = [threading.Thread(target=run_slot_indexer, args=(slot_id,), daemon=True) for slot_id in slot_ids]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+if __name__ == '__main__':
+    main()
@@ -2,13 +2,26 @@ import math
 import os
 import sys
 import tarfile
-from ftplib import FTP, error_perm
+from ftplib import FTP, error_perm, error_temp
 import click
 import socket
 import paramiko
 
+TRANSFER_WINDOW_SIZE = 16 * 1024 * 1024  #ssh channel window, large enough for slow high latency links
+TRANSFER_MAX_PACKET_SIZE = 32 * 1024
+TRANSFER_BUFFER_SIZE = 256 * 1024
+TRANSFER_RETRIES = 3
+
 class Pysftp(object):
-    def __init__(self, host, port, user, password,local_path='~/',remote_path='~/',time_out=10):
+    """
+    SFTP transfers to one server. The session opened by connect() is kept
+    until close(), so that several files are transferred over the same
+    transport: put() and get() take the paths of each file, the ones given
+    at construction are the defaults.
+    """
+    def __init__(self, host, port, user, password,local_path='~/',remote_path='~/',time_out=10,
+                 window_size=TRANSFER_WINDOW_SIZE, max_packet_size=TRANSFER_MAX_PACKET_SIZE,
+                 buffer_size=TRANSFER_BUFFER_SIZE):
 
         self.host = host
         self.port = port
@@ -17,46 +30,118 @@ class Pysftp(object):
         self.local_path = local_path
         self.server_path = remote_path
         self.time_out = time_out
+        self.window_size = window_size
+        self.max_packet_size = max_packet_size
+        self.buffer_size = buffer_size
+        self.t = None
+        self.sftp = None
 
     def connect(self):
+        # reuse the session while its transport is up
+        if self.t is not None and self.t.is_active():
+            return True
+        self.close()
         try:
-            self.t = paramiko.Transport((self.host, int(self.port)))
+            self.t = paramiko.Transport((self.host, int(self.port)), default_window_size=self.window_size,
+                                        default_max_packet_size=self.max_packet_size)
             self.t.banner_timeout = self.time_out
             self.t.connect(username=self.user, password=self.password)
-            self.sftp = paramiko.SFTPClient.from_transport(self.t)
+            self.sftp = paramiko.SFTPClient.from_transport(self.t, window_size=self.window_size,
+                                                           max_packet_size=self.max_packet_size)
         except Exception as e:
             click.echo(f"Connect Error: {e}")
+            self.close()
             return (False,e)
         else:
             return True
 
-    def put(self,path='',call_back=True):
+    def put(self,path='',call_back=True,resume=False,local_path=None,server_path=None):
+        local_path = local_path or self.local_path
+        server_path = server_path or self.server_path
         try:
             if call_back:
                 call_back = self.printTotals
             else:
                 call_back = None
-            self.sftp.put(self.local_path,self.server_path,callback=call_back)
+            if resume:
+                self.put_resume(local_path, server_path, call_back)
+            else:
+                self.sftp.put(local_path,server_path,callback=call_back)
         except Exception as e:
             click.echo(e)
             raise
         else:
             return True
 
-    def get(self,call_back=True):
+    def get(self,call_back=True,resume=False,server_path=None,local_path=None):
+        local_path = local_path or self.local_path
+        server_path = server_path or self.server_path
         try:
             if call_back:
                 call_back = self.printTotals
             else:
                 call_back = None
-            self.sftp.stat(self.server_path)
-            self.sftp.get(self.server_path, self.local_path,callback=call_back)
+            self.sftp.stat(server_path)
+            if resume:
+                self.get_resume(server_path, local_path, call_back)
+            else:
+                self.sftp.get(server_path, local_path,callback=call_back)
         except Exception as e:
             click.echo(e)
             return False, e
         else:
             return True
 
+    def put_resume(self, local_path, server_path, call_back=None):
+        """
+        Upload local_path, appending to a partial server_path left by an
+        interrupted transfer instead of sending the whole file again.
+        """
+        total = os.stat(local_path).st_size
+        try:
+            offset = self.sftp.stat(server_path).st_size
+        except IOError:
+            offset = 0
+        if offset > total:
+            offset = 0
+        with open(local_path, 'rb') as fl, self.sftp.open(server_path, 'ab' if offset else 'wb') as fr:
+            fr.set_pipelined(True)
+            fl.seek(offset)
+            self.copy_stream(fl, fr, offset, total, call_back)
+
+    def get_resume(self, server_path, local_path, call_back=None):
+        """
+        Download server_path, continuing a partial local_path from its size.
+        """
+        total = self.sftp.stat(server_path).st_size
+        offset = os.stat(local_path).st_size if os.path.exists(local_path) else 0
+        if offset > total:
+            offset = 0
+        with self.sftp.open(server_path, 'rb') as fr, open(local_path, 'ab' if offset else 'wb') as fl:
+            fr.seek(offset)
+            fr.prefetch(total)
+            self.copy_stream(fr, fl, offset, total, call_back)
+
+    def put_dir_tar(self, source_dir, server_path, call_back=None):
+        """
+        Stream source_dir as a tar.gz straight into server_path, no temporary tarball.
+        """
+        with self.sftp.open(server_path, 'wb') as fr:
+            fr.set_pipelined(True)
+            with tarfile.open(fileobj=fr, mode="w|gz", bufsize=self.buffer_size) as tar:
+                tar.add(source_dir, arcname=os.path.basename(source_dir))
+
+    def copy_stream(self, src, dst, offset, total, call_back=None):
+        transferred = offset
+        while True:
+            data = src.read(self.buffer_size)
+            if not data:
+                break
+            dst.write(data)
+            transferred += len(data)
+            if call_back:
+                call_back(transferred, total)
+
     def printTotals(self, transferred, toBeTransferred):
         self.progressbar(transferred,toBeTransferred)
 
@@ -76,7 +161,12 @@ class Pysftp(object):
             raise e
 
     def close(self):
-        self.sftp.close()
+        if self.sftp is not None:
+            self.sftp.close()
+            self.sftp = None
+        if self.t is not None:
+            self.t.close()
+            self.t = None
 
 
 def make_file_zip(output_filename,source_dir):
@@ -86,15 +176,25 @@ def make_file_zip(output_filename,source_dir):
     except Exception as e:
         raise Exception(f' cannot create directory {output_filename} Permission denied')
 
-
 class FTP_OPS(object):
-    def __init__(self, ftp_ip, ftp_port, ftp_user, ftp_pwd):
+    def __init__(self, ftp_ip, ftp_port, ftp_user, ftp_pwd, buffer_size=TRANSFER_BUFFER_SIZE,
+                 retries=TRANSFER_RETRIES):
         self.ftp_ip = ftp_ip
         self.ftp_port = ftp_port
         self.ftp_user = ftp_user
         self.ftp_pwd = ftp_pwd
+        self.buffer_size = buffer_size
+        self.retries = retries
+        self.ftp = None
 
     def ftp_connect(self,is_print=True):
+        # reuse the logged in control connection while the server still answers
+        if self.ftp is not None:
+            try:
+                self.ftp.voidcmd('NOOP')
+                return self.ftp
+            except Exception:
+                self.ftp_close()
         ftp = FTP()
         ftp.connect(host=self.ftp_ip, port=self.ftp_port)
         ftp.encoding = 'utf-8'
@@ -111,17 +211,37 @@ class FTP_OPS(object):
         except Exception as e:
             print(f"Error: {e}")
             return None
+        self.ftp = ftp
         return ftp
 
-    def upload_file(self, ftp: FTP, remotepath: str,localpath: str, file: str):
+    def ftp_close(self):
+        if self.ftp is not None:
+            try:
+                self.ftp.quit()
+            except Exception:
+                self.ftp.close()
+            self.ftp = None
+
+    def get_remote_file_size(self, ftp: FTP, file: str):
+        try:
+            return ftp.size(file) or 0
+        except error_perm:
+            return 0
+
+    def upload_file(self, ftp: FTP, remotepath: str,localpath: str, file: str, resume=False):
         flag = False
-        buffer_size = 10240 
         fp = open(os.path.join(localpath, file), 'rb')
         try:
             ftp.cwd(remotepath) 
             click.echo("found folder [{}] in ftp server, upload processing.".format(remotepath))
             ftp.voidcmd('TYPE I')
-            ftp.storbinary('STOR ' + file, fp, buffer_size)
+            rest = None
+            if resume:
+                remote_size = self.get_remote_file_size(ftp, file)
+                if 0 < remote_size < os.fstat(fp.fileno()).st_size:
+                    rest = remote_size
+                    fp.seek(rest)
+            ftp.storbinary('STOR ' + file, fp, self.buffer_size, rest=rest)
             ftp.set_debuglevel(0)
             click.echo("upload [{}] success".format(file))
             flag = True
@@ -139,7 +259,7 @@ class FTP_OPS(object):
         return {'file_name': file, 'flag': flag}
 
     def dowmload_log_file(self, ftp_file_path, dst_file_path,is_print=True):
-        buffer_size = 10240
+        buffer_size = self.buffer_size
         ftp = self.ftp_connect(is_print)
         ftp.voidcmd('TYPE I')
         remote_file_size = ftp.size(ftp_file_path)  
@@ -151,40 +271,50 @@ class FTP_OPS(object):
             # print('local file is bigger or equal remote file')
             return
         conn = ftp.transfercmd('RETR {0}'.format(ftp_file_path), lsize)
-        f = open(dst_file_path, "ab")
-        while True:
-            data = conn.recv(buffer_size)
-            if not data:
-                break
-            f.write(data)
+        with conn, open(dst_file_path, "ab") as f:
+            while True:
+                data = conn.recv(buffer_size)
+                if not data:
+                    break
+                f.write(data)
         # self.progressbar(local_file_size, total_size)
-        f.close()
+        ftp.voidresp()
         return remote_file_size
 
     def download_file(self, ftp_file_path, dst_file_path,is_print=True):
+        for retry in range(self.retries + 1):
+            try:
+                return self.download_file_once(ftp_file_path, dst_file_path, is_print)
+            except (socket.error, EOFError, error_temp) as e:
+                # continue from the local size with a new connection
+                self.ftp_close()
+                if retry == self.retries:
+                    raise
+                click.echo(f"\ndownload interrupted: {e}, resuming")
+
+    def download_file_once(self, ftp_file_path, dst_file_path,is_print=True):
         ftp = self.ftp_connect(is_print)
-        buffer_size = 10240  
+        buffer_size = self.buffer_size
         ftp.voidcmd('TYPE I')
         remote_file_size = ftp.size(ftp_file_path)  
 
-        cmpsize = 0  
         lsize = 0
         # check local file isn't exists and get the local file size
         if os.path.exists(dst_file_path):
             lsize = os.stat(dst_file_path).st_size
         if remote_file_size <= lsize:
             return
+        cmpsize = lsize
         conn = ftp.transfercmd('RETR {0}'.format(ftp_file_path), lsize)
-        f = open(dst_file_path, "ab")
-        while True:
-            data = conn.recv(buffer_size)
-            if not data:
-                break
-            f.write(data)
-            cmpsize += len(data)
-            self.progressbar(cmpsize, remote_file_size)
-        f.close()
-
+        with conn, open(dst_file_path, "ab") as f:
+            while True:
+                data = conn.recv(buffer_size)
+                if not data:
+                    break
+                f.write(data)
+                cmpsize += len(data)
+                self.progressbar(cmpsize, remote_file_size)
+        ftp.voidresp()
 
     def progressbar(self,cur, total):
         percent = '{:.2%}'.format([1 if cur / total >= 1 else cur / total][0])
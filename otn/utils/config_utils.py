@@ -1,5 +1,10 @@
+import atexit
 import click
+import json
+import os
+import threading
 import uuid
+from natsort import natsorted
 from otn.utils.db import *
 from otn.utils.utils import is_slot_present, log, get_linecard_slot_range, run_command
 
@@ -9,25 +14,73 @@ def set_slot_synchronized_save(slot_id,table_name,table_key,table_field,value):
     else:
         set_slot_configuration_sync(slot_id,table_name,table_key,table_field,value)    
 
+def set_slot_synchronized_save_multi(slot_id, configurations):
+    """
+    Multi-module variant of set_slot_synchronized_save.
+
+    Args:
+        configurations: list of (table_name, table_key, table_field, value)
+    Returns:
+        list of (err, msg), one per configuration
+    """
+    if not is_slot_present(slot_id):
+        set_db_tables_fields_batch(slot_id, DB_CONFIG_IDX, [(table_name, table_key, [(table_field, value)])
+                                   for table_name, table_key, table_field, value in configurations])
+        config_save(slot_id, [table_name for table_name, _, _, _ in configurations])
+        return [(0, '')] * len(configurations)
+    return set_slot_configurations_sync(slot_id, configurations)
+
+def set_slot_synchronized_save_modules(slot_id, table_name, table_keys, table_field, value):
+    """
+    Configure the same field of several modules, the backing of the 'all' commands.
+    """
+    configurations = [(table_name, table_key, table_field, value) for table_key in table_keys]
+    for table_key, (err, _) in zip(table_keys, set_slot_synchronized_save_multi(slot_id, configurations)):
+        if err == 0:
+            click.echo(f'{table_key}: Succeeded')
+
 def set_chassis_configuration_save(table_name,table_key,table_field,value):
     cfg_db = get_chassis_config_db()
     set_table_field(cfg_db, table_name,table_key,table_field,value)
-    config_save(0)
+    config_save(0, [table_name])
 
 def set_chassis_multi_configuration_save(table_name,table_key,field_value_touple_list):
     cfg_db = get_chassis_config_db()
     set_table_fields(cfg_db, table_name,table_key,field_value_touple_list)
-    config_save(0)
+    config_save(0, [table_name])
 
 def delete_chassis_configuration_save(table_name,table_key):
     cfg_db = get_chassis_config_db()
     del_table_key(cfg_db, table_name,table_key)
-    config_save(0)
+    config_save(0, [table_name])
      
 def set_slot_configuration_save(slot_id,table_name,table_key,table_field,value):
     cfg_db = get_config_db_by_slot(slot_id)
     set_table_field(cfg_db, table_name,table_key,table_field,value)
-    config_save(slot_id)
+    config_save(slot_id, [table_name])
+
+def set_slot_table_fields(slot_id, table_name, table_key, field_value_touple_list, wait=False):
+    """
+    In-process replacement of a run of run_OLSS_utils_set calls: all fields of
+    the key are written with a single HMSET on the slot config DB.
+
+    Args:
+        wait: also write an operation-id and wait for the linecard response on
+              the channel of the last field, the one that triggers the action
+    Returns:
+        (err, msg)
+    """
+    cfg_db = get_config_db_by_slot(slot_id)
+    field_value_touple_list = [(field, str(value)) for field, value in field_value_touple_list]
+    if not wait:
+        set_table_fields(cfg_db, table_name,table_key,field_value_touple_list)
+        return 0, ''
+
+    uuid_value = str(uuid.uuid1())
+    response_channel = field_value_touple_list[-1][0] + "-" + uuid_value
+    db_pubsub = subscribe_channels(cfg_db, [response_channel])
+    set_table_fields(cfg_db, table_name,table_key,field_value_touple_list + [('operation-id', uuid_value)])
+    return wait_channels(db_pubsub, [response_channel], CONFIG_TIMEOUT)[response_channel]
 
 def set_slot_configuration_sync(slot_id,table_name,table_key,table_field,value):
     cfg_db = get_config_db_by_slot(slot_id)
@@ -35,29 +88,174 @@ def set_slot_configuration_sync(slot_id,table_name,table_key,table_field,value):
     uuid_value = str(uuid.uuid1())
     old_value = get_db_table_field(cfg_db, table_name,table_key,table_field)
     
+    response_channel = table_field + "-" + uuid_value
+    db_pubsub = subscribe_channels(cfg_db, [response_channel])
+    
     field_value_touple_list = [(table_field, str(value)), ('operation-id', uuid_value)]
     set_table_fields(cfg_db, table_name,table_key,field_value_touple_list)
     
-    response_channel = table_field + "-" + uuid_value
-    err, msg = subscribe_channel(cfg_db,response_channel,CONFIG_TIMEOUT)
+    err, msg = subscribe_channel(cfg_db,response_channel,CONFIG_TIMEOUT,db_pubsub)
     if err != 0:
         print(f"Failed, error msg: {msg}")
         log.log_info(f"Failed, error msg: {msg}, table_name: {table_name}, table_field: {table_field}, table_key: {table_key}, uuid: {uuid_value}, value: {value}")
-        rollback_configuration(slot_id,table_name,table_key,table_field, old_value)
+        rollback_configuration(cfg_db,table_name,table_key,table_field, old_value)
     else:
-        config_save(slot_id)
+        config_save(slot_id, [table_name])
         log.log_info(f"Succeeded, error msg: {msg}, table_name: {table_name}, table_field: {table_field}, table_key: {table_key}, uuid: {uuid_value}, value: {value}")
 
+def set_slot_configurations_sync(slot_id, configurations):
+    """
+    Apply several synchronized configurations of one slot as one transaction:
+    the old values are read and the new ones written with one pipelined batch
+    each, every configuration with its own operation-id. All the responses are
+    awaited on a single subscription, only the configurations that failed are
+    rolled back and the slot config is persisted once.
+
+    Args:
+        configurations: list of (table_name, table_key, table_field, value)
+    Returns:
+        list of (err, msg), one per configuration
+    """
+    old_fields = get_db_tables_fields_batch(slot_id, DB_CONFIG_IDX, [(table_name, table_key)
+                                            for table_name, table_key, _, _ in configurations])
+    pendings = []
+    for (table_name, table_key, table_field, value), fields in zip(configurations, old_fields):
+        uuid_value = str(uuid.uuid1())
+        pendings.append((table_field + "-" + uuid_value, uuid_value, fields.get(table_field, NA_VALUE)))
+    
+    cfg_db = get_config_db_by_slot(slot_id)
+    db_pubsub = subscribe_channels(cfg_db, [channel for channel, _, _ in pendings])
+    set_db_tables_fields_batch(slot_id, DB_CONFIG_IDX,
+                               [(table_name, table_key, [(table_field, value), ('operation-id', uuid_value)])
+                                for (table_name, table_key, table_field, value), (_, uuid_value, _)
+                                in zip(configurations, pendings)])
+    
+    responses = wait_channels(db_pubsub, [channel for channel, _, _ in pendings], CONFIG_TIMEOUT)
+    results = []
+    rollbacks = []
+    for (table_name, table_key, table_field, value), (channel, uuid_value, old_value) in zip(configurations, pendings):
+        err, msg = responses[channel]
+        if err != 0:
+            print(f"{table_key}: Failed, error msg: {msg}")
+            log.log_info(f"Failed, error msg: {msg}, table_name: {table_name}, table_field: {table_field}, "
+                         f"table_key: {table_key}, uuid: {uuid_value}, value: {value}")
+            rollbacks.append((table_name, table_key, table_field, old_value))
+        else:
+            log.log_info(f"Succeeded, error msg: {msg}, table_name: {table_name}, table_field: {table_field}, "
+                         f"table_key: {table_key}, uuid: {uuid_value}, value: {value}")
+        results.append((err, msg))
+    rollback_configurations(slot_id, rollbacks)
+    if any(err == 0 for err, _ in results):
+        config_save(slot_id, [table_name for table_name, _, _, _ in configurations])
+    return results
+
+def rollback_configurations(slot_id, rollbacks):
+    """
+    Args:
+        rollbacks: list of (table_name, table_key, table_field, old_value)
+    """
+    restores = [(table_name, table_key, [(table_field, old_value)])
+                for table_name, table_key, table_field, old_value in rollbacks if old_value != NA_VALUE]
+    deletes = [(table_name, table_key, table_field)
+               for table_name, table_key, table_field, old_value in rollbacks if old_value == NA_VALUE]
+    if restores:
+        set_db_tables_fields_batch(slot_id, DB_CONFIG_IDX, restores)
+    if deletes:
+        del_db_tables_fields_batch(slot_id, DB_CONFIG_IDX, deletes)
+
 def rollback_configuration(db,table_name,table_key,table_field, old_value):
     if old_value == NA_VALUE:
         del_table_field(db,table_name,table_key,table_field)
     else:
         set_table_field(db, table_name,table_key,table_field,old_value)
   
-def config_save(slot_id = 0):
-    SLOTS_DEFAULT_CONFIG_DB_FILE = '/etc/sonic/config_db{}.json'
-    HOST_DEFAULT_CONFIG_DB_FILE = '/etc/sonic/config_db.json'
-    SONIC_CFGGEN_PATH = '/usr/local/bin/sonic-cfggen'
+SLOTS_DEFAULT_CONFIG_DB_FILE = '/etc/sonic/config_db{}.json'
+HOST_DEFAULT_CONFIG_DB_FILE = '/etc/sonic/config_db.json'
+SONIC_CFGGEN_PATH = '/usr/local/bin/sonic-cfggen'
+
+class ConfigSaver(object):
+    """
+    Coalesce the config_save requests of a CLI invocation.
+
+    A request only marks the namespace of the slot dirty, together with the
+    tables that were written. Everything is persisted once when the process
+    exits. A namespace whose tables are known gets only those tables patched
+    in its saved config_db json, otherwise it is dumped again by sonic-cfggen.
+    """
+    def __init__(self):
+        self.dirty = {}  # slot_id -> set of table names, None to dump the whole DB
+        self.lock = threading.Lock()
+
+    def mark_dirty(self, slot_id, table_names=None):
+        with self.lock:
+            if table_names is None:
+                self.dirty[slot_id] = None
+            elif slot_id not in self.dirty:
+                self.dirty[slot_id] = set(table_names)
+            elif self.dirty[slot_id] is not None:
+                self.dirty[slot_id].update(table_names)
+
+    def flush(self):
+        with self.lock:
+            dirty, self.dirty = self.dirty, {}
+        for slot_id, table_names in dirty.items():
+            save_config_db(slot_id, table_names)
+
+config_saver = ConfigSaver()
+atexit.register(config_saver.flush)
+
+def config_save(slot_id = 0, table_names = None):
+    config_saver.mark_dirty(slot_id, table_names)
+
+def get_config_db_file(slot_id):
+    if slot_id in get_linecard_slot_range():
+        return SLOTS_DEFAULT_CONFIG_DB_FILE.format(slot_id - 1)
+    return HOST_DEFAULT_CONFIG_DB_FILE
+
+def get_config_db_table_data(slot_id, table_name):
+    """
+    A CONFIG_DB table in the sonic-cfggen --print-data layout.
+    """
+    table_data = {}
+    for table_key, fields in get_db_table_all_fields_batch(slot_id, DB_CONFIG_IDX, table_name).items():
+        entry = {}
+        for field, value in fields.items():
+            if field == 'NULL':
+                continue
+            if field.endswith('@'):
+                entry[field[:-1]] = value.split(',')
+            else:
+                entry[field] = value
+        table_data[table_key] = entry
+    return {table_key: table_data[table_key] for table_key in natsorted(table_data)}
+
+def patch_config_db_file(slot_id, file_name, table_names):
+    with open(file_name) as f:
+        config_data = json.load(f)
+    for table_name in table_names:
+        table_data = get_config_db_table_data(slot_id, table_name)
+        if table_data:
+            config_data[table_name] = table_data
+        else:
+            config_data.pop(table_name, None)
+    config_data = {table_name: config_data[table_name] for table_name in natsorted(config_data)}
+
+    tmp_file_name = f'{file_name}.tmp'
+    with open(tmp_file_name, 'w') as f:
+        json.dump(config_data, f, indent=4)
+    os.replace(tmp_file_name, file_name)
+
+def save_config_db(slot_id, table_names=None):
+    file_name = get_config_db_file(slot_id)
+    if table_names is not None and os.path.exists(file_name):
+        try:
+            patch_config_db_file(slot_id, file_name, table_names)
+            return
+        except Exception as e:
+            log.log_info(f"Patch {file_name} failed: {e}, dump the whole config db")
+    dump_config_db(slot_id)
+
+def dump_config_db(slot_id = 0):
     try:
         if slot_id in get_linecard_slot_range():
             db_id = slot_id - 1
@@ -67,5 +265,3 @@ def config_save(slot_id = 0):
         run_command(command)
     except Exception as e:
         click.echo(e)
-        
-
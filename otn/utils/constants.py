@@ -9,6 +9,9 @@ DB_HISTORY_IDX = 10
 CARD_TYPE_NONE = "NONE"
 FLUSH_DB_IDX_LIST = [DB_APP_IDX, DB_ASIC_IDX, DB_COUNTER_IDX, DB_CONFIG_IDX, DB_FLEX_COUNTER_IDX, DB_HISTORY_IDX]
 
+DB_HEALTH_CHECK_INTERVAL = 30  #idle seconds before a pooled db connection is checked again
+DB_HEALTH_CHECK_KEY = "CONFIG_DB_INITIALIZED"
+
 CONFIG_ERROR = 255
 CONFIG_TIMEOUT = 120  #configuration timeout in seconds
 
@@ -25,6 +28,11 @@ NA = 'N/A'
 CURALARM = 'CURALARM'
 HISALARM = 'HISALARM'
 HISEVENT = 'HISEVENT'
+ALARM_COLLECT_WORKERS = 8  #max slots whose alarms are read concurrently
+HISALARM_TIME_INDEX = 'HISALARM_TIME_INDEX'  #sorted set of HISALARM keys scored by time-created in ms
+HISALARM_TIME_INDEX_HEARTBEAT = 'HISALARM_TIME_INDEX_HEARTBEAT'  #set by the indexer while the index is in sync
+HISALARM_TIME_INDEX_HEARTBEAT_TIMEOUT = 10  #seconds
+ALARM_HISTORY_PAGE_SIZE = 100
 OBX1100E_LINECARDS = ['P230C', 'E120C', 'E110C', 'E100C']
 LINECARD_IP_PREFIX = '117.103.88.'
 CU_IP_INTERNAL = '117.103.88.243'
@@ -41,4 +49,17 @@ COMMIT_PAUSE    =    "COMMIT_PAUSE"
 ROLLBACKING     =    "ROLLBACKING"
 COMMIT_ERROR    =    "COMMIT_ERROR"
 REBOOT_ERROR    =    "REBOOT_ERROR"
-COMMIT_STOP     =    "COMMIT_STOP"
\ No newline at end of file
+COMMIT_STOP     =    "COMMIT_STOP"
+UPGRADE_PARALLEL = 4  #slots upgraded at the same time by chassis upgrade-all
+UPGRADE_STAGE_TIMEOUT = 1800  #seconds allowed for one upgrade stage of a slot
+UPGRADE_STATE_REFRESH_INTERVAL = 5  #re-read the upgrade state even without keyspace event
+UPGRADE_STATE_POLL_INTERVAL = 0.2  #re-read the upgrade state when the redis publishes no keyspace event
+
+OCM_CHANNEL_THRESHOLD = -30.0  #dBm, a spectrum slice from this power carries a channel
+
+OTDR_SCAN_CACHE_DIR = '/var/cache/otn/otdr'
+OTDR_DIFF_BIN_SIZE = 0.1  #km, events of two scans within the same bin are compared
+OTDR_DIFF_LOSS_THRESHOLD = 0.1  #dB, smaller loss changes are not reported
+
+WATCH_MIN_INTERVAL = 0.2  #seconds, default minimum interval between two refreshes of a --watch display
+WATCH_POLL_INTERVAL = 2  #seconds, --watch re-reads every key when keyspace notifications are disabled
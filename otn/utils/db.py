@@ -1,15 +1,83 @@
 import time
+import threading
+import redis
 
 from swsscommon import swsscommon
 from .constants import *
 
-def connect_muti_db_common(slot_id, db_id):
+def get_redis_unix_socket_path(slot_id):
     slot_idx = int(slot_id)
     if slot_idx == 0:
-        redis_unix_socket_path = "/var/run/redis/redis.sock"
+        return "/var/run/redis/redis.sock"
     else:
-        redis_unix_socket_path = f"/var/run/redis{slot_idx - 1}/redis.sock"
-    return swsscommon.DBConnector(db_id, redis_unix_socket_path, 0)
+        return f"/var/run/redis{slot_idx - 1}/redis.sock"
+
+def connect_muti_db_common(slot_id, db_id):
+    return swsscommon.DBConnector(db_id, get_redis_unix_socket_path(slot_id), 0)
+
+def connect_muti_db_redis(slot_id, db_id):
+    # swsscommon has no pipelined read API, batch reads go through redis-py on the same socket
+    return redis.Redis(unix_socket_path=get_redis_unix_socket_path(slot_id), db=db_id, decode_responses=True,
+                       health_check_interval=DB_HEALTH_CHECK_INTERVAL)
+
+class DBConnectorPool(object):
+    """
+    Process-wide cache of the slot database connections, keyed by (slot, db index).
+
+    Connections are created on first use. A cached swsscommon connector that has
+    been idle longer than DB_HEALTH_CHECK_INTERVAL is pinged before it is handed
+    out again and is re-created if the linecard redis went away meanwhile.
+    """
+    def __init__(self):
+        self.connectors = {}
+        self.redis_clients = {}
+        self.lock = threading.Lock()
+
+    def get_connector(self, slot_id, db_id):
+        key = (int(slot_id), db_id)
+        now = time.monotonic()
+        with self.lock:
+            entry = self.connectors.get(key)
+            if entry is not None:
+                db, last_used = entry
+                if now - last_used < DB_HEALTH_CHECK_INTERVAL or self.is_alive(db):
+                    self.connectors[key] = (db, now)
+                    return db
+            db = connect_muti_db_common(slot_id, db_id)
+            self.connectors[key] = (db, now)
+            return db
+
+    def get_redis_client(self, slot_id, db_id):
+        key = (int(slot_id), db_id)
+        with self.lock:
+            client = self.redis_clients.get(key)
+            if client is None:
+                # redis-py reconnects by itself, see health_check_interval
+                client = connect_muti_db_redis(slot_id, db_id)
+                self.redis_clients[key] = client
+            return client
+
+    def is_alive(self, db):
+        try:
+            db.exists(DB_HEALTH_CHECK_KEY)
+            return True
+        except Exception:
+            return False
+
+    def clear(self):
+        with self.lock:
+            self.connectors.clear()
+            for client in self.redis_clients.values():
+                client.close()
+            self.redis_clients.clear()
+
+db_connector_pool = DBConnectorPool()
+
+def get_db_by_slot(slot_id, db_id):
+    return db_connector_pool.get_connector(slot_id, db_id)
+
+def get_redis_client_by_slot(slot_id, db_id):
+    return db_connector_pool.get_redis_client(slot_id, db_id)
 
 def set_table_field(db,table_name,table_key,field,value):
     table = swsscommon.Table(db, table_name)
@@ -64,6 +132,74 @@ def get_db_table_fields(db, table_name, table_key):
     
     return rdict(data)
 
+def get_db_table_separator(slot_id, db_id, table_name):
+    return swsscommon.Table(get_db_by_slot(slot_id, db_id), table_name).getTableNameSeparator()
+
+def get_db_tables_fields_batch(slot_id, db_id, table_keys):
+    """
+    Read many hashes of a slot database in one pipelined HGETALL round trip.
+
+    Args:
+        table_keys: list of (table_name, table_key) tuples
+    Returns:
+        list of rdict, in the same order as table_keys
+    """
+    if not table_keys:
+        return []
+    separators = {}
+    pipe = get_redis_client_by_slot(slot_id, db_id).pipeline(transaction=False)
+    for table_name, table_key in table_keys:
+        if table_name not in separators:
+            separators[table_name] = get_db_table_separator(slot_id, db_id, table_name)
+        pipe.hgetall(f'{table_name}{separators[table_name]}{table_key}')
+    return [rdict(data) for data in pipe.execute()]
+
+def get_db_table_all_fields_batch(slot_id, db_id, table_name, key_pattern='*'):
+    """
+    Read every hash of a table matching key_pattern: one KEYS call followed
+    by one pipelined HGETALL round trip.
+
+    Returns:
+        dict of table_key -> rdict
+    """
+    separator = get_db_table_separator(slot_id, db_id, table_name)
+    prefix = f'{table_name}{separator}'
+    client = get_redis_client_by_slot(slot_id, db_id)
+    table_keys = [key[len(prefix):] for key in client.keys(f'{prefix}{key_pattern}')]
+    fields_list = get_db_tables_fields_batch(slot_id, db_id, [(table_name, table_key) for table_key in table_keys])
+    return dict(zip(table_keys, fields_list))
+
+def set_db_tables_fields_batch(slot_id, db_id, table_entries):
+    """
+    Write several hashes with a single pipelined round trip.
+
+    Args:
+        table_entries: list of (table_name, table_key, field_value_touple_list)
+    """
+    separators = {}
+    pipe = get_redis_client_by_slot(slot_id, db_id).pipeline(transaction=False)
+    for table_name, table_key, field_value_touple_list in table_entries:
+        if table_name not in separators:
+            separators[table_name] = get_db_table_separator(slot_id, db_id, table_name)
+        pipe.hset(f'{table_name}{separators[table_name]}{table_key}',
+                  mapping={field: str(value) for field, value in field_value_touple_list})
+    pipe.execute()
+
+def del_db_tables_fields_batch(slot_id, db_id, table_fields):
+    """
+    Delete several hash fields with a single pipelined round trip.
+
+    Args:
+        table_fields: list of (table_name, table_key, field)
+    """
+    separators = {}
+    pipe = get_redis_client_by_slot(slot_id, db_id).pipeline(transaction=False)
+    for table_name, table_key, field in table_fields:
+        if table_name not in separators:
+            separators[table_name] = get_db_table_separator(slot_id, db_id, table_name)
+        pipe.hdel(f'{table_name}{separators[table_name]}{table_key}', field)
+    pipe.execute()
+
 def get_db_table_keys(db, table_name):
     table = swsscommon.Table(db, table_name)
     return table.getKeys()
@@ -72,16 +208,16 @@ def get_db_keys(db, pattern):
     return db.keys(pattern)
 
 def get_state_db_by_slot(slot_id):
-    return connect_muti_db_common(slot_id,DB_STATE_IDX) 
+    return get_db_by_slot(slot_id, DB_STATE_IDX)
 
 def get_counter_db_by_slot(slot_id):
-    return connect_muti_db_common(slot_id, DB_COUNTER_IDX) 
+    return get_db_by_slot(slot_id, DB_COUNTER_IDX)
 
 def get_config_db_by_slot(slot_id):
-    return connect_muti_db_common(slot_id, DB_CONFIG_IDX) 
+    return get_db_by_slot(slot_id, DB_CONFIG_IDX)
 
 def get_history_db_by_slot(slot_id):
-    return connect_muti_db_common(slot_id, DB_HISTORY_IDX) 
+    return get_db_by_slot(slot_id, DB_HISTORY_IDX)
 
 def get_chassis_state_db():
     return get_state_db_by_slot(0) 
@@ -95,19 +231,46 @@ def get_chassis_config_db():
 def get_chassis_history_db():
     return get_history_db_by_slot(0) 
 
-def subscribe_channel(db, channel, timeout):
+def get_config_response(data):
+    if "Failed" in data:
+        return CONFIG_ERROR, int(data.split(",")[0][2:-1])
+    return 0, ''
+
+def subscribe_channels(db, channels):
+    """
+    Subscribe to the response channels of pending configurations. Subscribe
+    before writing the configuration so that a fast response is not missed.
+    """
     db_pubsub = db.pubsub()
-    db_pubsub.psubscribe(channel)
-    idle = 0
-    while True and idle < timeout:
-        message = db_pubsub.get_message()
-        if message:
-            if "Failed" in message['data']:
-                err_msg = int(message['data'].split(",")[0][2:-1])
-                return CONFIG_ERROR,err_msg
-            else:
-                return 0, ''
-        else:
-            time.sleep(1)
-            idle += 1
-    return CONFIG_ERROR, "Configuration timeout!"
\ No newline at end of file
+    for channel in channels:
+        db_pubsub.psubscribe(channel)
+    return db_pubsub
+
+def wait_channels(db_pubsub, channels, timeout):
+    """
+    Block on the pubsub socket until every channel got its response or the
+    timeout expires, whichever comes first.
+
+    Returns:
+        dict of channel -> (err, msg), channels without response are reported as timeout
+    """
+    pending = set(channels)
+    responses = {}
+    deadline = time.monotonic() + timeout
+    while pending:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        message = db_pubsub.get_message(remaining)
+        if not message or message.get('channel') not in pending:
+            continue
+        pending.discard(message['channel'])
+        responses[message['channel']] = get_config_response(message['data'])
+    for channel in pending:
+        responses[channel] = (CONFIG_ERROR, "Configuration timeout!")
+    return responses
+
+def subscribe_channel(db, channel, timeout, db_pubsub=None):
+    if db_pubsub is None:
+        db_pubsub = subscribe_channels(db, [channel])
+    return wait_channels(db_pubsub, [channel], timeout)[channel]
@@ -1,42 +1,54 @@
+import click
+import csv
+import functools
+import json
 import time
 import sys
 from otn.utils.db import *
 from otn.utils.pm import *
 from tabulate import tabulate
 
+class PmSnapshot(object):
+    """
+    PM bins of one command, all derived from a single reference time so that
+    every entity shown by the command uses the same bins. The formatted bin
+    times are computed once.
+    """
+    def __init__(self, pm_type, now=None):
+        self.pm_type = pm_type
+        self.cycle = PM_CYCLE_24H if pm_type == '24' else PM_CYCLE_15M
+        self.now = time.time() if now is None else now
+        self.current_stamp = int(self.now * 1000 // self.cycle) * self.cycle
+        self.time_strs = {}
+
+    def format_time(self, stamp):
+        """
+        Args:
+            stamp: time in ms
+        """
+        if stamp not in self.time_strs:
+            self.time_strs[stamp] = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(stamp / 1000))
+        return self.time_strs[stamp]
+
+    def bin_start_stamp(self, bin_idx):
+        return self.current_stamp - bin_idx * self.cycle
+
+    def history_stamp(self, bin_idx):
+        return str(self.bin_start_stamp(bin_idx)) + "000000"
+
+    def start_end_time(self, bin_idx=0):
+        start_stamp = self.bin_start_stamp(bin_idx)
+        end_stamp = start_stamp + self.cycle if bin_idx > 0 else self.now * 1000
+        return self.format_time(start_stamp), self.format_time(end_stamp)
+
 def get_15m_start_end_time(bin_idx=0):
-    current_stamp = (time.time()*1000 // PM_CYCLE_15M) * PM_CYCLE_15M
-    start_stamp = current_stamp - bin_idx * PM_CYCLE_15M
-    starttime = time.strftime(time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(start_stamp / 1000)))
-    if (bin_idx > 0):
-        endtime = start_stamp + PM_CYCLE_15M
-        endtime = time.strftime(time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(endtime / 1000)))
-        return starttime, endtime
-    else:
-        endtime = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(time.time()))
-        return starttime, endtime
+    return PmSnapshot('15').start_end_time(bin_idx)
 
 def get_24h_start_end_time(bin_idx=0):
-    current_stamp = (time.time()*1000 // PM_CYCLE_24H) * PM_CYCLE_24H
-    start_stamp = current_stamp - bin_idx * PM_CYCLE_24H
-    starttime = time.strftime(time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(start_stamp / 1000)))
-    if (bin_idx > 0):
-        endtime = start_stamp + PM_CYCLE_24H
-        endtime = time.strftime(time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(endtime / 1000)))
-        return starttime, endtime
-    else:
-        endtime = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(time.time()))
-        return starttime, endtime
+    return PmSnapshot('24').start_end_time(bin_idx)
 
 def get_pm_history_bin_start_time(pm_type, bin_idx):
-    if(pm_type == '24'):
-        current_stamp = (time.time()*1000 // PM_CYCLE_24H) * PM_CYCLE_24H
-        start_stamp = current_stamp - bin_idx * PM_CYCLE_24H
-        return str(int(start_stamp)) + "000000"
-    else:
-        current_stamp = (time.time()*1000 // PM_CYCLE_15M) * PM_CYCLE_15M
-        start_stamp = current_stamp - bin_idx * PM_CYCLE_15M
-        return str(int(start_stamp)) + "000000"
+    return PmSnapshot(pm_type).history_stamp(bin_idx)
 
 def format_timestamp(time_value):
     if time_value != "NA":
@@ -46,159 +58,373 @@ def format_timestamp(time_value):
     else:
         return time_value
     
-def show_entity_pm_current_head(entity_name, pm_type):
-    if(pm_type == '24'):
-        start_time, end_time = get_24h_start_end_time()
-    else:
-        start_time, end_time = get_15m_start_end_time()
-        
+def show_entity_pm_current_head(entity_name, pm_type, snapshot=None):
+    snapshot = snapshot or PmSnapshot(pm_type)
+    start_time, end_time = snapshot.start_end_time()
+
     print(f"     Name: {entity_name}")
     print(f"StartTime: {start_time}")
     print(f"  EndTime: {end_time}")
 
-def show_entity_pm_history_head(entity_name, pm_type, bin_idx):
-    if(pm_type == '24'):
-        start_time, end_time = get_24h_start_end_time(bin_idx)
-    else:
-        start_time, end_time = get_15m_start_end_time(bin_idx)
-        
+def show_entity_pm_history_head(entity_name, pm_type, bin_idx, snapshot=None):
+    snapshot = snapshot or PmSnapshot(pm_type)
+    start_time, end_time = snapshot.start_end_time(bin_idx)
+
     print(f"     Name: {entity_name}")
     print(f"StartTime: {start_time}")
     print(f"  EndTime: {end_time}")
-        
-def show_module_pm_current_head(slot_id, module_id, table_name, pm_type):
+
+def show_module_pm_current_head(slot_id, module_id, table_name, pm_type, snapshot=None):
     entity_name = f"{table_name}-1-{slot_id}-{module_id}"
-    show_entity_pm_current_head(entity_name, pm_type)
+    show_entity_pm_current_head(entity_name, pm_type, snapshot)
 
-def show_module_pm_current_head_with_entity(entity_name, pm_type):
-    show_entity_pm_current_head(entity_name, pm_type)
+def show_module_pm_current_head_with_entity(entity_name, pm_type, snapshot=None):
+    show_entity_pm_current_head(entity_name, pm_type, snapshot)
 
-def show_module_pm_history_head(slot_id, module_id, table_name, pm_type, bin_idx):
+def show_module_pm_history_head(slot_id, module_id, table_name, pm_type, bin_idx, snapshot=None):
     entity_name = f"{table_name}-1-{slot_id}-{module_id}"
-    show_entity_pm_history_head(entity_name, pm_type, bin_idx)
+    show_entity_pm_history_head(entity_name, pm_type, bin_idx, snapshot)
 
-def show_module_pm_history_head_with_entity(entity_name, pm_type, bin_idx):
-    show_entity_pm_history_head(entity_name, pm_type, bin_idx)
-    
-def show_module_pm_current(slot_id, module_id, pm_list, table_name, pm_type): 
-    pm_header = ['Name','Instant','Avg','Min','Max','Min-time','Max-time','Valid']
-    pm_table = []
-    db = get_counter_db_by_slot(slot_id)
-    for field in pm_list:
-        table_key = f"{table_name}-1-{slot_id}-{module_id}_{field['Field']}:{pm_type}_pm_current"
-        pm = get_db_table_fields(db, table_name, table_key)
-        key = field['show_name']
-        pm_table.append([key, pm['instant'],pm['avg'],pm['min'],pm['max'], format_timestamp(pm['min-time']), format_timestamp(pm['max-time']),pm['validity']])
-    print(tabulate(pm_table, pm_header, numalign="left")+"\n")
-
-def show_module_pm_history(slot_id, module_id, pm_list, table_name, pm_type, bin_idx): 
-    pm_header = ['Name','Instant','Avg','Min','Max','Min-time','Max-time','Valid']
-    pm_table = []
-    history_stamp = get_pm_history_bin_start_time(pm_type, bin_idx)
-    db = get_history_db_by_slot(slot_id)
+def show_module_pm_history_head_with_entity(entity_name, pm_type, bin_idx, snapshot=None):
+    show_entity_pm_history_head(entity_name, pm_type, bin_idx, snapshot)
+
+PM_HEADER = ['Name','Instant','Avg','Min','Max','Min-time','Max-time','Valid']
+
+def get_pm_current_table_key(entity_name, pm_field, pm_type):
+    return f"{entity_name}_{pm_field}:{pm_type}_pm_current"
+
+def get_pm_history_table_key(entity_name, pm_field, pm_type, history_stamp):
+    return f"{entity_name}_{pm_field}:{pm_type}_pm_history_{history_stamp}"
+
+def get_pm_table_row(show_name, pm):
+    return [show_name, pm['instant'],pm['avg'],pm['min'],pm['max'], format_timestamp(pm['min-time']),
+            format_timestamp(pm['max-time']),pm['validity']]
+
+def get_pm_counter_table_row(show_name, value):
+    return [show_name, value] + [NA_VALUE] * (len(PM_HEADER) - 2)
+
+def get_pm_tables(slot_id, db_id, pm_requests_list):
+    """
+    Fetch the PM of several tables with a single pipelined batch on one DB.
+
+    Args:
+        pm_requests_list: list of per table requests, each one is a list of
+                          (show_name, table_name, table_key) tuples. A request
+                          with table_name None is rendered as a label row, a
+                          (show_name, table_name, table_key, field) request as
+                          the field of a PM counter table in the Instant column.
+    Returns:
+        list of PM tables, one per request list
+    """
+    # The fields of a PM counter table share one hash
+    table_keys = list(dict.fromkeys(request[1:3] for pm_requests in pm_requests_list
+                                    for request in pm_requests if request[1] is not None))
+    pms = dict(zip(table_keys, get_db_tables_fields_batch(slot_id, db_id, table_keys)))
+    pm_tables = []
+    for pm_requests in pm_requests_list:
+        pm_table = []
+        for request in pm_requests:
+            show_name, table_name, table_key = request[:3]
+            if table_name is None:
+                pm_table.append([show_name])
+            elif len(request) > 3:
+                pm_table.append(get_pm_counter_table_row(show_name, pms[(table_name, table_key)][request[3]]))
+            else:
+                pm_table.append(get_pm_table_row(show_name, pms[(table_name, table_key)]))
+        pm_tables.append(pm_table)
+    return pm_tables
+
+def get_entity_pm_requests(entity_name, pm_list, table_name, pm_type, history_stamp=None):
+    pm_requests = []
     for field in pm_list:
-        table_key = f"{table_name}-1-{slot_id}-{module_id}_{field['Field']}:{pm_type}_pm_history_{history_stamp}"
-        pm = get_db_table_fields(db, table_name, table_key)
-        key = field['show_name']
-        pm_table.append([key, pm['instant'],pm['avg'],pm['min'],pm['max'], format_timestamp(pm['min-time']), format_timestamp(pm['max-time']),pm['validity']])
-    print(tabulate(pm_table, pm_header, numalign="left")+"\n")
+        if history_stamp is None:
+            table_key = get_pm_current_table_key(entity_name, field['Field'], pm_type)
+        else:
+            table_key = get_pm_history_table_key(entity_name, field['Field'], pm_type, history_stamp)
+        pm_requests.append((field['show_name'], table_name, table_key))
+    return pm_requests
+
+def get_counter_pm_requests(pm_list, table_keys):
+    """
+    Requests of the fields of pm_list held by PM counter tables, the fields of
+    the tables missing from table_keys are skipped.
+
+    Args:
+        table_keys: dict of table name -> key of its PM counter table
+    """
+    return [(field['show_name'], field['Module'], table_keys[field['Module']], field['Field'])
+            for field in pm_list if field['Module'] in table_keys]
+
+def show_pm_table(pm_table):
+    print(tabulate(pm_table, PM_HEADER, numalign="left")+"\n")
+
+def show_entity_pm(slot_id, db_id, entity_name, pm_list, table_name, pm_type, history_stamp=None):
+    pm_requests = get_entity_pm_requests(entity_name, pm_list, table_name, pm_type, history_stamp)
+    pm_table, = get_pm_tables(slot_id, db_id, [pm_requests])
+    show_pm_table(pm_table)
+
+def show_module_pm_current(slot_id, module_id, pm_list, table_name, pm_type): 
+    entity_name = f"{table_name}-1-{slot_id}-{module_id}"
+    show_entity_pm(slot_id, DB_COUNTER_IDX, entity_name, pm_list, table_name, pm_type)
+
+def show_module_pm_history(slot_id, module_id, pm_list, table_name, pm_type, bin_idx, snapshot=None): 
+    entity_name = f"{table_name}-1-{slot_id}-{module_id}"
+    history_stamp = (snapshot or PmSnapshot(pm_type)).history_stamp(bin_idx)
+    show_entity_pm(slot_id, DB_HISTORY_IDX, entity_name, pm_list, table_name, pm_type, history_stamp)
+
+def show_slot_modules_pm_current(slot_id, module_ids, pm_list, table_name, pm_type):
+    snapshot = PmSnapshot(pm_type)
+    entity_names = [f"{table_name}-1-{slot_id}-{module_id}" for module_id in module_ids]
+    pm_requests_list = [get_entity_pm_requests(entity_name, pm_list, table_name, pm_type)
+                        for entity_name in entity_names]
+    pm_tables = get_pm_tables(slot_id, DB_COUNTER_IDX, pm_requests_list)
+    for entity_name, pm_table in zip(entity_names, pm_tables):
+        show_module_pm_current_head_with_entity(entity_name, pm_type, snapshot)
+        show_pm_table(pm_table)
+
+def show_slot_modules_pm_history(slot_id, module_ids, pm_list, table_name, pm_type, bin_idx):
+    snapshot = PmSnapshot(pm_type)
+    history_stamp = snapshot.history_stamp(bin_idx)
+    entity_names = [f"{table_name}-1-{slot_id}-{module_id}" for module_id in module_ids]
+    pm_requests_list = [get_entity_pm_requests(entity_name, pm_list, table_name, pm_type, history_stamp)
+                        for entity_name in entity_names]
+    pm_tables = get_pm_tables(slot_id, DB_HISTORY_IDX, pm_requests_list)
+    for entity_name, pm_table in zip(entity_names, pm_tables):
+        show_module_pm_history_head_with_entity(entity_name, pm_type, bin_idx, snapshot)
+        show_pm_table(pm_table)
 
-def show_slot_pm_current_head(slot_id, table_name, pm_type):
+def show_slot_pm_current_head(slot_id, table_name, pm_type, snapshot=None):
     entity_name = f"{table_name}-1-{slot_id}"
-    show_entity_pm_current_head(entity_name, pm_type)
+    show_entity_pm_current_head(entity_name, pm_type, snapshot)
 
-def show_slot_pm_history_head(slot_id, table_name, pm_type, bin_idx):
+def show_slot_pm_history_head(slot_id, table_name, pm_type, bin_idx, snapshot=None):
     entity_name = f"{table_name}-1-{slot_id}"
-    show_entity_pm_history_head(entity_name, pm_type, bin_idx)
+    show_entity_pm_history_head(entity_name, pm_type, bin_idx, snapshot)
 
 def show_slot_pm_current(slot_id, pm_list, table_name, pm_type): 
-    pm_header = ['Name','Instant','Avg','Min','Max','Min-time','Max-time','Valid']
-    pm_table = []
-    db = get_counter_db_by_slot(slot_id)
-    for field in pm_list:
-        table_key = f"{table_name}-1-{slot_id}_{field['Field']}:{pm_type}_pm_current"
-        pm = get_db_table_fields(db, table_name, table_key)
-        key = field['show_name']
-        pm_table.append([key, pm['instant'],pm['avg'],pm['min'],pm['max'], format_timestamp(pm['min-time']), format_timestamp(pm['max-time']),pm['validity']])
-    print(tabulate(pm_table, pm_header, numalign="left")+"\n")
-
-def show_slot_pm_history(slot_id, pm_list, table_name, pm_type, bin_idx): 
-    pm_header = ['Name','Instant','Avg','Min','Max','Min-time','Max-time','Valid']
-    pm_table = []
-    db = get_history_db_by_slot(slot_id)
-    history_stamp = get_pm_history_bin_start_time(pm_type, bin_idx)
-    for field in pm_list:
-        table_key = f"{table_name}-1-{slot_id}_{field['Field']}:{pm_type}_pm_history_{history_stamp}"
-        pm = get_db_table_fields(db, table_name, table_key)
-        key = field['show_name']
-        pm_table.append([key, pm['instant'],pm['avg'],pm['min'],pm['max'], format_timestamp(pm['min-time']), format_timestamp(pm['max-time']),pm['validity']])
-    print(tabulate(pm_table, pm_header, numalign="left")+"\n")
+    show_entity_pm(slot_id, DB_COUNTER_IDX, f"{table_name}-1-{slot_id}", pm_list, table_name, pm_type)
+
+def show_slot_pm_history(slot_id, pm_list, table_name, pm_type, bin_idx, snapshot=None): 
+    history_stamp = (snapshot or PmSnapshot(pm_type)).history_stamp(bin_idx)
+    show_entity_pm(slot_id, DB_HISTORY_IDX, f"{table_name}-1-{slot_id}", pm_list, table_name, pm_type, history_stamp)
     
 def show_chassis_pm_current(chassis_id, pm_list, table_name, pm_type): 
-    pm_header = ['Name','Instant','Avg','Min','Max','Min-time','Max-time','Valid']
-    pm_table = []
-    db = get_chassis_counter_db()
-    for field in pm_list:
-        table_key = f"{table_name}-{chassis_id}_{field['Field']}:{pm_type}_pm_current"
-        pm = get_db_table_fields(db, table_name, table_key)
-        key = field['show_name']
-        pm_table.append([key, pm['instant'],pm['avg'],pm['min'],pm['max'], format_timestamp(pm['min-time']), format_timestamp(pm['max-time']),pm['validity']])
-    print(tabulate(pm_table, pm_header, numalign="left")+"\n")
-
-def show_chassis_pm_history(chassis_id, pm_list, table_name, pm_type, bin_idx): 
-    pm_header = ['Name','Instant','Avg','Min','Max','Min-time','Max-time','Valid']
-    pm_table = []
-    db = get_chassis_history_db()
-    history_stamp = get_pm_history_bin_start_time(pm_type, bin_idx)
-    for field in pm_list:
-        table_key = f"{table_name}-{chassis_id}_{field['Field']}:{pm_type}_pm_history_{history_stamp}"
-        pm = get_db_table_fields(db, table_name, table_key)
-        key = field['show_name']
-        pm_table.append([key, pm['instant'],pm['avg'],pm['min'],pm['max'], format_timestamp(pm['min-time']), format_timestamp(pm['max-time']),pm['validity']])
-    print(tabulate(pm_table, pm_header, numalign="left")+"\n")
+    show_entity_pm(0, DB_COUNTER_IDX, f"{table_name}-{chassis_id}", pm_list, table_name, pm_type)
+
+def show_chassis_pm_history(chassis_id, pm_list, table_name, pm_type, bin_idx, snapshot=None): 
+    history_stamp = (snapshot or PmSnapshot(pm_type)).history_stamp(bin_idx)
+    show_entity_pm(0, DB_HISTORY_IDX, f"{table_name}-{chassis_id}", pm_list, table_name, pm_type, history_stamp)
     
 def show_fan_pm_current(fan_id, pm_list, table_name, pm_type): 
-    pm_header = ['Name','Instant','Avg','Min','Max','Min-time','Max-time','Valid']
-    pm_table = []
-    db = get_chassis_counter_db()
-    for field in pm_list:
-        table_key = f"{table_name}-1-{fan_id}_{field['Field']}:{pm_type}_pm_current"
-        pm = get_db_table_fields(db, table_name, table_key)
-        key = field['show_name']
-        pm_table.append([key, pm['instant'],pm['avg'],pm['min'],pm['max'], format_timestamp(pm['min-time']), format_timestamp(pm['max-time']),pm['validity']])
-    print(tabulate(pm_table, pm_header, numalign="left")+"\n")
-
-def show_fan_pm_history(fan_id, pm_list, table_name, pm_type, bin_idx): 
-    pm_header = ['Name','Instant','Avg','Min','Max','Min-time','Max-time','Valid']
-    pm_table = []
-    db = get_chassis_history_db()
-    history_stamp = get_pm_history_bin_start_time(pm_type, bin_idx)
-    for field in pm_list:
-        table_key = f"{table_name}-1-{fan_id}_{field['Field']}:{pm_type}_pm_history_{history_stamp}"
-        pm = get_db_table_fields(db, table_name, table_key)
-        key = field['show_name']
-        pm_table.append([key, pm['instant'],pm['avg'],pm['min'],pm['max'], format_timestamp(pm['min-time']), format_timestamp(pm['max-time']),pm['validity']])
-    print(tabulate(pm_table, pm_header, numalign="left")+"\n")
+    show_entity_pm(0, DB_COUNTER_IDX, f"{table_name}-1-{fan_id}", pm_list, table_name, pm_type)
+
+def show_fan_pm_history(fan_id, pm_list, table_name, pm_type, bin_idx, snapshot=None): 
+    history_stamp = (snapshot or PmSnapshot(pm_type)).history_stamp(bin_idx)
+    show_entity_pm(0, DB_HISTORY_IDX, f"{table_name}-1-{fan_id}", pm_list, table_name, pm_type, history_stamp)
 
 def show_psu_pm_current(psu_id, pm_list, table_name, pm_type): 
-    pm_header = ['Name','Instant','Avg','Min','Max','Min-time','Max-time','Valid']
-    pm_table = []
-    db = get_chassis_counter_db()
-    for field in pm_list:
-        table_key = f"{table_name}-1-{psu_id}_{field['Field']}:{pm_type}_pm_current"
-        pm = get_db_table_fields(db, table_name, table_key)
-        key = field['show_name']
-        pm_table.append([key, pm['instant'],pm['avg'],pm['min'],pm['max'], format_timestamp(pm['min-time']), format_timestamp(pm['max-time']),pm['validity']])
-    print(tabulate(pm_table, pm_header, numalign="left")+"\n")
-
-def show_psu_pm_history(psu_id, pm_list, table_name, pm_type, bin_idx): 
-    pm_header = ['Name','Instant','Avg','Min','Max','Min-time','Max-time','Valid']
-    pm_table = []
-    db = get_chassis_history_db()
-    history_stamp = get_pm_history_bin_start_time(pm_type, bin_idx)
-    for field in pm_list:
-        table_key = f"{table_name}-1-{psu_id}_{field['Field']}:{pm_type}_pm_history_{history_stamp}"
-        pm = get_db_table_fields(db, table_name, table_key)
-        key = field['show_name']
-        pm_table.append([key, pm['instant'],pm['avg'],pm['min'],pm['max'], format_timestamp(pm['min-time']), format_timestamp(pm['max-time']),pm['validity']])
-    print(tabulate(pm_table, pm_header, numalign="left")+"\n") 
\ No newline at end of file
+    show_entity_pm(0, DB_COUNTER_IDX, f"{table_name}-1-{psu_id}", pm_list, table_name, pm_type)
+
+def show_psu_pm_history(psu_id, pm_list, table_name, pm_type, bin_idx, snapshot=None): 
+    history_stamp = (snapshot or PmSnapshot(pm_type)).history_stamp(bin_idx)
+    show_entity_pm(0, DB_HISTORY_IDX, f"{table_name}-1-{psu_id}", pm_list, table_name, pm_type, history_stamp)
+
+################################### pm history range ###############################################
+PM_HISTORY_BIN_MAX = 96
+PM_RANGE_HEADER = ['Name','StartTime','Instant','Avg','Min','Max','Min-time','Max-time','Valid']
+PM_SUMMARY_HEADER = ['Name','Bins','Min','Avg','Max']
+
+def pm_history_range_options(func):
+    func = click.option('--summary', is_flag=True, help='Show min/avg/max of every PM over the bins')(func)
+    func = click.option('--format', 'output_format', type=click.Choice(['table', 'csv', 'json']), default='table',
+                        help='Output format of a bin range')(func)
+    func = click.option('--to', 'bin_to', type=click.IntRange(1, PM_HISTORY_BIN_MAX),
+                        help='Oldest history bin of the range, defaults to --from')(func)
+    func = click.option('--from', 'bin_from', type=click.IntRange(1, PM_HISTORY_BIN_MAX),
+                        help='Newest history bin of the range')(func)
+    return func
+
+def get_pm_history_bins(bin_idx, bin_from, bin_to):
+    """
+    Resolve the history command arguments.
+
+    Returns:
+        None for a single bin_idx query, else the list of bins of the range, oldest first
+    """
+    if bin_from is None and bin_to is None:
+        if bin_idx is None:
+            raise click.UsageError("Missing bin_idx or --from/--to")
+        return None
+    if bin_idx is not None:
+        raise click.UsageError("bin_idx and --from/--to are mutually exclusive")
+    bin_from = bin_from if bin_from is not None else bin_to
+    bin_to = bin_to if bin_to is not None else bin_from
+    low, high = min(bin_from, bin_to), max(bin_from, bin_to)
+    return list(range(high, low - 1, -1))
+
+PM_RECORD_FIELDS = ['name','instant','avg','min','max','min-time','max-time','validity']
+
+class PmFrame(object):
+    """
+    PM of several entities over several bins, aligned on one snapshot:
+    entities x fields x bins. Bin 0 is the current PM.
+    """
+    def __init__(self, snapshot, entity_names, bins):
+        self.snapshot = snapshot
+        self.entity_names = entity_names
+        self.bins = bins
+        self.fields = {entity_name: [] for entity_name in entity_names}
+        self.values = {}  # (entity_name, field, bin_idx) -> pm record
+
+    def add(self, entity_name, bin_idx, record):
+        if record['name'] not in self.fields[entity_name]:
+            self.fields[entity_name].append(record['name'])
+        self.values[(entity_name, record['name'], bin_idx)] = record
+
+    def get(self, entity_name, field, bin_idx):
+        return self.values.get((entity_name, field, bin_idx))
+
+    def records(self, entity_name=None):
+        """
+        Returns:
+            list of dict records, grouped by entity then PM name, oldest bin first
+        """
+        records = []
+        for name in self.entity_names if entity_name is None else [entity_name]:
+            for field in self.fields[name]:
+                for bin_idx in self.bins:
+                    record = self.get(name, field, bin_idx)
+                    if record is not None:
+                        records.append(record)
+        return records
+
+    def get_bins_info(self):
+        bins_info = []
+        for bin_idx in self.bins:
+            start_time, end_time = self.snapshot.start_end_time(bin_idx)
+            bins_info.append({'bin': bin_idx, 'start-time': start_time, 'end-time': end_time})
+        return bins_info
+
+def get_pm_frame(slot_id, entities, snapshot, bins):
+    """
+    Fetch the PM of several entities over several bins, one batch per DB.
+
+    Args:
+        entities: list of (entity_name, get_pm_requests), get_pm_requests(history_stamp)
+                  returns the pm requests of the entity for a bin, history_stamp
+                  None for the current PM. The PM following a label row are
+                  named after it, e.g. 'Lane-2 InputPower(dBm)'
+        bins: bins to fetch, oldest first, 0 for the current PM
+    """
+    frame = PmFrame(snapshot, [entity_name for entity_name, _ in entities], bins)
+    for db_id, db_bins in [(DB_COUNTER_IDX, [b for b in bins if b == 0]), (DB_HISTORY_IDX, [b for b in bins if b > 0])]:
+        if not db_bins:
+            continue
+        pm_requests_list = []
+        for bin_idx in db_bins:
+            history_stamp = snapshot.history_stamp(bin_idx) if bin_idx > 0 else None
+            for _, get_pm_requests in entities:
+                pm_requests_list.append(get_pm_requests(history_stamp))
+        pm_tables = iter(get_pm_tables(slot_id, db_id, pm_requests_list))
+
+        for bin_idx in db_bins:
+            start_time = snapshot.start_end_time(bin_idx)[0]
+            for entity_name, _ in entities:
+                section = None
+                for row in next(pm_tables):
+                    # A label row, e.g. <Lane-2>, names the section of the rows following it
+                    if len(row) != len(PM_HEADER):
+                        section = row[0].strip('<>')
+                        continue
+                    record = dict(zip(PM_RECORD_FIELDS, row))
+                    if section is not None:
+                        record['name'] = f"{section} {record['name']}"
+                    record.update({'entity': entity_name, 'bin': bin_idx, 'start-time': start_time})
+                    frame.add(entity_name, bin_idx, record)
+    return frame
+
+def to_pm_value(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+def get_pm_record_values(record):
+    """
+    Returns:
+        (min, avg, max) of a PM record, the value of a PM counter record,
+        which only holds an instant, for all three
+    """
+    values = [to_pm_value(record[field]) for field in ('min', 'avg', 'max')]
+    if all(value is None for value in values):
+        values = [to_pm_value(record['instant'])] * 3
+    return values
+
+def get_pm_range_summary(records):
+    """
+    Min of min, mean of avg and max of max of every (entity, PM) over the bins
+    that hold a value.
+    """
+    series = {}
+    for record in records:
+        series.setdefault((record['entity'], record['name']), []).append(get_pm_record_values(record))
+
+    summary = []
+    for (entity_name, name), series_values in series.items():
+        mins = [v[0] for v in series_values if v[0] is not None]
+        avgs = [v[1] for v in series_values if v[1] is not None]
+        maxs = [v[2] for v in series_values if v[2] is not None]
+        summary.append({'entity': entity_name, 'name': name, 'bins': len(avgs),
+                        'min': min(mins) if mins else NA_VALUE,
+                        'avg': round(sum(avgs) / len(avgs), 2) if avgs else NA_VALUE,
+                        'max': max(maxs) if maxs else NA_VALUE})
+    return summary
+
+def show_pm_history_range(slot_id, entities, pm_type, bins, output_format='table', summary=False):
+    snapshot = PmSnapshot(pm_type)
+    frame = get_pm_frame(slot_id, entities, snapshot, bins)
+    show_pm_frame(frame, output_format, summary)
+
+def show_pm_frame(frame, output_format='table', summary=False):
+    records = frame.records()
+    summary_records = get_pm_range_summary(records) if summary else []
+
+    if output_format == 'json':
+        output = {'pm-type': frame.snapshot.pm_type,
+                  'reference-time': frame.snapshot.format_time(frame.snapshot.now * 1000),
+                  'bins': frame.get_bins_info(),
+                  'records': records}
+        if summary:
+            output['summary'] = summary_records
+        click.echo(json.dumps(output, indent=4))
+    elif output_format == 'csv':
+        fields = ['entity','bin','start-time','name','instant','avg','min','max','min-time','max-time','validity']
+        writer = csv.DictWriter(sys.stdout, fieldnames=fields, extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(records)
+        if summary:
+            writer = csv.DictWriter(sys.stdout, fieldnames=['entity','name','bins','min','avg','max'])
+            writer.writeheader()
+            writer.writerows(summary_records)
+    else:
+        start_time = frame.snapshot.start_end_time(frame.bins[0])[0]
+        for entity_name in frame.entity_names:
+            print(f"     Name: {entity_name}")
+            print(f"StartTime: {start_time}")
+            print(f"     Bins: {len(frame.bins)}")
+            pm_table = [[r['name'], r['start-time'], r['instant'], r['avg'], r['min'], r['max'],
+                         r['min-time'], r['max-time'], r['validity']] for r in frame.records(entity_name)]
+            print(tabulate(pm_table, PM_RANGE_HEADER, numalign="left")+"\n")
+            if summary:
+                summary_table = [[r['name'], r['bins'], r['min'], r['avg'], r['max']]
+                                 for r in summary_records if r['entity'] == entity_name]
+                print(tabulate(summary_table, PM_SUMMARY_HEADER, numalign="left")+"\n")
+
+def show_slot_modules_pm_history_range(slot_id, module_ids, pm_list, table_name, pm_type, bins,
+                                       output_format='table', summary=False):
+    entities = []
+    for module_id in module_ids:
+        entity_name = f"{table_name}-1-{slot_id}-{module_id}"
+        entities.append((entity_name,
+                         functools.partial(get_entity_pm_requests, entity_name, pm_list, table_name, pm_type)))
+    show_pm_history_range(slot_id, entities, pm_type, bins, output_format, summary)
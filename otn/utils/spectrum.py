@@ -0,0 +1,139 @@
+import struct
+import sys
+from array import array
+
+SPECTRUM_MAGIC = b'OCMS'
+SPECTRUM_VERSION = 1
+SPECTRUM_HEADER = struct.Struct('<4sHI')  #magic, version, number of slices, the arrays follow little-endian
+
+class OcmSpectrum(object):
+    """
+    OCM spectrum held as parallel arrays sorted by lower frequency: lower and
+    upper frequency of every slice in MHz and its power in dBm.
+    """
+    def __init__(self, lower=None, upper=None, power=None):
+        self.lower = lower if lower is not None else array('q')
+        self.upper = upper if upper is not None else array('q')
+        self.power = power if power is not None else array('d')
+
+    @classmethod
+    def from_channels(cls, channels):
+        """
+        Args:
+            channels: iterable of dict with lower-frequency, upper-frequency and power
+        """
+        slices = []
+        for channel in channels:
+            try:
+                slices.append((int(channel['lower-frequency']), int(channel['upper-frequency']),
+                               float(channel['power'])))
+            except (KeyError, TypeError, ValueError):
+                continue
+        slices.sort()
+        return cls(array('q', [s[0] for s in slices]), array('q', [s[1] for s in slices]),
+                   array('d', [s[2] for s in slices]))
+
+    def __len__(self):
+        return len(self.power)
+
+    def center(self, i):
+        return (self.lower[i] + self.upper[i]) / 2
+
+    def channel_count(self, threshold):
+        return sum(1 for p in self.power if p >= threshold)
+
+    def tilt(self):
+        """
+        Least-squares slope of power over the band, in dB/THz.
+        """
+        n = len(self)
+        if n < 2:
+            return 0.0
+        freqs = [self.center(i) / 1e6 for i in range(n)]
+        mean_f = sum(freqs) / n
+        mean_p = sum(self.power) / n
+        var = sum((f - mean_f) ** 2 for f in freqs)
+        if var == 0:
+            return 0.0
+        return sum((f - mean_f) * (p - mean_p) for f, p in zip(freqs, self.power)) / var
+
+    def ripple(self, threshold):
+        """
+        Peak to peak power of the slices carrying a channel.
+        """
+        powers = [p for p in self.power if p >= threshold]
+        return max(powers) - min(powers) if powers else 0.0
+
+    def peak_to_floor(self, threshold):
+        """
+        OSNR-like delta of every slice above threshold: its power minus the mean
+        of the nearest slices below threshold on each side.
+
+        Returns:
+            list of (lower-frequency, upper-frequency, delta in dB)
+        """
+        floor_idx = [i for i, p in enumerate(self.power) if p < threshold]
+        deltas = []
+        j = 0
+        for i, p in enumerate(self.power):
+            if p < threshold:
+                continue
+            while j < len(floor_idx) and floor_idx[j] < i:
+                j += 1
+            neighbours = []
+            if j > 0:
+                neighbours.append(self.power[floor_idx[j - 1]])
+            if j < len(floor_idx):
+                neighbours.append(self.power[floor_idx[j]])
+            if neighbours:
+                deltas.append((self.lower[i], self.upper[i], p - sum(neighbours) / len(neighbours)))
+        return deltas
+
+    def diff(self, baseline):
+        """
+        Power change of the slices present in both spectrums, matched on the frequency range.
+
+        Returns:
+            list of (lower-frequency, upper-frequency, power, baseline power, delta in dB)
+        """
+        baseline_power = {(l, u): p for l, u, p in zip(baseline.lower, baseline.upper, baseline.power)}
+        deltas = []
+        for l, u, p in zip(self.lower, self.upper, self.power):
+            if (l, u) in baseline_power:
+                deltas.append((l, u, p, baseline_power[(l, u)], p - baseline_power[(l, u)]))
+        return deltas
+
+    def to_bytes(self):
+        data = SPECTRUM_HEADER.pack(SPECTRUM_MAGIC, SPECTRUM_VERSION, len(self))
+        for values in (self.lower, self.upper, self.power):
+            if sys.byteorder == 'big':
+                values = array(values.typecode, values)
+                values.byteswap()
+            data += values.tobytes()
+        return data
+
+    @classmethod
+    def from_bytes(cls, data):
+        magic, version, n = SPECTRUM_HEADER.unpack_from(data)
+        if magic != SPECTRUM_MAGIC or version != SPECTRUM_VERSION:
+            raise ValueError('Not an OCM spectrum file')
+        spectrum = cls()
+        offset = SPECTRUM_HEADER.size
+        for values in (spectrum.lower, spectrum.upper, spectrum.power):
+            size = n * values.itemsize
+            values.frombytes(data[offset:offset + size])
+            if sys.byteorder == 'big':
+                values.byteswap()
+            offset += size
+        if len(spectrum.power) != n:
+            raise ValueError('Truncated OCM spectrum file')
+        return spectrum
+
+    def save(self, path):
+        with open(path, 'wb') as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            return cls.from_bytes(f.read())
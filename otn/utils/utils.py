@@ -1,4 +1,7 @@
 import click
+import functools
+import heapq
+import itertools
 import operator
 import json
 import pexpect
@@ -8,6 +11,7 @@ import otn
 import subprocess
 import sys
 
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime 
 from otn.utils.db import *
 from otn.utils.constants import *
@@ -148,30 +152,47 @@ def slot_is_fan(slot_id):
     chassis_info = get_chassis_capability()
     return slot_id in chassis_info["fan_id_list"]
 
+# Parsed JSON files, keyed by path and stored with the mtime they were parsed at
+capability_cache = {}
+
+def load_json_file_cached(path):
+    """
+    Parse a capability/profile JSON file once per process.
+
+    The file is stat'ed on every call and only re-parsed when its mtime
+    changes, so repeated lookups during one CLI invocation are cheap.
+    Returns None if the file does not exist.
+    """
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        capability_cache.pop(path, None)
+        return None
+
+    entry = capability_cache.get(path)
+    if entry is None or entry[0] != mtime:
+        with open(path, encoding='utf-8') as f:
+            entry = (mtime, json.load(f))
+        capability_cache[path] = entry
+    return entry[1]
+
+@functools.lru_cache(maxsize=None)
+def get_platform():
+    return get_chassis_config_db().hget('DEVICE_METADATA|localhost', 'platform')
+
 def get_linecard_capability(slot_idx):
     card_type = get_slot_card_type(slot_idx).upper()
-    platform = get_chassis_config_db().hget('DEVICE_METADATA|localhost', 'platform')
-    path = f'/usr/share/sonic/device/{platform}/linecards/{card_type}/cli_capability.json'
-    if os.path.isfile(path):
-        return json.load(open(path, encoding='utf-8'))
-    else:
-        return {}
+    return get_linecard_capability_with_cardtype(slot_idx, card_type)
 
 def get_linecard_capability_with_cardtype(slot_idx, card_type):
-    platform = get_chassis_config_db().hget('DEVICE_METADATA|localhost', 'platform')
-    path = f'/usr/share/sonic/device/{platform}/linecards/{card_type}/cli_capability.json'
-    if os.path.isfile(path):
-        return json.load(open(path, encoding='utf-8'))
-    else:
-        return {}
+    path = f'/usr/share/sonic/device/{get_platform()}/linecards/{card_type}/cli_capability.json'
+    capability = load_json_file_cached(path)
+    return capability if capability is not None else {}
 
 def get_chassis_capability():
-    platform = get_chassis_config_db().hget('DEVICE_METADATA|localhost', 'platform')
-    path = f'/usr/share/sonic/device/{platform}/chassis_cli_capability.json'
-    if os.path.isfile(path):
-        return json.load(open(path, encoding='utf-8'))
-    else:
-        return {}
+    path = f'/usr/share/sonic/device/{get_platform()}/chassis_cli_capability.json'
+    capability = load_json_file_cached(path)
+    return capability if capability is not None else {}
 
 def get_card_is_present(slot_id):
     db = get_state_db_by_slot(slot_id)
@@ -283,90 +304,245 @@ def run_cmd(cmd):
     print(cmd)
 
 def show_slot_alarm_current(slot_id):
-    db = get_state_db_by_slot(slot_id)
-    show_db_entity_alarm_current(db, f'Slot {slot_id} Current Alarm', CURALARM)
+    show_db_entity_alarm_current(slot_id, DB_STATE_IDX, f'Slot {slot_id} Current Alarm', CURALARM)
 
 def show_slot_alarm_history(slot_id):
-    db = get_history_db_by_slot(slot_id)
-    show_db_entity_alarm_history(db, f'Slot {slot_id}')
-    show_db_entity_alarm_current(db, f'Slot {slot_id} History Event', HISEVENT)
+    show_db_entity_alarm_history(slot_id, DB_HISTORY_IDX, f'Slot {slot_id}')
+    show_db_entity_alarm_current(slot_id, DB_HISTORY_IDX, f'Slot {slot_id} History Event', HISEVENT)
     
 def show_chassis_alarm_current():
-    db = get_chassis_state_db()
-    show_db_entity_alarm_current(db, f'System Current Alarm', CURALARM)
+    show_db_entity_alarm_current(0, DB_STATE_IDX, f'System Current Alarm', CURALARM)
 
 def show_chassis_alarm_history():
-    db = get_chassis_history_db()
-    show_db_entity_alarm_history(db, f'System History Alarm')
-    show_db_entity_alarm_current(db, f'System History Event', HISEVENT)
+    show_db_entity_alarm_history(0, DB_HISTORY_IDX, f'System History Alarm')
+    show_db_entity_alarm_current(0, DB_HISTORY_IDX, f'System History Event', HISEVENT)
 
 def get_system_alarm_profile():
-    platform = get_chassis_config_db().hget('DEVICE_METADATA|localhost', 'platform')
-    path = f'/usr/share/sonic/device/{platform}/alarm_profile.json'
-    if os.path.isfile(path):
-        return json.load(open(path, encoding='utf-8'))
-
-def show_db_entity_alarm_current(db, entity_name, talbe_name):
-    keys = get_db_table_keys(db, talbe_name)
-    click.echo(f'{entity_name} Total num: {len(keys)}')
-    if not keys:
-        return
-    
-    alarm_profile_dic = get_system_alarm_profile()
-    alarms = []
-    for key in keys:
-        alarm = get_db_table_fields(db, talbe_name, key)
-        alarm['time-created'] = int(alarm['time-created'])
-        NANOSECONDS = 1000000000
-        alarm['time-created-str'] = datetime.fromtimestamp(alarm['time-created']/NANOSECONDS).strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
-        if alarm['type-id'] in alarm_profile_dic:
-            alarm['sa'] = alarm_profile_dic[alarm['type-id']]["SA"]
-            alarm['type'] = alarm_profile_dic[alarm['type-id']]["Type"]
-            alarms.append(alarm)
-        else:
-            click.echo(f"Warning: invalid alarm type {alarm['type-id']}")
-    sorted_alarms = sorted(alarms, key=operator.itemgetter('time-created'),reverse=True)
-    
-    current_alarm_header = ['id','time-created','resource','severity','type-id','text','sa','type']
-    current_alarm_info = []
-    index = 1
-    for alarm in sorted_alarms:
-        current_alarm_info.append([index, alarm['time-created-str'], alarm['resource'], alarm['severity'], alarm['type-id'], alarm['text'], alarm['sa'], alarm['type']])
-        index = index + 1     
-    click.echo(tabulate(current_alarm_info, current_alarm_header, tablefmt="simple"))
-    click.echo("")
+    path = f'/usr/share/sonic/device/{get_platform()}/alarm_profile.json'
+    return load_json_file_cached(path)
 
-def show_db_entity_alarm_history(db, entity_name):
-    keys = get_db_table_keys(db, HISALARM)
-    click.echo(f'{entity_name} History Alarm Total num: {len(keys)}')
-    if not keys:
-        return
-    
-    alarms = []
-    alarm_profile_dic = get_system_alarm_profile()
-    for key in keys:
-        alarm = get_db_table_fields(db, HISALARM, key)
+def format_alarm_time(time_value):
+    NANOSECONDS = 1000000000
+    return datetime.fromtimestamp(time_value/NANOSECONDS).strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
+
+def get_alarm_entity_name(slot_id):
+    return f'Slot {slot_id}' if slot_id else 'System'
+
+def normalize_alarm(slot_id, table_name, alarm, alarm_profile_dic, severities=None, since=None, until=None):
+    """
+    Convert a raw CURALARM/HISALARM/HISEVENT entry for display.
+
+    Args:
+        severities: if set, only keep alarms whose severity is in it (upper case)
+        since, until: if set, only keep alarms created in [since, until] (ns timestamps)
+    Returns:
+        the alarm, or None if it is invalid or filtered out
+    """
+    try:
+        return convert_alarm(slot_id, table_name, alarm, alarm_profile_dic, severities, since, until)
+    except (KeyError, ValueError, TypeError) as e:
+        # a malformed entry must not hide the other alarms of the table
+        log.log_warning(f"Warning: skip invalid alarm {alarm.get('id')} of {table_name}: {e!r}")
+        return None
+
+def convert_alarm(slot_id, table_name, alarm, alarm_profile_dic, severities, since, until):
+    if table_name == HISALARM:
         if(len(alarm['id'].split('#')) != 2):
             log.log_error(f"Error: invalid alarm id {alarm['id']}")
-            continue
+            return None
         alarm['type-id'] = alarm['id'].split('#')[1]
-        alarm['time-created'] = int(alarm['time-created'])
         alarm['time-cleared'] = int(alarm['time-cleared'])
-        NANOSECONDS = 1000000000
-        alarm['time-created-str'] = datetime.fromtimestamp(alarm['time-created']/NANOSECONDS).strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
-        alarm['time-cleared-str'] = datetime.fromtimestamp(alarm['time-cleared']/NANOSECONDS).strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
-        alarm['sa'] = alarm_profile_dic[alarm['type-id']]["SA"]
-        alarm['type'] = alarm_profile_dic[alarm['type-id']]["Type"]
-        alarms.append(alarm)
-    sorted_alarms = sorted(alarms, key=operator.itemgetter('time-created'),reverse=True)
-    
-    current_alarm_header = ['id','time-created','time-cleared', 'resource','severity','type-id','text','sa','type']
-    current_alarm_info = []
-    index = 1
-    for alarm in sorted_alarms:
-        current_alarm_info.append([index, alarm['time-created-str'], alarm['time-cleared-str'], alarm['resource'], alarm['severity'], alarm['type-id'], alarm['text'], alarm['sa'], alarm['type']])
-        index = index + 1     
-    click.echo(tabulate(current_alarm_info, current_alarm_header, tablefmt="simple"))
+        alarm['time-cleared-str'] = format_alarm_time(alarm['time-cleared'])
+    alarm['time-created'] = int(alarm['time-created'])
+    if since is not None and alarm['time-created'] < since:
+        return None
+    if until is not None and alarm['time-created'] > until:
+        return None
+    if severities and alarm['severity'].upper() not in severities:
+        return None
+    if alarm['type-id'] not in alarm_profile_dic:
+        log.log_warning(f"Warning: invalid alarm type {alarm['type-id']}")
+        return None
+    alarm['time-created-str'] = format_alarm_time(alarm['time-created'])
+    alarm['sa'] = alarm_profile_dic[alarm['type-id']]["SA"]
+    alarm['type'] = alarm_profile_dic[alarm['type-id']]["Type"]
+    alarm['entity'] = get_alarm_entity_name(slot_id)
+    return alarm
+
+def get_db_entity_alarms(slot_id, db_id, table_name, alarm_profile_dic, severities=None, since=None, until=None):
+    """
+    Read all alarms of a CURALARM/HISALARM/HISEVENT table with one pipelined
+    batch and normalize them for display.
+    """
+    alarms = []
+    for alarm in get_db_table_all_fields_batch(slot_id, db_id, table_name).values():
+        alarm = normalize_alarm(slot_id, table_name, alarm, alarm_profile_dic, severities, since, until)
+        if alarm is not None:
+            alarms.append(alarm)
+    return alarms
+
+def sort_alarms(alarms):
+    return sorted(alarms, key=operator.itemgetter('time-created'),reverse=True)
+
+def collect_chassis_alarms(db_id, table_name, severities=None, since=None, until=None):
+    """
+    Collect the alarms of every linecard and of the chassis concurrently,
+    one worker per slot redis instance, and merge them newest first.
+    """
+    alarm_profile_dic = get_system_alarm_profile() or {}
+    slot_ids = get_linecard_slot_range() + [0]
+
+    def collect_slot_alarms(slot_id):
+        try:
+            return get_db_entity_alarms(slot_id, db_id, table_name, alarm_profile_dic, severities, since, until)
+        except Exception as e:
+            log.log_error(f"Failed to collect {table_name} of {get_alarm_entity_name(slot_id)}: {e}")
+            return []
+
+    with ThreadPoolExecutor(max_workers=min(ALARM_COLLECT_WORKERS, len(slot_ids))) as executor:
+        slot_alarms_list = list(executor.map(collect_slot_alarms, slot_ids))
+    return sort_alarms([alarm for slot_alarms in slot_alarms_list for alarm in slot_alarms])
+
+def get_alarm_table(alarms, with_entity=False, with_cleared=False, start_index=1):
+    alarm_header = ['id','time-created']
+    if with_cleared:
+        alarm_header.append('time-cleared')
+    alarm_header += ['resource','severity','type-id','text','sa','type']
+    if with_entity:
+        alarm_header.insert(1, 'entity')
+
+    alarm_info = []
+    for index, alarm in enumerate(alarms, start_index):
+        row = [index, alarm['time-created-str']]
+        if with_cleared:
+            row.append(alarm['time-cleared-str'])
+        row += [alarm['resource'], alarm['severity'], alarm['type-id'], alarm['text'], alarm['sa'], alarm['type']]
+        if with_entity:
+            row.insert(1, alarm['entity'])
+        alarm_info.append(row)
+    return alarm_header, alarm_info
+
+def show_alarm_table(title, alarms, with_entity=False, with_cleared=False):
+    click.echo(f'{title} Total num: {len(alarms)}')
+    if not alarms:
+        return
+    alarm_header, alarm_info = get_alarm_table(alarms, with_entity, with_cleared)
+    click.echo(tabulate(alarm_info, alarm_header, tablefmt="simple"))
+    click.echo("")
+
+def show_db_entity_alarm_current(slot_id, db_id, entity_name, talbe_name):
+    alarm_profile_dic = get_system_alarm_profile() or {}
+    alarms = get_db_entity_alarms(slot_id, db_id, talbe_name, alarm_profile_dic)
+    show_alarm_table(entity_name, sort_alarms(alarms))
+
+def show_db_entity_alarm_history(slot_id, db_id, entity_name):
+    alarms = iter_chassis_alarm_history([slot_id])
+    show_alarm_history_stream(f'{entity_name} History Alarm', alarms)
+
+def get_alarm_index_score(time_created):
+    """
+    Args:
+        time_created: time-created of an alarm, ns timestamp
+    Returns:
+        score of the alarm in the HISALARM time index, ms timestamp
+    """
+    return int(time_created) // 1000000
+
+def iter_alarm_index_keys(client, max_score, min_score):
+    """
+    Yield the HISALARM keys of the time index in [min_score, max_score]
+    newest first, one page at a time.
+
+    The pages follow a (score, key) cursor rather than an offset, so that the
+    alarms indexed or removed while the history is read do not shift the
+    next pages. The keys of a same score are returned in reverse
+    lexicographical order, the rest of the score ending a page is read at
+    once before going on with the lower scores.
+    """
+    while True:
+        page = client.zrevrangebyscore(HISALARM_TIME_INDEX, max_score, min_score,
+                                       start=0, num=ALARM_HISTORY_PAGE_SIZE, withscores=True)
+        if page:
+            yield [key for key, _ in page]
+        if len(page) < ALARM_HISTORY_PAGE_SIZE:
+            return
+        last_key, last_score = page[-1]
+        last_score = int(last_score)
+        ties = [key for key in client.zrevrangebyscore(HISALARM_TIME_INDEX, last_score, last_score) if key < last_key]
+        if ties:
+            yield ties
+        max_score = f'({last_score}'
+
+def iter_slot_alarm_history(slot_id, alarm_profile_dic, severities=None, since=None, until=None):
+    """
+    Yield the history alarms of one slot newest first.
+
+    The time range is resolved on the redis side through the HISALARM time
+    index maintained by otn-alarm-indexer, and the alarm hashes are read one
+    page (pipelined HGETALL) at a time, so the first rows are available
+    whatever the history size. The index is only trusted while the indexer
+    heartbeat is fresh, the heartbeat being set once a full reconciliation
+    pass is done; otherwise the whole table is read.
+    """
+    client = get_redis_client_by_slot(slot_id, DB_HISTORY_IDX)
+    try:
+        indexed = client.exists(HISALARM_TIME_INDEX_HEARTBEAT)
+        if not indexed:
+            alarms = get_db_entity_alarms(slot_id, DB_HISTORY_IDX, HISALARM, alarm_profile_dic,
+                                          severities, since, until)
+    except Exception as e:
+        log.log_error(f"Failed to read {HISALARM} of {get_alarm_entity_name(slot_id)}: {e}")
+        return
+    if not indexed:
+        yield from sort_alarms(alarms)
+        return
+
+    # The scores are in ms, the alarms are filtered on the exact ns boundaries
+    max_score = get_alarm_index_score(until) if until is not None else '+inf'
+    min_score = get_alarm_index_score(since) if since is not None else '-inf'
+    for keys in iter_alarm_index_keys(client, max_score, min_score):
+        pipe = client.pipeline(transaction=False)
+        for key in keys:
+            pipe.hgetall(key)
+        for data in pipe.execute():
+            # the alarm may have been aged out before the indexer removed it
+            if not data:
+                continue
+            alarm = normalize_alarm(slot_id, HISALARM, rdict(data), alarm_profile_dic, severities, since, until)
+            if alarm is not None:
+                yield alarm
+
+def iter_chassis_alarm_history(slot_ids, severities=None, since=None, until=None):
+    """
+    Merge the history alarm streams of several slots, newest first.
+    """
+    alarm_profile_dic = get_system_alarm_profile() or {}
+    streams = [iter_slot_alarm_history(slot_id, alarm_profile_dic, severities, since, until) for slot_id in slot_ids]
+    return heapq.merge(*streams, key=operator.itemgetter('time-created'), reverse=True)
+
+def show_alarm_history_stream(title, alarms, offset=0, limit=None, with_entity=False):
+    """
+    Print a history alarm stream page by page, as soon as each page is read.
+    """
+    stop = offset + limit if limit is not None else None
+    alarms = itertools.islice(alarms, offset, stop)
+    index = offset + 1
+    count = 0
+    page = []
+    click.echo(title)
+    for alarm in alarms:
+        page.append(alarm)
+        if len(page) == ALARM_HISTORY_PAGE_SIZE:
+            alarm_header, alarm_info = get_alarm_table(page, with_entity, True, index)
+            click.echo(tabulate(alarm_info, alarm_header, tablefmt="simple"))
+            index += len(page)
+            count += len(page)
+            page = []
+    if page:
+        alarm_header, alarm_info = get_alarm_table(page, with_entity, True, index)
+        click.echo(tabulate(alarm_info, alarm_header, tablefmt="simple"))
+        count += len(page)
+    click.echo(f'{title} Displayed num: {count}')
     click.echo("")
 
 def show_key_value_list_with_module(target_list, dict_kvs):
@@ -0,0 +1,187 @@
+import click
+import shutil
+import sys
+import time
+from datetime import datetime
+from otn.utils.db import *
+
+class WatchRow(object):
+    """
+    One line of a watch display: the field of a slot database hash shown as
+    'label: value'. A row without table is a static line, such as a blank
+    separator. An optional row missing from the first read is not displayed.
+    """
+    def __init__(self, label, db_id=None, table_name=None, table_key=None, field=None, optional=False):
+        self.label = label
+        self.db_id = db_id
+        self.table_name = table_name
+        self.table_key = table_key
+        self.field = field
+        self.optional = optional
+
+    @property
+    def key(self):
+        return (self.db_id, self.table_name, self.table_key)
+
+    def render(self, value):
+        if self.table_name is None:
+            return self.label
+        return self.label.ljust(FIELD_WITH) + ": " + value
+
+def get_state_watch_rows(table_name, table_key, field_list, prefix="", optional=False):
+    return [WatchRow(prefix + field['show_name'], DB_STATE_IDX, table_name, table_key, field['Field'], optional)
+            for field in field_list]
+
+def get_pm_instant_watch_rows(table_name, entity_name, pm_list, prefix=""):
+    return [WatchRow(prefix + field['show_name'], DB_COUNTER_IDX, table_name,
+                     f"{entity_name}_{field['Field']}:15_pm_current", 'instant') for field in pm_list]
+
+def is_keyspace_notification_enabled(client):
+    try:
+        flags = client.config_get('notify-keyspace-events').get('notify-keyspace-events', '')
+    except Exception:
+        return False
+    return 'K' in flags and ('A' in flags or 'h' in flags)
+
+class KeyspaceWatch(object):
+    """
+    Display rows of a slot and keep them up to date from the keyspace
+    notifications of their keys. Only the keys named by a notification are
+    read again, and only the rows whose value changed are redrawn, at most
+    once per interval. When the linecard redis does not publish keyspace
+    events every key is re-read each WATCH_POLL_INTERVAL instead.
+    """
+    def __init__(self, slot_id, rows, interval=WATCH_MIN_INTERVAL):
+        self.slot_id = slot_id
+        self.rows = rows
+        self.interval = interval
+        self.values = {}
+        self.lines = []
+        self.separators = {}
+        self.in_place = sys.stdout.isatty()
+
+    def get_redis_key(self, key):
+        db_id, table_name, table_key = key
+        if (db_id, table_name) not in self.separators:
+            self.separators[(db_id, table_name)] = get_db_table_separator(self.slot_id, db_id, table_name)
+        return f'{table_name}{self.separators[(db_id, table_name)]}{table_key}'
+
+    def get_channels(self):
+        """
+        Returns:
+            dict of keyspace channel -> row key
+        """
+        return {f'__keyspace@{key[0]}__:{self.get_redis_key(key)}': key
+                for key in set(row.key for row in self.rows if row.table_name is not None)}
+
+    def read(self, keys):
+        """
+        Read the hashes of keys, one pipelined round trip per database.
+
+        Returns:
+            set of the keys whose hash changed
+        """
+        keys_by_db = {}
+        for key in keys:
+            keys_by_db.setdefault(key[0], []).append(key)
+        changed = set()
+        for db_id, db_keys in keys_by_db.items():
+            datas = get_db_tables_fields_batch(self.slot_id, db_id, [key[1:] for key in db_keys])
+            for key, data in zip(db_keys, datas):
+                if self.values.get(key) != data:
+                    self.values[key] = data
+                    changed.add(key)
+        return changed
+
+    def render_row(self, row):
+        if row.table_name is None:
+            return row.render('')
+        return row.render(self.values.get(row.key, rdict())[row.field])
+
+    def show(self):
+        self.rows = [row for row in self.rows
+                     if not row.optional or row.field in self.values.get(row.key, {})]
+        self.lines = [self.render_row(row) for row in self.rows]
+        if self.in_place:
+            click.clear()
+        click.echo("\n".join(self.lines))
+        if self.in_place and len(self.lines) >= shutil.get_terminal_size().lines:
+            # Rows scrolled out of the terminal cannot be redrawn in place
+            self.in_place = False
+
+    def update(self, keys):
+        changed = self.read(keys)
+        updates = []
+        for i, row in enumerate(self.rows):
+            if row.key in changed:
+                line = self.render_row(row)
+                if line != self.lines[i]:
+                    self.lines[i] = line
+                    updates.append(i)
+        if not updates:
+            return
+        if self.in_place:
+            # The cursor stays at the end of the last line
+            output = ""
+            for i in updates:
+                up = len(self.lines) - 1 - i
+                output += (f"\x1b[{up}A" if up else "") + "\r\x1b[2K" + self.lines[i] + (f"\x1b[{up}B" if up else "")
+            click.echo(output, nl=False)
+            sys.stdout.flush()
+        else:
+            now = datetime.now().strftime("%H:%M:%S.%f")[:-3]
+            click.echo("\n".join(f"{now} {self.lines[i]}" for i in updates))
+
+    def wait_keys(self, pubsub, channels, timeout):
+        """
+        Wait up to timeout for keyspace events, then drain the queued ones.
+
+        Returns:
+            set of the keys named by the events
+        """
+        keys = set()
+        message = pubsub.get_message(timeout=timeout)
+        while message:
+            if message.get('channel') in channels:
+                keys.add(channels[message['channel']])
+            message = pubsub.get_message()
+        return keys
+
+    def run(self):
+        channels = self.get_channels()
+        all_keys = set(channels.values())
+        client = get_redis_client_by_slot(self.slot_id, DB_STATE_IDX)
+        notification = is_keyspace_notification_enabled(client)
+        # Subscribe before the first read so that no change is missed
+        pubsub = client.pubsub(ignore_subscribe_messages=True)
+        try:
+            if notification:
+                pubsub.subscribe(*channels)
+            self.read(all_keys)
+            self.show()
+            pending = set()
+            last_refresh = time.monotonic()
+            while True:
+                if notification:
+                    timeout = WATCH_POLL_INTERVAL
+                    if pending:
+                        timeout = max(0, last_refresh + self.interval - time.monotonic())
+                    pending |= self.wait_keys(pubsub, channels, timeout)
+                else:
+                    time.sleep(max(0, last_refresh + WATCH_POLL_INTERVAL - time.monotonic()))
+                    pending = all_keys
+                if not pending or time.monotonic() - last_refresh < self.interval:
+                    continue
+                self.update(pending)
+                pending = set()
+                last_refresh = time.monotonic()
+        except KeyboardInterrupt:
+            click.echo("")
+        finally:
+            pubsub.close()
+
+def watch_options(func):
+    func = click.option('--interval', type=click.FloatRange(0.05, 60), default=WATCH_MIN_INTERVAL, show_default=True,
+                        help='Minimum seconds between two refreshes of --watch')(func)
+    func = click.option('--watch', is_flag=True, help='Keep the display up to date from the database changes')(func)
+    return func
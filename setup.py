@@ -200,7 +200,7 @@ setup(
     entry_points={
         'console_scripts': [
             'acl-loader = acl_loader.main:cli',
-            'config = config.main:config',
+            'config = utilities_common.cli_server:config',
             'connect = connect.main:connect',
             'consutil = consutil.main:consutil',
             'counterpoll = counterpoll.main:cli',
@@ -208,6 +208,7 @@ setup(
             'debug = debug.main:cli',
             'dump = dump.main:dump',
             'filter_fdb_entries = fdbutil.filter_fdb_entries:main',
+            'otn-alarm-indexer = otn.utils.alarm_index:main',
             'pfcwd = pfcwd.main:cli',
             'sfputil = sfputil.main:cli',
             'ssdutil = ssdutil.main:ssdutil',
@@ -221,8 +222,10 @@ setup(
             'pddf_ledutil = pddf_ledutil.main:cli',
             'rexec = rcli.rexec:cli',
             'rshell = rcli.rshell:cli',
-            'show = show.main:cli',
+            'show = utilities_common.cli_server:show',
             'sonic-clear = clear.main:cli',
+            'sonic-cli-server = utilities_common.cli_server:main',
+            'sonic-yang-cache = utilities_common.yang_cache:main',
             'sonic-installer = sonic_installer.main:sonic_installer',
             'sonic_installer = sonic_installer.main:sonic_installer',  # Deprecated
             'sonic-package-manager = sonic_package_manager.main:cli',
@@ -9,7 +9,7 @@ import lazy_object_proxy
 import utilities_common.cli as clicommon
 from sonic_py_common import multi_asic
 import utilities_common.multi_asic as multi_asic_util
-from importlib import reload
+from importlib import import_module, reload
 from natsort import natsorted
 from sonic_py_common import device_info
 from swsscommon.swsscommon import SonicV2Connector, ConfigDBConnector
@@ -40,35 +40,11 @@ try:
 except KeyError:
     pass
 
-from . import acl
-from . import bgp_common
-from . import chassis_modules
-from . import dropcounters
-from . import fabric
-from . import feature
-from . import fgnhg
-from . import flow_counters
-from . import gearbox
-from . import interfaces
-from . import kdump
-from . import kube
-from . import muxcable
-from . import nat
-from . import platform
-from . import p4_table
-from . import processes
-from . import reboot_cause
-from . import sflow
-from . import vlan
-from . import vnet
-from . import vxlan
-from . import system_health
-from . import warm_restart
 from . import plugins
-from . import syslog
-from . import dns
-from . import bgp_cli
-from . import stp
+
+# Submodules used by commands of this file, imported on first use
+bgp_common = lazy_object_proxy.Proxy(lambda: import_module('show.bgp_common'))
+platform = lazy_object_proxy.Proxy(lambda: import_module('show.platform'))
 
 # Global Variables
 PLATFORM_JSON = 'platform.json'
@@ -315,43 +291,42 @@ def cli(ctx):
 if asic_type.startswith("ot-"):
     add_otn_show_commands(cli)
 
-# Add groups from other modules
-cli.add_command(acl.acl)
-cli.add_command(chassis_modules.chassis)
-cli.add_command(dropcounters.dropcounters)
-cli.add_command(fabric.fabric)
-cli.add_command(feature.feature)
-cli.add_command(fgnhg.fgnhg)
-cli.add_command(flow_counters.flowcnt_route)
-cli.add_command(flow_counters.flowcnt_trap)
-cli.add_command(kdump.kdump)
-cli.add_command(interfaces.interfaces)
-cli.add_command(kdump.kdump)
-cli.add_command(kube.kubernetes)
-cli.add_command(muxcable.muxcable)
-cli.add_command(nat.nat)
-cli.add_command(platform.platform)
-cli.add_command(p4_table.p4_table)
-cli.add_command(processes.processes)
-cli.add_command(reboot_cause.reboot_cause)
-cli.add_command(sflow.sflow)
-cli.add_command(vlan.vlan)
-cli.add_command(vnet.vnet)
-cli.add_command(vxlan.vxlan)
-cli.add_command(system_health.system_health)
-cli.add_command(warm_restart.warm_restart)
-cli.add_command(dns.dns)
-cli.add_command(stp.spanning_tree)
+# Add groups from other modules, they are imported when resolved
+cli.add_lazy_command('acl', 'show.acl:acl')
+cli.add_lazy_command('chassis', 'show.chassis_modules:chassis')
+cli.add_lazy_command('dropcounters', 'show.dropcounters:dropcounters')
+cli.add_lazy_command('fabric', 'show.fabric:fabric')
+cli.add_lazy_command('feature', 'show.feature:feature')
+cli.add_lazy_command('fgnhg', 'show.fgnhg:fgnhg')
+cli.add_lazy_command('flowcnt-route', 'show.flow_counters:flowcnt_route')
+cli.add_lazy_command('flowcnt-trap', 'show.flow_counters:flowcnt_trap')
+cli.add_lazy_command('interfaces', 'show.interfaces:interfaces')
+cli.add_lazy_command('kdump', 'show.kdump:kdump')
+cli.add_lazy_command('kubernetes', 'show.kube:kubernetes')
+cli.add_lazy_command('muxcable', 'show.muxcable:muxcable')
+cli.add_lazy_command('nat', 'show.nat:nat')
+cli.add_lazy_command('platform', 'show.platform:platform')
+cli.add_lazy_command('p4-table', 'show.p4_table:p4_table')
+cli.add_lazy_command('processes', 'show.processes:processes')
+cli.add_lazy_command('reboot-cause', 'show.reboot_cause:reboot_cause')
+cli.add_lazy_command('sflow', 'show.sflow:sflow')
+cli.add_lazy_command('vlan', 'show.vlan:vlan')
+cli.add_lazy_command('vnet', 'show.vnet:vnet')
+cli.add_lazy_command('vxlan', 'show.vxlan:vxlan')
+cli.add_lazy_command('system-health', 'show.system_health:system_health')
+cli.add_lazy_command('warm_restart', 'show.warm_restart:warm_restart')
+cli.add_lazy_command('dns', 'show.dns:dns')
+cli.add_lazy_command('spanning-tree', 'show.stp:spanning_tree')
 
 # syslog module
-cli.add_command(syslog.syslog)
+cli.add_lazy_command('syslog', 'show.syslog:syslog')
 
 # Add greabox commands only if GEARBOX is configured
 if is_gearbox_configured():
-    cli.add_command(gearbox.gearbox)
+    cli.add_lazy_command('gearbox', 'show.gearbox:gearbox')
 
 # bgp module
-cli.add_command(bgp_cli.BGP)
+cli.add_lazy_command('bgp', 'show.bgp_cli:BGP')
 
 #
 # 'vrf' command ("show vrf")
@@ -441,6 +441,17 @@ class TestChassisModules(object):
         assert return_code == 0
         assert result == show_chassis_system_lags_output_lc4
 
+    def test_config_chassis_upgrade_all_resolved(self):
+        runner = CliRunner()
+        result = runner.invoke(config.config.commands["chassis"], ["upgrade-all", "--help"])
+        print(result.output)
+        assert result.exit_code == 0
+        assert "--parallel" in result.output
+
+        result = runner.invoke(config.config.commands["chassis"], ["--help"])
+        print(result.output)
+        assert "upgrade-all" in result.output
+
     @classmethod
     def teardown_class(cls):
         print("TEARDOWN")
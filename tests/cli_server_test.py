@@ -0,0 +1,210 @@
+import json
+import os
+import selectors
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import textwrap
+import threading
+import time
+from unittest import mock
+
+from utilities_common import cli_server
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Server serving the 'stub' command, which reports how it was run
+SERVER_SCRIPT = textwrap.dedent("""
+    import json
+    import os
+    import sys
+
+    import click
+
+    from utilities_common import cli_server
+
+    @click.command(context_settings=dict(ignore_unknown_options=True))
+    @click.argument('args', nargs=-1)
+    def stub(args):
+        if args and args[0] == 'exit':
+            sys.exit(int(args[1]))
+        click.echo(json.dumps({'argv': sys.argv, 'args': list(args), 'cwd': os.getcwd(),
+                               'env': os.environ.get('CLI_SERVER_TEST')}))
+
+    cli_server.CLI_COMMANDS['stub'] = '__main__:stub'
+    cli_server.CLI_SERVER_REQUEST_TIMEOUT = float(sys.argv[2])
+    server = cli_server.CliServer(sys.argv[1], ['stub'])
+    server.listen()
+    print('ready', flush=True)
+    server.serve_forever()
+""")
+
+
+class TestCliServer(object):
+    def setup_method(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, 'cli.sock')
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join([REPO_DIR] + sys.path))
+        self.server = subprocess.Popen([sys.executable, '-c', SERVER_SCRIPT, self.path, '1'],
+                                       stdout=subprocess.PIPE, env=env, text=True)
+        assert self.server.stdout.readline() == 'ready\n'
+        self.environ = mock.patch.dict(os.environ, {cli_server.CLI_SERVER_SOCKET_ENV: self.path,
+                                                    'CLI_SERVER_TEST': 'client'})
+        self.environ.start()
+        self.signal_handlers = {signum: signal.getsignal(signum) for signum in cli_server.CLI_SERVER_FORWARDED_SIGNALS}
+
+    def teardown_method(self):
+        for signum, handler in self.signal_handlers.items():
+            signal.signal(signum, handler)
+        self.environ.stop()
+        self.server.terminate()
+        self.server.wait()
+        self.server.stdout.close()
+        shutil.rmtree(self.tmp_dir)
+
+    def run_stub(self, argv, command='stub'):
+        """
+        Returns:
+            (exit code, stdout of the command, stderr of the command)
+        """
+        with tempfile.TemporaryFile('w+') as stdin, tempfile.TemporaryFile('w+') as stdout, \
+                tempfile.TemporaryFile('w+') as stderr, \
+                mock.patch.object(sys, 'stdin', stdin), mock.patch.object(sys, 'stdout', stdout), \
+                mock.patch.object(sys, 'stderr', stderr), mock.patch.object(sys, 'argv', [command] + argv):
+            code = cli_server.run_cli_command(command)
+            stdout.seek(0)
+            stderr.seek(0)
+            return code, stdout.read(), stderr.read()
+
+    def test_run_cli_command__served__run_with_client_argv_cwd_and_env(self):
+        code, stdout, _ = self.run_stub(['a', '--flag', 'b'])
+
+        assert code == 0
+        assert json.loads(stdout) == {'argv': ['stub', 'a', '--flag', 'b'], 'args': ['a', '--flag', 'b'],
+                                      'cwd': os.getcwd(), 'env': 'client'}
+
+    def test_run_cli_command__command_exits__exit_code_returned(self):
+        code, _, _ = self.run_stub(['exit', '3'])
+
+        assert code == 3
+
+    def test_run_cli_command__command_not_served__error_reported(self):
+        # The 'show' command is known to the client but not served by this server
+        code, _, stderr = self.run_stub([], command='show')
+
+        assert code == 1
+        assert stderr == 'CLI server error: Command show is not served\n'
+
+    def test_run_cli_command__no_server__run_in_process_with_connector_cache(self):
+        with mock.patch.dict(os.environ, {cli_server.CLI_SERVER_SOCKET_ENV: os.path.join(self.tmp_dir, 'none')}), \
+                mock.patch.object(cli_server, 'load_cli_command') as mock_load_cli_command, \
+                mock.patch('utilities_common.db.enable_connector_cache') as mock_enable_connector_cache:
+            code = cli_server.run_cli_command('show')
+
+        mock_load_cli_command.assert_called_once_with('show')
+        mock_load_cli_command.return_value.assert_called_once_with(prog_name='show')
+        mock_enable_connector_cache.assert_called_once_with()
+        assert code == mock_load_cli_command.return_value.return_value
+
+    def test_connect_cli_server__server_of_another_user__not_used(self):
+        with mock.patch.object(cli_server, 'get_peer_uid', return_value=os.getuid() + 1):
+            assert cli_server.connect_cli_server() is None
+
+    def test_serve__stalled_client__other_requests_served_and_stalled_one_expired(self):
+        stalled = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        stalled.connect(self.path)
+        stalled.sendall(b'\0\0')
+
+        start = time.monotonic()
+        code, _, _ = self.run_stub(['a'])
+
+        assert code == 0
+        assert time.monotonic() - start < 1
+        stalled.settimeout(5)
+        assert stalled.recv(128) == b'error Request timeout\n'
+        stalled.close()
+
+    def test_wait_cli_response__signal_before_pid__forwarded_once_pid_known(self):
+        client, server = socket.socketpair()
+
+        def respond():
+            time.sleep(0.2)
+            signal.pthread_kill(threading.main_thread().ident, signal.SIGTERM)
+            time.sleep(0.2)
+            server.sendall(b'pid 12345\n')
+            server.sendall(b'exit 143\n')
+
+        thread = threading.Thread(target=respond)
+        with mock.patch.object(os, 'kill') as mock_kill:
+            thread.start()
+            code = cli_server.wait_cli_response(client)
+        thread.join()
+        client.close()
+        server.close()
+
+        assert code == 143
+        mock_kill.assert_called_once_with(12345, signal.SIGTERM)
+
+
+class TestCliServerPlugins(object):
+    def setup_method(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.server = cli_server.CliServer(os.path.join(self.tmp_dir, 'cli.sock'), ['stub'])
+        self.server.plugins_signature = {'stub': {'plugins': 1}}
+        self.client, self.conn = socket.socketpair()
+        self.conn.setblocking(False)
+        self.server.pending[self.conn] = cli_server.PendingRequest(self.conn)
+        self.server.selector.register(self.conn, selectors.EVENT_READ)
+
+    def teardown_method(self):
+        self.client.close()
+        self.server.selector.close()
+        shutil.rmtree(self.tmp_dir)
+
+    def send_request(self):
+        with tempfile.TemporaryFile() as stdio, mock.patch.object(sys, 'stdin', stdio), \
+                mock.patch.object(sys, 'stdout', stdio), mock.patch.object(sys, 'stderr', stdio):
+            cli_server.send_cli_request(self.client, 'stub', ['a'])
+
+    def read_request(self, signature):
+        with mock.patch.object(cli_server, 'get_cli_plugins_signature', return_value=signature), \
+                mock.patch.object(self.server, 'fork_request') as mock_fork_request:
+            self.server.read_request(self.conn)
+        return mock_fork_request
+
+    def test_read_request__same_plugins__request_run(self):
+        self.send_request()
+
+        mock_fork_request = self.read_request({'stub': {'plugins': 1}})
+
+        mock_fork_request.assert_called_once()
+        assert not self.server.restarting
+
+    def test_read_request__plugins_changed__client_runs_in_process_and_server_restarts(self):
+        self.send_request()
+
+        mock_fork_request = self.read_request({'stub': {'plugins': 2}})
+
+        mock_fork_request.assert_not_called()
+        assert self.server.restarting
+        assert cli_server.wait_cli_response(self.client) is None
+
+    def test_run_cli_command__server_restarting__run_in_process(self):
+        with mock.patch.object(cli_server, 'connect_cli_server', return_value=self.client), \
+                mock.patch.object(cli_server, 'send_cli_request'), \
+                mock.patch.object(cli_server, 'wait_cli_response', return_value=None), \
+                mock.patch.object(cli_server, 'run_cli_command_in_process', return_value=0) as mock_run_in_process:
+            assert cli_server.run_cli_command('show') == 0
+
+        mock_run_in_process.assert_called_once_with('show')
+
+    def test_restart__daemonized_server__re_executed_in_foreground(self):
+        with mock.patch.object(sys, 'argv', ['sonic-cli-server', '-y']), \
+                mock.patch.object(self.server, 'close'), mock.patch.object(os, 'execv') as mock_execv:
+            self.server.restart()
+
+        mock_execv.assert_called_once_with(sys.executable,
+                                           [sys.executable, 'sonic-cli-server', '-y', '--foreground'])
@@ -1994,6 +1994,24 @@ class TestGenericUpdateCommands(unittest.TestCase):
         self.assertNotEqual(unexpected_exit_code, result.exit_code)
         self.assertTrue(any_error_message in result.output)
 
+    def test_apply_patch__parallel_with_sort_workers__usage_error_returned(self):
+        # Arrange
+        expected_exit_code = 2
+        expected_output = "--parallel cannot be used with --sort-workers greater than 1"
+        mock_generic_updater = mock.Mock()
+        with mock.patch('config.main.GenericUpdater', return_value=mock_generic_updater):
+            with mock.patch('builtins.open', mock.mock_open(read_data=self.any_patch_as_text)):
+
+                # Act
+                result = self.runner.invoke(config.config.commands["apply-patch"],
+                                            [self.any_path, "--parallel", "--sort-workers", "2"],
+                                            catch_exceptions=False)
+
+        # Assert
+        self.assertEqual(expected_exit_code, result.exit_code)
+        self.assertTrue(expected_output in result.output)
+        mock_generic_updater.apply_patch.assert_not_called()
+
     def test_apply_patch__optional_parameters_passed_correctly(self):
         self.validate_apply_patch_optional_parameter(
             ["--format", ConfigFormat.SONICYANG.name],
@@ -4107,7 +4125,7 @@ class TestApplyPatchMultiAsic(unittest.TestCase):
 
     @patch('generic_config_updater.generic_updater.subprocess.Popen')
     @patch('generic_config_updater.generic_updater.Util.ensure_checkpoints_dir_exists', mock.Mock(return_value=True))
-    @patch('generic_config_updater.generic_updater.Util.save_json_file', MagicMock())
+    @patch('generic_config_updater.generic_updater.Util.save_checkpoint', MagicMock())
     def test_checkpoint_multiasic(self, mock_subprocess_popen):
         allconfigs = copy.deepcopy(self.all_config)
 
@@ -8,6 +8,10 @@ import pytest
 from sonic_py_common import device_info, multi_asic
 from swsscommon.swsscommon import ConfigDBConnector
 
+# The tests generate and reload plugins within the same process, and mock the loading of the YANG models
+os.environ['SONIC_PLUGINS_MANIFEST'] = '0'
+os.environ['SONIC_YANG_CACHE'] = '0'
+
 from .mock_tables import dbconnector
 from . import show_ip_route_common
 from .bgp_commands_input.bgp_neighbor_test_vector import(
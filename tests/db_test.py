@@ -0,0 +1,135 @@
+from unittest import mock
+
+import pytest
+
+from utilities_common import constants
+from utilities_common import db as db_module
+from utilities_common.db import Db, LazyClients, LazySonicV2Connector
+
+
+class TestLazyClients(object):
+    def test_getitem__known_namespace__client_created_once(self):
+        factory = mock.MagicMock(side_effect=lambda ns: object())
+        clients = LazyClients(['', 'asic0'], factory)
+
+        client = clients['asic0']
+
+        assert clients['asic0'] is client
+        factory.assert_called_once_with('asic0')
+        assert list(clients) == ['', 'asic0']
+        assert len(clients) == 2
+
+    def test_getitem__unknown_namespace__key_error_and_no_client_created(self):
+        factory = mock.MagicMock()
+        clients = LazyClients([''], factory)
+
+        with pytest.raises(KeyError):
+            clients['asic0']
+        assert clients.get('asic0') is None
+        factory.assert_not_called()
+
+    def test_iteration__no_access__no_client_created(self):
+        factory = mock.MagicMock()
+        clients = LazyClients(['', 'asic0'], factory)
+
+        assert 'asic0' in clients
+        assert list(clients.keys()) == ['', 'asic0']
+        factory.assert_not_called()
+
+
+class TestLazySonicV2Connector(object):
+    # The mocked databases of the unit tests replace SonicV2Connector, patch the
+    # base LazySonicV2Connector was actually built on
+    def test_ensure_connected__first_access__connected_once(self):
+        with mock.patch.object(db_module.SonicV2Connector, 'connect') as mock_connect, \
+                mock.patch.object(db_module.SonicV2Connector, 'keys', return_value=[]) as mock_keys:
+            connector = LazySonicV2Connector(host="127.0.0.1")
+
+            connector.keys('STATE_DB', '*')
+            connector.keys('STATE_DB', '*')
+
+        mock_connect.assert_called_once_with('STATE_DB', True)
+        assert mock_keys.call_count == 2
+        assert connector.connected_dbs == {'STATE_DB'}
+
+    def test_ensure_connected__explicitly_connected__not_connected_again(self):
+        with mock.patch.object(db_module.SonicV2Connector, 'connect') as mock_connect, \
+                mock.patch.object(db_module.SonicV2Connector, 'get_all', return_value={}):
+            connector = LazySonicV2Connector(host="127.0.0.1")
+            connector.connect('APPL_DB')
+
+            connector.get_all('APPL_DB', 'PORT_TABLE:Ethernet0')
+
+        mock_connect.assert_called_once_with('APPL_DB', True)
+
+    def test_close__closed_database__connected_again_on_access(self):
+        with mock.patch.object(db_module.SonicV2Connector, 'connect') as mock_connect, \
+                mock.patch.object(db_module.SonicV2Connector, 'close'), \
+                mock.patch.object(db_module.SonicV2Connector, 'exists', return_value=True):
+            connector = LazySonicV2Connector(host="127.0.0.1")
+            connector.ensure_connected('STATE_DB')
+            connector.ensure_connected('APPL_DB')
+
+            connector.close('STATE_DB')
+            connector.exists('STATE_DB', 'PORT_TABLE|Ethernet0')
+            connector.close()
+
+        assert mock_connect.call_count == 3
+        assert connector.connected_dbs == set()
+
+
+class TestConnectorCache(object):
+    def setup_method(self):
+        db_module.enable_connector_cache()
+
+    def teardown_method(self):
+        db_module.enable_connector_cache(False)
+
+    def test_get_connector__cache_enabled__factory_called_once_per_key(self):
+        factory = mock.MagicMock(side_effect=lambda: object())
+
+        connector = db_module.get_connector('', 'db', factory)
+
+        assert db_module.get_connector('', 'db', factory) is connector
+        assert db_module.get_connector('asic0', 'db', factory) is not connector
+        assert db_module.get_connector('', 'cfgdb', factory) is not connector
+        assert factory.call_count == 3
+
+    def test_get_connector__cache_disabled__factory_called_every_time(self):
+        factory = mock.MagicMock(side_effect=lambda: object())
+        db_module.get_connector('', 'db', factory)
+
+        db_module.enable_connector_cache(False)
+        db_module.get_connector('', 'db', factory)
+        db_module.get_connector('', 'db', factory)
+
+        assert factory.call_count == 3
+        assert not db_module.is_connector_cache_enabled()
+
+    def test_db__cache_enabled__connectors_shared_and_created_on_access(self):
+        with mock.patch.object(db_module.multi_asic, 'is_multi_asic', return_value=False), \
+                mock.patch.object(db_module, 'connect_config_db') as mock_connect_config_db, \
+                mock.patch.object(db_module, 'create_db') as mock_create_db:
+            db1 = Db()
+            db2 = Db()
+
+            mock_connect_config_db.assert_not_called()
+            mock_create_db.assert_not_called()
+
+            assert db1.cfgdb is db2.cfgdb
+            assert db1.db is db2.db
+
+        mock_connect_config_db.assert_called_once_with(constants.DEFAULT_NAMESPACE)
+        mock_create_db.assert_called_once_with(constants.DEFAULT_NAMESPACE)
+
+    def test_db__setter__only_this_db_client_replaced(self):
+        with mock.patch.object(db_module.multi_asic, 'is_multi_asic', return_value=False), \
+                mock.patch.object(db_module, 'create_db'):
+            db1 = Db()
+            db2 = Db()
+            replacement = object()
+
+            db1.db = replacement
+
+            assert db1.db is replacement
+            assert db2.db is not replacement
@@ -0,0 +1,205 @@
+import copy
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+import generic_config_updater.checkpoint_store as cs
+from generic_config_updater.gu_common import GenericConfigUpdaterError
+
+
+class TestCheckpointStore(unittest.TestCase):
+    def setUp(self):
+        self.checkpoints_dir = tempfile.mkdtemp()
+        self.store = cs.CheckpointStore(self.checkpoints_dir)
+        self.config = {
+            "PORT": {"Ethernet{}".format(i): {"lanes": str(i), "mtu": "9100"} for i in range(0, 64, 4)},
+            "VLAN": {"Vlan1000": {"vlanid": "1000"}},
+            "DEVICE_METADATA": {"localhost": {"hostname": "sonic"}}
+        }
+
+    def tearDown(self):
+        shutil.rmtree(self.checkpoints_dir)
+
+    def test_get_checkpoint__saved_checkpoint__same_config_returned(self):
+        # Act
+        self.store.save_checkpoint("cp1", self.config)
+        actual = self.store.get_checkpoint("cp1")
+
+        # Assert
+        self.assertEqual(self.config, actual)
+        self.assertEqual(["cp1"], self.store.get_checkpoint_names())
+        self.assertIn("cp1", self.store.get_checkpoint_times())
+
+    def test_save_checkpoint__unchanged_tables__chunks_shared(self):
+        # Arrange
+        config = copy.deepcopy(self.config)
+        config["VLAN"]["Vlan1000"]["mtu"] = "9100"
+
+        # Act
+        self.store.save_checkpoint("cp1", self.config)
+        self.store.save_checkpoint("cp2", config)
+
+        # Assert
+        index = self.store.load_index()
+        cp1_tables = index["checkpoints"]["cp1"]["tables"]
+        cp2_tables = index["checkpoints"]["cp2"]["tables"]
+        self.assertEqual(cp1_tables["PORT"], cp2_tables["PORT"])
+        self.assertNotEqual(cp1_tables["VLAN"], cp2_tables["VLAN"])
+        self.assertEqual(4, len(index["chunks"]))
+        self.assertEqual(4, self.count_chunk_files())
+        self.assertEqual(config, self.store.get_checkpoint("cp2"))
+
+    def test_save_checkpoint__changed_key_of_large_table__saved_as_delta(self):
+        # Arrange
+        config = copy.deepcopy(self.config)
+        config["PORT"]["Ethernet0"]["mtu"] = "1500"
+        config["PORT"].pop("Ethernet4")
+
+        # Act
+        self.store.save_checkpoint("cp1", self.config)
+        self.store.save_checkpoint("cp2", config)
+
+        # Assert
+        index = self.store.load_index()
+        port_chunk = index["checkpoints"]["cp2"]["tables"]["PORT"]
+        cp1_port_chunk = index["checkpoints"]["cp1"]["tables"]["PORT"]
+        self.assertEqual({"base": cp1_port_chunk, "depth": 1}, index["chunks"][port_chunk])
+        self.assertEqual(config, self.store.get_checkpoint("cp2"))
+        self.assertEqual(self.config, self.store.get_checkpoint("cp1"))
+
+    def test_save_checkpoint__many_changes__delta_chain_limited(self):
+        # Arrange
+        config = copy.deepcopy(self.config)
+
+        # Act
+        for i in range(cs.CHECKPOINT_MAX_DELTA_CHAIN + 2):
+            config["PORT"]["Ethernet0"]["description"] = str(i)
+            self.store.save_checkpoint(f"cp{i}", config)
+
+        # Assert
+        index = self.store.load_index()
+        depths = [index["chunks"][checkpoint["tables"]["PORT"]]["depth"]
+                  for checkpoint in index["checkpoints"].values()]
+        self.assertEqual(list(range(cs.CHECKPOINT_MAX_DELTA_CHAIN + 1)) + [0], depths)
+        self.assertEqual(config, self.store.get_checkpoint(f"cp{cs.CHECKPOINT_MAX_DELTA_CHAIN + 1}"))
+
+    def test_get_checkpoint__scoped_checkpoint__config_of_every_scope_returned(self):
+        # Arrange
+        config = {"localhost": self.config, "asic0": copy.deepcopy(self.config), "asic1": {"VLAN": {}}}
+        config["asic0"]["DEVICE_METADATA"]["localhost"]["hostname"] = "asic0"
+
+        # Act
+        self.store.save_checkpoint("cp1", config, scoped=True)
+        actual = self.store.get_checkpoint("cp1")
+
+        # Assert
+        self.assertEqual(config, actual)
+        self.assertIsNot(actual["localhost"]["PORT"], actual["asic0"]["PORT"])
+
+    def test_get_checkpoint__chunks_of_other_checkpoints_missing__config_returned(self):
+        # Arrange
+        other_config = {"ACL_TABLE": {"EVERFLOW": {"type": "MIRROR"}}}
+        self.store.save_checkpoint("cp1", self.config)
+        self.store.save_checkpoint("cp2", other_config)
+        os.remove(self.store.get_chunk_path(self.store.load_index()["checkpoints"]["cp2"]["tables"]["ACL_TABLE"]))
+
+        # Act
+        actual = self.store.get_checkpoint("cp1")
+
+        # Assert
+        self.assertEqual(self.config, actual)
+
+    def test_get_checkpoint__corrupted_chunk__failure(self):
+        # Arrange
+        self.store.save_checkpoint("cp1", self.config)
+        path = self.store.get_chunk_path(self.store.load_index()["checkpoints"]["cp1"]["tables"]["VLAN"])
+        with open(path, "wb") as fh:
+            fh.write(cs.compress(cs.dump_canonical_json({"content": {"Vlan2000": {}}})))
+
+        # Act and assert
+        self.assertRaises(GenericConfigUpdaterError, self.store.get_checkpoint, "cp1")
+
+    def test_get_checkpoint__checkpoint_does_not_exist__failure(self):
+        self.assertRaises(ValueError, self.store.get_checkpoint, "cp1")
+
+    def test_delete_checkpoint__base_of_other_checkpoint__only_unused_chunks_deleted(self):
+        # Arrange
+        config = copy.deepcopy(self.config)
+        config["PORT"]["Ethernet0"]["mtu"] = "1500"
+        config["VLAN"]["Vlan1000"]["mtu"] = "9100"
+        self.store.save_checkpoint("cp1", self.config)
+        self.store.save_checkpoint("cp2", config)
+
+        # Act
+        self.store.delete_checkpoint("cp1")
+
+        # Assert
+        index = self.store.load_index()
+        self.assertEqual(["cp2"], self.store.get_checkpoint_names())
+        # The PORT delta still needs its base, the former VLAN is not needed anymore
+        self.assertEqual(4, len(index["chunks"]))
+        self.assertEqual(4, self.count_chunk_files())
+        self.assertEqual(config, self.store.get_checkpoint("cp2"))
+
+    def test_delete_checkpoint__last_checkpoint__all_chunks_deleted(self):
+        # Arrange
+        self.store.save_checkpoint("cp1", self.config)
+
+        # Act
+        self.store.delete_checkpoint("cp1")
+
+        # Assert
+        self.assertEqual([], self.store.get_checkpoint_names())
+        self.assertEqual(0, self.count_chunk_files())
+
+    def test_save_checkpoint__existing_name__checkpoint_replaced(self):
+        # Arrange
+        config = {"VLAN": {}}
+        self.store.save_checkpoint("cp1", self.config)
+
+        # Act
+        self.store.save_checkpoint("cp1", config)
+
+        # Assert
+        self.assertEqual(["cp1"], self.store.get_checkpoint_names())
+        self.assertEqual(config, self.store.get_checkpoint("cp1"))
+        self.assertEqual(1, self.count_chunk_files())
+
+    def test_save_checkpoint__interleaved_saves__both_checkpoints_kept(self):
+        # Arrange
+        other_store = cs.CheckpointStore(self.checkpoints_dir)
+        other_config = {"VLAN": {}}
+        index_loaded = threading.Event()
+        resume = threading.Event()
+        load_index = self.store.load_index
+
+        def pausing_load_index():
+            index = load_index()
+            index_loaded.set()
+            resume.wait(5)
+            return index
+
+        self.store.load_index = pausing_load_index
+        first_save = threading.Thread(target=self.store.save_checkpoint, args=("cp1", self.config))
+        second_save = threading.Thread(target=other_store.save_checkpoint, args=("cp2", other_config))
+
+        # Act
+        first_save.start()
+        self.assertTrue(index_loaded.wait(5))
+        second_save.start()
+        second_save.join(0.5)
+        second_save_blocked = second_save.is_alive()
+        resume.set()
+        first_save.join(5)
+        second_save.join(5)
+
+        # Assert
+        self.assertTrue(second_save_blocked)
+        self.assertEqual(["cp1", "cp2"], other_store.get_checkpoint_names())
+        self.assertEqual(self.config, other_store.get_checkpoint("cp1"))
+        self.assertEqual(other_config, other_store.get_checkpoint("cp2"))
+
+    def count_chunk_files(self):
+        return sum(len(files) for _, _, files in os.walk(self.store.chunks_dir))
@@ -296,6 +296,36 @@ class TestFileSystemConfigRollbacker(unittest.TestCase):
         # Assert
         self.assertFalse(self.check_checkpoint_exists(self.any_checkpoint_name))
 
+    def test_checkpoint__checkpoint_file_with_same_name__replaced_by_stored_checkpoint(self):
+        # Arrange
+        self.create_checkpoints_dir()
+        self.add_checkpoint(self.any_checkpoint_name, {"ANY_TABLE": {}})
+        rollbacker = self.create_rollbacker()
+
+        # Act
+        rollbacker.checkpoint(self.any_checkpoint_name)
+
+        # Assert
+        self.assertFalse(os.path.isfile(os.path.join(self.checkpoints_dir,
+                                                     f"{self.any_checkpoint_name}{self.checkpoint_ext}")))
+        self.assertCountEqual([self.any_checkpoint_name], rollbacker.list_checkpoints())
+        self.assertEqual(self.any_config, self.get_checkpoint(self.any_checkpoint_name))
+
+    def test_list_checkpoints__stored_checkpoint_and_checkpoint_file_with_time__both_listed(self):
+        # Arrange
+        self.create_checkpoints_dir()
+        mod_time = self.add_checkpoint(self.any_checkpoint_name, self.any_config, mod_time=0)
+        rollbacker = self.create_rollbacker()
+        rollbacker.checkpoint(self.any_other_checkpoint_name)
+
+        # Act
+        actual = rollbacker.list_checkpoints(includes_time=True)
+
+        # Assert
+        self.assertEqual([self.any_other_checkpoint_name, self.any_checkpoint_name],
+                         self.extract_checkpoint_names(actual))
+        self.assertEqual(mod_time, actual[1]["time"])
+
     def test_multiple_operations(self):
         rollbacker = self.create_rollbacker()
 
@@ -374,14 +404,10 @@ class TestFileSystemConfigRollbacker(unittest.TestCase):
         return datetime.fromtimestamp(mod_time, tz=timezone.utc).isoformat()
 
     def get_checkpoint(self, name):
-        path=os.path.join(self.checkpoints_dir, f"{name}{self.checkpoint_ext}")
-        with open(path) as fh:
-            text = fh.read()
-            return json.loads(text)
+        return gu.Util(checkpoints_dir=self.checkpoints_dir).get_checkpoint_content(name)
 
     def check_checkpoint_exists(self, name):
-        path=os.path.join(self.checkpoints_dir, f"{name}{self.checkpoint_ext}")
-        return os.path.isfile(path)
+        return gu.Util(checkpoints_dir=self.checkpoints_dir).check_checkpoint_exists(name)
 
     def create_rollbacker(self):
         replacer = Mock()
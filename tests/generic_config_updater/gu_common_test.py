@@ -1,6 +1,7 @@
 import copy
 import json
 import jsonpatch
+import pickle
 import sonic_yang
 import unittest
 import mock
@@ -10,6 +11,44 @@ from mock import patch
 from .gutest_helpers import create_side_effect_dict, Files
 import generic_config_updater.gu_common as gu_common
 
+class TestFreezeConfig(unittest.TestCase):
+    def test_freeze_config__equal_to_config_and_immutable(self):
+        config = {"ACL_TABLE": {"EVERFLOW": {"ports": ["Ethernet0"]}}}
+
+        actual = gu_common.freeze_config(config)
+
+        self.assertEqual(config, actual)
+        self.assertEqual(json.dumps(config), json.dumps(actual))
+        self.assertRaises(TypeError, actual.update, {"PORT": {}})
+        self.assertRaises(TypeError, actual["ACL_TABLE"]["EVERFLOW"]["ports"].append, "Ethernet4")
+
+    def test_freeze_config__frozen_subtrees_reused(self):
+        frozen_table = gu_common.freeze_config({"Ethernet0": {}})
+
+        actual = gu_common.freeze_config({"PORT": frozen_table})
+
+        self.assertIs(frozen_table, actual["PORT"])
+        self.assertIs(actual, gu_common.freeze_config(actual))
+
+    def test_hash__equal_configs__same_hash(self):
+        config1 = gu_common.freeze_config({"PORT": {"Ethernet0": {"lanes": "65"}}, "VLAN": {}})
+        config2 = gu_common.freeze_config({"VLAN": {}, "PORT": {"Ethernet0": {"lanes": "65"}}})
+        config3 = gu_common.freeze_config({"VLAN": {}, "PORT": {"Ethernet0": {"lanes": "66"}}})
+
+        self.assertEqual(hash(config1), hash(config2))
+        self.assertNotEqual(hash(config1), hash(config3))
+
+    def test_deepcopy_and_pickle(self):
+        config = gu_common.freeze_config({"ACL_TABLE": {"EVERFLOW": {"ports": ["Ethernet0"]}}})
+
+        copied = copy.deepcopy(config)
+        copied["ACL_TABLE"]["EVERFLOW"]["ports"].append("Ethernet4")
+        unpickled = pickle.loads(pickle.dumps(config))
+
+        self.assertEqual({"ACL_TABLE": {"EVERFLOW": {"ports": ["Ethernet0"]}}}, config)
+        self.assertEqual(config, unpickled)
+        self.assertIsInstance(unpickled["ACL_TABLE"], gu_common.FrozenConfigDict)
+
 class TestDryRunConfigWrapper(unittest.TestCase):
     @patch('generic_config_updater.gu_common.subprocess.Popen')
     def test_get_config_db_as_json(self, mock_popen):
@@ -494,6 +533,152 @@ class TestConfigWrapper(unittest.TestCase):
         check(sy1, config_wrapper.sonic_yang_with_loaded_models)
         check(sy2, config_wrapper.sonic_yang_with_loaded_models)
 
+    def test_get_tables_references__leafref_tables__returned(self):
+        # Arrange
+        config_wrapper = gu_common.ConfigWrapper()
+
+        # Act
+        tables_references = config_wrapper.get_tables_references()
+        tables_dependents = config_wrapper.get_tables_dependents()
+
+        # Assert
+        self.assertIn("VLAN", tables_references["VLAN_MEMBER"])
+        self.assertIn("PORT", tables_references["VLAN_MEMBER"])
+        self.assertNotIn("VLAN_MEMBER", tables_references["VLAN_MEMBER"])
+        self.assertIn("VLAN_MEMBER", tables_dependents["VLAN"])
+        self.assertIn("VLAN_MEMBER", tables_dependents["PORT"])
+
+class TestIncrementalConfigValidator(unittest.TestCase):
+    def setUp(self):
+        self.base_config = {
+            "PORT": {"Ethernet0": {"lanes": "65"}},
+            "VLAN": {"Vlan1000": {}},
+            "VLAN_MEMBER": {"Vlan1000|Ethernet0": {}},
+            "ACL_TABLE": {"EVERFLOW": {}},
+            "DEVICE_METADATA": {"localhost": {}}
+        }
+        self.config_wrapper = Mock()
+        self.config_wrapper.get_tables_references.return_value = {
+            "PORT": set(),
+            "VLAN": set(),
+            "VLAN_MEMBER": {"VLAN", "PORT"},
+            "ACL_TABLE": {"PORT", "DEVICE_METADATA"},
+            "DEVICE_METADATA": set()
+        }
+        self.config_wrapper.get_tables_dependents.return_value = {
+            "PORT": {"VLAN_MEMBER", "ACL_TABLE"},
+            "VLAN": {"VLAN_MEMBER"},
+            "DEVICE_METADATA": {"ACL_TABLE"}
+        }
+        self.config_wrapper.validate_config_db_config.return_value = (True, None)
+        self.config_wrapper.validate_config_db_config_yang.return_value = (True, None)
+        self.config_wrapper.validate_config_db_config_supplemental.return_value = (True, None)
+        self.validator = gu_common.IncrementalConfigValidator(self.config_wrapper)
+
+    def test_get_affected_tables__changed_table__dependents_and_references_returned(self):
+        config = copy.deepcopy(self.base_config)
+        config["VLAN"]["Vlan1000"]["mtu"] = "9100"
+
+        actual = self.validator.get_affected_tables(self.base_config, config)
+
+        self.assertEqual({"VLAN", "VLAN_MEMBER", "PORT"}, actual)
+
+    def test_get_affected_tables__removed_table__dependents_and_references_returned(self):
+        config = copy.deepcopy(self.base_config)
+        config.pop("DEVICE_METADATA")
+
+        actual = self.validator.get_affected_tables(self.base_config, config)
+
+        self.assertEqual({"DEVICE_METADATA", "ACL_TABLE", "PORT"}, actual)
+
+    def test_validate_config_db_config__valid_base__only_affected_tables_validated(self):
+        # Arrange
+        config = copy.deepcopy(self.base_config)
+        config["VLAN"]["Vlan1000"]["mtu"] = "9100"
+
+        # Act
+        actual, error = self.validator.validate_config_db_config(self.base_config, config)
+
+        # Assert
+        self.assertTrue(actual)
+        self.assertIsNone(error)
+        self.config_wrapper.validate_config_db_config.assert_called_once_with(self.base_config)
+        self.config_wrapper.validate_config_db_config_yang.assert_called_once_with(
+            {"VLAN": config["VLAN"], "VLAN_MEMBER": config["VLAN_MEMBER"], "PORT": config["PORT"]})
+        self.config_wrapper.validate_config_db_config_supplemental.assert_called_once_with(config)
+
+    def test_validate_config_db_config__invalid_affected_tables__returns_false(self):
+        # Arrange
+        config = copy.deepcopy(self.base_config)
+        config["VLAN"].pop("Vlan1000")
+        self.config_wrapper.validate_config_db_config_yang.return_value = (False, "error")
+
+        # Act
+        actual, error = self.validator.validate_config_db_config(self.base_config, config)
+
+        # Assert
+        self.assertFalse(actual)
+        self.assertEqual("error", error)
+        self.config_wrapper.validate_config_db_config_supplemental.assert_not_called()
+
+    def test_validate_config_db_config__invalid_base__full_config_validated(self):
+        # Arrange
+        config = copy.deepcopy(self.base_config)
+        config["VLAN"]["Vlan1000"]["mtu"] = "9100"
+        self.config_wrapper.validate_config_db_config.side_effect = \
+            create_side_effect_dict({(str(self.base_config),): (False, "error"),
+                                     (str(config),): (True, None)})
+
+        # Act
+        actual, error = self.validator.validate_config_db_config(self.base_config, config)
+
+        # Assert
+        self.assertTrue(actual)
+        self.assertIsNone(error)
+        self.config_wrapper.validate_config_db_config_yang.assert_not_called()
+
+    def test_validate_config_db_config__validated_config_as_base__base_not_validated_again(self):
+        # Arrange
+        config1 = copy.deepcopy(self.base_config)
+        config1["VLAN"]["Vlan1000"]["mtu"] = "9100"
+        config2 = copy.deepcopy(config1)
+        config2["ACL_TABLE"]["EVERFLOW"]["policy_desc"] = "EVERFLOW"
+
+        # Act
+        self.validator.validate_config_db_config(self.base_config, config1)
+        actual, _ = self.validator.validate_config_db_config(copy.deepcopy(config1), config2)
+
+        # Assert
+        self.assertTrue(actual)
+        self.config_wrapper.validate_config_db_config.assert_called_once_with(self.base_config)
+
+    def test_validate_config_db_config__base_set_valid__base_not_validated(self):
+        # Arrange
+        config = copy.deepcopy(self.base_config)
+        config["VLAN"]["Vlan1000"]["mtu"] = "9100"
+
+        # Act
+        self.validator.set_config_valid(copy.deepcopy(self.base_config))
+        actual, _ = self.validator.validate_config_db_config(self.base_config, config)
+
+        # Assert
+        self.assertTrue(actual)
+        self.config_wrapper.validate_config_db_config.assert_not_called()
+        self.config_wrapper.validate_config_db_config_yang.assert_called_once()
+
+    def test_validate_config_db_config__yang_models__same_result_as_full_validation(self):
+        # Arrange
+        validator = gu_common.IncrementalConfigValidator(gu_common.ConfigWrapper())
+
+        # Act
+        valid, _ = validator.validate_config_db_config(Files.CONFIG_DB_AS_JSON, Files.CONFIG_DB_AS_JSON)
+        invalid, error = validator.validate_config_db_config(Files.CONFIG_DB_AS_JSON, Files.CONFIG_DB_AS_JSON_INVALID)
+
+        # Assert
+        self.assertTrue(valid)
+        self.assertFalse(invalid)
+        self.assertIsNotNone(error)
+
 class TestPatchWrapper(unittest.TestCase):
     def setUp(self):
         self.config_wrapper_mock = gu_common.ConfigWrapper()
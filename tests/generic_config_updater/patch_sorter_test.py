@@ -1,5 +1,7 @@
+import copy
 from collections import OrderedDict
 import jsonpatch
+import os
 import unittest
 from unittest.mock import MagicMock, Mock
 
@@ -108,6 +110,21 @@ class TestDiff(unittest.TestCase):
         self.assertEqual(diff, other_diff)
         self.assertTrue(diff == other_diff)
 
+    def test_apply_move__unchanged_tables_shared_with_current_config(self):
+        # Arrange
+        current_config = {"PORT": {"Ethernet0": {"lanes": "65"}}, "VLAN": {"Vlan1000": {}}}
+        diff = ps.Diff(current_config, {})
+        move = ps.JsonMove.from_operation({"op": "replace", "path": "/PORT/Ethernet0/lanes", "value": "66"})
+
+        # Act
+        actual = diff.apply_move(move)
+
+        # Assert
+        self.assertEqual({"PORT": {"Ethernet0": {"lanes": "66"}}, "VLAN": {"Vlan1000": {}}}, actual.current_config)
+        self.assertEqual({"PORT": {"Ethernet0": {"lanes": "65"}}, "VLAN": {"Vlan1000": {}}}, diff.current_config)
+        self.assertIs(diff.current_config["VLAN"], actual.current_config["VLAN"])
+        self.assertIs(diff.target_config, actual.target_config)
+
 class TestJsonMove(unittest.TestCase):
     def setUp(self):
         self.operation_wrapper = OperationWrapper()
@@ -412,6 +429,42 @@ class TestJsonMove(unittest.TestCase):
                              tokens,
                              jsonmove)
 
+    def test_apply__same_result_as_jsonpatch(self):
+        config = {"PORT": {"Ethernet0": {"lanes": "65"}}, "ACL_TABLE": {"EVERFLOW": {"ports": ["Ethernet0"]}}}
+        operations = [
+            {"op": "add", "path": "/PORT/Ethernet4", "value": {"lanes": "66"}},
+            {"op": "add", "path": "/ACL_TABLE/EVERFLOW/ports/0", "value": "Ethernet4"},
+            {"op": "add", "path": "/ACL_TABLE/EVERFLOW/ports/-", "value": "Ethernet4"},
+            {"op": "replace", "path": "/PORT/Ethernet0/lanes", "value": "66"},
+            {"op": "replace", "path": "/ACL_TABLE/EVERFLOW/ports/0", "value": "Ethernet4"},
+            {"op": "replace", "path": "", "value": {"VLAN": {}}},
+            {"op": "remove", "path": "/ACL_TABLE/EVERFLOW/ports/0"},
+            {"op": "remove", "path": "/PORT"},
+        ]
+        for operation in operations:
+            expected = jsonpatch.JsonPatch([operation]).apply(config)
+
+            actual = ps.JsonMove.from_operation(operation).apply(config)
+
+            self.assertEqual(expected, actual, operation)
+            self.assertEqual({"PORT": {"Ethernet0": {"lanes": "65"}},
+                              "ACL_TABLE": {"EVERFLOW": {"ports": ["Ethernet0"]}}}, config)
+
+    def test_apply__path_does_not_exist__failure(self):
+        move = ps.JsonMove.from_operation({"op": "replace", "path": "/PORT/Ethernet4/lanes", "value": "66"})
+
+        self.assertRaises(jsonpatch.JsonPatchConflict, move.apply, {"PORT": {"Ethernet0": {"lanes": "65"}}})
+
+    def test_apply__result_is_immutable(self):
+        move = ps.JsonMove.from_operation({"op": "add", "path": "/PORT/Ethernet4", "value": {"lanes": "66"}})
+
+        actual = move.apply({"PORT": {}})
+
+        self.assertRaises(TypeError, actual["PORT"].pop, "Ethernet4")
+        copied = copy.deepcopy(actual)
+        copied["PORT"].pop("Ethernet4")
+        self.assertEqual({"PORT": {}}, copied)
+
     def verify_jsonmove(self,
                         expected_operation,
                         expected_op_type,
@@ -753,6 +806,110 @@ class TestMoveWrapper(unittest.TestCase):
         # Assert
         self.assertIs(self.any_diff, actual)
 
+    def test_validate_moves__no_validation_pool__moves_validated_in_order(self):
+        # Arrange
+        move_validators = [self.fail_move_validator]
+        move_wrapper = ps.MoveWrapper([], [], [], move_validators)
+        self.fail_move_validator.validate.side_effect = create_side_effect_dict(
+            {(str(self.any_move), str(self.any_diff)): False,
+             (str(self.any_other_move1), str(self.any_diff)): True})
+        expected = [(self.any_move, False), (self.any_other_move1, True)]
+
+        # Act
+        actual = list(move_wrapper.validate_moves([self.any_move, self.any_other_move1], self.any_diff))
+
+        # Assert
+        self.assertListEqual(expected, actual)
+
+    def test_validate_moves__validation_pool__pool_results_returned(self):
+        # Arrange
+        validation_pool = Mock()
+        validation_pool.validate_moves.side_effect = create_side_effect_dict(
+            {(str([self.any_move]), str(self.any_diff)): iter([(self.any_move, True)])})
+        move_wrapper = ps.MoveWrapper([], [], [], [self.fail_move_validator], validation_pool)
+
+        # Act
+        actual = list(move_wrapper.validate_moves([self.any_move], self.any_diff))
+
+        # Assert
+        self.assertListEqual([(self.any_move, True)], actual)
+        self.fail_move_validator.validate.assert_not_called()
+
+class TestMoveValidationPool(unittest.TestCase):
+    def setUp(self):
+        self.config_wrapper = ConfigWrapper()
+        self.diff = ps.Diff(Files.CROPPED_CONFIG_DB_AS_JSON, Files.ANY_CONFIG_DB)
+        move_generators = [ps.LowLevelMoveGenerator(PathAddressing(self.config_wrapper))]
+        move_validators = [ps.DeleteWholeConfigMoveValidator(),
+                           ps.FullConfigMoveValidator(self.config_wrapper,
+                                                      ps.IncrementalConfigValidator(self.config_wrapper))]
+        self.move_wrapper = ps.MoveWrapper(move_generators, [ps.KeyLevelMoveGenerator()], [], move_validators)
+
+    def test_validate_moves__multiple_workers__same_results_as_sequential(self):
+        # Arrange
+        moves = list(self.move_wrapper.generate(self.diff))
+        moves.append(ps.JsonMove(self.diff, OperationType.REMOVE, [], []))
+        expected = list(self.move_wrapper.validate_moves(moves, self.diff))
+        validation_pool = ps.MoveValidationPool(self.move_wrapper, self.config_wrapper, workers=2, batch_size=3)
+
+        # Act
+        try:
+            actual = list(validation_pool.validate_moves(moves, self.diff))
+        finally:
+            validation_pool.close()
+
+        # Assert
+        self.assertListEqual(expected, actual)
+        self.assertFalse(actual[-1][1])
+
+    def test_validate_moves__valid_move__simulated_config_remembered_as_valid(self):
+        # Arrange
+        move = ps.JsonMove.from_patch(Files.SINGLE_OPERATION_CONFIG_DB_PATCH)
+        move_wrapper = ps.MoveWrapper([], [], [], [ps.DeleteWholeConfigMoveValidator()])
+        validation_pool = ps.MoveValidationPool(move_wrapper, self.config_wrapper, workers=2)
+
+        # Act
+        try:
+            actual = list(validation_pool.validate_moves([move], self.diff))
+        finally:
+            validation_pool.close()
+
+        # Assert
+        self.assertListEqual([(move, True)], actual)
+        self.assertIn(hash(self.diff.apply_move(move).current_config), validation_pool.valid_configs)
+
+    def test_validate_moves__several_batches__diff_received_once_by_every_worker(self):
+        # Arrange
+        moves = [ps.JsonMove.from_patch(Files.SINGLE_OPERATION_CONFIG_DB_PATCH) for _ in range(6)]
+        move_wrapper = Mock()
+        # The object id of the diff in the worker process, with the id of the process
+        move_wrapper.validate.side_effect = lambda move, diff: (id(diff), os.getpid())
+        validation_pool = ps.MoveValidationPool(move_wrapper, Mock(), workers=2, batch_size=1)
+
+        # Act
+        try:
+            actual = [is_valid for _, is_valid in validation_pool.validate_moves(moves, self.diff)]
+        finally:
+            validation_pool.close()
+
+        # Assert
+        self.assertEqual(6, len(actual))
+        self.assertEqual(2, len(set(actual)))
+
+    def test_validate_moves__worker_error__error_raised(self):
+        # Arrange
+        move = ps.JsonMove.from_patch(Files.SINGLE_OPERATION_CONFIG_DB_PATCH)
+        move_wrapper = Mock()
+        move_wrapper.validate.side_effect = ValueError("any error")
+        validation_pool = ps.MoveValidationPool(move_wrapper, Mock(), workers=2)
+
+        # Act and assert
+        try:
+            with self.assertRaises(GenericConfigUpdaterError):
+                list(validation_pool.validate_moves([move], self.diff))
+        finally:
+            validation_pool.close()
+
 class TestJsonPointerFilter(unittest.TestCase):
     def test_get_paths__common_prefix__exact_match_returned(self):
         config = {
@@ -933,6 +1090,29 @@ class TestFullConfigMoveValidator(unittest.TestCase):
         # Act and assert
         self.assertTrue(validator.validate(self.any_move, self.any_diff))
 
+    def test_validate__incremental_validator__validates_against_current_config(self):
+        # Arrange
+        config_wrapper = Mock()
+        incremental_validator = Mock()
+        incremental_validator.validate_config_db_config.side_effect = \
+            create_side_effect_dict({(str(self.any_current_config), str(self.any_simulated_config)): (False, None)})
+        validator = ps.FullConfigMoveValidator(config_wrapper, incremental_validator)
+
+        # Act and assert
+        self.assertFalse(validator.validate(self.any_move, self.any_diff))
+        config_wrapper.validate_config_db_config.assert_not_called()
+
+    def test_set_config_valid__incremental_validator__forwarded(self):
+        # Arrange
+        incremental_validator = Mock()
+        validator = ps.FullConfigMoveValidator(Mock(), incremental_validator)
+
+        # Act
+        validator.set_config_valid(self.any_current_config)
+
+        # Assert
+        incremental_validator.set_config_valid.assert_called_once_with(self.any_current_config)
+
 class TestCreateOnlyMoveValidator(unittest.TestCase):
     def setUp(self):
         self.validator = ps.CreateOnlyMoveValidator(ps.PathAddressing())
@@ -0,0 +1,122 @@
+import os
+import shutil
+import sys
+import tempfile
+import textwrap
+from unittest import mock
+
+import click
+import pytest
+from click.testing import CliRunner
+
+import utilities_common.cli as clicommon
+
+LAZY_COMMANDS_MODULE = """
+import click
+
+@click.command()
+def status():
+    click.echo('status')
+
+@click.group()
+def stats():
+    pass
+
+@stats.command()
+def clear():
+    click.echo('stats clear')
+"""
+
+
+class TestLazyGroup(object):
+    def setup_method(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        with open(os.path.join(self.tmp_dir, 'lazy_group_commands.py'), 'w') as module_file:
+            module_file.write(textwrap.dedent(LAZY_COMMANDS_MODULE))
+        sys.path.insert(0, self.tmp_dir)
+
+    def teardown_method(self):
+        sys.path.remove(self.tmp_dir)
+        sys.modules.pop('lazy_group_commands', None)
+        shutil.rmtree(self.tmp_dir)
+
+    def make_cli(self, cls):
+        @click.group(cls=cls)
+        def cli():
+            pass
+
+        @cli.command()
+        def start():
+            click.echo('start')
+
+        cli.add_lazy_command('status', 'lazy_group_commands:status')
+        cli.add_lazy_command('stats', 'lazy_group_commands:stats')
+        return cli
+
+    def test_list_commands__lazy_commands__listed_without_import(self):
+        cli = self.make_cli(clicommon.LazyGroup)
+
+        assert cli.list_commands(None) == ['start', 'stats', 'status']
+        assert 'status' in cli.commands
+        assert 'lazy_group_commands' not in sys.modules
+
+    def test_invoke__lazy_subgroup__imported_and_run(self):
+        cli = self.make_cli(clicommon.LazyGroup)
+
+        result = CliRunner().invoke(cli, ['stats', 'clear'])
+
+        assert result.exit_code == 0
+        assert result.output == 'stats clear\n'
+        assert 'lazy_group_commands' in sys.modules
+        assert cli.commands['stats'] is sys.modules['lazy_group_commands'].stats
+
+    def test_invoke__loader_callable__called_once(self):
+        cli = self.make_cli(clicommon.LazyGroup)
+        loader = mock.MagicMock(return_value=click.Command('stop', callback=lambda: click.echo('stop')))
+        cli.add_lazy_command('stop', loader)
+
+        CliRunner().invoke(cli, ['stop'])
+        result = CliRunner().invoke(cli, ['stop'])
+
+        assert result.output == 'stop\n'
+        loader.assert_called_once_with()
+
+    def test_get_command__abbreviation__only_the_matching_command_imported(self):
+        cli = self.make_cli(clicommon.AbbreviationGroup)
+
+        result = CliRunner().invoke(cli, ['star'])
+
+        assert result.output == 'start\n'
+        assert 'lazy_group_commands' not in sys.modules
+        result = CliRunner().invoke(cli, ['statu'])
+        assert result.output == 'status\n'
+
+    def test_get_command__ambiguous_abbreviation__failure(self):
+        cli = self.make_cli(clicommon.AbbreviationGroup)
+
+        result = CliRunner().invoke(cli, ['stat'])
+
+        assert result.exit_code == 2
+        assert 'Too many matches: stats, status' in result.output
+
+    def test_get_command__alias__resolved_to_lazy_command(self):
+        cli = self.make_cli(clicommon.AliasedGroup)
+        config = clicommon.Config()
+        config.aliases['st'] = 'status'
+
+        with mock.patch.object(clicommon, '_config', config):
+            result = CliRunner().invoke(cli, ['st'])
+
+        assert result.exit_code == 0
+        assert result.output == 'status\n'
+
+    def test_get_command__bad_entry__error_raised_on_every_lookup(self):
+        cli = self.make_cli(clicommon.LazyGroup)
+        cli.add_lazy_command('missing', 'lazy_group_commands:missing')
+
+        for _ in range(2):
+            with pytest.raises(AttributeError):
+                cli.get_command(None, 'missing')
+
+        assert 'missing' in cli.list_commands(None)
+        assert cli.get_command(None, 'status') is sys.modules['lazy_group_commands'].status
@@ -0,0 +1,158 @@
+import os
+import shutil
+import struct
+import tempfile
+from array import array
+from unittest import mock
+
+import pytest
+
+from otn.slot import ocm
+from otn.utils import spectrum as spectrum_module
+from otn.utils.spectrum import OcmSpectrum, SPECTRUM_HEADER
+
+
+def make_channels(powers, start=191300000, width=50000):
+    return [{'lower-frequency': str(start + i * width), 'upper-frequency': str(start + (i + 1) * width),
+             'power': str(power)} for i, power in enumerate(powers)]
+
+
+class TestOcmSpectrum(object):
+    def setup_method(self):
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def teardown_method(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_from_channels__unsorted_and_invalid_slices__sorted_valid_slices(self):
+        channels = make_channels([-10.0, -20.0, -30.0])
+        channels.reverse()
+        channels.append({'lower-frequency': 'NA', 'upper-frequency': '0', 'power': '0'})
+        channels.append({'power': '-1'})
+
+        spectrum = OcmSpectrum.from_channels(channels)
+
+        assert len(spectrum) == 3
+        assert list(spectrum.lower) == [191300000, 191350000, 191400000]
+        assert list(spectrum.power) == [-10.0, -20.0, -30.0]
+
+    def test_channel_count_and_ripple__threshold__only_channel_slices_counted(self):
+        spectrum = OcmSpectrum.from_channels(make_channels([-40.0, -5.0, -40.0, -7.5, -40.0]))
+
+        assert spectrum.channel_count(-20.0) == 2
+        assert spectrum.ripple(-20.0) == pytest.approx(2.5)
+        assert spectrum.ripple(0.0) == 0.0
+
+    def test_tilt__linear_power__slope_in_db_per_thz(self):
+        # 1 dB more every 50 GHz slice is 20 dB/THz
+        spectrum = OcmSpectrum.from_channels(make_channels([-10.0, -9.0, -8.0, -7.0]))
+
+        assert spectrum.tilt() == pytest.approx(20.0)
+        assert OcmSpectrum.from_channels(make_channels([-10.0])).tilt() == 0.0
+
+    def test_peak_to_floor__channels_between_floor__delta_to_neighbour_floors(self):
+        spectrum = OcmSpectrum.from_channels(make_channels([-40.0, -10.0, -36.0, -12.0, -20.0]))
+
+        deltas = spectrum.peak_to_floor(-30.0)
+
+        assert [(lower, delta) for lower, _, delta in deltas] == [
+            (191350000, pytest.approx(-10.0 - (-38.0))),
+            (191450000, pytest.approx(-12.0 - (-36.0))),
+            (191500000, pytest.approx(-20.0 - (-36.0))),
+        ]
+
+    def test_diff__partially_overlapping_baseline__matched_slices_only(self):
+        spectrum = OcmSpectrum.from_channels(make_channels([-10.0, -11.0, -12.0]))
+        baseline = OcmSpectrum.from_channels(make_channels([-9.0, -13.0], start=191350000))
+
+        deltas = spectrum.diff(baseline)
+
+        assert deltas == [(191350000, 191400000, -11.0, -9.0, pytest.approx(-2.0)),
+                          (191400000, 191450000, -12.0, -13.0, pytest.approx(1.0))]
+
+    def test_save_and_load__spectrum__same_spectrum_returned(self):
+        spectrum = OcmSpectrum.from_channels(make_channels([-10.5, -20.25, -30.0]))
+        path = os.path.join(self.tmp_dir, 'spectrum')
+
+        spectrum.save(path)
+        loaded = OcmSpectrum.load(path)
+
+        assert list(loaded.lower) == list(spectrum.lower)
+        assert list(loaded.upper) == list(spectrum.upper)
+        assert list(loaded.power) == list(spectrum.power)
+
+    def test_to_bytes__any_host__arrays_written_little_endian(self):
+        spectrum = OcmSpectrum.from_channels(make_channels([-10.5]))
+
+        data = spectrum.to_bytes()
+
+        assert struct.unpack_from('<qqd', data, SPECTRUM_HEADER.size) == (191300000, 191350000, -10.5)
+
+    def test_save_and_load__big_endian_host__little_endian_file(self):
+        spectrum = OcmSpectrum.from_channels(make_channels([-10.5, -20.25]))
+        little_endian = spectrum.to_bytes()
+
+        with mock.patch.object(spectrum_module.sys, 'byteorder', 'big'):
+            data = spectrum.to_bytes()
+            loaded = OcmSpectrum.from_bytes(data)
+
+        # Swapping on a little-endian host stands for a big-endian host, the
+        # file is the other way round and the spectrum itself is untouched
+        assert data != little_endian
+        assert list(spectrum.power) == [-10.5, -20.25]
+        assert list(loaded.power) == [-10.5, -20.25]
+
+    def test_from_bytes__bad_magic_or_truncated__failure(self):
+        data = OcmSpectrum.from_channels(make_channels([-10.0, -20.0])).to_bytes()
+
+        with pytest.raises(ValueError):
+            OcmSpectrum.from_bytes(b'XXXX' + data[4:])
+        with pytest.raises(ValueError):
+            OcmSpectrum.from_bytes(data[:-1])
+
+    def test_init__no_arrays__empty_spectrum(self):
+        spectrum = OcmSpectrum()
+
+        assert len(spectrum) == 0
+        assert spectrum.lower.typecode == 'q'
+        assert isinstance(spectrum.power, array)
+
+
+class TestShowOcmsSpectrum(object):
+    def setup_method(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.spectrums = {
+            1: OcmSpectrum.from_channels(make_channels([-10.0, -11.0])),
+            2: OcmSpectrum.from_channels(make_channels([-20.0, -21.0])),
+        }
+
+    def teardown_method(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def show_ocms_spectrum(self, ocm_ids, **kwargs):
+        ocms_spectrum = {ocm_id: ({'name': f'OCM-1-1-{ocm_id}', 'monitor-port': 'PORT-1-1-MON'},
+                                  self.spectrums[ocm_id]) for ocm_id in ocm_ids}
+        with mock.patch.object(ocm, 'get_ocms_spectrum', return_value=ocms_spectrum), \
+                mock.patch.object(ocm, 'show_ocm_spectrum'), \
+                mock.patch.object(ocm, 'show_ocm_spectrum_diff') as mock_show_diff:
+            ocm.show_ocms_spectrum(1, ocm_ids, **kwargs)
+        return mock_show_diff
+
+    def test_show_ocms_spectrum__several_ocms__each_compared_with_its_own_export(self):
+        path = os.path.join(self.tmp_dir, 'spectrum')
+        self.show_ocms_spectrum([1, 2], export=path)
+
+        mock_show_diff = self.show_ocms_spectrum([1, 2], baseline=path)
+
+        assert sorted(os.listdir(self.tmp_dir)) == ['spectrum.1', 'spectrum.2']
+        assert [list(baseline.power) for _, baseline in (call[0] for call in mock_show_diff.call_args_list)] == \
+            [[-10.0, -11.0], [-20.0, -21.0]]
+
+    def test_show_ocms_spectrum__baseline_of_an_ocm_missing__nothing_shown(self, capsys):
+        path = os.path.join(self.tmp_dir, 'spectrum')
+        self.spectrums[1].save(f'{path}.1')
+
+        mock_show_diff = self.show_ocms_spectrum([1, 2], baseline=path)
+
+        mock_show_diff.assert_not_called()
+        assert capsys.readouterr().out == f'Baseline spectrum {path}.2 does not exist\n'
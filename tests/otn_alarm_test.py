@@ -0,0 +1,126 @@
+from unittest import mock
+
+from otn.utils import utils
+from otn.utils.db import rdict
+
+ALARM_PROFILE = {'LOS': {'SA': 'true', 'Type': 'communication'}}
+
+
+def parse_score_bound(bound):
+    """
+    Returns:
+        (score, exclusive) of a redis score bound
+    """
+    bound = str(bound)
+    if bound.startswith('('):
+        return float(bound[1:]), True
+    return float(bound), False
+
+
+class FakeHistoryClient(object):
+    """
+    The part of a redis client used to read the HISALARM history.
+    """
+    def __init__(self, alarms, indexed=True):
+        self.hashes = {f'HISALARM|{alarm["id"]}': dict(alarm) for alarm in alarms}
+        self.index = {key: utils.get_alarm_index_score(alarm['time-created']) for key, alarm in self.hashes.items()}
+        self.keys = set(self.hashes)
+        if indexed:
+            self.keys.add(utils.HISALARM_TIME_INDEX_HEARTBEAT)
+        self.on_page = None
+
+    def exists(self, key):
+        return int(key in self.keys)
+
+    def zrevrangebyscore(self, name, max_score, min_score, start=None, num=None, withscores=False):
+        (high, high_exclusive), (low, low_exclusive) = parse_score_bound(max_score), parse_score_bound(min_score)
+        members = [(key, float(score)) for key, score in self.index.items()
+                   if (score < high or (score == high and not high_exclusive)) and
+                   (score > low or (score == low and not low_exclusive))]
+        members.sort(key=lambda member: (member[1], member[0]), reverse=True)
+        if start is not None:
+            members = members[start:start + num]
+        if self.on_page:
+            self.on_page(self)
+        return members if withscores else [key for key, _ in members]
+
+    def pipeline(self, transaction=True):
+        client = self
+
+        class Pipeline(object):
+            def __init__(self):
+                self.keys = []
+
+            def hgetall(self, key):
+                self.keys.append(key)
+
+            def execute(self):
+                return [client.hashes.get(key, {}) for key in self.keys]
+
+        return Pipeline()
+
+
+def make_history_alarm(alarm_id, time_created, time_cleared, severity='MAJOR'):
+    return rdict({'id': alarm_id, 'time-created': str(time_created), 'time-cleared': str(time_cleared),
+                  'resource': alarm_id.split('#')[0], 'severity': severity, 'text': 'loss of signal'})
+
+
+class TestNormalizeAlarm(object):
+    def test_get_db_entity_alarms__malformed_alarm__only_that_alarm_skipped(self):
+        alarms = {
+            'A': make_history_alarm('PORT-1-1-L1#LOS', 2000000000, 2000001000),
+            'B': make_history_alarm('PORT-1-1-L2#LOS', 1500000000, 'garbage'),
+            'C': make_history_alarm('PORT-1-1-L3#LOS', 1000000000, 1000001000),
+        }
+
+        with mock.patch.object(utils, 'get_db_table_all_fields_batch', return_value=alarms), \
+                mock.patch.object(utils.log, 'log_warning') as mock_log_warning:
+            result = utils.get_db_entity_alarms(1, utils.DB_HISTORY_IDX, utils.HISALARM, ALARM_PROFILE)
+
+        assert [alarm['resource'] for alarm in result] == ['PORT-1-1-L1', 'PORT-1-1-L3']
+        mock_log_warning.assert_called_once()
+        assert 'PORT-1-1-L2#LOS' in mock_log_warning.call_args[0][0]
+
+
+class TestAlarmHistory(object):
+    def iter_history(self, client, **kwargs):
+        with mock.patch.object(utils, 'get_redis_client_by_slot', return_value=client), \
+                mock.patch.object(utils, 'ALARM_HISTORY_PAGE_SIZE', 2):
+            return [alarm['id'] for alarm in utils.iter_slot_alarm_history(1, ALARM_PROFILE, **kwargs)]
+
+    def test_iter_slot_alarm_history__same_score_across_pages__every_alarm_once(self):
+        # 4 alarms in the same ms, the page boundary falls in the middle of them
+        alarms = [make_history_alarm(f'PORT-1-1-L{i}#LOS', 5000000000 + i, 6000000000) for i in range(4)]
+        alarms.append(make_history_alarm('PORT-1-1-C1#LOS', 1000000000, 6000000000))
+        client = FakeHistoryClient(alarms)
+
+        ids = self.iter_history(client)
+
+        assert ids == ['PORT-1-1-L3#LOS', 'PORT-1-1-L2#LOS', 'PORT-1-1-L1#LOS', 'PORT-1-1-L0#LOS', 'PORT-1-1-C1#LOS']
+
+    def test_iter_slot_alarm_history__alarm_indexed_while_reading__next_pages_not_shifted(self):
+        alarms = [make_history_alarm(f'PORT-1-1-L{i}#LOS', i * 1000000000, 9000000000) for i in range(1, 6)]
+        client = FakeHistoryClient(alarms)
+        new_alarm = make_history_alarm('PORT-1-1-C1#LOS', 8000000000, 9000000000)
+
+        def add_new_alarm(client):
+            client.hashes['HISALARM|PORT-1-1-C1#LOS'] = dict(new_alarm)
+            client.index['HISALARM|PORT-1-1-C1#LOS'] = 8000
+            client.on_page = None
+        client.on_page = add_new_alarm
+
+        ids = self.iter_history(client)
+
+        assert ids == [f'PORT-1-1-L{i}#LOS' for i in range(5, 0, -1)]
+
+    def test_iter_slot_alarm_history__no_indexer_heartbeat__whole_table_read(self):
+        alarms = [make_history_alarm('PORT-1-1-L1#LOS', 1000000000, 2000000000),
+                  make_history_alarm('PORT-1-1-L2#LOS', 3000000000, 4000000000)]
+        client = FakeHistoryClient(alarms, indexed=False)
+        client.index = {}
+
+        with mock.patch.object(utils, 'get_db_table_all_fields_batch',
+                               return_value={key: rdict(alarm) for key, alarm in client.hashes.items()}):
+            ids = self.iter_history(client)
+
+        assert ids == ['PORT-1-1-L2#LOS', 'PORT-1-1-L1#LOS']
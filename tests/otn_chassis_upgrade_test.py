@@ -0,0 +1,92 @@
+from unittest import mock
+
+from otn.chassis import chassis_upgrade
+from otn.utils.constants import (COMMIT_ERROR, COMMIT_FINISH, COMMITING, DOWNLOAD_FINISH, DOWNLOADING, IDLE,
+                                 REBOOTING, ROLLBACKING)
+
+FILE_FIELDS = [('upgrade-file-name', 'linecard.bin')]
+
+
+class FakeLinecard(object):
+    """
+    Upgrade state machine of a linecard: each upgrade action written moves the
+    state through the given states, one per read, the last one is kept.
+    """
+    def __init__(self, transitions):
+        self.transitions = transitions
+        self.state = IDLE
+        self.pending = []
+        self.actions = []
+
+    def set_fields(self, slot_id, field_value_touple_list):
+        action = field_value_touple_list[-1][0]
+        self.actions.append(action)
+        self.pending = list(self.transitions.get(action, []))
+
+    def read_state(self, slot_id):
+        if self.pending:
+            self.state = self.pending.pop(0)
+        return self.state
+
+
+class FakeClock(object):
+    def __init__(self):
+        self.now = 0
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += max(seconds, 0.1)
+
+
+class TestUpgradeSlot(object):
+    def upgrade_slot(self, transitions, no_reboot=False):
+        linecard = FakeLinecard(transitions)
+        progress = chassis_upgrade.ChassisUpgradeProgress([1])
+        clock = FakeClock()
+        with mock.patch.object(chassis_upgrade, 'watch_slot_upgrade_state', return_value=None), \
+                mock.patch.object(chassis_upgrade, 'read_slot_upgrade_state', side_effect=linecard.read_state), \
+                mock.patch.object(chassis_upgrade, 'set_slot_upgrade_fields', side_effect=linecard.set_fields), \
+                mock.patch.object(chassis_upgrade.time, 'monotonic', side_effect=clock.monotonic), \
+                mock.patch.object(chassis_upgrade.time, 'sleep', side_effect=clock.sleep):
+            chassis_upgrade.upgrade_slot(1, FILE_FIELDS, progress, no_reboot)
+        return linecard.actions, progress.slots[1]
+
+    def test_upgrade_slot__every_stage_finished__succeeded(self):
+        actions, slot = self.upgrade_slot({
+            'upgrade-download': [DOWNLOADING, DOWNLOAD_FINISH],
+            'upgrade-commit': [COMMITING, COMMIT_FINISH],
+            'upgrade-reboot': [REBOOTING, IDLE],
+        })
+
+        assert actions == ['upgrade-download', 'upgrade-commit', 'upgrade-reboot']
+        assert slot['stage'] == 'reboot'
+        assert slot['result'] == chassis_upgrade.UPGRADE_SUCCEEDED
+
+    def test_upgrade_slot__commit_error_rolled_back_to_idle__rolled_back(self):
+        actions, slot = self.upgrade_slot({
+            'upgrade-download': [DOWNLOADING, DOWNLOAD_FINISH],
+            'upgrade-commit': [COMMITING, COMMIT_ERROR],
+            'upgrade-rollback': [ROLLBACKING, IDLE],
+        })
+
+        assert actions == ['upgrade-download', 'upgrade-commit', 'upgrade-rollback']
+        assert slot['result'] == chassis_upgrade.UPGRADE_ROLLED_BACK
+
+    def test_upgrade_slot__rollback_ends_in_error__failed(self):
+        _, slot = self.upgrade_slot({
+            'upgrade-download': [DOWNLOADING, DOWNLOAD_FINISH],
+            'upgrade-commit': [COMMITING, COMMIT_ERROR],
+            'upgrade-rollback': [ROLLBACKING, COMMIT_ERROR],
+        })
+
+        assert slot['stage'] == 'rollback'
+        assert slot['result'] == chassis_upgrade.UPGRADE_FAILED
+
+    def test_upgrade_slot__download_never_finishes__timeout(self):
+        actions, slot = self.upgrade_slot({'upgrade-download': [DOWNLOADING]})
+
+        assert actions == ['upgrade-download']
+        assert slot['state'] == DOWNLOADING
+        assert slot['result'] == chassis_upgrade.UPGRADE_TIMEOUT
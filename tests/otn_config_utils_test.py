@@ -0,0 +1,56 @@
+from unittest import mock
+
+from otn.utils import config_utils
+
+
+class TestSetSlotTableFields(object):
+    def test_set_slot_table_fields__no_wait__fields_written_without_operation_id(self):
+        with mock.patch.object(config_utils, 'get_config_db_by_slot') as mock_get_db, \
+                mock.patch.object(config_utils, 'set_table_fields') as mock_set_table_fields, \
+                mock.patch.object(config_utils, 'subscribe_channels') as mock_subscribe_channels:
+            result = config_utils.set_slot_table_fields(1, 'APS', 'APS-1-1-1', [('active-path', 'PRIMARY')])
+
+        assert result == (0, '')
+        mock_set_table_fields.assert_called_once_with(mock_get_db.return_value, 'APS', 'APS-1-1-1',
+                                                      [('active-path', 'PRIMARY')])
+        mock_subscribe_channels.assert_not_called()
+
+    def test_set_slot_table_fields__wait__response_of_last_field_returned(self):
+        def wait_channels(db_pubsub, channels, timeout):
+            return {channels[0]: (1, 'busy')}
+
+        with mock.patch.object(config_utils, 'get_config_db_by_slot'), \
+                mock.patch.object(config_utils, 'set_table_fields') as mock_set_table_fields, \
+                mock.patch.object(config_utils, 'subscribe_channels') as mock_subscribe_channels, \
+                mock.patch.object(config_utils, 'wait_channels', side_effect=wait_channels):
+            result = config_utils.set_slot_table_fields(1, 'LINECARD', 'LINECARD-1-1',
+                                                        [('upgrade-file-name', 'a.bin'), ('upgrade-stage', 2)],
+                                                        wait=True)
+
+        assert result == (1, 'busy')
+        channel = mock_subscribe_channels.call_args[0][1][0]
+        fields = mock_set_table_fields.call_args[0][3]
+        assert fields[:2] == [('upgrade-file-name', 'a.bin'), ('upgrade-stage', '2')]
+        assert fields[2][0] == 'operation-id'
+        assert channel == f'upgrade-stage-{fields[2][1]}'
+
+
+class TestSetSlotSynchronizedSaveModules(object):
+    def test_set_slot_synchronized_save_modules__mixed_results__each_line_prefixed_with_key(self, capsys):
+        def wait_channels(db_pubsub, channels, timeout):
+            return {channel: (1, 'out of range') if index == 1 else (0, '') for index, channel in enumerate(channels)}
+
+        with mock.patch.object(config_utils, 'is_slot_present', return_value=True), \
+                mock.patch.object(config_utils, 'get_db_tables_fields_batch', return_value=[{}, {}, {}]), \
+                mock.patch.object(config_utils, 'get_config_db_by_slot'), \
+                mock.patch.object(config_utils, 'subscribe_channels'), \
+                mock.patch.object(config_utils, 'set_db_tables_fields_batch'), \
+                mock.patch.object(config_utils, 'del_db_tables_fields_batch'), \
+                mock.patch.object(config_utils, 'wait_channels', side_effect=wait_channels), \
+                mock.patch.object(config_utils, 'config_save'):
+            config_utils.set_slot_synchronized_save_modules(1, 'AMPLIFIER', ['AMPLIFIER-1-1-1', 'AMPLIFIER-1-1-2',
+                                                                             'AMPLIFIER-1-1-3'], 'enabled', 'true')
+
+        assert capsys.readouterr().out == ('AMPLIFIER-1-1-2: Failed, error msg: out of range\n'
+                                           'AMPLIFIER-1-1-1: Succeeded\n'
+                                           'AMPLIFIER-1-1-3: Succeeded\n')
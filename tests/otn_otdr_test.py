@@ -0,0 +1,102 @@
+import fnmatch
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+from otn.slot import otdr
+from otn.utils.db import rdict
+
+SCAN_KEY = 'OTDR|OTDR-1-1-1|2024-01-01T00:00:00'
+EVENT_KEY = 'OTDR_EVENT|OTDR-1-1-1|2024-01-01T00:00:00'
+
+
+def make_event(length, loss, reflection='0'):
+    return {'length': str(length), 'loss': str(loss), 'reflection': reflection}
+
+
+class TestDiffOtdrEvents(object):
+    def test_diff_otdr_events__same_events__no_diff(self):
+        events = [make_event(1.0, 0.3), make_event(5.0, 0.5, '-40')]
+
+        assert otdr.diff_otdr_events(events, list(events), 0.1) == []
+
+    def test_diff_otdr_events__changes__one_row_per_changed_bin(self):
+        baseline_events = [make_event(1.0, 0.3), make_event(5.0, 0.5), make_event(9.0, 0.2)]
+        events = [make_event(1.02, 0.35), make_event(5.0, 1.5), make_event(7.0, 0.4, '-35'),
+                  make_event(9.0, 0.2, '-30')]
+
+        diffs = otdr.diff_otdr_events(baseline_events, events, 0.1)
+
+        # 1.02 km falls in the 1.0 km bin and the 0.05 dB change is under the threshold
+        assert diffs == [
+            ['5.000', '0.50', '1.50', '+1.00', ''],
+            ['7.000', '0.00', '0.40', '+0.40', 'new reflection'],
+            ['9.000', '0.20', '0.20', '+0.00', 'new reflection'],
+        ]
+
+    def test_diff_otdr_events__event_gone_or_added__reported(self):
+        baseline_events = [make_event(2.0, 0.3), {'length': 'NA', 'loss': '9.0'}]
+        events = [make_event(3.0, 0.05)]
+
+        diffs = otdr.diff_otdr_events(baseline_events, events, 0.5)
+
+        assert diffs == [['2.000', '0.30', '0.00', '-0.30', 'event missing'],
+                         ['3.000', '0.00', '0.05', '+0.05', 'new event']]
+
+
+class FakeStateClient(object):
+    def __init__(self, db):
+        self.db = db
+
+    def keys(self, pattern):
+        return [key for key in self.db if fnmatch.fnmatch(key, pattern)]
+
+
+class TestOtdrHistoryScans(object):
+    def setup_method(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.db = {SCAN_KEY: {'scan-time': '2024-01-01T00:00:00'},
+                   f'{EVENT_KEY}|1': {'index': '1', 'length': '1.0'}}
+        self.batches = []
+
+    def teardown_method(self):
+        shutil.rmtree(self.cache_dir)
+
+    def get_db_tables_fields_batch(self, slot_id, db_id, table_keys):
+        self.batches.append(table_keys)
+        return [rdict(self.db.get(f'{table_name}|{table_key}', {})) for table_name, table_key in table_keys]
+
+    def get_history_scans(self):
+        with mock.patch.object(otdr, 'get_redis_client_by_slot', return_value=FakeStateClient(self.db)), \
+                mock.patch.object(otdr, 'get_db_table_separator', return_value='|'), \
+                mock.patch.object(otdr, 'get_db_tables_fields_batch', side_effect=self.get_db_tables_fields_batch), \
+                mock.patch.object(otdr, 'OTDR_SCAN_CACHE_DIR', self.cache_dir):
+            return otdr.get_otdr_history_scans(1, 1)
+
+    def test_get_otdr_history_scans__cached_scan__not_read_again(self):
+        self.get_history_scans()
+
+        scans = self.get_history_scans()
+
+        assert len(self.batches) == 1
+        assert scans['2024-01-01T00:00:00']['events'] == [{'index': '1', 'length': '1.0'}]
+        assert os.listdir(self.cache_dir) == ['OTDR-1-1-1.json']
+
+    def test_get_otdr_history_scans__event_added_after_caching__scan_read_again(self):
+        self.get_history_scans()
+        self.db[f'{EVENT_KEY}|2'] = {'index': '2', 'length': '5.0'}
+
+        scans = self.get_history_scans()
+
+        assert len(self.batches) == 2
+        assert [event['index'] for event in scans['2024-01-01T00:00:00']['events']] == ['1', '2']
+        self.get_history_scans()
+        assert len(self.batches) == 2
+
+    def test_save_otdr_scan_cache__replace_fails__no_temporary_file_left(self):
+        with mock.patch.object(otdr, 'OTDR_SCAN_CACHE_DIR', self.cache_dir), \
+                mock.patch.object(otdr.os, 'replace', side_effect=OSError('read-only')):
+            otdr.save_otdr_scan_cache(1, 1, {})
+
+        assert os.listdir(self.cache_dir) == []
@@ -0,0 +1,63 @@
+from unittest import mock
+
+from otn.utils import pm
+from otn.utils.db import rdict
+
+NOW = 1700000000
+
+
+def make_pm(instant, avg, min_value, max_value):
+    return rdict({'instant': str(instant), 'avg': str(avg), 'min': str(min_value), 'max': str(max_value),
+                  'min-time': '0', 'max-time': '0', 'validity': 'complete'})
+
+
+def get_lane_pm_requests(history_stamp):
+    stamp = history_stamp or 'current'
+    return [
+        ('InputPower(dBm)', 'TRANSCEIVER', f'port_{stamp}'),
+        ('<Lane-1>', None, None),
+        ('InputPower(dBm)', 'TRANSCEIVER', f'lane1_{stamp}'),
+        ('<Lane-2>', None, None),
+        ('InputPower(dBm)', 'TRANSCEIVER', f'lane2_{stamp}'),
+    ]
+
+
+class TestPmFrame(object):
+    def setup_method(self):
+        self.snapshot = pm.PmSnapshot('15', now=NOW)
+        self.stamps = {self.snapshot.history_stamp(1): 1, self.snapshot.history_stamp(2): 2}
+
+    def get_db_tables_fields_batch(self, slot_id, db_id, table_keys):
+        pms = []
+        for _, table_key in table_keys:
+            name, stamp = table_key.split('_')
+            bin_offset = self.stamps.get(stamp, 0)
+            value = {'port': -1.0, 'lane1': -3.0, 'lane2': -7.0}[name] - bin_offset
+            pms.append(make_pm(value, value, value - 0.5, value + 0.5))
+        return pms
+
+    def test_get_pm_frame__lanes_with_same_pm__every_lane_kept(self):
+        with mock.patch.object(pm, 'get_db_tables_fields_batch', side_effect=self.get_db_tables_fields_batch):
+            frame = pm.get_pm_frame(1, [('PORT-1-1-C1', get_lane_pm_requests)], self.snapshot, [2, 1])
+
+        records = frame.records()
+        assert [(r['name'], r['bin'], r['instant']) for r in records] == [
+            ('InputPower(dBm)', 2, '-3.0'),
+            ('InputPower(dBm)', 1, '-2.0'),
+            ('Lane-1 InputPower(dBm)', 2, '-5.0'),
+            ('Lane-1 InputPower(dBm)', 1, '-4.0'),
+            ('Lane-2 InputPower(dBm)', 2, '-9.0'),
+            ('Lane-2 InputPower(dBm)', 1, '-8.0'),
+        ]
+        assert frame.get('PORT-1-1-C1', 'Lane-1 InputPower(dBm)', 1)['avg'] == '-4.0'
+
+    def test_get_pm_range_summary__lanes_with_same_pm__summarized_per_lane(self):
+        with mock.patch.object(pm, 'get_db_tables_fields_batch', side_effect=self.get_db_tables_fields_batch):
+            frame = pm.get_pm_frame(1, [('PORT-1-1-C1', get_lane_pm_requests)], self.snapshot, [2, 1, 0])
+
+        summary = {r['name']: r for r in pm.get_pm_range_summary(frame.records())}
+
+        assert list(summary) == ['InputPower(dBm)', 'Lane-1 InputPower(dBm)', 'Lane-2 InputPower(dBm)']
+        assert summary['Lane-1 InputPower(dBm)'] == {'entity': 'PORT-1-1-C1', 'name': 'Lane-1 InputPower(dBm)',
+                                                     'bins': 3, 'min': -5.5, 'avg': -4.0, 'max': -2.5}
+        assert summary['Lane-2 InputPower(dBm)']['avg'] == -8.0
@@ -0,0 +1,172 @@
+import importlib
+import os
+import shutil
+import sys
+import tempfile
+import textwrap
+from unittest import mock
+
+import click
+from click.testing import CliRunner
+
+from utilities_common import util_base
+from utilities_common.cli import AbbreviationGroup
+
+NEW_COMMAND_PLUGIN = """
+import click
+
+@click.command()
+def hello():
+    click.echo('hello')
+
+def register(cli):
+    cli.add_command(hello)
+"""
+
+EXTENDING_PLUGIN = """
+import click
+
+@click.command()
+def extra():
+    click.echo('extra')
+
+def register(cli):
+    cli.commands['interfaces'].add_command(extra)
+    cli.add_command(click.Command('goodbye'))
+"""
+
+
+def make_cli():
+    @click.group(cls=AbbreviationGroup)
+    def cli():
+        pass
+
+    @cli.group(cls=AbbreviationGroup)
+    def interfaces():
+        pass
+
+    return cli
+
+
+class TestPluginsManifest(object):
+    def setup_method(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.manifest_dir = os.path.join(self.tmp_dir, 'manifest')
+        self.plugins_dir = os.path.join(self.tmp_dir, 'test_manifest_plugins')
+        os.makedirs(self.plugins_dir)
+        self.write_plugin('__init__', '')
+        self.write_plugin('new_command', NEW_COMMAND_PLUGIN)
+        self.write_plugin('extending', EXTENDING_PLUGIN)
+        sys.path.insert(0, self.tmp_dir)
+        self.patches = [
+            mock.patch.object(util_base, 'PLUGINS_MANIFEST_DIR', self.manifest_dir),
+            mock.patch.object(util_base, 'PACKAGE_MANAGER_DB_FILE', os.path.join(self.tmp_dir, 'packages.json')),
+            mock.patch.dict(os.environ, {util_base.PLUGINS_MANIFEST_ENV: '1'}),
+        ]
+        for patch in self.patches:
+            patch.start()
+        self.plugins = importlib.import_module('test_manifest_plugins')
+        self.helper = util_base.UtilHelper()
+
+    def teardown_method(self):
+        for patch in self.patches:
+            patch.stop()
+        sys.path.remove(self.tmp_dir)
+        for name in [name for name in sys.modules if name.startswith('test_manifest_plugins')]:
+            del sys.modules[name]
+        shutil.rmtree(self.tmp_dir)
+
+    def write_plugin(self, name, source):
+        with open(os.path.join(self.plugins_dir, '{}.py'.format(name)), 'w') as plugin_file:
+            plugin_file.write(textwrap.dedent(source))
+
+    def forget_plugins(self):
+        for name in ['test_manifest_plugins.new_command', 'test_manifest_plugins.extending']:
+            sys.modules.pop(name, None)
+
+    def test_build_plugins_manifest__plugins__new_commands_and_extensions_recorded(self):
+        cli = make_cli()
+
+        manifest = self.helper.build_plugins_manifest(self.plugins, cli)
+
+        assert manifest == {
+            'test_manifest_plugins.extending': {'commands': ['goodbye'], 'extends': True},
+            'test_manifest_plugins.new_command': {'commands': ['hello'], 'extends': False},
+        }
+        assert 'extra' in cli.commands['interfaces'].commands
+
+    def test_load_and_register_plugins__saved_manifest__only_extending_plugin_imported(self):
+        self.helper.load_and_register_plugins(self.plugins, make_cli())
+        assert os.listdir(self.manifest_dir) == ['test_manifest_plugins.json']
+        self.forget_plugins()
+        cli = make_cli()
+
+        self.helper.load_and_register_plugins(self.plugins, cli)
+
+        assert 'test_manifest_plugins.extending' in sys.modules
+        assert 'test_manifest_plugins.new_command' not in sys.modules
+        assert 'extra' in cli.commands['interfaces'].commands
+        assert 'hello' in cli.commands
+
+    def test_load_and_register_plugins__lazy_command_resolved__plugin_imported(self):
+        self.helper.load_and_register_plugins(self.plugins, make_cli())
+        self.forget_plugins()
+        cli = make_cli()
+        self.helper.load_and_register_plugins(self.plugins, cli)
+
+        result = CliRunner().invoke(cli, ['hello'])
+
+        assert result.exit_code == 0
+        assert result.output == 'hello\n'
+        assert 'test_manifest_plugins.new_command' in sys.modules
+
+    def test_load_and_register_plugins__plugin_added__manifest_rebuilt(self):
+        self.helper.load_and_register_plugins(self.plugins, make_cli())
+        self.forget_plugins()
+        self.write_plugin('other', NEW_COMMAND_PLUGIN.replace('hello', 'other'))
+        # Directory mtime granularity may hide the change, make it visible
+        stat = os.stat(self.plugins_dir)
+        os.utime(self.plugins_dir, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000000000))
+        importlib.invalidate_caches()
+        cli = make_cli()
+
+        self.helper.load_and_register_plugins(self.plugins, cli)
+
+        assert 'test_manifest_plugins.new_command' in sys.modules
+        manifest = self.helper.load_plugins_manifest(self.plugins, self.helper.get_plugins_signature(self.plugins))
+        assert manifest['test_manifest_plugins.other'] == {'commands': ['other'], 'extends': False}
+
+    def test_load_plugins_manifest__previous_format__stale(self):
+        self.helper.save_plugins_manifest(self.plugins, self.helper.get_plugins_signature(self.plugins), {})
+        path = self.helper.get_plugins_manifest_path(self.plugins)
+        with open(path, 'w') as manifest_file:
+            manifest_file.write('{"signature": {}, "plugins": {}}')
+
+        assert self.helper.load_plugins_manifest(self.plugins, {}) is None
+
+    def test_load_plugins_manifest__writable_by_others__not_trusted(self):
+        signature = self.helper.get_plugins_signature(self.plugins)
+        self.helper.save_plugins_manifest(self.plugins, signature, {})
+        path = self.helper.get_plugins_manifest_path(self.plugins)
+        assert self.helper.load_plugins_manifest(self.plugins, signature) == {}
+
+        os.chmod(path, 0o666)
+
+        assert self.helper.load_plugins_manifest(self.plugins, signature) is None
+
+    def test_load_plugins_manifest__written_by_another_user__not_trusted(self):
+        signature = self.helper.get_plugins_signature(self.plugins)
+        self.helper.save_plugins_manifest(self.plugins, signature, {})
+
+        with mock.patch.object(util_base.os, 'getuid', return_value=os.getuid() + 1):
+            assert self.helper.load_plugins_manifest(self.plugins, signature) is None
+
+    def test_load_and_register_plugins__manifest_disabled__every_plugin_imported(self):
+        cli = make_cli()
+
+        with mock.patch.dict(os.environ, {util_base.PLUGINS_MANIFEST_ENV: '0'}):
+            self.helper.load_and_register_plugins(self.plugins, cli)
+
+        assert not os.path.exists(self.manifest_dir)
+        assert 'test_manifest_plugins.new_command' in sys.modules
+        assert 'hello' in cli.commands
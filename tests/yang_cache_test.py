@@ -0,0 +1,88 @@
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+import sonic_yang
+import yang as ly
+from utilities_common import yang_cache
+
+
+class TestYangCache(object):
+    def setup_method(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.environ = mock.patch.dict(os.environ, {yang_cache.YANG_CACHE_DIR_ENV: self.cache_dir,
+                                                   yang_cache.YANG_CACHE_ENV: '1'})
+        self.environ.start()
+        yang_cache._preloaded.clear()
+
+    def teardown_method(self):
+        self.environ.stop()
+        yang_cache._preloaded.clear()
+        shutil.rmtree(self.cache_dir)
+
+    def test_load_sonic_yang__cached_models__models_not_loaded_again(self):
+        sy1 = yang_cache.load_sonic_yang()
+        with mock.patch.object(sonic_yang.SonicYang, 'loadYangModel') as mock_load_yang_model:
+            sy2 = yang_cache.load_sonic_yang()
+
+        mock_load_yang_model.assert_not_called()
+        assert len(os.listdir(self.cache_dir)) == 1
+        assert sy1.confDbYangMap.keys() == sy2.confDbYangMap.keys()
+        assert sy1.yangFiles == sy2.yangFiles
+        sy2.loadData({'DEVICE_METADATA': {'localhost': {'hostname': 'sonic'}}})
+        sy2.validate_data_tree()
+
+    def test_load_sonic_yang__preloaded_models__libyang_context_shared(self):
+        yang_cache.preload_sonic_yang()
+        with mock.patch.object(sonic_yang.SonicYang, 'loadYangModel') as mock_load_yang_model:
+            sy = yang_cache.load_sonic_yang()
+
+        mock_load_yang_model.assert_not_called()
+        preloaded_sy = yang_cache._preloaded[(yang_cache.YANG_DIR, 0)][2]
+        assert sy.ctx is preloaded_sy.ctx
+        assert sy.confDbYangMap is not preloaded_sy.confDbYangMap
+
+    def test_load_sonic_yang__preloaded_models_other_options__own_libyang_context(self):
+        yang_cache.preload_sonic_yang()
+        with mock.patch.object(sonic_yang.SonicYang, 'loadYangModel') as mock_load_yang_model:
+            sy = yang_cache.load_sonic_yang(sonic_yang_options=ly.LY_CTX_DISABLE_SEARCHDIR_CWD)
+
+        # Restored from the cache in a libyang context of its own
+        mock_load_yang_model.assert_not_called()
+        assert sy.ctx is not yang_cache._preloaded[(yang_cache.YANG_DIR, 0)][2].ctx
+        assert sy.confDbYangMap.keys() == yang_cache._preloaded[(yang_cache.YANG_DIR, 0)][2].confDbYangMap.keys()
+
+    def test_load_sonic_yang__cache_disabled__models_loaded(self):
+        with mock.patch.dict(os.environ, {yang_cache.YANG_CACHE_ENV: '0'}), \
+                mock.patch.object(sonic_yang.SonicYang, 'loadYangModel') as mock_load_yang_model:
+            yang_cache.load_sonic_yang()
+
+        mock_load_yang_model.assert_called_once()
+        assert os.listdir(self.cache_dir) == []
+
+    def test_get_yang_models_key__changed_yang_file__different_key(self):
+        yang_file = os.path.join(self.cache_dir, 'any.yang')
+        with open(yang_file, 'w') as f:
+            f.write('module any {}')
+        key1 = yang_cache.get_yang_models_key([yang_file])
+        with open(yang_file, 'w') as f:
+            f.write('module any { namespace "any"; }')
+        key2 = yang_cache.get_yang_models_key([yang_file])
+
+        assert key1 != key2
+        assert key2 == yang_cache.get_yang_models_key([yang_file])
+
+    def test_read_yang_cache__writable_by_others__not_read(self):
+        yang_cache.write_yang_cache('any_key', b'any models')
+        assert yang_cache.read_yang_cache('any_key') == b'any models'
+
+        os.chmod(yang_cache.get_yang_cache_path('any_key'), 0o666)
+
+        assert yang_cache.read_yang_cache('any_key') is None
+
+    def test_write_yang_cache__new_key__previous_cache_removed(self):
+        yang_cache.write_yang_cache('old_key', b'old models')
+        yang_cache.write_yang_cache('new_key', b'new models')
+
+        assert os.listdir(self.cache_dir) == [os.path.basename(yang_cache.get_yang_cache_path('new_key'))]
@@ -1,5 +1,6 @@
 import configparser
 import datetime
+import importlib
 import os
 import re
 import subprocess
@@ -11,6 +12,7 @@ import json
 import lazy_object_proxy
 import netaddr
 
+from collections.abc import MutableMapping
 from natsort import natsorted
 from sonic_py_common import multi_asic
 from utilities_common.db import Db
@@ -20,7 +22,79 @@ VLAN_SUB_INTERFACE_SEPARATOR = '.'
 pass_db = click.make_pass_decorator(Db, ensure=True)
 
 
-class AbbreviationGroup(click.Group):
+def load_lazy_command(import_path):
+    """Import the command referenced by 'module:attribute' or returned by a loader"""
+    if callable(import_path):
+        return import_path()
+    module_name, attr = import_path.split(':', 1)
+    command = importlib.import_module(module_name)
+    for name in attr.split('.'):
+        command = getattr(command, name)
+    return command
+
+
+class LazyCommands(MutableMapping):
+    """Subcommands of a click group where lazy entries are registered as
+       'module:attribute' or a loader callable and imported the first time
+       they are looked up.
+       Membership and iteration only use the names, so listing or
+       abbreviating commands does not import anything.
+    """
+
+    def __init__(self, commands=None):
+        self.loaded = dict(commands or {})
+        self.lazy = {}
+
+    def add_lazy(self, name, import_path):
+        self.loaded.pop(name, None)
+        self.lazy[name] = import_path
+
+    def __getitem__(self, name):
+        if name not in self.loaded and name in self.lazy:
+            # a failed import is raised again on the next lookup
+            command = load_lazy_command(self.lazy[name])
+            if command is None:
+                raise KeyError(name)
+            del self.lazy[name]
+            self.loaded[name] = command
+        return self.loaded[name]
+
+    def __setitem__(self, name, command):
+        self.lazy.pop(name, None)
+        self.loaded[name] = command
+
+    def __delitem__(self, name):
+        if name in self.lazy:
+            del self.lazy[name]
+        else:
+            del self.loaded[name]
+
+    def __contains__(self, name):
+        return name in self.loaded or name in self.lazy
+
+    def __iter__(self):
+        yield from self.loaded
+        yield from [name for name in self.lazy if name not in self.loaded]
+
+    def __len__(self):
+        return len(self.loaded) + len(self.lazy)
+
+
+class LazyGroup(click.Group):
+    """This subclass of click.Group supports subgroups/subcommands which are
+       only imported when they are resolved
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.commands = LazyCommands(self.commands)
+
+    def add_lazy_command(self, name, import_path):
+        """Register subcommand 'name' implemented by 'module:attribute' or returned by a loader"""
+        self.commands.add_lazy(name, import_path)
+
+
+class AbbreviationGroup(LazyGroup):
     """This subclass of click.Group supports abbreviated subgroup/subcommand names
     """
 
@@ -81,7 +155,7 @@ class Config(object):
 _config = None
 
 
-class AliasedGroup(click.Group):
+class AliasedGroup(LazyGroup):
     """This subclass of click.Group supports abbreviations and
        looking up aliases in a config file with a bit of magic.
     """
@@ -0,0 +1,518 @@
+"""
+Persistent backend for the 'show' and 'config' command line.
+
+The server imports the click command trees once and forks a child for
+every request, so a command starts with everything already imported. The
+client passes its stdin, stdout and stderr to the server, the child runs
+the command directly on them: terminal width, prompts and colors behave as
+in a regular invocation. The client forwards the signals it receives to the
+child and exits with its exit code.
+
+The 'show'/'config' entry points are such clients. When no server is
+listening they run the command in-process as before. Client and server
+only talk to each other when they run with the same user.
+
+The server checks the signature of the CLI plugins (see
+UtilHelper.get_plugins_signature) on every request. Once a plugin is
+installed or removed, the clients are told to run in-process and the server
+re-executes itself as soon as its running commands are done. The commands
+registered from the database state when the server started, such as 'show
+gearbox', are not refreshed: restart the server after changing them.
+
+This module is imported by the clients, keep its imports light.
+"""
+import argparse
+import functools
+import importlib
+import json
+import os
+import selectors
+import signal
+import socket
+import struct
+import sys
+import time
+from array import array
+
+CLI_SERVER_SOCKET_DIR = '/var/run/sonic-cli'
+CLI_SERVER_SOCKET_ENV = 'SONIC_CLI_SERVER_SOCKET'
+CLI_SERVER_BACKLOG = 64
+CLI_SERVER_REQUEST_TIMEOUT = 5
+CLI_SERVER_REQUEST_MAX_SIZE = 1024 * 1024
+CLI_SERVER_FORWARDED_SIGNALS = (signal.SIGINT, signal.SIGTERM, signal.SIGHUP, signal.SIGQUIT)
+
+# Command name -> 'module:attribute' of its click root group
+CLI_COMMANDS = {
+    'show': 'show.main:cli',
+    'config': 'config.main:config',
+}
+
+# Command name -> package of its CLI plugins
+CLI_PLUGINS = {
+    'show': 'show.plugins',
+    'config': 'config.plugins',
+}
+
+REQUEST_HEADER = struct.Struct('!I')
+REQUEST_FDS = 3  # stdin, stdout, stderr
+
+
+def get_cli_server_socket_path():
+    return os.environ.get(CLI_SERVER_SOCKET_ENV,
+                          os.path.join(CLI_SERVER_SOCKET_DIR, 'cli-{}.sock'.format(os.getuid())))
+
+
+def load_cli_command(command):
+    module_name, attr = CLI_COMMANDS[command].split(':')
+    return getattr(importlib.import_module(module_name), attr)
+
+
+def get_cli_plugins_signature(commands):
+    from utilities_common.util_base import UtilHelper
+
+    helper = UtilHelper()
+    return {command: helper.get_plugins_signature(importlib.import_module(CLI_PLUGINS[command]))
+            for command in commands if command in CLI_PLUGINS}
+
+
+def get_peer_uid(sock):
+    creds = sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize('3i'))
+    _, uid, _ = struct.unpack('3i', creds)
+    return uid
+
+
+def get_exit_code(status):
+    if os.WIFSIGNALED(status):
+        return 128 + os.WTERMSIG(status)
+    return os.WEXITSTATUS(status)
+
+
+# Client ======================================================================
+
+def connect_cli_server():
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(get_cli_server_socket_path())
+        # The stdio of the client must not be handed to a server of another user
+        if get_peer_uid(sock) != os.getuid():
+            raise PermissionError('CLI server runs with another user')
+    except OSError:
+        sock.close()
+        return None
+    return sock
+
+
+def send_cli_request(sock, command, argv):
+    request = json.dumps({
+        'command': command,
+        'argv': argv,
+        'env': dict(os.environ),
+        'cwd': os.getcwd(),
+    }).encode()
+    fds = array('i', [sys.stdin.fileno(), sys.stdout.fileno(), sys.stderr.fileno()])
+    data = REQUEST_HEADER.pack(len(request)) + request
+    sent = sock.sendmsg([data], [(socket.SOL_SOCKET, socket.SCM_RIGHTS, fds)])
+    if sent < len(data):
+        sock.sendall(data[sent:])
+
+
+def wait_cli_response(sock):
+    """
+    Read the 'pid <pid>' and 'exit <code>' lines of the server, forwarding
+    the signals received meanwhile to the child running the command. The
+    signals received before the pid line are forwarded once it is read.
+
+    Returns:
+        exit code of the command, None when the server did not start it and
+        it is to be run in-process
+    """
+    pid = None
+    pending_signals = []
+
+    def kill(signum):
+        try:
+            os.kill(pid, signum)
+        except OSError:
+            pass
+
+    def forward_signal(signum, frame):
+        if pid is None:
+            pending_signals.append(signum)
+        else:
+            kill(signum)
+
+    handlers = {signum: signal.signal(signum, forward_signal) for signum in CLI_SERVER_FORWARDED_SIGNALS}
+    try:
+        with sock.makefile('r') as response:
+            for line in response:
+                key, _, value = line.strip().partition(' ')
+                if key == 'pid':
+                    pid = int(value)
+                    while pending_signals:
+                        kill(pending_signals.pop(0))
+                elif key == 'exit':
+                    return int(value)
+                elif key == 'restart':
+                    return None
+                elif key == 'error':
+                    sys.stderr.write('CLI server error: {}\n'.format(value))
+                    return 1
+        # Closed before the command was started, e.g. the server is restarting
+        return None if pid is None else 1
+    finally:
+        for signum, handler in handlers.items():
+            signal.signal(signum, handler)
+
+
+def enable_cli_connector_cache():
+    """
+    A command runs alone in its process, in-process or in a forked child of
+    the server, so all its Db instances can share the database connectors.
+    """
+    from utilities_common.db import enable_connector_cache
+    enable_connector_cache()
+
+
+def run_cli_command_in_process(command):
+    enable_cli_connector_cache()
+    return load_cli_command(command)(prog_name=command)
+
+
+def run_cli_command(command):
+    sock = connect_cli_server()
+    if sock is None:
+        # No server, run in-process
+        return run_cli_command_in_process(command)
+
+    with sock:
+        try:
+            send_cli_request(sock, command, sys.argv[1:])
+        except (OSError, ValueError):
+            sock.close()
+            return run_cli_command_in_process(command)
+        code = wait_cli_response(sock)
+    if code is None:
+        return run_cli_command_in_process(command)
+    return code
+
+
+def show():
+    return run_cli_command('show')
+
+
+def config():
+    return run_cli_command('config')
+
+
+# Server ======================================================================
+
+def parse_cli_request(data):
+    """
+    Returns:
+        request dict, None while data does not hold all of it yet
+    """
+    if len(data) < REQUEST_HEADER.size:
+        return None
+    size, = REQUEST_HEADER.unpack_from(data)
+    if size > CLI_SERVER_REQUEST_MAX_SIZE:
+        raise ValueError('Request too large')
+    if len(data) < REQUEST_HEADER.size + size:
+        return None
+    return json.loads(bytes(data[REQUEST_HEADER.size:REQUEST_HEADER.size + size]))
+
+
+class PendingRequest(object):
+    """
+    Request being read from a client connection
+    """
+    def __init__(self, conn):
+        self.conn = conn
+        self.deadline = time.monotonic() + CLI_SERVER_REQUEST_TIMEOUT
+        self.data = bytearray()
+        self.fds = []
+
+    def recv(self):
+        """
+        Read what the client sent so far, without blocking.
+
+        Returns:
+            request dict, None while incomplete
+        """
+        fds = array('i')
+        data, ancdata, _, _ = self.conn.recvmsg(CLI_SERVER_REQUEST_MAX_SIZE,
+                                                socket.CMSG_LEN(REQUEST_FDS * fds.itemsize))
+        for level, type, cmsg_data in ancdata:
+            if level == socket.SOL_SOCKET and type == socket.SCM_RIGHTS:
+                fds.frombytes(cmsg_data[:len(cmsg_data) - (len(cmsg_data) % fds.itemsize)])
+        self.fds.extend(fds)
+        if not data:
+            raise ValueError('Truncated request')
+        self.data += data
+        request = parse_cli_request(self.data)
+        if request is not None and len(self.fds) != REQUEST_FDS:
+            raise ValueError('Missing stdio')
+        return request
+
+    def close_fds(self):
+        for fd in self.fds:
+            os.close(fd)
+        self.fds = []
+
+
+def run_cli_request(request, fds):
+    """
+    Run the request in a forked child, on the stdio of the client. Never returns.
+    """
+    code = 1
+    try:
+        for signum in CLI_SERVER_FORWARDED_SIGNALS + (signal.SIGCHLD,):
+            signal.signal(signum, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+        signal.set_wakeup_fd(-1)
+
+        for target, fd in enumerate(fds):
+            os.dup2(fd, target)
+            os.close(fd)
+        sys.stdin = open(0, 'r', closefd=False)
+        sys.stdout = open(1, 'w', buffering=1 if os.isatty(1) else -1, closefd=False)
+        sys.stderr = open(2, 'w', buffering=1, closefd=False)
+
+        os.chdir(request['cwd'])
+        os.environ.clear()
+        os.environ.update(request['env'])
+        sys.argv = [request['command']] + request['argv']
+
+        enable_cli_connector_cache()
+        load_cli_command(request['command']).main(args=request['argv'], prog_name=request['command'])
+        code = 0
+    except SystemExit as e:
+        code = e.code
+    except BaseException as e:
+        sys.stderr.write('{}\n'.format(e))
+    finally:
+        # Exit through the interpreter so that the atexit handlers, such as
+        # pending config saves, run in the child
+        sys.stdout.flush()
+        sys.stderr.flush()
+        raise SystemExit(code)
+
+
+class CliServer(object):
+    """
+    Accept requests on the unix socket and fork a child per request. The
+    requests are read without blocking, so that a stalled client only delays
+    itself. The exit code of every child is reported on its client connection.
+    """
+    def __init__(self, path, commands, yang_models=False):
+        self.path = path
+        self.commands = commands
+        self.yang_models = yang_models
+        self.plugins_signature = None
+        self.restarting = False
+        self.pid = os.getpid()
+        self.children = {}  # pid -> client connection
+        self.pending = {}  # client connection -> PendingRequest
+        self.selector = selectors.DefaultSelector()
+        self.sock = None
+        self.wakeup_r = None
+        self.wakeup_w = None
+
+    def preload(self):
+        from utilities_common.general import load_db_config
+
+        for command in self.commands:
+            load_cli_command(command)
+        self.plugins_signature = get_cli_plugins_signature(self.commands)
+        load_db_config()
+        if self.yang_models:
+            from utilities_common.yang_cache import preload_sonic_yang
+            preload_sonic_yang()
+
+    def listen(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        old_umask = os.umask(0o177)
+        try:
+            self.sock.bind(self.path)
+        finally:
+            os.umask(old_umask)
+        self.sock.listen(CLI_SERVER_BACKLOG)
+
+        self.wakeup_r, self.wakeup_w = os.pipe()
+        os.set_blocking(self.wakeup_r, False)
+        os.set_blocking(self.wakeup_w, False)
+        signal.set_wakeup_fd(self.wakeup_w)
+        signal.signal(signal.SIGCHLD, lambda signum, frame: None)
+        signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+
+        self.selector.register(self.sock, selectors.EVENT_READ, self.accept)
+        self.selector.register(self.wakeup_r, selectors.EVENT_READ, self.reap)
+
+    def serve_forever(self):
+        try:
+            while True:
+                timeout = None
+                if self.pending:
+                    timeout = max(0, min(pending.deadline for pending in self.pending.values()) - time.monotonic())
+                for key, _ in self.selector.select(timeout):
+                    key.data()
+                self.expire_requests()
+                if self.restarting and not self.children:
+                    self.restart()
+        finally:
+            if os.getpid() == self.pid:
+                self.close()
+
+    def close(self):
+        self.selector.close()
+        if self.sock is not None:
+            self.sock.close()
+            if os.path.exists(self.path):
+                os.unlink(self.path)
+        for pending in self.pending.values():
+            pending.close_fds()
+            pending.conn.close()
+        for conn in self.children.values():
+            conn.close()
+
+    def accept(self):
+        conn, _ = self.sock.accept()
+        if get_peer_uid(conn) != os.getuid():
+            self.send(conn, 'error Permission denied')
+            conn.close()
+            return
+        conn.setblocking(False)
+        self.pending[conn] = PendingRequest(conn)
+        self.selector.register(conn, selectors.EVENT_READ, functools.partial(self.read_request, conn))
+
+    def read_request(self, conn):
+        pending = self.pending[conn]
+        try:
+            request = pending.recv()
+            if request is None:
+                return
+            if request.get('command') not in self.commands:
+                raise ValueError('Command {} is not served'.format(request.get('command')))
+        except (BlockingIOError, InterruptedError):
+            return
+        except (OSError, ValueError) as e:
+            self.reject_request(conn, e)
+            return
+
+        self.selector.unregister(conn)
+        del self.pending[conn]
+        if self.plugins_signature is not None and not self.restarting and \
+                get_cli_plugins_signature(self.commands) != self.plugins_signature:
+            self.restarting = True
+        if self.restarting:
+            pending.close_fds()
+            self.send(conn, 'restart')
+            conn.close()
+            return
+        self.fork_request(conn, request, pending.fds)
+
+    def reject_request(self, conn, error):
+        self.selector.unregister(conn)
+        self.pending.pop(conn).close_fds()
+        self.send(conn, 'error {}'.format(error))
+        conn.close()
+
+    def expire_requests(self):
+        now = time.monotonic()
+        for conn in [conn for conn, pending in self.pending.items() if pending.deadline <= now]:
+            self.reject_request(conn, 'Request timeout')
+
+    def fork_request(self, conn, request, fds):
+        pid = os.fork()
+        if pid == 0:
+            self.selector.close()
+            self.sock.close()
+            os.close(self.wakeup_r)
+            os.close(self.wakeup_w)
+            for pending in self.pending.values():
+                pending.close_fds()
+                pending.conn.close()
+            for child_conn in self.children.values():
+                child_conn.close()
+            conn.close()
+            run_cli_request(request, fds)
+
+        for fd in fds:
+            os.close(fd)
+        self.children[pid] = conn
+        self.send(conn, 'pid {}'.format(pid))
+
+    def reap(self):
+        try:
+            while os.read(self.wakeup_r, 512):
+                pass
+        except BlockingIOError:
+            pass
+        while self.children:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+            if pid == 0:
+                break
+            conn = self.children.pop(pid, None)
+            if conn is not None:
+                self.send(conn, 'exit {}'.format(get_exit_code(status)))
+                conn.close()
+
+    def restart(self):
+        """
+        Re-execute the server, in the foreground as it is already detached, so
+        that it imports the current plugins.
+        """
+        self.close()
+        argv = sys.argv if '-f' in sys.argv or '--foreground' in sys.argv else sys.argv + ['--foreground']
+        os.execv(sys.executable, [sys.executable] + argv)
+
+    def send(self, conn, line):
+        try:
+            conn.sendall((line + '\n').encode())
+        except OSError:
+            pass
+
+
+def daemonize():
+    if os.fork() > 0:
+        os._exit(0)
+    os.setsid()
+    if os.fork() > 0:
+        os._exit(0)
+    os.chdir('/')
+    devnull = os.open(os.devnull, os.O_RDWR)
+    for fd in range(3):
+        os.dup2(devnull, fd)
+    os.close(devnull)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Persistent backend of the show and config commands. '
+                                     'It reloads itself when CLI plugins are installed or removed, restart it '
+                                     'after a change of the gearbox configuration.')
+    parser.add_argument('-s', '--socket', default=get_cli_server_socket_path(), help='Unix socket to listen on')
+    parser.add_argument('-c', '--commands', default=','.join(CLI_COMMANDS),
+                        help='Comma separated commands to serve, default: %(default)s')
+    parser.add_argument('-f', '--foreground', action='store_true', help='Do not daemonize')
+    parser.add_argument('-y', '--yang-models', action='store_true',
+                        help='Keep the YANG models loaded for the config commands validating with them')
+    args = parser.parse_args()
+
+    commands = args.commands.split(',')
+    for command in commands:
+        if command not in CLI_COMMANDS:
+            parser.error('Unknown command {}'.format(command))
+
+    server = CliServer(args.socket, commands, args.yang_models)
+    server.preload()
+    server.listen()
+    if not args.foreground:
+        daemonize()
+        server.pid = os.getpid()
+    server.serve_forever()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,41 +1,213 @@
+from collections.abc import Mapping
 from sonic_py_common import multi_asic, device_info
 from swsscommon.swsscommon import ConfigDBConnector, ConfigDBPipeConnector, SonicV2Connector
 from utilities_common import constants
 from utilities_common.multi_asic import multi_asic_ns_choices
 
+# Connectors shared by every Db of the process, keyed by (namespace, connector kind).
+# The cache is enabled by the show/config entry points, which run one command
+# per process; otherwise each Db connects on its own.
+_connectors = {}
+_connector_cache_enabled = False
+
+
+def enable_connector_cache(enabled=True):
+    global _connector_cache_enabled
+    _connector_cache_enabled = enabled
+    if not enabled:
+        clear_connectors()
+
+
+def is_connector_cache_enabled():
+    return _connector_cache_enabled
+
+
+def get_connector(namespace, kind, factory):
+    key = (namespace, kind)
+    if not is_connector_cache_enabled():
+        return factory()
+    if key not in _connectors:
+        _connectors[key] = factory()
+    return _connectors[key]
+
+
+def clear_connectors():
+    _connectors.clear()
+
+
+class LazySonicV2Connector(SonicV2Connector):
+    """SonicV2Connector which connects to a database the first time it is accessed"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.connected_dbs = set()
+
+    def connect(self, db_name, retry_on=True):
+        super().connect(db_name, retry_on)
+        self.connected_dbs.add(db_name)
+
+    def close(self, *args):
+        super().close(*args)
+        if args:
+            self.connected_dbs.discard(args[0])
+        else:
+            self.connected_dbs.clear()
+
+    def ensure_connected(self, db_name):
+        if db_name not in self.connected_dbs:
+            self.connect(db_name)
+
+    def get_redis_client(self, db_name, *args, **kwargs):
+        self.ensure_connected(db_name)
+        return super().get_redis_client(db_name, *args, **kwargs)
+
+    def publish(self, db_name, *args, **kwargs):
+        self.ensure_connected(db_name)
+        return super().publish(db_name, *args, **kwargs)
+
+    def exists(self, db_name, *args, **kwargs):
+        self.ensure_connected(db_name)
+        return super().exists(db_name, *args, **kwargs)
+
+    def keys(self, db_name, *args, **kwargs):
+        self.ensure_connected(db_name)
+        return super().keys(db_name, *args, **kwargs)
+
+    def scan(self, db_name, *args, **kwargs):
+        self.ensure_connected(db_name)
+        return super().scan(db_name, *args, **kwargs)
+
+    def get(self, db_name, *args, **kwargs):
+        self.ensure_connected(db_name)
+        return super().get(db_name, *args, **kwargs)
+
+    def hexists(self, db_name, *args, **kwargs):
+        self.ensure_connected(db_name)
+        return super().hexists(db_name, *args, **kwargs)
+
+    def get_all(self, db_name, *args, **kwargs):
+        self.ensure_connected(db_name)
+        return super().get_all(db_name, *args, **kwargs)
+
+    def hmset(self, db_name, *args, **kwargs):
+        self.ensure_connected(db_name)
+        return super().hmset(db_name, *args, **kwargs)
+
+    def set(self, db_name, *args, **kwargs):
+        self.ensure_connected(db_name)
+        return super().set(db_name, *args, **kwargs)
+
+    def delete(self, db_name, *args, **kwargs):
+        self.ensure_connected(db_name)
+        return super().delete(db_name, *args, **kwargs)
+
+    def delete_all_by_pattern(self, db_name, *args, **kwargs):
+        self.ensure_connected(db_name)
+        return super().delete_all_by_pattern(db_name, *args, **kwargs)
+
+
+class LazyClients(Mapping):
+    """Per namespace clients, created by factory(namespace) on first access"""
+
+    def __init__(self, namespaces, factory):
+        self.namespaces = list(namespaces)
+        self.factory = factory
+        self.clients = {}
+
+    def __getitem__(self, namespace):
+        if namespace not in self.clients:
+            if namespace not in self.namespaces:
+                raise KeyError(namespace)
+            self.clients[namespace] = self.factory(namespace)
+        return self.clients[namespace]
+
+    def __contains__(self, namespace):
+        return namespace in self.namespaces
+
+    def __iter__(self):
+        return iter(self.namespaces)
+
+    def __len__(self):
+        return len(self.namespaces)
+
+
+def connect_config_db(namespace):
+    if namespace != constants.DEFAULT_NAMESPACE:
+        return multi_asic.connect_config_db_for_ns(namespace)
+    config_db = ConfigDBConnector()
+    config_db.connect()
+    return config_db
+
+
+def connect_config_db_pipe():
+    config_db = ConfigDBPipeConnector()
+    config_db.connect()
+    return config_db
+
+
+def create_db(namespace):
+    if namespace == constants.DEFAULT_NAMESPACE:
+        return LazySonicV2Connector(host="127.0.0.1")
+    return LazySonicV2Connector(use_unix_socket_path=True, namespace=namespace)
+
 
 class Db(object):
+    """
+    Database clients of the CLI. The connections are opened per namespace and
+    database on first access and shared by every Db of the process.
+    """
     def __init__(self):
-        self.cfgdb_clients = {}
-        self.db_clients = {}
-        self.cfgdb = ConfigDBConnector()
-        self.cfgdb.connect()
-        self.cfgdb_pipe = ConfigDBPipeConnector()
-        self.cfgdb_pipe.connect()
-        self.db = SonicV2Connector(host="127.0.0.1")
-
-        # Skip connecting to chassis databases in line cards
-        self.db_list = list(self.db.get_db_list())
+        self.ns_list = []
+        namespaces = [constants.DEFAULT_NAMESPACE]
+        if multi_asic.is_multi_asic():
+            self.ns_list = multi_asic_ns_choices()
+            namespaces.extend(self.ns_list)
+
+        self.cfgdb_clients = LazyClients(
+            namespaces, lambda ns: get_connector(ns, 'cfgdb', lambda: connect_config_db(ns))
+        )
+        self.db_clients = LazyClients(
+            namespaces, lambda ns: get_connector(ns, 'db', lambda: create_db(ns))
+        )
+        self._cfgdb_pipe = None
+
+    @property
+    def cfgdb(self):
+        return self.cfgdb_clients[constants.DEFAULT_NAMESPACE]
+
+    @cfgdb.setter
+    def cfgdb(self, cfgdb):
+        self.cfgdb_clients.clients[constants.DEFAULT_NAMESPACE] = cfgdb
+
+    @property
+    def cfgdb_pipe(self):
+        if self._cfgdb_pipe is None:
+            self._cfgdb_pipe = get_connector(constants.DEFAULT_NAMESPACE, 'cfgdb_pipe', connect_config_db_pipe)
+        return self._cfgdb_pipe
+
+    @cfgdb_pipe.setter
+    def cfgdb_pipe(self, cfgdb_pipe):
+        self._cfgdb_pipe = cfgdb_pipe
+
+    @property
+    def db(self):
+        return self.db_clients[constants.DEFAULT_NAMESPACE]
+
+    @db.setter
+    def db(self, db):
+        self.db_clients.clients[constants.DEFAULT_NAMESPACE] = db
+
+    @property
+    def db_list(self):
+        # Skip chassis databases in line cards
+        db_list = list(self.db.get_db_list())
         if not device_info.is_supervisor():
             try:
-                self.db_list.remove('CHASSIS_APP_DB')
-                self.db_list.remove('CHASSIS_STATE_DB')
+                db_list.remove('CHASSIS_APP_DB')
+                db_list.remove('CHASSIS_STATE_DB')
             except Exception:
                 pass
-
-        for db_id in self.db_list:
-            self.db.connect(db_id)
-
-        self.cfgdb_clients[constants.DEFAULT_NAMESPACE] = self.cfgdb
-        self.db_clients[constants.DEFAULT_NAMESPACE] = self.db
-
-        if multi_asic.is_multi_asic():
-            self.ns_list = multi_asic_ns_choices()
-            for ns in self.ns_list:
-                self.cfgdb_clients[ns] = (
-                    multi_asic.connect_config_db_for_ns(ns)
-                )
-                self.db_clients[ns] = multi_asic.connect_to_all_dbs_for_ns(ns)
+        return db_list
 
     def get_data(self, table, key):
         data = self.cfgdb.get_table(table)
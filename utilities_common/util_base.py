@@ -1,11 +1,18 @@
 import os
+import functools
+import json
 import pkgutil
 import importlib
+import tempfile
 
 from sonic_py_common import logger
 
 # Constants ====================================================================
 PDDF_SUPPORT_FILE = '/usr/share/sonic/platform/pddf_support'
+PLUGINS_MANIFEST_DIR = '/var/cache/sonic-utilities/plugins'
+PLUGINS_MANIFEST_VERSION = 2
+PLUGINS_MANIFEST_ENV = 'SONIC_PLUGINS_MANIFEST'  # '0' disables the plugins manifest
+PACKAGE_MANAGER_DB_FILE = '/var/lib/sonic-package-manager/packages.json'
 
 # Helper classs
 
@@ -26,16 +33,21 @@ class UtilHelper(object):
             if ispkg:
                 yield from self.load_plugins(importlib.import_module(module_name))
                 continue
-            log.log_debug('importing plugin: {}'.format(module_name))
-            try:
-                module = importlib.import_module(module_name)
-            except Exception as err:
-                log.log_error('failed to import plugin {}: {}'.format(module_name, err),
-                              also_print_to_console=True)
+            module = self.import_plugin(module_name)
+            if module is None:
                 continue
 
             yield module
 
+    def import_plugin(self, module_name):
+        log.log_debug('importing plugin: {}'.format(module_name))
+        try:
+            return importlib.import_module(module_name)
+        except Exception as err:
+            log.log_error('failed to import plugin {}: {}'.format(module_name, err),
+                          also_print_to_console=True)
+            return None
+
     def register_plugin(self, plugin, root_command):
         """ Register plugin in top-level command root_command. """
 
@@ -85,7 +97,123 @@ class UtilHelper(object):
             return False
 
     def load_and_register_plugins(self, plugins, cli):
-        """ Load plugins and register them """
+        """ Load plugins and register them.
+
+        When cli supports lazy commands, the plugins which only add top-level
+        commands are imported when one of their commands is resolved, using
+        the plugins manifest.
+        """
+
+        if not self.is_plugins_manifest_enabled() or not hasattr(cli, 'add_lazy_command'):
+            for plugin in self.load_plugins(plugins):
+                self.register_plugin(plugin, cli)
+            return
+
+        signature = self.get_plugins_signature(plugins)
+        manifest = self.load_plugins_manifest(plugins, signature)
+        if manifest is None:
+            manifest = self.build_plugins_manifest(plugins, cli)
+            self.save_plugins_manifest(plugins, signature, manifest)
+        else:
+            self.register_plugins_manifest(manifest, cli)
+
+    def is_plugins_manifest_enabled(self):
+        return os.environ.get(PLUGINS_MANIFEST_ENV, '1') != '0'
+
+    def get_plugins_manifest_path(self, plugins_namespace):
+        return os.path.join(PLUGINS_MANIFEST_DIR, '{}.json'.format(plugins_namespace.__name__))
+
+    def get_plugins_signature(self, plugins_namespace):
+        """ Modification times of the plugin directories and of the package manager database.
+        Installing or removing a plugin changes one of them. """
+
+        signature = {}
+        for path in plugins_namespace.__path__:
+            for dirpath, dirnames, _ in os.walk(path):
+                dirnames[:] = [dirname for dirname in dirnames if dirname != '__pycache__']
+                signature[dirpath] = os.stat(dirpath).st_mtime_ns
+        try:
+            signature[PACKAGE_MANAGER_DB_FILE] = os.stat(PACKAGE_MANAGER_DB_FILE).st_mtime_ns
+        except OSError:
+            signature[PACKAGE_MANAGER_DB_FILE] = None
+        return signature
+
+    def load_plugins_manifest(self, plugins_namespace, signature):
+        """ Return the manifest saved by save_plugins_manifest, None if missing or stale """
+
+        try:
+            with open(self.get_plugins_manifest_path(plugins_namespace)) as manifest_file:
+                stat = os.fstat(manifest_file.fileno())
+                # The manifest names the modules to import, only trust one written by this user
+                # and not writable by others
+                if stat.st_uid != os.getuid() or stat.st_mode & 0o022:
+                    return None
+                manifest = json.load(manifest_file)
+        except (OSError, ValueError):
+            return None
+        if manifest.get('version') != PLUGINS_MANIFEST_VERSION or manifest.get('signature') != signature:
+            return None
+        return manifest.get('plugins')
+
+    def save_plugins_manifest(self, plugins_namespace, signature, manifest):
+        path = self.get_plugins_manifest_path(plugins_namespace)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with tempfile.NamedTemporaryFile('w', dir=os.path.dirname(path), delete=False) as manifest_file:
+                json.dump({'version': PLUGINS_MANIFEST_VERSION, 'signature': signature, 'plugins': manifest},
+                          manifest_file)
+            os.replace(manifest_file.name, path)
+        except OSError as err:
+            log.log_debug('failed to save plugins manifest {}: {}'.format(path, err))
+
+    def get_commands_tree(self, command, path=()):
+        """ Loaded commands with their parameters and subcommand names, and lazy
+        commands with their import path, keyed by command path. Nothing is imported. """
+
+        commands = getattr(command, 'commands', {})
+        # New top-level commands are recorded in the manifest, not as a change of the root
+        tree = {path: (command, tuple(command.params), tuple(commands) if path else ())}
+        for name, import_path in getattr(commands, 'lazy', {}).items():
+            tree[path + (name,)] = (import_path,)
+        for name, subcommand in getattr(commands, 'loaded', commands).items():
+            tree.update(self.get_commands_tree(subcommand, path + (name,)))
+        return tree
+
+    def build_plugins_manifest(self, plugins_namespace, cli):
+        """ Load and register every plugin, recording the top-level commands each one
+        adds and whether it changed commands which existed before it was registered """
+
+        manifest = {}
+        tree = self.get_commands_tree(cli)
+        for plugin in self.load_plugins(plugins_namespace):
+            self.register_plugin(plugin, cli)
+            new_tree = self.get_commands_tree(cli)
+            manifest[plugin.__name__] = {
+                'commands': [path[0] for path in new_tree if len(path) == 1 and path not in tree],
+                'extends': any(new_tree.get(path) != entry for path, entry in tree.items()),
+            }
+            tree = new_tree
+        return manifest
+
+    def register_plugins_manifest(self, manifest, cli):
+        """ Register the plugins of the manifest. Plugins which extend existing commands
+        are registered right away, the others on first use of their commands. """
+
+        for module_name, plugin_manifest in manifest.items():
+            if plugin_manifest['extends'] or not plugin_manifest['commands']:
+                plugin = self.import_plugin(module_name)
+                if plugin is not None:
+                    self.register_plugin(plugin, cli)
+                continue
+            for name in plugin_manifest['commands']:
+                cli.add_lazy_command(name, functools.partial(self.load_lazy_plugin, module_name, name, cli))
+
+    def load_lazy_plugin(self, module_name, name, cli):
+        """ Import and register the plugin implementing command name, return the command """
+
+        plugin = self.import_plugin(module_name)
+        if plugin is None:
+            return None
+        self.register_plugin(plugin, cli)
+        return cli.commands.get(name)
 
-        for plugin in self.load_plugins(plugins):
-            self.register_plugin(plugin, cli)
\ No newline at end of file
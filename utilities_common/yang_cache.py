@@ -0,0 +1,232 @@
+"""
+Cache of the YANG models loaded by sonic_yang.
+
+SonicYang.loadYangModel parses every module of the YANG directory with
+libyang, converts them to json and builds the maps from the config DB tables
+to the YANG containers, which takes seconds of CPU. The json models and the
+maps are pickled once in the cache directory, keyed by a hash of the YANG
+files, so that the next loads only parse the modules with libyang and
+unpickle the rest. Changing the YANG files, such as adding a module, changes
+the key and the cache is built again.
+
+The cache directory is YANG_CACHE_DIR, or SONIC_YANG_CACHE_DIR when set.
+SONIC_YANG_CACHE=0 turns the cache off: the models are loaded by sonic_yang
+every time, as without this module.
+
+The libyang context itself cannot be pickled. A long running process, such
+as sonic-cli-server with --yang-models, preloads the models once: the
+commands it forks share its libyang context and parse nothing.
+"""
+import argparse
+import glob
+import hashlib
+import os
+import pickle
+import sys
+import tempfile
+
+import sonic_yang
+import sonic_yang_ext
+import yang as ly
+
+YANG_DIR = "/usr/local/yang-models"
+YANG_CACHE_DIR = '/var/cache/sonic-yang'
+YANG_CACHE_DIR_ENV = 'SONIC_YANG_CACHE_DIR'
+YANG_CACHE_ENV = 'SONIC_YANG_CACHE'  # '0' disables the cache
+YANG_CACHE_FORMAT = 1
+YANG_CACHE_PREFIX = 'models-'
+
+# (YANG directory, sonic_yang options) -> (key, pickled models, SonicYang holding the libyang context) of the
+# preloaded models
+_preloaded = {}
+
+
+def is_yang_cache_enabled():
+    return os.environ.get(YANG_CACHE_ENV, '1') != '0'
+
+
+def get_yang_cache_dir():
+    return os.environ.get(YANG_CACHE_DIR_ENV, YANG_CACHE_DIR)
+
+
+def get_yang_cache_path(key):
+    return os.path.join(get_yang_cache_dir(), '{}{}.pickle'.format(YANG_CACHE_PREFIX, key))
+
+
+def get_preloaded_key(yang_dir, kwargs):
+    # The options are the flags the libyang context is created with
+    return yang_dir, kwargs.get('sonic_yang_options', 0)
+
+
+def get_yang_files(yang_dir):
+    # Same files, in the same order, as SonicYang.loadYangModel
+    return glob.glob(yang_dir + "/*.yang")
+
+
+def get_yang_models_key(yang_files):
+    """
+    Hash of the content of the YANG files and of the sonic_yang modules converting them.
+    """
+    sha = hashlib.sha256()
+    sha.update('{} {}'.format(YANG_CACHE_FORMAT, sys.version_info[:2]).encode())
+    for module in (sonic_yang, sonic_yang_ext):
+        stat = os.stat(module.__file__)
+        sha.update('{} {} {}'.format(module.__file__, stat.st_size, stat.st_mtime_ns).encode())
+    for path in sorted(yang_files):
+        sha.update(os.path.basename(path).encode() + b'\0')
+        with open(path, 'rb') as f:
+            sha.update(f.read())
+        sha.update(b'\0')
+    return sha.hexdigest()
+
+
+def read_yang_cache(key):
+    try:
+        with open(get_yang_cache_path(key), 'rb') as f:
+            stat = os.fstat(f.fileno())
+            # Only unpickle a cache written by this user and not writable by others
+            if stat.st_uid != os.getuid() or stat.st_mode & 0o022:
+                return None
+            return f.read()
+    except OSError:
+        return None
+
+
+def write_yang_cache(key, models):
+    cache_dir = get_yang_cache_dir()
+    path = get_yang_cache_path(key)
+    try:
+        os.makedirs(cache_dir, mode=0o755, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=cache_dir, prefix='.' + YANG_CACHE_PREFIX)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(models)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+        # Remove the caches of the previous YANG files
+        for name in os.listdir(cache_dir):
+            if name.startswith(YANG_CACHE_PREFIX) and name != os.path.basename(path):
+                try:
+                    os.unlink(os.path.join(cache_dir, name))
+                except OSError:
+                    pass
+    except OSError:
+        # Not cached, for example when the user cannot write the cache directory
+        pass
+
+
+def _dumps(value):
+    try:
+        return pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+    except Exception:
+        return None
+
+
+def load_models(sy):
+    """
+    Load the models in sy with loadYangModel.
+
+    Returns:
+        the attributes set by loadYangModel pickled in a dict, None if one of them cannot be pickled
+    """
+    before = {name: (value, _dumps(value)) for name, value in vars(sy).items()}
+    sy.loadYangModel()
+
+    models = {}
+    for name, value in vars(sy).items():
+        pickled = _dumps(value)
+        if name in before and before[name][0] is value and before[name][1] == pickled:
+            continue
+        if pickled is None:
+            return None
+        models[name] = value
+
+    return pickle.dumps(models, pickle.HIGHEST_PROTOCOL) if models else None
+
+
+def restore_models(sy, yang_files, models):
+    """
+    Load the models in sy from their pickled attributes, the modules are still parsed by libyang.
+    """
+    for path in yang_files:
+        sy.ctx.parse_module_path(path, ly.LYS_IN_YANG)
+    vars(sy).update(pickle.loads(models))
+
+
+def _load_sonic_yang(yang_dir, kwargs):
+    """
+    Returns:
+        (SonicYang with the models loaded, key of the models, pickled models or None)
+    """
+    yang_files = get_yang_files(yang_dir)
+    key = get_yang_models_key(yang_files)
+
+    preloaded = _preloaded.get(get_preloaded_key(yang_dir, kwargs))
+    if preloaded is not None and preloaded[0] == key:
+        sy = sonic_yang.SonicYang(yang_dir, **kwargs)
+        sy.ctx = preloaded[2].ctx
+        vars(sy).update(pickle.loads(preloaded[1]))
+        return sy, key, preloaded[1]
+
+    models = read_yang_cache(key)
+    if models is not None:
+        sy = sonic_yang.SonicYang(yang_dir, **kwargs)
+        try:
+            restore_models(sy, yang_files, models)
+            return sy, key, models
+        except Exception:
+            pass
+
+    sy = sonic_yang.SonicYang(yang_dir, **kwargs)
+    models = load_models(sy)
+    if models is not None:
+        write_yang_cache(key, models)
+    return sy, key, models
+
+
+def load_sonic_yang(yang_dir=YANG_DIR, **kwargs):
+    """
+    Returns a sonic_yang.SonicYang(yang_dir, **kwargs) with the models of yang_dir loaded, taken from the preloaded
+    models or the cache when they are up to date.
+    """
+    if not is_yang_cache_enabled():
+        sy = sonic_yang.SonicYang(yang_dir, **kwargs)
+        sy.loadYangModel()
+        return sy
+
+    sy, _, _ = _load_sonic_yang(yang_dir, kwargs)
+    return sy
+
+
+def preload_sonic_yang(yang_dir=YANG_DIR, **kwargs):
+    """
+    Keep the models of yang_dir loaded in this process. The next load_sonic_yang with the same sonic_yang options, in
+    this process or in the processes it forks, share its libyang context while the YANG files are unchanged.
+    """
+    sy, key, models = _load_sonic_yang(yang_dir, kwargs)
+    if models is not None:
+        _preloaded[get_preloaded_key(yang_dir, kwargs)] = (key, models, sy)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build the cache of the loaded YANG models')
+    parser.add_argument('-d', '--yang-dir', default=YANG_DIR, help='YANG models directory, default: %(default)s')
+    args = parser.parse_args()
+
+    yang_files = get_yang_files(args.yang_dir)
+    key = get_yang_models_key(yang_files)
+    if read_yang_cache(key) is None:
+        models = load_models(sonic_yang.SonicYang(args.yang_dir))
+        if models is None:
+            sys.exit('The loaded YANG models cannot be cached')
+        write_yang_cache(key, models)
+        if read_yang_cache(key) is None:
+            sys.exit('Cannot write the cache in {}'.format(get_yang_cache_dir()))
+    print(get_yang_cache_path(key))
+
+
+if __name__ == '__main__':
+    main()